@@ -0,0 +1,82 @@
+"""深度学习集成训练性能测试
+
+对比依次运行 mlp、lstm_mlp、cnn_mlp 三个策略的 generate_signals 与 DLEnsemble 在同一份特征上
+(串行/线程池并行)训练三个网络的总耗时:
+
+    python -m backend.benchmarks.bench_dl_ensemble --bars 2000 --epochs 10
+"""
+import argparse
+import os
+import time
+import numpy as np
+import pandas as pd
+import torch
+from backend.models.strategies.factory import StrategyFactory
+from backend.models.strategies.ml.deep_learning.ensemble import DEFAULT_MEMBERS, DLEnsemble
+from backend.models.strategies.ml.features import feature_cache
+
+
+def make_data(n_bars: int, seed: int = 42) -> pd.DataFrame:
+    """生成模拟的日线行情"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+    return pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.002, n_bars)),
+        'High': close * 1.01,
+        'Low': close * 0.99,
+        'Close': close,
+        'Volume': rng.integers(1000, 5000, n_bars).astype(float)
+    }, index=pd.date_range('2000-01-01', periods=n_bars, freq='D'))
+
+
+def configure(strategy, epochs: int):
+    strategy.model_registry = None
+    strategy.max_epochs = epochs
+    strategy.patience = None
+    return strategy
+
+
+def run_sequential(data: pd.DataFrame, epochs: int) -> float:
+    """原先的用法: 三个策略各自准备特征、训练和预测"""
+    start = time.perf_counter()
+    for name in DEFAULT_MEMBERS:
+        configure(StrategyFactory.create_strategy(name), epochs).generate_signals(data)
+    return time.perf_counter() - start
+
+
+def run_ensemble(data: pd.DataFrame, epochs: int, max_workers: int) -> float:
+    start = time.perf_counter()
+    ensemble = DLEnsemble(max_workers=max_workers)
+    for strategy in ensemble.strategies.values():
+        configure(strategy, epochs)
+    ensemble.run(data)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='深度学习集成训练性能测试')
+    parser.add_argument('--bars', type=int, default=2000)
+    parser.add_argument('--epochs', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=len(DEFAULT_MEMBERS), help='并行训练的线程数')
+    args = parser.parse_args()
+
+    data = make_data(args.bars)
+    print(f"K线 {args.bars}, epoch {args.epochs}, CPU核数 {os.cpu_count()}, torch线程 {torch.get_num_threads()}")
+
+    # 预热(导入、首次分配等一次性开销)
+    run_ensemble(data.iloc[:300], 1, 1)
+
+    results = {}
+    for label, run in [
+        ('依次运行三个策略', lambda: run_sequential(data, args.epochs)),
+        ('集成(串行)', lambda: run_ensemble(data, args.epochs, 1)),
+        (f'集成({args.workers}线程)', lambda: run_ensemble(data, args.epochs, args.workers)),
+    ]:
+        # 每种方式都从没有特征缓存开始
+        feature_cache.clear()
+        results[label] = run()
+        print(f"{label:>12}: {results[label]:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
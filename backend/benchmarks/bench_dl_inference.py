@@ -0,0 +1,79 @@
+"""深度学习策略推理性能测试
+
+对比原先 DataLoader + batch_size=32 的逐批预测与整块推理(inference_mode，普通网络/TorchScript)的单次调用耗时:
+
+    python -m backend.benchmarks.bench_dl_inference --rows 5000 --repeat 20
+"""
+import argparse
+import statistics
+import time
+import numpy as np
+import pandas as pd
+import torch
+from backend.models.strategies.ml.deep_learning.mlp_strategy import MLPStrategy
+from backend.models.strategies.ml.deep_learning.lstm_mlp_strategy import LSTMMlPStrategy
+from backend.models.strategies.ml.deep_learning.cnn_mlp_strategy import CNNMLPStrategy
+
+STRATEGIES = {
+    'mlp': MLPStrategy,
+    'lstm_mlp': LSTMMlPStrategy,
+    'cnn_mlp': CNNMLPStrategy,
+}
+
+
+def legacy_predict(model: torch.nn.Module, X: pd.DataFrame, batch_size: int = 32) -> np.ndarray:
+    """原 BaseDLStrategy.predict 的 DataLoader 实现"""
+    model.eval()
+    with torch.no_grad():
+        dataset = torch.utils.data.TensorDataset(torch.FloatTensor(X.values))
+        dataloader = torch.utils.data.DataLoader(
+            dataset, batch_size=min(batch_size, len(dataset)), shuffle=False, drop_last=False
+        )
+        predictions = []
+        for batch_X, in dataloader:
+            outputs = model(batch_X)
+            predictions.append(torch.argmax(outputs, dim=1).cpu().numpy() - 1)
+        return np.concatenate(predictions)
+
+
+def latency_ms(func, repeat: int) -> float:
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='深度学习策略推理性能测试')
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--features', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--models', nargs='+', choices=list(STRATEGIES), default=list(STRATEGIES))
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    X = pd.DataFrame(rng.normal(size=(args.rows, args.features)).astype(np.float32))
+    y = rng.integers(-1, 2, size=args.rows)
+    print(f"行数 {args.rows}, 特征 {args.features}, 线程 {torch.get_num_threads()}, 单次调用耗时取中位数")
+
+    for name in args.models:
+        strategy = STRATEGIES[name]()
+        strategy.model_registry = None
+        strategy.max_epochs = 1
+        strategy.fit(X.values, y)
+
+        legacy = latency_ms(lambda: legacy_predict(strategy.model, X), args.repeat)
+        strategy.inference_runtime = None
+        eager = latency_ms(lambda: strategy.predict(X), args.repeat)
+        strategy.inference_runtime = 'torchscript'
+        scripted = latency_ms(lambda: strategy.predict(X), args.repeat)
+        assert np.array_equal(legacy_predict(strategy.model, X), strategy.predict(X))
+        print(f"{name:>9}: DataLoader {legacy:.1f}ms, 整块推理 {eager:.1f}ms ({legacy / eager:.1f}x), "
+              f"TorchScript {scripted:.1f}ms ({legacy / scripted:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""深度学习训练循环性能测试
+
+在CPU上对比原先各策略中复制的训练循环(DataLoader + 每个batch两次 .item())与共用的 Trainer 每秒训练的epoch数:
+
+    python -m backend.benchmarks.bench_dl_training --samples 2000 --epochs 20
+    python -m backend.benchmarks.bench_dl_training --threads 1 --compile torchscript
+"""
+import argparse
+import time
+import numpy as np
+import torch
+import torch.nn as nn
+from backend.models.strategies.ml.deep_learning.trainer import Trainer
+from backend.models.strategies.ml.deep_learning.mlp_strategy import MLPModel
+from backend.models.strategies.ml.deep_learning.lstm_mlp_strategy import LSTMMlPModel
+from backend.models.strategies.ml.deep_learning.cnn_mlp_strategy import CNNMLPModel
+
+MODELS = {
+    'mlp': lambda input_dim: MLPModel(input_dim),
+    'lstm_mlp': lambda input_dim: LSTMMlPModel(input_dim),
+    'cnn_mlp': lambda input_dim: CNNMLPModel(input_dim, seq_len=20),
+}
+
+
+def make_data(n_samples: int, n_features: int, seed: int = 42):
+    """生成模拟的特征和 -1/0/1 标签"""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_samples, n_features)).astype(np.float32)
+    y = np.digitize(X[:, 0] + 0.5 * rng.normal(size=n_samples), [-0.5, 0.5]) - 1
+    return X, y
+
+
+def legacy_train(model: nn.Module, X: np.ndarray, y: np.ndarray, epochs: int, batch_size: int) -> None:
+    """原 MLP/CNN+MLP/LSTM+MLP 策略中的训练循环(不早停)"""
+    optimizer = torch.optim.Adam(model.parameters(), lr=0.001)
+    criterion = nn.CrossEntropyLoss()
+    dataset = torch.utils.data.TensorDataset(torch.FloatTensor(X), torch.LongTensor(y + 1))
+    dataloader = torch.utils.data.DataLoader(
+        dataset, batch_size=min(batch_size, len(dataset)), shuffle=True, drop_last=False
+    )
+    for epoch in range(epochs):
+        total_loss = 0
+        total_acc = 0
+        n_batches = 0
+        for batch_X, batch_y in dataloader:
+            model.train()
+            optimizer.zero_grad()
+            outputs = model(batch_X)
+            loss = criterion(outputs, batch_y)
+            loss.backward()
+            torch.nn.utils.clip_grad_norm_(model.parameters(), max_norm=1.0)
+            optimizer.step()
+            _, predicted = torch.max(outputs.data, 1)
+            total_acc += (predicted == batch_y).sum().item() / len(batch_y)
+            total_loss += loss.item()
+            n_batches += 1
+
+
+def trainer_train(model: nn.Module, X: np.ndarray, y: np.ndarray, epochs: int, batch_size: int,
+                  compile_mode: str = None) -> None:
+    trainer = Trainer(max_epochs=epochs, batch_size=batch_size, patience=None,
+                      compile_mode=compile_mode, device=torch.device('cpu'))
+    trainer.fit(model, torch.optim.Adam(model.parameters(), lr=0.001), nn.CrossEntropyLoss(), X, y)
+
+
+def epochs_per_second(train, build, X, y, epochs: int, batch_size: int, **kwargs) -> float:
+    # 第一个epoch包含编译等一次性开销，单独预热
+    torch.manual_seed(0)
+    model = build(X.shape[1])
+    train(model, X, y, 1, batch_size, **kwargs)
+    start = time.perf_counter()
+    train(model, X, y, epochs, batch_size, **kwargs)
+    return epochs / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='深度学习训练循环性能测试')
+    parser.add_argument('--samples', type=int, default=2000)
+    parser.add_argument('--features', type=int, default=30)
+    parser.add_argument('--epochs', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--threads', type=int, default=None, help='torch 线程数，默认不修改')
+    parser.add_argument('--compile', choices=['torchscript', 'compile'], default=None,
+                        help='额外测试编译后的模型')
+    parser.add_argument('--models', nargs='+', choices=list(MODELS), default=list(MODELS))
+    args = parser.parse_args()
+
+    if args.threads is not None:
+        torch.set_num_threads(args.threads)
+    X, y = make_data(args.samples, args.features)
+    print(f"样本 {args.samples}, 特征 {args.features}, batch {args.batch_size}, 线程 {torch.get_num_threads()}")
+
+    for name in args.models:
+        build = MODELS[name]
+        legacy = epochs_per_second(legacy_train, build, X, y, args.epochs, args.batch_size)
+        shared = epochs_per_second(trainer_train, build, X, y, args.epochs, args.batch_size)
+        line = (f"{name:>9}: 原训练循环 {legacy:.1f} epoch/s, Trainer {shared:.1f} epoch/s, "
+                f"加速 {shared / legacy:.2f}x")
+        if args.compile:
+            compiled = epochs_per_second(trainer_train, build, X, y, args.epochs, args.batch_size,
+                                         compile_mode=args.compile)
+            line += f", {args.compile} {compiled:.1f} epoch/s"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
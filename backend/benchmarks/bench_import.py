@@ -0,0 +1,89 @@
+"""应用冷启动性能测试
+
+在独立的子进程中导入 backend.main，统计导入耗时和进程峰值内存(RSS):
+- lazy: 当前的按需加载，启动后列出策略
+- eager: 启动时导入全部策略类(相当于原先 factory 在模块级导入所有策略)
+- first_use: 启动后第一次创建各机器学习策略时的额外开销
+
+    python -m backend.benchmarks.bench_import --repeat 3
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+SCENARIOS = {
+    'lazy': "StrategyFactory.list_strategies()",
+    'eager': "StrategyFactory.load_all()",
+}
+
+# 第一次使用时才导入的策略
+FIRST_USE = ['random_forest', 'xgboost', 'mlp', 'lstm']
+
+CHILD = """
+import json, resource, sys, time
+start = time.perf_counter()
+import backend.main
+from backend.models.strategies.factory import StrategyFactory
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    'seconds': elapsed,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'frameworks': [m for m in ('tensorflow', 'torch', 'xgboost', 'sklearn') if m in sys.modules]
+}}))
+"""
+
+FIRST_USE_CHILD = """
+import json, resource, time
+import backend.main
+from backend.models.strategies.factory import StrategyFactory
+start = time.perf_counter()
+StrategyFactory.create_strategy({name!r})
+print(json.dumps({{
+    'seconds': time.perf_counter() - start,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+}}))
+"""
+
+
+def run_child(code: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(code: str, repeat: int) -> dict:
+    runs = [run_child(code) for _ in range(repeat)]
+    return {
+        'seconds': statistics.median(r['seconds'] for r in runs),
+        'max_rss_mb': statistics.median(r['max_rss_mb'] for r in runs),
+        'frameworks': runs[-1].get('frameworks', []),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='应用冷启动性能测试')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--skip-first-use', action='store_true', help='不测试第一次创建机器学习策略的开销')
+    args = parser.parse_args()
+
+    results = {name: measure(CHILD.format(statement=statement), args.repeat)
+               for name, statement in SCENARIOS.items()}
+    for name, r in results.items():
+        frameworks = ', '.join(r['frameworks']) or '无'
+        print(f"{name:>6}: 启动 {r['seconds']:.2f}s, 峰值内存 {r['max_rss_mb']:.0f}MB, 已加载框架: {frameworks}")
+    lazy, eager = results['lazy'], results['eager']
+    print(f"按需加载: 启动快 {eager['seconds'] / lazy['seconds']:.1f}x, "
+          f"内存少 {eager['max_rss_mb'] - lazy['max_rss_mb']:.0f}MB")
+
+    if not args.skip_first_use:
+        for name in FIRST_USE:
+            r = measure(FIRST_USE_CHILD.format(name=name), 1)
+            print(f"第一次创建 {name}: {r['seconds']:.2f}s, 峰值内存 {r['max_rss_mb']:.0f}MB")
+
+
+if __name__ == '__main__':
+    main()
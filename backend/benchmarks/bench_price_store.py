@@ -0,0 +1,89 @@
+"""行情存储读取性能测试
+
+对比按股票保存的CSV文件与列式存储读取 N 只股票多年日线数据的耗时:
+
+    python -m backend.benchmarks.bench_price_store --symbols 1000 --years 10
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from backend.services.price_store import PriceStore, FILE_FORMATS
+
+
+def make_ohlcv(n_bars: int, seed: int) -> pd.DataFrame:
+    """生成模拟的日线OHLCV数据"""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2000-01-03', periods=n_bars, name='Date')
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+    spread = np.abs(rng.normal(0, 0.005, n_bars)) * close
+    return pd.DataFrame({
+        'Open': close + rng.normal(0, 0.002, n_bars) * close,
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close,
+        'Volume': rng.integers(1_000, 1_000_000, n_bars).astype(float)
+    }, index=index)
+
+
+def read_csv_files(csv_dir: str, symbols: list) -> dict:
+    return {
+        symbol: pd.read_csv(os.path.join(csv_dir, f"{symbol}.csv"), index_col=0, parse_dates=True)
+        for symbol in symbols
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='行情存储读取性能测试')
+    parser.add_argument('--symbols', type=int, default=1000)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--price-dtype', default='float64', choices=['float32', 'float64'])
+    args = parser.parse_args()
+
+    n_bars = args.years * 252
+    symbols = [f"SYM{i:04d}" for i in range(args.symbols)]
+    workdir = tempfile.mkdtemp(prefix='bench_price_store_')
+    csv_dir = os.path.join(workdir, 'stocks')
+    os.makedirs(csv_dir)
+    stores = {
+        file_format: PriceStore(
+            os.path.join(workdir, file_format),
+            price_dtype=args.price_dtype,
+            file_format=file_format
+        )
+        for file_format in FILE_FORMATS
+    }
+
+    try:
+        for i, symbol in enumerate(symbols):
+            df = make_ohlcv(n_bars, seed=i)
+            df.to_csv(os.path.join(csv_dir, f"{symbol}.csv"))
+            for store in stores.values():
+                store.write(symbol, df)
+
+        start = time.perf_counter()
+        read_csv_files(csv_dir, symbols)
+        csv_time = time.perf_counter() - start
+
+        print(f"股票数量: {args.symbols}, 年数: {args.years}, K线/股票: {n_bars}")
+        print(f"CSV解析: {csv_time:.3f}s")
+        for file_format, store in stores.items():
+            start = time.perf_counter()
+            store.read_many(symbols)
+            store_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            store.read_many(symbols, columns=['Close'])
+            close_time = time.perf_counter() - start
+
+            print(f"{file_format}(全部列): {store_time:.3f}s ({csv_time / store_time:.1f}x)")
+            print(f"{file_format}(仅Close): {close_time:.3f}s ({csv_time / close_time:.1f}x)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,9 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from backend.routes.stock_routes import router as stock_router
 from backend.routes.backtest_routes import router as backtest_router
+from backend.routes.cache_routes import router as cache_router
+from backend.routes.stream_routes import router as stream_router
+from backend.routes.model_routes import router as model_router
 import logging
 
 # 配置日志
@@ -25,6 +28,9 @@ app.add_middleware(
 # 注册路由
 app.include_router(stock_router, prefix="/api")
 app.include_router(backtest_router, prefix="/api")
+app.include_router(cache_router, prefix="/api")
+app.include_router(stream_router, prefix="/api")
+app.include_router(model_router, prefix="/api")
 
 @app.get("/")
 async def root():
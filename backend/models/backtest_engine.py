@@ -0,0 +1,196 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+ArrayLike = Union[np.ndarray, pd.Series]
+
+
+def signal_events(signals: ArrayLike, edge_triggered: bool = False) -> np.ndarray:
+    """提取有效的买卖事件(1买入, -1卖出, 0无事件)
+
+    edge_triggered=True 时只在信号发生变化的位置产生事件，且忽略第一根K线，
+    与 BaseStrategy.backtest 中逐行比较 signals[i] != signals[i-1] 的行为一致。
+    """
+    sig = np.asarray(signals, dtype=float)
+    events = np.where(sig == 1, 1, np.where(sig == -1, -1, 0)).astype(np.int8)
+
+    if edge_triggered and len(sig) > 0:
+        changed = np.empty(len(sig), dtype=bool)
+        changed[0] = False
+        # NaN != NaN 为 True，与逐行比较的语义保持一致
+        changed[1:] = sig[1:] != sig[:-1]
+        events[~changed] = 0
+
+    return events
+
+
+def positions_from_signals(signals: ArrayLike, edge_triggered: bool = False) -> np.ndarray:
+    """计算多头持仓状态(0空仓, 1持仓)
+
+    状态机: 空仓时遇到买入事件开仓，持仓时遇到卖出事件平仓，其余事件忽略。
+    因此任意时刻的持仓等价于"最近一次事件是否为买入"，可以用前向填充一次性求出。
+    """
+    events = signal_events(signals, edge_triggered)
+    n = len(events)
+    if n == 0:
+        return np.zeros(0, dtype=np.int8)
+
+    # 最近一次事件所在的位置(没有事件时为-1)
+    idx = np.where(events != 0, np.arange(n), -1)
+    last_event = np.maximum.accumulate(idx)
+
+    positions = np.zeros(n, dtype=np.int8)
+    has_event = last_event >= 0
+    positions[has_event] = events[last_event[has_event]] == 1
+    return positions
+
+
+def trade_indices(positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """根据持仓变化找出开仓和平仓位置"""
+    changes = np.diff(np.asarray(positions, dtype=np.int8), prepend=np.int8(0))
+    entries = np.flatnonzero(changes == 1)
+    exits = np.flatnonzero(changes == -1)
+    return entries, exits
+
+
+def run_vectorized_backtest(
+    close: ArrayLike,
+    signals: ArrayLike,
+    edge_triggered: bool = False
+) -> Dict[str, Any]:
+    """向量化回测内核
+
+    返回持仓序列、开平仓位置及对应价格和每笔交易的盈亏(平仓价 - 开仓价)，
+    交易结果与逐行循环实现完全一致。
+    """
+    prices = np.asarray(close, dtype=float)
+    positions = positions_from_signals(signals, edge_triggered)
+    entries, exits = trade_indices(positions)
+
+    entry_prices = prices[entries]
+    exit_prices = prices[exits]
+    profits = exit_prices - entry_prices[:len(exits)]
+
+    return {
+        'positions': positions,
+        'entries': entries,
+        'exits': exits,
+        'entry_prices': entry_prices,
+        'exit_prices': exit_prices,
+        'profits': profits
+    }
+
+
+def panel_positions(signals: np.ndarray) -> np.ndarray:
+    """面板版本的 positions_from_signals，signals 为 (时间, 股票) 矩阵，沿第0维计算"""
+    sig = np.asarray(signals, dtype=float)
+    events = np.where(sig == 1, 1, np.where(sig == -1, -1, 0)).astype(np.int8)
+    if events.shape[0] == 0:
+        return np.zeros(events.shape, dtype=np.int8)
+
+    idx = np.arange(events.shape[0])[:, None]
+    last_event = np.maximum.accumulate(np.where(events != 0, idx, -1), axis=0)
+    last_events = np.take_along_axis(events, np.maximum(last_event, 0), axis=0)
+    return ((last_event >= 0) & (last_events == 1)).astype(np.int8)
+
+
+def _safe(values: np.ndarray) -> np.ndarray:
+    """与 BacktestService._safe_float 一致: NaN/无穷大置0，并限制在JSON可表示的范围内"""
+    values = np.asarray(values, dtype=float)
+    return np.where(np.isfinite(values), np.clip(values, -1e308, 1e308), 0.0)
+
+
+def _nan_std(values: np.ndarray) -> np.ndarray:
+    """沿第0维的样本标准差(忽略NaN，有效值少于2个时为NaN)"""
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=0)
+    filled = np.where(valid, values, 0.0)
+    mean = filled.sum(axis=0) / np.maximum(count, 1)
+    squares = np.where(valid, (values - mean) ** 2, 0.0).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count > 1, np.sqrt(squares / (count - 1)), np.nan)
+
+
+def panel_metrics(
+    close: np.ndarray,
+    signals: np.ndarray,
+    days: int,
+    risk_free_rate: float = 0.02
+) -> Dict[str, np.ndarray]:
+    """按列(股票)同时计算整个面板的回测指标
+
+    指标定义与 BacktestService._evaluate_signals/_calculate_metrics 逐只计算的结果一致:
+    收益为前一日信号乘以当日涨跌幅，交易按非边沿触发的信号撮合；
+    逐只计算时会因除零、溢出等异常回退为全0指标的列，这里同样置0。
+
+    :param close: (时间, 股票) 收盘价矩阵
+    :param signals: 同形状的信号矩阵
+    :param days: 首尾日期相隔的自然日数
+    :return: 指标名 -> 每只股票的指标值数组
+    """
+    close = np.asarray(close, dtype=float)
+    sig = np.asarray(signals, dtype=float)
+    n_symbols = close.shape[1]
+    names = ['total_return', 'annual_return', 'sharpe_ratio', 'max_drawdown', 'win_rate',
+             'volatility', 'trades_count', 'profit_factor', 'recovery_factor', 'risk_return_ratio']
+    if close.shape[0] == 0 or days == 0:
+        return {name: np.zeros(n_symbols) for name in names}
+
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        # 收益率与收益曲线(NaN位置保持NaN，累乘时跳过)
+        returns = np.full(close.shape, np.nan)
+        returns[1:] = close[1:] / close[:-1] - 1
+        prev_signals = np.full(sig.shape, np.nan)
+        prev_signals[1:] = sig[:-1]
+        strategy_returns = prev_signals * returns
+        equity_curve = np.nancumprod(1 + strategy_returns, axis=0)
+        equity_curve[np.isnan(strategy_returns)] = np.nan
+
+        # 回撤
+        rolling_max = np.fmax.accumulate(equity_curve, axis=0)
+        drawdown = (equity_curve - rolling_max) / rolling_max
+
+        # 交易: 每次平仓的盈亏为平仓价减最近一次开仓价
+        positions = panel_positions(sig)
+        changes = np.diff(positions, axis=0, prepend=np.zeros((1, n_symbols), dtype=np.int8))
+        entries, exits = changes == 1, changes == -1
+        idx = np.arange(close.shape[0])[:, None]
+        last_entry = np.maximum.accumulate(np.where(entries, idx, -1), axis=0)
+        entry_prices = np.take_along_axis(close, np.maximum(last_entry, 0), axis=0)
+        profits = np.where(exits, close - entry_prices, 0.0)
+        trades_count = entries.sum(axis=0) + exits.sum(axis=0)
+        gross_profit = np.where(exits & (profits > 0), profits, 0.0).sum(axis=0)
+        gross_loss = np.where(exits & (profits < 0), profits, 0.0).sum(axis=0)
+        winning = (exits & (profits > 0)).sum(axis=0)
+
+        total_return = _safe(equity_curve[-1] - 1)
+        growth = (1 + total_return) ** (365 / days)
+        annual_return = _safe(growth - 1)
+        volatility = _safe(_nan_std(strategy_returns) * np.sqrt(252))
+        sharpe_ratio = _safe((annual_return - risk_free_rate) / volatility)
+        max_drawdown = _safe(np.fmin.reduce(drawdown, axis=0))
+        win_rate = _safe(np.where(trades_count > 0, winning / np.maximum(trades_count, 1), 0.0))
+        profit_factor = _safe(np.where(gross_loss != 0, gross_profit / np.abs(gross_loss), np.inf))
+        recovery_factor = _safe(np.where(max_drawdown != 0, np.abs(total_return / max_drawdown), np.inf))
+        risk_return_ratio = _safe(np.where(max_drawdown != 0, np.abs(annual_return / max_drawdown), np.inf))
+
+    metrics = {
+        'total_return': total_return,
+        'annual_return': annual_return,
+        'sharpe_ratio': sharpe_ratio,
+        'max_drawdown': max_drawdown,
+        'win_rate': win_rate,
+        'volatility': volatility,
+        'trades_count': trades_count.astype(float),
+        'profit_factor': profit_factor,
+        'recovery_factor': recovery_factor,
+        'risk_return_ratio': risk_return_ratio
+    }
+    # 逐只计算时抛出异常的情形: 年化收益溢出或为复数、波动率为0
+    failed = ~np.isfinite(growth) | (volatility == 0)
+    for name in names:
+        metrics[name] = np.where(failed, 0.0, metrics[name])
+    return metrics
@@ -0,0 +1,82 @@
+"""K线形态的向量化计算
+
+输入为NumPy的OHLC数组，所有函数沿最后一维(时间)计算，既可处理单只股票的一维数组，
+也可一次处理 (股票数, 时间) 的二维面板。与前一根K线比较的形态在第一根K线上为False，
+含NaN的比较结果为False。
+"""
+import numpy as np
+from backend.models.indicators.rolling import shift
+
+
+def bar_direction(open_: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """K线方向: 阳线1，阴线-1，十字星0"""
+    close = np.asarray(close, dtype=np.float64)
+    return np.where(close > open_, 1, np.where(close < open_, -1, 0)).astype(np.int64)
+
+
+def up_bar(open_: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """阳线(收盘价高于开盘价)"""
+    return np.asarray(close, dtype=np.float64) > open_
+
+
+def down_bar(open_: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """阴线(收盘价低于开盘价)"""
+    return np.asarray(close, dtype=np.float64) < open_
+
+
+def inside_bar(high: np.ndarray, low: np.ndarray) -> np.ndarray:
+    """内包K线: 最高价和最低价都在前一根K线范围内"""
+    return (high <= shift(high)) & (low >= shift(low))
+
+
+def outside_bar(high: np.ndarray, low: np.ndarray) -> np.ndarray:
+    """外包K线: 最高价和最低价都突破前一根K线"""
+    return (high > shift(high)) & (low < shift(low))
+
+
+def consecutive_count(mask: np.ndarray) -> np.ndarray:
+    """截至每个位置(含)连续为True的K线数量"""
+    mask = np.asarray(mask, dtype=bool)
+    index = np.broadcast_to(np.arange(mask.shape[-1]), mask.shape)
+    last_false = np.maximum.accumulate(np.where(mask, -1, index), axis=-1)
+    return index - last_false
+
+
+def preceded_by_streak(mask: np.ndarray, n_bars: int) -> np.ndarray:
+    """当前K线之前的 n_bars 根K线是否全部满足条件(不含当前K线)"""
+    mask = np.asarray(mask, dtype=bool)
+    counts = consecutive_count(mask)
+    prev_counts = np.zeros(counts.shape, dtype=counts.dtype)
+    prev_counts[..., 1:] = counts[..., :-1]
+    return prev_counts >= n_bars
+
+
+def doji(
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    body_ratio: float = 0.1
+) -> np.ndarray:
+    """十字星: 实体长度不超过K线振幅的 body_ratio"""
+    body = np.abs(np.asarray(close, dtype=np.float64) - open_)
+    bar_range = np.asarray(high, dtype=np.float64) - low
+    return (bar_range > 0) & (body <= body_ratio * bar_range)
+
+
+def bullish_engulfing(open_: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """看涨吞没: 前一根阴线的实体被当前阳线的实体完全覆盖"""
+    prev_open, prev_close = shift(open_), shift(close)
+    return (
+        (prev_close < prev_open) & up_bar(open_, close) &
+        (open_ <= prev_close) & (close >= prev_open)
+    )
+
+
+def bearish_engulfing(open_: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """看跌吞没: 前一根阳线的实体被当前阴线的实体完全覆盖"""
+    prev_open, prev_close = shift(open_), shift(close)
+    return (
+        (prev_close > prev_open) & down_bar(open_, close) &
+        (open_ >= prev_close) & (close <= prev_open)
+    )
@@ -0,0 +1,219 @@
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from backend.services.cache_service import CacheService
+from backend.services.memory_cache import MemoryCache
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(data: pd.Series) -> str:
+    """计算序列内容(数值+索引)的哈希，内容相同的序列得到相同的指纹"""
+    h = hashlib.blake2b(digest_size=16)
+    values = np.ascontiguousarray(data.to_numpy())
+    h.update(values.dtype.str.encode())
+    h.update(values.tobytes())
+
+    index = data.index
+    if isinstance(index, pd.DatetimeIndex):
+        h.update(str(index.tz).encode())
+        h.update(np.ascontiguousarray(index.asi8).tobytes())
+    elif isinstance(index, pd.RangeIndex):
+        h.update(f"range:{index.start}:{index.stop}:{index.step}".encode())
+    else:
+        h.update(pd.util.hash_pandas_object(index, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _copy(result: Any) -> Any:
+    """复制缓存的计算结果(序列、数组或它们组成的元组)"""
+    if isinstance(result, tuple):
+        return tuple(_copy(item) for item in result)
+    if isinstance(result, (pd.Series, pd.DataFrame, np.ndarray)):
+        return result.copy()
+    return result
+
+
+class IndicatorEngine:
+    """带记忆化的技术指标计算
+
+    缓存key由 CacheService.get_indicator_key(输入序列指纹, 指标名, 参数) 生成，
+    同一份行情数据上的相同指标只计算一次，多个策略(或参数扫描中的多个组合)共享结果。
+    每次返回缓存结果的副本，调用方原地修改不会影响缓存和其他调用方。
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.cache = MemoryCache(max_bytes=max_bytes, default_ttl=None)
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _record(self, indicator: str, hit: bool):
+        with self._lock:
+            counts = self._counts.setdefault(indicator, {'hits': 0, 'misses': 0})
+            counts['hits' if hit else 'misses'] += 1
+
+    def memoize(
+        self,
+        indicator: str,
+        data: pd.Series,
+        params: Dict[str, Any],
+        compute: Callable[[], Any],
+        key: Optional[str] = None
+    ) -> Any:
+        """按 (数据指纹, 指标, 参数) 缓存计算结果
+
+        :param key: 调用方已计算的数据指纹，对同一序列多次调用时可避免重复哈希
+        """
+        cache_key = CacheService.get_indicator_key(key or fingerprint(data), indicator, params)
+        result = self.cache.get(cache_key)
+        if result is not None:
+            self._record(indicator, True)
+            return _copy(result)
+
+        result = compute()
+        self.cache.set(cache_key, result)
+        self._record(indicator, False)
+        return _copy(result)
+
+    def sma(
+        self,
+        data: pd.Series,
+        window: int,
+        min_periods: Optional[int] = None,
+        key: Optional[str] = None
+    ) -> pd.Series:
+        """简单移动平均"""
+        return self.memoize(
+            'sma', data, {'window': window, 'min_periods': min_periods},
+            lambda: data.rolling(window=window, min_periods=min_periods).mean(),
+            key
+        )
+
+    def rolling_std(
+        self,
+        data: pd.Series,
+        window: int,
+        min_periods: Optional[int] = None,
+        key: Optional[str] = None
+    ) -> pd.Series:
+        """滚动标准差"""
+        return self.memoize(
+            'std', data, {'window': window, 'min_periods': min_periods},
+            lambda: data.rolling(window=window, min_periods=min_periods).std(),
+            key
+        )
+
+    def ema(self, data: pd.Series, span: int, key: Optional[str] = None) -> pd.Series:
+        """指数移动平均"""
+        return self.memoize(
+            'ema', data, {'span': span},
+            lambda: data.ewm(span=span, adjust=False).mean(),
+            key
+        )
+
+    def rsi(
+        self,
+        data: pd.Series,
+        period: int = 14,
+        method: str = 'sma',
+        key: Optional[str] = None
+    ) -> pd.Series:
+        """相对强弱指标
+
+        :param method: 'sma' 使用涨跌幅的简单移动平均；
+                       'wilder' 使用Wilder平滑
+        """
+        if method not in ('sma', 'wilder'):
+            raise ValueError(f"不支持的RSI计算方式: {method}")
+
+        def compute():
+            delta = data.diff()
+            gain = delta.where(delta > 0, 0)
+            loss = -delta.where(delta < 0, 0)
+            if method == 'sma':
+                avg_gain = gain.rolling(window=period).mean()
+                avg_loss = loss.rolling(window=period).mean()
+                rs = avg_gain / avg_loss
+                return 100 - (100 / (1 + rs))
+
+            # 第period个变化处用前period个涨跌幅的均值作为初值，之后递推平滑
+            avg_gain = self._wilder_smooth(gain, period)
+            avg_loss = self._wilder_smooth(loss, period)
+            total = avg_gain + avg_loss
+            return (100 * avg_gain / total).where(total != 0, 0).where(total.notna())
+
+        return self.memoize('rsi', data, {'period': period, 'method': method}, compute, key)
+
+    @staticmethod
+    def _wilder_smooth(values: pd.Series, period: int) -> pd.Series:
+        seeded = values.copy()
+        seeded.iloc[:period + 1] = np.nan
+        if len(values) > period:
+            seeded.iloc[period] = values.iloc[1:period + 1].mean()
+        return seeded.ewm(alpha=1.0 / period, adjust=False).mean()
+
+    def macd(
+        self,
+        data: pd.Series,
+        fast_period: int = 12,
+        slow_period: int = 26,
+        signal_period: int = 9,
+        key: Optional[str] = None
+    ) -> Tuple[pd.Series, pd.Series, pd.Series]:
+        """MACD线、信号线和柱状图"""
+        key = key or fingerprint(data)
+
+        def compute():
+            macd = self.ema(data, fast_period, key) - self.ema(data, slow_period, key)
+            signal = macd.ewm(span=signal_period, adjust=False).mean()
+            return macd, signal, macd - signal
+
+        return self.memoize(
+            'macd', data,
+            {'fast': fast_period, 'slow': slow_period, 'signal': signal_period},
+            compute, key
+        )
+
+    def bollinger_bands(
+        self,
+        data: pd.Series,
+        window: int = 20,
+        num_std: float = 2.0,
+        min_periods: Optional[int] = None,
+        key: Optional[str] = None
+    ) -> Tuple[pd.Series, pd.Series, pd.Series]:
+        """布林带(上轨、中轨、下轨)"""
+        key = key or fingerprint(data)
+        middle = self.sma(data, window, min_periods, key)
+        std = self.rolling_std(data, window, min_periods, key)
+        return middle + std * num_std, middle, middle - std * num_std
+
+    def stats(self) -> Dict[str, Any]:
+        """指标缓存的命中统计"""
+        with self._lock:
+            indicators = {name: dict(counts) for name, counts in self._counts.items()}
+        hits = sum(c['hits'] for c in indicators.values())
+        misses = sum(c['misses'] for c in indicators.values())
+        cache_stats = self.cache.stats()
+        return {
+            'hits': hits,
+            'misses': misses,
+            'reuse_rate': hits / (hits + misses) if hits + misses else 0.0,
+            'indicators': indicators,
+            'entries': cache_stats['entries'],
+            'current_bytes': cache_stats['current_bytes'],
+            'max_bytes': cache_stats['max_bytes'],
+            'evictions': cache_stats['evictions'],
+        }
+
+    def clear(self):
+        self.cache.clear()
+        with self._lock:
+            self._counts.clear()
+
+
+# 进程内共享的指标引擎
+indicator_engine = IndicatorEngine()
@@ -0,0 +1,52 @@
+"""滚动窗口最值的批量计算
+
+使用 van Herk/Gil-Werman 算法: 把序列切成长度为 window 的块，分别计算块内前缀和后缀的
+累计最值，任意窗口的最值等于其跨越的两个块的后缀/前缀最值之一，每个元素只比较常数次，
+总复杂度O(N)且与窗口长度无关。
+
+所有函数沿最后一维计算，可直接处理 (股票数, 时间) 的二维数组。窗口内的NaN被忽略
+(与 Series.max()/min() 的skipna语义一致)，窗口内全为NaN时结果为NaN。
+"""
+import numpy as np
+
+
+def _rolling_extreme(values: np.ndarray, window: int, ufunc: np.ufunc) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    if window < 1:
+        raise ValueError("window必须大于0")
+    n = values.shape[-1]
+    result = np.full(values.shape, np.nan)
+    if n < window:
+        return result
+
+    # 末尾用NaN补齐为window的整数倍，fmax/fmin会忽略补齐的值
+    blocks = -(-n // window)
+    padded = np.full(values.shape[:-1] + (blocks * window,), np.nan)
+    padded[..., :n] = values
+    padded = padded.reshape(values.shape[:-1] + (blocks, window))
+
+    prefix = ufunc.accumulate(padded, axis=-1).reshape(values.shape[:-1] + (-1,))
+    suffix = ufunc.accumulate(padded[..., ::-1], axis=-1)[..., ::-1].reshape(values.shape[:-1] + (-1,))
+
+    # 以位置 i 结尾的窗口 [i-window+1, i] = 块后缀(起点) + 块前缀(终点)
+    result[..., window - 1:] = ufunc(suffix[..., :n - window + 1], prefix[..., window - 1:n])
+    return result
+
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """以每个位置结尾的窗口最大值，前 window-1 个位置为NaN"""
+    return _rolling_extreme(values, window, np.fmax)
+
+
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """以每个位置结尾的窗口最小值，前 window-1 个位置为NaN"""
+    return _rolling_extreme(values, window, np.fmin)
+
+
+def shift(values: np.ndarray, periods: int = 1, axis: int = -1) -> np.ndarray:
+    """沿指定维度(默认最后一维)向后平移，空出的位置填NaN"""
+    values = np.moveaxis(np.asarray(values, dtype=np.float64), axis, -1)
+    result = np.full(values.shape, np.nan)
+    if periods < values.shape[-1]:
+        result[..., periods:] = values[..., :values.shape[-1] - periods]
+    return np.moveaxis(result, -1, axis)
@@ -0,0 +1,377 @@
+"""逐K线增量计算的技术指标
+
+每个指标对象每次 update 只消耗 O(1) 时间(滚动最值为均摊O(1))，
+输出与批量版本(IndicatorEngine / TechnicalIndicators)一致:
+- 预热期(数据不足窗口长度)输出NaN，与pandas rolling的min_periods语义相同
+- EMA/MACD 使用与 pandas ewm(adjust=False) 相同的递推公式，结果逐位一致
+- 滚动均值/标准差使用与 pandas rolling 相同的补偿求和(Kahan)与加减顺序，长序列上误差不累积，
+  结果逐位一致
+- 滚动最值跳过NaN，窗口内有效值不足 min_periods 时输出NaN
+"""
+import math
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+NAN = float('nan')
+
+
+def _is_nan(value: float) -> bool:
+    return value != value
+
+
+def _div(numerator: float, denominator: float) -> float:
+    """与numpy一致的除法: 除以0得到inf或NaN而不是抛出异常"""
+    if denominator == 0:
+        if numerator == 0 or _is_nan(numerator):
+            return NAN
+        return math.copysign(math.inf, numerator) * math.copysign(1.0, denominator)
+    return numerator / denominator
+
+
+class _KahanSum:
+    """补偿求和，加和减分别补偿(与 pandas roll_mean 相同)"""
+
+    def __init__(self):
+        self.total = 0.0
+        self._add_comp = 0.0
+        self._remove_comp = 0.0
+
+    def add(self, x: float):
+        y = x - self._add_comp
+        t = self.total + y
+        self._add_comp = t - self.total - y
+        self.total = t
+
+    def remove(self, x: float):
+        y = -x - self._remove_comp
+        t = self.total + y
+        self._remove_comp = t - self.total - y
+        self.total = t
+
+
+class StreamingIndicator:
+    """增量指标基类"""
+
+    def __init__(self):
+        self.value = NAN
+
+    @property
+    def ready(self) -> bool:
+        """是否已完成预热"""
+        value = self.value[-1] if isinstance(self.value, tuple) else self.value
+        return not _is_nan(value)
+
+    def update(self, *args):
+        raise NotImplementedError
+
+
+class _RollingWindow(StreamingIndicator):
+    """固定窗口的滚动统计: 先移出离开窗口的值，再加入新值(与 pandas rolling 的顺序相同)
+
+    窗口长度为1时每根K线都重新开始累计，与 pandas 对不重叠窗口的处理一致。
+    """
+
+    def __init__(self, window: int, min_periods: Optional[int] = None):
+        super().__init__()
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self._values: Deque[float] = deque()
+
+    def _reset(self, x: float):
+        raise NotImplementedError
+
+    def _add(self, x: float):
+        raise NotImplementedError
+
+    def _remove(self, x: float):
+        raise NotImplementedError
+
+    def _result(self) -> float:
+        raise NotImplementedError
+
+    def update(self, x: float) -> float:
+        if not self._values or self.window == 1:
+            self._values.clear()
+            self._reset(x)
+        elif len(self._values) == self.window:
+            self._remove(self._values.popleft())
+        self._values.append(x)
+        self._add(x)
+        self.value = self._result()
+        return self.value
+
+
+class SMA(_RollingWindow):
+    """简单移动平均(跳过NaN，min_periods为窗口内有效值个数下限)"""
+
+    def _reset(self, x: float):
+        self._sum = _KahanSum()
+        self._count = 0
+        self._negative = 0
+        # 末尾连续相同的值及个数，窗口内全部相同时直接取该值(与pandas一致)
+        self._last = x
+        self._same = 0
+
+    def _add(self, x: float):
+        if _is_nan(x):
+            return
+        self._count += 1
+        self._sum.add(x)
+        if math.copysign(1.0, x) < 0:
+            self._negative += 1
+        self._same = self._same + 1 if x == self._last else 1
+        self._last = x
+
+    def _remove(self, x: float):
+        if _is_nan(x):
+            return
+        self._count -= 1
+        self._sum.remove(x)
+        if math.copysign(1.0, x) < 0:
+            self._negative -= 1
+
+    def _result(self) -> float:
+        if self._count < max(self.min_periods, 1):
+            return NAN
+        if self._same >= self._count:
+            return self._last
+        mean = self._sum.total / self._count
+        # 全部为非负(非正)值时均值不会因舍入变号
+        if self._negative == 0 and mean < 0:
+            return 0.0
+        if self._negative == self._count and mean > 0:
+            return 0.0
+        return mean
+
+
+class RollingStd(_RollingWindow):
+    """滚动样本标准差(ddof=1)，使用带补偿的滑动窗口Welford算法"""
+
+    def _reset(self, x: float):
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._add_comp = 0.0
+        self._remove_comp = 0.0
+        self._last = x
+        self._same = 0
+
+    def _add(self, x: float):
+        if _is_nan(x):
+            return
+        self._count += 1
+        self._same = self._same + 1 if x == self._last else 1
+        self._last = x
+        prev_mean = self._mean - self._add_comp
+        y = x - self._add_comp
+        t = y - self._mean
+        self._add_comp = t + self._mean - y
+        self._mean = self._mean + t / self._count
+        self._m2 = self._m2 + (x - prev_mean) * (x - self._mean)
+
+    def _remove(self, x: float):
+        if _is_nan(x):
+            return
+        self._count -= 1
+        if self._count == 0:
+            self._mean = 0.0
+            self._m2 = 0.0
+            return
+        prev_mean = self._mean - self._remove_comp
+        y = x - self._remove_comp
+        t = y - self._mean
+        self._remove_comp = t + self._mean - y
+        self._mean = self._mean - t / self._count
+        self._m2 = self._m2 - (x - prev_mean) * (x - self._mean)
+
+    def _result(self) -> float:
+        if self._count < max(self.min_periods, 1) or self._count <= 1:
+            return NAN
+        if self._same >= self._count:
+            # 窗口内全部相同时方差为0(与pandas一致)
+            return 0.0
+        return math.sqrt(max(self._m2 / (self._count - 1), 0.0))
+
+
+class EMA(StreamingIndicator):
+    """指数移动平均，与 pandas ewm(adjust=False) 相同的递推"""
+
+    def __init__(self, span: Optional[int] = None, alpha: Optional[float] = None):
+        super().__init__()
+        if alpha is None:
+            if span is None:
+                raise ValueError("span和alpha必须指定一个")
+            alpha = 2.0 / (span + 1.0)
+        self.alpha = alpha
+        self._old_wt_factor = 1.0 - alpha
+
+    def update(self, x: float) -> float:
+        if _is_nan(x):
+            return self.value
+        if _is_nan(self.value):
+            self.value = x
+        elif self.value != x:
+            self.value = (self._old_wt_factor * self.value + self.alpha * x) / (self._old_wt_factor + self.alpha)
+        return self.value
+
+
+class RSI(StreamingIndicator):
+    """相对强弱指标
+
+    :param method: 'sma' 与 IndicatorEngine.rsi 默认算法一致(涨跌幅简单移动平均)；
+                   'wilder' 使用Wilder平滑(与TA-Lib一致)
+    """
+
+    def __init__(self, period: int = 14, method: str = 'sma'):
+        super().__init__()
+        if method not in ('sma', 'wilder'):
+            raise ValueError(f"不支持的RSI计算方式: {method}")
+        self.period = period
+        self.method = method
+        self._prev: Optional[float] = None
+        if method == 'sma':
+            self._avg_gain = SMA(period)
+            self._avg_loss = SMA(period)
+        else:
+            self._avg_gain = EMA(alpha=1.0 / period)
+            self._avg_loss = EMA(alpha=1.0 / period)
+            self._seed_gains = []
+            self._seed_losses = []
+
+    def update(self, x: float) -> float:
+        # 与批量版本一致: 第一根K线没有涨跌幅，按0计入
+        delta = NAN if self._prev is None else x - self._prev
+        self._prev = x
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+
+        if self.method == 'sma':
+            avg_gain = self._avg_gain.update(gain)
+            avg_loss = self._avg_loss.update(loss)
+            if _is_nan(avg_gain) or _is_nan(avg_loss):
+                self.value = NAN
+            else:
+                rs = _div(avg_gain, avg_loss)
+                self.value = 100 - 100 / (1 + rs) if not _is_nan(rs) else NAN
+            return self.value
+
+        # Wilder: 前period个涨跌幅的均值作为初值，之后递推平滑
+        if _is_nan(self._avg_gain.value):
+            if _is_nan(delta):
+                return self.value
+            self._seed_gains.append(gain)
+            self._seed_losses.append(loss)
+            if len(self._seed_gains) < self.period:
+                return self.value
+            avg_gain = self._avg_gain.update(math.fsum(self._seed_gains) / self.period)
+            avg_loss = self._avg_loss.update(math.fsum(self._seed_losses) / self.period)
+        else:
+            avg_gain = self._avg_gain.update(gain)
+            avg_loss = self._avg_loss.update(loss)
+
+        total = avg_gain + avg_loss
+        self.value = 100 * avg_gain / total if total != 0 else 0.0
+        return self.value
+
+
+class MACD(StreamingIndicator):
+    """MACD线、信号线和柱状图"""
+
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9):
+        super().__init__()
+        self._fast = EMA(fast_period)
+        self._slow = EMA(slow_period)
+        self._signal = EMA(signal_period)
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, x: float) -> Tuple[float, float, float]:
+        macd = self._fast.update(x) - self._slow.update(x)
+        signal = self._signal.update(macd)
+        self.value = (macd, signal, macd - signal)
+        return self.value
+
+
+class BollingerBands(StreamingIndicator):
+    """布林带(上轨、中轨、下轨)"""
+
+    def __init__(self, window: int = 20, num_std: float = 2.0, min_periods: Optional[int] = None):
+        super().__init__()
+        self.num_std = num_std
+        self._mean = SMA(window, min_periods)
+        self._std = RollingStd(window, min_periods)
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, x: float) -> Tuple[float, float, float]:
+        middle = self._mean.update(x)
+        std = self._std.update(x)
+        self.value = (middle + std * self.num_std, middle, middle - std * self.num_std)
+        return self.value
+
+
+class ATR(StreamingIndicator):
+    """平均真实波幅(真实波幅的简单移动平均)"""
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self._tr = SMA(period)
+        self._prev_close: Optional[float] = None
+
+    def update(self, high: float, low: float, close: float) -> float:
+        tr = high - low
+        if self._prev_close is not None:
+            tr = max(tr, abs(high - self._prev_close), abs(low - self._prev_close))
+        self._prev_close = close
+        self.value = self._tr.update(tr)
+        return self.value
+
+
+class RollingExtreme:
+    """单调队列实现的滚动最大/最小值，均摊O(1)
+
+    与 pandas rolling().max()/min() 一致: 跳过NaN，窗口内有效值不足 min_periods(默认窗口长度)时输出NaN。
+    """
+
+    def __init__(self, window: int, mode: str = 'max', min_periods: Optional[int] = None):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self._better = (lambda a, b: a >= b) if mode == 'max' else (lambda a, b: a <= b)
+        self._queue: Deque[Tuple[int, float]] = deque()
+        # 窗口内的NaN位置
+        self._nans: Deque[int] = deque()
+        self._index = 0
+
+    def update(self, x: float) -> float:
+        if _is_nan(x):
+            self._nans.append(self._index)
+        else:
+            while self._queue and self._better(x, self._queue[-1][1]):
+                self._queue.pop()
+            self._queue.append((self._index, x))
+        oldest = self._index - self.window
+        if self._queue and self._queue[0][0] <= oldest:
+            self._queue.popleft()
+        if self._nans and self._nans[0] <= oldest:
+            self._nans.popleft()
+        self._index += 1
+        count = min(self._index, self.window) - len(self._nans)
+        if count < max(self.min_periods, 1) or not self._queue:
+            return NAN
+        return self._queue[0][1]
+
+
+class Stochastic(StreamingIndicator):
+    """随机指标(K、D)"""
+
+    def __init__(self, k_period: int = 14, d_period: int = 3):
+        super().__init__()
+        self._highest = RollingExtreme(k_period, 'max')
+        self._lowest = RollingExtreme(k_period, 'min')
+        self._d = SMA(d_period)
+        self.value = (NAN, NAN)
+
+    def update(self, high: float, low: float, close: float) -> Tuple[float, float]:
+        highest = self._highest.update(high)
+        lowest = self._lowest.update(low)
+        k = 100 * _div(close - lowest, highest - lowest)
+        self.value = (k, self._d.update(k))
+        return self.value
@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 from typing import Union, Optional
 import talib
+from backend.models.indicators.engine import indicator_engine
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,7 +11,7 @@ class TechnicalIndicators:
     @staticmethod
     def SMA(data: pd.Series, period: int = 20) -> pd.Series:
         """简单移动平均"""
-        return data.rolling(window=period).mean()
+        return indicator_engine.sma(data, period)
     
     @staticmethod
     def EMA(data: pd.Series, period: int = 20) -> pd.Series:
@@ -20,7 +21,10 @@ class TechnicalIndicators:
     @staticmethod
     def RSI(data: pd.Series, period: int = 14) -> pd.Series:
         """相对强弱指标"""
-        return talib.RSI(data, timeperiod=period)
+        return indicator_engine.memoize(
+            'talib_rsi', data, {'period': period},
+            lambda: talib.RSI(data, timeperiod=period)
+        )
     
     @staticmethod
     def MACD(data: pd.Series, 
@@ -1,27 +1,32 @@
+import importlib
 from .base import BaseStrategy
 from .factory import StrategyFactory
 from .indicators.moving_average import MovingAverageStrategy
 from .indicators.bollinger_bands import BollingerBandsStrategy
 from .indicators.macd import MACDStrategy
-from .ml.lstm_strategy import LSTMStrategy
-from .ml.xgboost_strategy import XGBoostStrategy
-from .ml.random_forest_strategy import RandomForestStrategy
-from .ml.svm_strategy import SVMStrategy
-from .ml.deep_learning.mlp_strategy import MLPStrategy
-from .ml.deep_learning.lstm_mlp_strategy import LSTMMlPStrategy
-from .ml.deep_learning.cnn_mlp_strategy import CNNMLPStrategy
 
+# 机器学习策略依赖 torch/xgboost/sklearn，访问时才导入
+_LAZY_STRATEGIES = {
+    'LSTMStrategy': '.ml.lstm_strategy',
+    'XGBoostStrategy': '.ml.xgboost_strategy',
+    'RandomForestStrategy': '.ml.random_forest_strategy',
+    'SVMStrategy': '.ml.svm_strategy',
+    'MLPStrategy': '.ml.deep_learning.mlp_strategy',
+    'LSTMMlPStrategy': '.ml.deep_learning.lstm_mlp_strategy',
+    'CNNMLPStrategy': '.ml.deep_learning.cnn_mlp_strategy',
+    'DLEnsembleStrategy': '.ml.deep_learning.ensemble',
+}
+
+def __getattr__(name):
+    if name in _LAZY_STRATEGIES:
+        return getattr(importlib.import_module(_LAZY_STRATEGIES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# 星号导入只包含不依赖机器学习框架的名称
 __all__ = [
     'BaseStrategy',
     'StrategyFactory',
     'MovingAverageStrategy',
     'BollingerBandsStrategy',
-    'MACDStrategy',
-    'LSTMStrategy',
-    'XGBoostStrategy',
-    'RandomForestStrategy',
-    'SVMStrategy',
-    'MLPStrategy',
-    'LSTMMlPStrategy',
-    'CNNMLPStrategy'
-] 
\ No newline at end of file
+    'MACDStrategy'
+]
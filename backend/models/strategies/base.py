@@ -1,9 +1,11 @@
+import inspect
 import pandas as pd
 import numpy as np
 from abc import ABC, abstractmethod
 from typing import Dict, Any, List
 import logging
 from datetime import datetime
+from backend.models.backtest_engine import run_vectorized_backtest
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +17,38 @@ class Trade:
         self.size = size
         self.profit = 0.0
 
+class Bar:
+    """单根K线(逐K线运行时的输入)"""
+    __slots__ = ('time', 'open', 'high', 'low', 'close', 'volume', 'symbol')
+    
+    def __init__(
+        self,
+        time: datetime,
+        open: float,
+        high: float,
+        low: float,
+        close: float,
+        volume: float = 0.0,
+        symbol: str = ''
+    ):
+        self.time = time
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.symbol = symbol
+        
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'Date': self.time,
+            'Open': self.open,
+            'High': self.high,
+            'Low': self.low,
+            'Close': self.close,
+            'Volume': self.volume
+        }
+
 class BaseStrategy(ABC):
     def __init__(self, name: str):
         self.name = name
@@ -22,12 +56,63 @@ class BaseStrategy(ABC):
         self.trades: List[Trade] = []
         self.position = 0
         self.last_trade = None
+        # 逐K线计算的状态，由 on_bar 在首次调用时创建
+        self._stream = None
         
     @abstractmethod
     def generate_signals(self, data: pd.DataFrame) -> np.ndarray:
         """生成交易信号"""
         pass
         
+    def get_params(self) -> Dict[str, Any]:
+        """按构造函数签名读取策略参数(与实例上的同名属性对应)"""
+        params = {}
+        for name in inspect.signature(type(self).__init__).parameters:
+            if name in ('self', 'name') or not hasattr(self, name):
+                continue
+            params[name] = getattr(self, name)
+        return params
+        
+    def generate_panel_signals(self, panel: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """面板模式: 输入按 (时间 × 股票) 对齐的价格矩阵，返回同形状的信号矩阵
+        
+        :param panel: 字段名('Close'、'High'、'Low'等) -> 行为日期、列为股票的DataFrame
+        
+        默认实现逐只股票调用 generate_signals，支持向量化的策略应重写为一次计算整个矩阵。
+        """
+        close = panel['Close']
+        signals = pd.DataFrame(0, index=close.index, columns=close.columns, dtype=np.int64)
+        for symbol in close.columns:
+            data = pd.DataFrame({field: frame[symbol] for field, frame in panel.items()})
+            data = data.dropna(subset=['Close'])
+            if data.empty:
+                continue
+            symbol_signals = pd.Series(np.asarray(self.generate_signals(data)), index=data.index)
+            signals.loc[data.index, symbol] = symbol_signals.fillna(0).astype(np.int64)
+        return signals
+        
+    def on_bar(self, bar: Bar) -> int:
+        """接收一根新K线，返回基于截至当前的全部历史计算的最新信号
+        
+        默认实现累积历史后重新调用 generate_signals(每根K线O(N))，
+        支持增量计算的策略应重写为O(1)实现，结果与默认实现一致。
+        """
+        if self._stream is None:
+            self._stream = []
+        self._stream.append(bar.to_dict())
+        history = pd.DataFrame(self._stream).set_index('Date')
+        signals = np.asarray(self.generate_signals(history))
+        return int(signals[-1]) if len(signals) and signals[-1] == signals[-1] else 0
+        
+    @classmethod
+    def supports_streaming(cls) -> bool:
+        """是否实现了增量的 on_bar(默认实现每根K线重新计算全部历史，不适合实时运行)"""
+        return cls.on_bar is not BaseStrategy.on_bar
+        
+    def reset_stream(self):
+        """清空逐K线计算的状态"""
+        self._stream = None
+        
     def backtest(self, data: pd.DataFrame, initial_capital: float = 100000.0) -> Dict[str, Any]:
         """执行回测"""
         try:
@@ -40,29 +125,16 @@ class BaseStrategy(ABC):
             price_returns = data['Close'].pct_change()
             self.returns = price_returns * signals.shift(1)  # 使用前一天的信号
             
-            # 记录交易
+            # 记录交易(向量化计算开平仓位置，避免逐行遍历信号)
+            kernel = run_vectorized_backtest(data['Close'], signals, edge_triggered=True)
+            times = data.index
             self.trades = []
-            position = 0
-            last_trade = None
-            
-            for i in range(1, len(signals)):
-                if signals.iloc[i] != signals.iloc[i-1]:  # 信号发生变化
-                    time = data.index[i]
-                    price = data['Close'].iloc[i]
-                    
-                    if signals.iloc[i] == 1 and position == 0:  # 买入信号且无持仓
-                        trade = Trade(time, 'buy', price)
-                        self.trades.append(trade)
-                        position = 1
-                        last_trade = trade
-                        
-                    elif signals.iloc[i] == -1 and position == 1:  # 卖出信号且有持仓
-                        trade = Trade(time, 'sell', price)
-                        if last_trade:
-                            trade.profit = (price - last_trade.price) * trade.size
-                        self.trades.append(trade)
-                        position = 0
-                        last_trade = trade
+            for k, entry in enumerate(kernel['entries']):
+                self.trades.append(Trade(times[entry], 'buy', kernel['entry_prices'][k]))
+                if k < len(kernel['exits']):
+                    trade = Trade(times[kernel['exits'][k]], 'sell', kernel['exit_prices'][k])
+                    trade.profit = kernel['profits'][k] * trade.size
+                    self.trades.append(trade)
             
             # 计算回测指标
             returns = self.returns.dropna()
@@ -1,6 +1,7 @@
 from ..base import BaseStrategy
 import pandas as pd
 import numpy as np
+from backend.models.indicators import candlestick
 
 class BarUpDnStrategy(BaseStrategy):
     """
@@ -13,27 +14,18 @@ class BarUpDnStrategy(BaseStrategy):
         
     def generate_signals(self, data: pd.DataFrame) -> pd.Series:
         """生成交易信号"""
+        signals = self.streak_signals(data['Open'].values, data['Close'].values, self.n_bars)
+        return pd.Series(signals, index=data.index)
+    
+    @staticmethod
+    def streak_signals(open_: np.ndarray, close: np.ndarray, n_bars: int) -> np.ndarray:
+        """沿最后一维计算信号，可传入 (股票数, 时间) 的二维数组"""
         # 计算每根K线的涨跌
-        bar_direction = np.where(
-            data['Close'] > data['Open'],
-            1,  # 阳线
-            np.where(
-                data['Close'] < data['Open'],
-                -1,  # 阴线
-                0   # 十字星
-            )
-        )
-        
-        signals = pd.Series(0, index=data.index)
+        bar_direction = candlestick.bar_direction(open_, close)
         
+        signals = np.zeros(bar_direction.shape, dtype=np.int64)
         # 连续n根阴线后买入
-        for i in range(self.n_bars, len(data)):
-            if all(bar_direction[i-self.n_bars:i] == -1):
-                signals.iloc[i] = 1
-                
+        signals[candlestick.preceded_by_streak(bar_direction == -1, n_bars)] = 1
         # 连续n根阳线后卖出
-        for i in range(self.n_bars, len(data)):
-            if all(bar_direction[i-self.n_bars:i] == 1):
-                signals.iloc[i] = -1
-                
-        return signals 
\ No newline at end of file
+        signals[candlestick.preceded_by_streak(bar_direction == 1, n_bars)] = -1
+        return signals
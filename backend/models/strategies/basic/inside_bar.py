@@ -1,5 +1,8 @@
 from ..base import BaseStrategy
 import pandas as pd
+import numpy as np
+from backend.models.indicators import candlestick
+from backend.models.indicators.rolling import shift
 
 class InsideBarStrategy(BaseStrategy):
     """
@@ -11,22 +14,19 @@ class InsideBarStrategy(BaseStrategy):
         
     def generate_signals(self, data: pd.DataFrame) -> pd.Series:
         """生成交易信号"""
-        signals = pd.Series(0, index=data.index)
+        signals = self.inside_bar_signals(data['High'].values, data['Low'].values, data['Close'].values)
+        return pd.Series(signals, index=data.index)
+    
+    @staticmethod
+    def inside_bar_signals(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+        """沿最后一维计算信号，可传入 (股票数, 时间) 的二维数组"""
+        # 当前K线完全包含在前一根K线内
+        inside = candlestick.inside_bar(high, low)
+        prev_close = shift(close)
         
-        # 判断是否为内包K线
-        for i in range(1, len(data)):
-            prev_high = data['High'].iloc[i-1]
-            prev_low = data['Low'].iloc[i-1]
-            curr_high = data['High'].iloc[i]
-            curr_low = data['Low'].iloc[i]
-            
-            # 当前K线完全包含在前一根K线内
-            if curr_high <= prev_high and curr_low >= prev_low:
-                # 如果是上涨趋势中的内包K线，买入
-                if data['Close'].iloc[i] > data['Close'].iloc[i-1]:
-                    signals.iloc[i] = 1
-                # 如果是下跌趋势中的内包K线，卖出
-                elif data['Close'].iloc[i] < data['Close'].iloc[i-1]:
-                    signals.iloc[i] = -1
-                    
-        return signals 
\ No newline at end of file
+        signals = np.zeros(np.shape(close), dtype=np.int64)
+        # 如果是上涨趋势中的内包K线，买入
+        signals[inside & (close > prev_close)] = 1
+        # 如果是下跌趋势中的内包K线，卖出
+        signals[inside & (close < prev_close)] = -1
+        return signals
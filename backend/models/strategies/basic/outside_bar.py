@@ -1,5 +1,7 @@
 from ..base import BaseStrategy
 import pandas as pd
+import numpy as np
+from backend.models.indicators import candlestick
 
 class OutsideBarStrategy(BaseStrategy):
     """
@@ -11,22 +13,25 @@ class OutsideBarStrategy(BaseStrategy):
         
     def generate_signals(self, data: pd.DataFrame) -> pd.Series:
         """生成交易信号"""
-        signals = pd.Series(0, index=data.index)
+        signals = self.outside_bar_signals(
+            data['Open'].values, data['High'].values, data['Low'].values, data['Close'].values
+        )
+        return pd.Series(signals, index=data.index)
+    
+    @staticmethod
+    def outside_bar_signals(
+        open_: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray
+    ) -> np.ndarray:
+        """沿最后一维计算信号，可传入 (股票数, 时间) 的二维数组"""
+        # 当前K线完全包含前一根K线
+        outside = candlestick.outside_bar(high, low)
         
-        # 判断是否为外包K线
-        for i in range(1, len(data)):
-            prev_high = data['High'].iloc[i-1]
-            prev_low = data['Low'].iloc[i-1]
-            curr_high = data['High'].iloc[i]
-            curr_low = data['Low'].iloc[i]
-            
-            # 当前K线完全包含前一根K线
-            if curr_high > prev_high and curr_low < prev_low:
-                # 如果是看涨吞没形态，买入
-                if data['Close'].iloc[i] > data['Open'].iloc[i]:
-                    signals.iloc[i] = 1
-                # 如果是看跌吞没形态，卖出
-                elif data['Close'].iloc[i] < data['Open'].iloc[i]:
-                    signals.iloc[i] = -1
-                    
-        return signals 
\ No newline at end of file
+        signals = np.zeros(np.shape(close), dtype=np.int64)
+        # 如果是看涨吞没形态，买入
+        signals[outside & candlestick.up_bar(open_, close)] = 1
+        # 如果是看跌吞没形态，卖出
+        signals[outside & candlestick.down_bar(open_, close)] = -1
+        return signals
@@ -1,6 +1,8 @@
-from ..base import BaseStrategy
+from ..base import BaseStrategy, Bar
 import pandas as pd
 import numpy as np
+from typing import Dict
+from backend.models.indicators import streaming
 
 class ChannelBreakoutStrategy(BaseStrategy):
     def __init__(self, window: int = 20):
@@ -18,4 +20,31 @@ class ChannelBreakoutStrategy(BaseStrategy):
         signals[data['Close'] > high_channel] = 1  # 突破上轨买入
         signals[data['Close'] < low_channel] = -1  # 突破下轨卖出
         
-        return signals 
\ No newline at end of file
+        return signals
+        
+    def generate_panel_signals(self, panel: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """面板模式: 一次计算 (时间 × 股票) 价格矩阵上所有股票的通道突破信号"""
+        close = panel['Close']
+        high_channel = panel['High'].rolling(window=self.window).max()
+        low_channel = panel['Low'].rolling(window=self.window).min()
+        
+        signals = np.zeros(close.shape, dtype=np.int64)
+        signals[close.values > high_channel.values] = 1
+        signals[close.values < low_channel.values] = -1
+        return pd.DataFrame(signals, index=close.index, columns=close.columns)
+        
+    def on_bar(self, bar: Bar) -> int:
+        """单调队列维护通道上下轨，均摊O(1)生成最新K线的信号"""
+        if self._stream is None:
+            self._stream = {
+                'high': streaming.RollingExtreme(self.window, 'max'),
+                'low': streaming.RollingExtreme(self.window, 'min')
+            }
+        high_channel = self._stream['high'].update(bar.high)
+        low_channel = self._stream['low'].update(bar.low)
+        
+        if bar.close < low_channel:
+            return -1
+        if bar.close > high_channel:
+            return 1
+        return 0
@@ -2,6 +2,8 @@ from ..base import BaseStrategy
 import pandas as pd
 import numpy as np
 from typing import Tuple
+from numpy.lib.stride_tricks import sliding_window_view
+from backend.models.indicators.rolling import rolling_max, rolling_min, shift
 
 class PatternBreakoutStrategy(BaseStrategy):
     """
@@ -14,81 +16,106 @@ class PatternBreakoutStrategy(BaseStrategy):
         
     def generate_signals(self, data: pd.DataFrame) -> pd.Series:
         """生成交易信号"""
-        signals = pd.Series(0, index=data.index)
+        signals = self.breakout_signals(
+            data['High'].values,
+            data['Low'].values,
+            data['Close'].values,
+            self.window
+        )
+        return pd.Series(signals, index=data.index)
+    
+    @staticmethod
+    def breakout_signals(
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        window: int
+    ) -> np.ndarray:
+        """价格突破前 window 根K线的阻力位买入，跌破支撑位卖出
+        
+        沿最后一维计算，可传入 (股票数, 时间) 的二维数组一次扫描多只股票。
+        """
+        support, resistance = PatternBreakoutStrategy._find_support_resistance(high, low, window)
         
-        # 计算支撑和阻力位
-        for i in range(self.window, len(data)):
-            window_data = data.iloc[i-self.window:i]
-            support, resistance = self._find_support_resistance(window_data)
-            
-            current_price = data['Close'].iloc[i]
-            
-            # 突破阻力位买入
-            if current_price > resistance:
-                signals.iloc[i] = 1
-            # 跌破支撑位卖出
-            elif current_price < support:
-                signals.iloc[i] = -1
-                
+        signals = np.zeros(np.shape(close), dtype=np.int64)
+        signals[close > resistance] = 1
+        signals[(close < support) & ~(close > resistance)] = -1
         return signals
     
-    def _find_support_resistance(self, data: pd.DataFrame) -> Tuple[float, float]:
-        """查找支撑位和阻力位"""
+    @staticmethod
+    def _find_support_resistance(
+        high: np.ndarray,
+        low: np.ndarray,
+        window: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """查找每个位置之前 window 根K线(不含当前K线)的支撑位和阻力位"""
         # 使用低点作为支撑位
-        support = data['Low'].min()
+        support = shift(rolling_min(low, window))
         
         # 使用高点作为阻力位
-        resistance = data['High'].max()
+        resistance = shift(rolling_max(high, window))
         
         return support, resistance
     
     def _identify_patterns(self, data: pd.DataFrame) -> pd.Series:
         """识别常见K线形态"""
-        patterns = pd.Series(0, index=data.index)
+        patterns = self.pattern_signals(data['High'].values, data['Low'].values)
+        return pd.Series(patterns, index=data.index)
+    
+    @classmethod
+    def pattern_signals(cls, high: np.ndarray, low: np.ndarray) -> np.ndarray:
+        """在以每个位置结尾的4根K线窗口上识别形态，沿最后一维计算"""
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        patterns = np.zeros(high.shape, dtype=np.int64)
+        if high.shape[-1] < 4:
+            return patterns
+        
+        # (..., N-3, 4) 的窗口视图，不复制数据
+        highs = sliding_window_view(high, 4, axis=-1)
+        lows = sliding_window_view(low, 4, axis=-1)
         
-        for i in range(3, len(data)):
-            # 头肩顶形态
-            if self._is_head_shoulders_top(data.iloc[i-3:i+1]):
-                patterns.iloc[i] = -1  # 看跌信号
-                
-            # 头肩底形态
-            elif self._is_head_shoulders_bottom(data.iloc[i-3:i+1]):
-                patterns.iloc[i] = 1   # 看涨信号
-                
-            # 双顶形态
-            elif self._is_double_top(data.iloc[i-3:i+1]):
-                patterns.iloc[i] = -1
-                
-            # 双底形态
-            elif self._is_double_bottom(data.iloc[i-3:i+1]):
-                patterns.iloc[i] = 1
-                
+        # 按优先级: 头肩顶、头肩底、双顶、双底
+        patterns[..., 3:] = np.select(
+            [
+                cls._is_head_shoulders_top(highs),
+                cls._is_head_shoulders_bottom(lows),
+                cls._is_double_top(highs),
+                cls._is_double_bottom(lows),
+            ],
+            [-1, 1, -1, 1],
+            default=0
+        )
         return patterns
     
-    def _is_head_shoulders_top(self, data: pd.DataFrame) -> bool:
-        """判断是否形成头肩顶形态"""
-        highs = data['High'].values
-        return (highs[0] < highs[1] and highs[1] > highs[2] and 
-                highs[2] < highs[3] and highs[1] < highs[2] and 
-                abs(highs[0] - highs[3]) < 0.01 * highs[0])
+    @staticmethod
+    def _is_head_shoulders_top(highs: np.ndarray) -> np.ndarray:
+        """判断是否形成头肩顶形态(最后一维为4根K线的最高价)"""
+        h0, h1, h2, h3 = highs[..., 0], highs[..., 1], highs[..., 2], highs[..., 3]
+        return ((h0 < h1) & (h1 > h2) &
+                (h2 < h3) & (h1 < h2) &
+                (np.abs(h0 - h3) < 0.01 * h0))
     
-    def _is_head_shoulders_bottom(self, data: pd.DataFrame) -> bool:
-        """判断是否形成头肩底形态"""
-        lows = data['Low'].values
-        return (lows[0] > lows[1] and lows[1] < lows[2] and 
-                lows[2] > lows[3] and lows[1] > lows[2] and 
-                abs(lows[0] - lows[3]) < 0.01 * lows[0])
+    @staticmethod
+    def _is_head_shoulders_bottom(lows: np.ndarray) -> np.ndarray:
+        """判断是否形成头肩底形态(最后一维为4根K线的最低价)"""
+        l0, l1, l2, l3 = lows[..., 0], lows[..., 1], lows[..., 2], lows[..., 3]
+        return ((l0 > l1) & (l1 < l2) &
+                (l2 > l3) & (l1 > l2) &
+                (np.abs(l0 - l3) < 0.01 * l0))
     
-    def _is_double_top(self, data: pd.DataFrame) -> bool:
+    @staticmethod
+    def _is_double_top(highs: np.ndarray) -> np.ndarray:
         """判断是否形成双顶形态"""
-        highs = data['High'].values
-        return (highs[0] < highs[1] and highs[1] > highs[2] and 
-                highs[2] < highs[3] and 
-                abs(highs[1] - highs[3]) < 0.01 * highs[1])
+        h0, h1, h2, h3 = highs[..., 0], highs[..., 1], highs[..., 2], highs[..., 3]
+        return ((h0 < h1) & (h1 > h2) &
+                (h2 < h3) &
+                (np.abs(h1 - h3) < 0.01 * h1))
     
-    def _is_double_bottom(self, data: pd.DataFrame) -> bool:
+    @staticmethod
+    def _is_double_bottom(lows: np.ndarray) -> np.ndarray:
         """判断是否形成双底形态"""
-        lows = data['Low'].values
-        return (lows[0] > lows[1] and lows[1] < lows[2] and 
-                lows[2] > lows[3] and 
-                abs(lows[1] - lows[3]) < 0.01 * lows[1]) 
\ No newline at end of file
+        l0, l1, l2, l3 = lows[..., 0], lows[..., 1], lows[..., 2], lows[..., 3]
+        return ((l0 > l1) & (l1 < l2) &
+                (l2 > l3) &
+                (np.abs(l1 - l3) < 0.01 * l1))
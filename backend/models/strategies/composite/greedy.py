@@ -1,12 +1,22 @@
 from ..base import BaseStrategy
 import pandas as pd
 import numpy as np
+from typing import Any, Dict, List
+from backend.models.indicators.engine import fingerprint, indicator_engine
 
 class GreedyStrategy(BaseStrategy):
     """
     贪心策略
     根据多个技术指标的组合生成信号
     """
+    DEFAULT_PARAMS = {
+        'rsi_period': 14,
+        'ma_short': 5,
+        'ma_long': 20,
+        'bb_period': 20,
+        'bb_std': 2.0
+    }
+    
     def __init__(self, 
                  rsi_period: int = 14,
                  ma_short: int = 5,
@@ -22,56 +32,79 @@ class GreedyStrategy(BaseStrategy):
         
     def generate_signals(self, data: pd.DataFrame) -> pd.Series:
         """生成交易信号"""
-        signals = pd.Series(0, index=data.index)
+        params = {
+            'rsi_period': self.rsi_period,
+            'ma_short': self.ma_short,
+            'ma_long': self.ma_long,
+            'bb_period': self.bb_period,
+            'bb_std': self.bb_std
+        }
+        signals = self.generate_signals_batch(data, [params])[0]
+        return pd.Series(signals, index=data.index)
         
-        # 计算RSI
-        rsi = self._calculate_rsi(data['Close'], self.rsi_period)
+    @classmethod
+    def generate_signals_batch(
+        cls,
+        data: pd.DataFrame,
+        param_sets: List[Dict[str, Any]]
+    ) -> np.ndarray:
+        """同时计算多组参数的信号，返回 (参数组数, 时间) 的信号矩阵
         
-        # 计算移动平均
-        ma_short = data['Close'].rolling(window=self.ma_short).mean()
-        ma_long = data['Close'].rolling(window=self.ma_long).mean()
+        相同周期的指标由指标引擎在参数组之间共享，投票在整个矩阵上一次完成。
+        """
+        close = data['Close']
+        n = len(data)
+        if not param_sets:
+            return np.zeros((0, n), dtype=np.int64)
         
-        # 计算布林带
-        bb_mid = data['Close'].rolling(window=self.bb_period).mean()
-        bb_std = data['Close'].rolling(window=self.bb_period).std()
-        bb_upper = bb_mid + self.bb_std * bb_std
-        bb_lower = bb_mid - self.bb_std * bb_std
+        rsi = np.empty((len(param_sets), n))
+        ma_short = np.empty_like(rsi)
+        ma_long = np.empty_like(rsi)
+        bb_upper = np.empty_like(rsi)
+        bb_lower = np.empty_like(rsi)
+        start = np.empty(len(param_sets), dtype=np.int64)
         
-        # 综合信号
-        for i in range(max(self.rsi_period, self.ma_long, self.bb_period), len(data)):
-            buy_signals = 0
-            sell_signals = 0
+        key = fingerprint(close)
+        for row, params in enumerate(param_sets):
+            params = {**cls.DEFAULT_PARAMS, **params}
+            rsi[row] = indicator_engine.rsi(close, params['rsi_period'], key=key).values
+            ma_short[row] = indicator_engine.sma(close, params['ma_short'], key=key).values
+            ma_long[row] = indicator_engine.sma(close, params['ma_long'], key=key).values
+            bb_mid = indicator_engine.sma(close, params['bb_period'], key=key).values
+            bb_std = indicator_engine.rolling_std(close, params['bb_period'], key=key).values
+            bb_upper[row] = bb_mid + params['bb_std'] * bb_std
+            bb_lower[row] = bb_mid - params['bb_std'] * bb_std
+            start[row] = max(params['rsi_period'], params['ma_long'], params['bb_period'])
             
-            # RSI信号
-            if rsi.iloc[i] < 30:
-                buy_signals += 1
-            elif rsi.iloc[i] > 70:
-                sell_signals += 1
-                
-            # 移动平均信号
-            if ma_short.iloc[i] > ma_long.iloc[i]:
-                buy_signals += 1
-            elif ma_short.iloc[i] < ma_long.iloc[i]:
-                sell_signals += 1
-                
-            # 布林带信号
-            if data['Close'].iloc[i] < bb_lower.iloc[i]:
-                buy_signals += 1
-            elif data['Close'].iloc[i] > bb_upper.iloc[i]:
-                sell_signals += 1
-                
-            # 根据信号数量决定交易方向
-            if buy_signals >= 2:
-                signals.iloc[i] = 1
-            elif sell_signals >= 2:
-                signals.iloc[i] = -1
-                
-        return signals
+        return cls.vote_signals(close.values, rsi, ma_short, ma_long, bb_upper, bb_lower, start)
     
-    def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
-        """计算RSI指标"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs)) 
\ No newline at end of file
+    @staticmethod
+    def vote_signals(
+        close: np.ndarray,
+        rsi: np.ndarray,
+        ma_short: np.ndarray,
+        ma_long: np.ndarray,
+        bb_upper: np.ndarray,
+        bb_lower: np.ndarray,
+        start: np.ndarray
+    ) -> np.ndarray:
+        """三个指标投票: 至少两个看多买入，否则至少两个看空卖出
+        
+        指标数组的最后一维为时间，可带参数维度(close按最后一维广播)；
+        start 为每组参数开始产生信号的位置，之前的信号为0。
+        """
+        # 与逐K线判断的 if/elif 顺序一致: 同一指标已判为看多时不再计为看空
+        rsi_buy = rsi < 30
+        rsi_sell = ~rsi_buy & (rsi > 70)
+        ma_buy = ma_short > ma_long
+        ma_sell = ~ma_buy & (ma_short < ma_long)
+        bb_buy = close < bb_lower
+        bb_sell = ~bb_buy & (close > bb_upper)
+        
+        buy_votes = rsi_buy.astype(np.int8) + ma_buy + bb_buy
+        sell_votes = rsi_sell.astype(np.int8) + ma_sell + bb_sell
+        signals = np.where(buy_votes >= 2, 1, np.where(sell_votes >= 2, -1, 0)).astype(np.int64)
+        
+        warmup = np.arange(signals.shape[-1]) < np.asarray(start)[..., None]
+        signals[warmup] = 0
+        return signals
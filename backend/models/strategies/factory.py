@@ -1,30 +1,57 @@
-from typing import Dict, Any
+from typing import Dict, Any, Tuple, Type
+import importlib
+import threading
 from .base import BaseStrategy
-from .indicators.moving_average import MovingAverageStrategy
-from .indicators.bollinger_bands import BollingerBandsStrategy
-from .indicators.macd import MACDStrategy
-from .ml.svm_strategy import SVMStrategy
-from .ml.random_forest_strategy import RandomForestStrategy
-from .ml.xgboost_strategy import XGBoostStrategy
-from .ml.lstm_strategy import LSTMStrategy
-from .ml.deep_learning.mlp_strategy import MLPStrategy
-from .ml.deep_learning.lstm_mlp_strategy import LSTMMlPStrategy
-from .ml.deep_learning.cnn_mlp_strategy import CNNMLPStrategy
 from .validators import validate_strategy_params
 
 class StrategyFactory:
-    _strategies = {
-        'moving_average': MovingAverageStrategy,
-        'bollinger_bands': BollingerBandsStrategy,
-        'macd': MACDStrategy,
-        'svm': SVMStrategy,
-        'random_forest': RandomForestStrategy,
-        'xgboost': XGBoostStrategy,
-        'lstm': LSTMStrategy,
-        'mlp': MLPStrategy,
-        'lstm_mlp': LSTMMlPStrategy,
-        'cnn_mlp': CNNMLPStrategy,
+    # 策略名 -> (模块, 类名)。策略模块在第一次使用时才导入，
+    # 启动应用和列出策略不会加载 torch/xgboost/sklearn
+    _strategies: Dict[str, Tuple[str, str]] = {
+        'moving_average': ('.indicators.moving_average', 'MovingAverageStrategy'),
+        'bollinger_bands': ('.indicators.bollinger_bands', 'BollingerBandsStrategy'),
+        'macd': ('.indicators.macd', 'MACDStrategy'),
+        'channel_breakout': ('.breakout.channel_breakout', 'ChannelBreakoutStrategy'),
+        'momentum': ('.momentum.momentum', 'MomentumStrategy'),
+        'consecutive': ('.momentum.consecutive', 'ConsecutiveStrategy'),
+        'svm': ('.ml.svm_strategy', 'SVMStrategy'),
+        'random_forest': ('.ml.random_forest_strategy', 'RandomForestStrategy'),
+        'xgboost': ('.ml.xgboost_strategy', 'XGBoostStrategy'),
+        'lstm': ('.ml.lstm_strategy', 'LSTMStrategy'),
+        'mlp': ('.ml.deep_learning.mlp_strategy', 'MLPStrategy'),
+        'lstm_mlp': ('.ml.deep_learning.lstm_mlp_strategy', 'LSTMMlPStrategy'),
+        'cnn_mlp': ('.ml.deep_learning.cnn_mlp_strategy', 'CNNMLPStrategy'),
+        'dl_ensemble': ('.ml.deep_learning.ensemble', 'DLEnsembleStrategy'),
     }
+    # 已导入的策略类
+    _loaded: Dict[str, Type[BaseStrategy]] = {}
+    _lock = threading.Lock()
+    
+    @classmethod
+    def has_strategy(cls, name: str) -> bool:
+        """是否支持该策略(不导入策略模块)"""
+        return name in cls._strategies
+    
+    @classmethod
+    def get_strategy_class(cls, name: str) -> Type[BaseStrategy]:
+        """获取策略类，第一次调用时导入策略模块"""
+        strategy_class = cls._loaded.get(name)
+        if strategy_class is not None:
+            return strategy_class
+        if name not in cls._strategies:
+            raise ValueError(f"不支持的策略类型: {name}")
+            
+        module_name, class_name = cls._strategies[name]
+        with cls._lock:
+            if name not in cls._loaded:
+                module = importlib.import_module(module_name, __package__)
+                cls._loaded[name] = getattr(module, class_name)
+        return cls._loaded[name]
+    
+    @classmethod
+    def load_all(cls) -> Dict[str, Type[BaseStrategy]]:
+        """导入所有策略类(用于预热或检查依赖)"""
+        return {name: cls.get_strategy_class(name) for name in cls._strategies}
     
     @classmethod
     def create_strategy(cls, name: str, **params) -> BaseStrategy:
@@ -35,7 +62,7 @@ class StrategyFactory:
         # 验证策略参数
         validated_params = validate_strategy_params(name, params)
         
-        strategy_class = cls._strategies[name]
+        strategy_class = cls.get_strategy_class(name)
         return strategy_class(**validated_params)
     
     @classmethod
@@ -45,11 +72,15 @@ class StrategyFactory:
             'moving_average': '移动平均策略',
             'bollinger_bands': '布林带策略',
             'macd': 'MACD策略',
+            'channel_breakout': '通道突破策略',
+            'momentum': '动量策略',
+            'consecutive': '连续涨跌策略',
             'svm': 'SVM策略',
             'random_forest': '随机森林策略',
             'xgboost': 'XGBoost策略',
             'lstm': 'LSTM策略',
             'mlp': 'MLP深度神经网络',
             'lstm_mlp': 'LSTM+MLP混合网络',
-            'cnn_mlp': 'CNN+MLP混合网络'
+            'cnn_mlp': 'CNN+MLP混合网络',
+            'dl_ensemble': '深度学习集成(MLP、LSTM+MLP、CNN+MLP投票)'
         }
\ No newline at end of file
@@ -1,6 +1,10 @@
-from ..base import BaseStrategy
+from ..base import BaseStrategy, Bar
 import pandas as pd
 import numpy as np
+from typing import Dict
+from backend.models.indicators.engine import indicator_engine
+from backend.models.indicators import streaming
+from backend.models.indicators.rolling import shift
 import logging
 
 logger = logging.getLogger(__name__)
@@ -27,29 +31,17 @@ class BollingerBandsStrategy(BaseStrategy):
                 return pd.Series(0, index=data.index)
                 
             # 计算布林带
-            rolling_mean = data['Close'].rolling(
-                window=self.window, 
-                min_periods=1
-            ).mean()
-            
-            rolling_std = data['Close'].rolling(
-                window=self.window, 
-                min_periods=1
-            ).std()
+            rolling_mean = indicator_engine.sma(data['Close'], self.window, min_periods=1)
+            rolling_std = indicator_engine.rolling_std(data['Close'], self.window, min_periods=1)
             
             upper_band = rolling_mean + (rolling_std * self.num_std)
             lower_band = rolling_mean - (rolling_std * self.num_std)
             
-            # 生成信号
-            signals = pd.Series(0, index=data.index)
-            
-            # 价格突破下轨，超卖信号
-            oversold = (data['Close'] <= lower_band) & (data['Close'].shift(1) > lower_band)
-            signals[oversold] = 1
-            
-            # 价格突破上轨，超买信号
-            overbought = (data['Close'] >= upper_band) & (data['Close'].shift(1) < upper_band)
-            signals[overbought] = -1
+            # 生成信号: 价格突破下轨为超卖买入，突破上轨为超买卖出
+            signals = pd.Series(
+                self.band_signals(data['Close'].values, upper_band.values, lower_band.values),
+                index=data.index
+            )
             
             # 调试信息
             signal_counts = signals.value_counts()
@@ -71,4 +63,50 @@ class BollingerBandsStrategy(BaseStrategy):
             
         except Exception as e:
             logger.error(f"生成信号失败: {str(e)}", exc_info=True)
-            return pd.Series(0, index=data.index) 
\ No newline at end of file
+            return pd.Series(0, index=data.index)
+            
+    def generate_panel_signals(self, panel: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """面板模式: 一次计算 (时间 × 股票) 收盘价矩阵上所有股票的布林带信号"""
+        close = panel['Close']
+        if len(close) < self.window:
+            return pd.DataFrame(0, index=close.index, columns=close.columns, dtype=np.int64)
+            
+        rolling_mean = close.rolling(window=self.window, min_periods=1).mean()
+        rolling_std = close.rolling(window=self.window, min_periods=1).std()
+        upper_band = rolling_mean + (rolling_std * self.num_std)
+        lower_band = rolling_mean - (rolling_std * self.num_std)
+        
+        signals = self.band_signals(close.values, upper_band.values, lower_band.values)
+        return pd.DataFrame(signals, index=close.index, columns=close.columns)
+            
+    def on_bar(self, bar: Bar) -> int:
+        """增量计算布林带，O(1)生成最新K线的突破信号"""
+        if self._stream is None:
+            self._stream = {
+                'bands': streaming.BollingerBands(self.window, self.num_std, min_periods=1),
+                'prev_close': streaming.NAN,
+                'count': 0
+            }
+        state = self._stream
+        upper_band, _, lower_band = state['bands'].update(bar.close)
+        prev_close = state['prev_close']
+        state['prev_close'] = bar.close
+        state['count'] += 1
+        
+        if state['count'] < self.window:
+            return 0
+        if bar.close >= upper_band and prev_close < upper_band:
+            return -1
+        if bar.close <= lower_band and prev_close > lower_band:
+            return 1
+        return 0
+            
+    @staticmethod
+    def band_signals(close: np.ndarray, upper_band: np.ndarray, lower_band: np.ndarray) -> np.ndarray:
+        """根据价格突破布林带上下轨生成信号"""
+        prev_close = shift(close, axis=0)
+        
+        signals = np.zeros(np.shape(close), dtype=np.int64)
+        signals[(close <= lower_band) & (prev_close > lower_band)] = 1
+        signals[(close >= upper_band) & (prev_close < upper_band)] = -1
+        return signals
@@ -1,6 +1,10 @@
-from ..base import BaseStrategy
+from ..base import BaseStrategy, Bar
 import pandas as pd
 import numpy as np
+from typing import Dict
+from backend.models.indicators.engine import indicator_engine
+from backend.models.indicators import streaming
+from backend.models.indicators.rolling import shift
 
 class MACDStrategy(BaseStrategy):
     def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9):
@@ -12,24 +16,56 @@ class MACDStrategy(BaseStrategy):
     def generate_signals(self, data: pd.DataFrame) -> pd.Series:
         """生成交易信号"""
         # 计算MACD
-        exp1 = data['Close'].ewm(span=self.fast_period, adjust=False).mean()
-        exp2 = data['Close'].ewm(span=self.slow_period, adjust=False).mean()
-        macd = exp1 - exp2
-        signal = macd.ewm(span=self.signal_period, adjust=False).mean()
-        histogram = macd - signal
-        
-        # 生成信号
-        signals = pd.Series(0, index=data.index)
+        macd, signal, histogram = indicator_engine.macd(
+            data['Close'],
+            self.fast_period,
+            self.slow_period,
+            self.signal_period
+        )
         
-        # MACD金叉买入
-        buy_signals = (histogram > 0) & (histogram.shift(1) <= 0)
-        signals[buy_signals] = 1
-        
-        # MACD死叉卖出
-        sell_signals = (histogram < 0) & (histogram.shift(1) >= 0)
-        signals[sell_signals] = -1
+        # 生成信号: MACD金叉买入，死叉卖出
+        signals = pd.Series(self.histogram_signals(histogram.values), index=data.index)
         
         # 打印调试信息
         total_signals = len(signals[signals != 0])
         buy_count = len(signals[signals == 1])
-        return signals 
\ No newline at end of file
+        return signals
+    
+    def generate_panel_signals(self, panel: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """面板模式: 一次计算 (时间 × 股票) 收盘价矩阵上所有股票的MACD信号"""
+        close = panel['Close']
+        fast = close.ewm(span=self.fast_period, adjust=False).mean()
+        slow = close.ewm(span=self.slow_period, adjust=False).mean()
+        macd = fast - slow
+        signal = macd.ewm(span=self.signal_period, adjust=False).mean()
+        
+        signals = self.histogram_signals((macd - signal).values)
+        return pd.DataFrame(signals, index=close.index, columns=close.columns)
+    
+    def on_bar(self, bar: Bar) -> int:
+        """增量计算MACD，O(1)生成最新K线的信号"""
+        if self._stream is None:
+            self._stream = {
+                'macd': streaming.MACD(self.fast_period, self.slow_period, self.signal_period),
+                'prev_hist': streaming.NAN
+            }
+        state = self._stream
+        _, _, histogram = state['macd'].update(bar.close)
+        prev_hist = state['prev_hist']
+        state['prev_hist'] = histogram
+        
+        if histogram > 0 and prev_hist <= 0:
+            return 1
+        if histogram < 0 and prev_hist >= 0:
+            return -1
+        return 0
+    
+    @staticmethod
+    def histogram_signals(histogram: np.ndarray) -> np.ndarray:
+        """根据MACD柱穿越零轴生成信号"""
+        prev_hist = shift(histogram, axis=0)
+        
+        signals = np.zeros(np.shape(histogram), dtype=np.int64)
+        signals[(histogram > 0) & (prev_hist <= 0)] = 1
+        signals[(histogram < 0) & (prev_hist >= 0)] = -1
+        return signals
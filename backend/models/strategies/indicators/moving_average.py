@@ -1,6 +1,10 @@
-from backend.models.strategies.base import BaseStrategy
+from backend.models.strategies.base import BaseStrategy, Bar
 import pandas as pd
 import numpy as np
+from typing import Dict
+from backend.models.indicators.engine import indicator_engine
+from backend.models.indicators import streaming
+from backend.models.indicators.rolling import shift
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,22 +23,64 @@ class MovingAverageStrategy(BaseStrategy):
             return pd.Series(0, index=data.index)
             
         # 计算移动平均
-        short_ma = data['Close'].rolling(window=self.short_window, min_periods=1).mean()
-        long_ma = data['Close'].rolling(window=self.long_window, min_periods=1).mean()
+        short_ma = indicator_engine.sma(data['Close'], self.short_window, min_periods=1)
+        long_ma = indicator_engine.sma(data['Close'], self.long_window, min_periods=1)
         
         # 生成信号
-        signals = pd.Series(0, index=data.index)
-        
-        # 金叉买入
-        buy_signals = (short_ma > long_ma) & (short_ma.shift(1) <= long_ma.shift(1))
-        signals[buy_signals] = 1
-        
-        # 死叉卖出
-        sell_signals = (short_ma < long_ma) & (short_ma.shift(1) >= long_ma.shift(1))
-        signals[sell_signals] = -1
+        signals = pd.Series(
+            self.crossover_signals(short_ma.values, long_ma.values),
+            index=data.index
+        )
         
         # 调试信息
         signal_counts = signals.value_counts()
         logger.info(f"生成信号统计: \n{signal_counts}")
         
-        return signals 
\ No newline at end of file
+        return signals
+    
+    def generate_panel_signals(self, panel: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """面板模式: 一次计算 (时间 × 股票) 收盘价矩阵上所有股票的交叉信号"""
+        close = panel['Close']
+        if len(close) < self.long_window:
+            return pd.DataFrame(0, index=close.index, columns=close.columns, dtype=np.int64)
+            
+        short_ma = close.rolling(window=self.short_window, min_periods=1).mean()
+        long_ma = close.rolling(window=self.long_window, min_periods=1).mean()
+        signals = self.crossover_signals(short_ma.values, long_ma.values)
+        return pd.DataFrame(signals, index=close.index, columns=close.columns)
+    
+    def on_bar(self, bar: Bar) -> int:
+        """增量计算均线，O(1)生成最新K线的交叉信号"""
+        if self._stream is None:
+            self._stream = {
+                'short': streaming.SMA(self.short_window, min_periods=1),
+                'long': streaming.SMA(self.long_window, min_periods=1),
+                'prev': (streaming.NAN, streaming.NAN),
+                'count': 0
+            }
+        state = self._stream
+        short_ma = state['short'].update(bar.close)
+        long_ma = state['long'].update(bar.close)
+        prev_short, prev_long = state['prev']
+        state['prev'] = (short_ma, long_ma)
+        state['count'] += 1
+        
+        # 与 generate_signals 一致: 数据不足长期窗口时不产生信号
+        if state['count'] < self.long_window:
+            return 0
+        if short_ma > long_ma and prev_short <= prev_long:
+            return 1
+        if short_ma < long_ma and prev_short >= prev_long:
+            return -1
+        return 0
+    
+    @staticmethod
+    def crossover_signals(short_ma: np.ndarray, long_ma: np.ndarray) -> np.ndarray:
+        """根据短期/长期均线交叉生成信号(金叉买入，死叉卖出)"""
+        prev_short = shift(short_ma, axis=0)
+        prev_long = shift(long_ma, axis=0)
+        
+        signals = np.zeros(np.shape(short_ma), dtype=np.int64)
+        signals[(short_ma > long_ma) & (prev_short <= prev_long)] = 1
+        signals[(short_ma < long_ma) & (prev_short >= prev_long)] = -1
+        return signals
@@ -1,12 +1,13 @@
 import pandas as pd
 import numpy as np
 from typing import Tuple
+from backend.models.indicators.engine import indicator_engine
 
 class TechnicalIndicators:
     @staticmethod
     def moving_average(data: pd.Series, window: int) -> pd.Series:
         """计算移动平均"""
-        return data.rolling(window=window).mean()
+        return indicator_engine.sma(data, window)
         
     @staticmethod
     def bollinger_bands(
@@ -15,20 +16,12 @@ class TechnicalIndicators:
         num_std: float = 2.0
     ) -> Tuple[pd.Series, pd.Series, pd.Series]:
         """计算布林带"""
-        middle = data.rolling(window=window).mean()
-        std = data.rolling(window=window).std()
-        upper = middle + (std * num_std)
-        lower = middle - (std * num_std)
-        return upper, middle, lower
+        return indicator_engine.bollinger_bands(data, window, num_std)
         
     @staticmethod
     def rsi(data: pd.Series, periods: int = 14) -> pd.Series:
         """计算RSI"""
-        delta = data.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=periods).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=periods).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs))
+        return indicator_engine.rsi(data, periods)
         
     @staticmethod
     def macd(
@@ -38,12 +31,7 @@ class TechnicalIndicators:
         signal_period: int = 9
     ) -> Tuple[pd.Series, pd.Series, pd.Series]:
         """计算MACD"""
-        exp1 = data.ewm(span=fast_period, adjust=False).mean()
-        exp2 = data.ewm(span=slow_period, adjust=False).mean()
-        macd = exp1 - exp2
-        signal = macd.ewm(span=signal_period, adjust=False).mean()
-        hist = macd - signal
-        return macd, signal, hist
+        return indicator_engine.macd(data, fast_period, slow_period, signal_period)
         
     @staticmethod
     def atr(
@@ -1,8 +1,18 @@
-from .base_ml_strategy import BaseMLStrategy
-from .lstm_strategy import LSTMStrategy
-from .xgboost_strategy import XGBoostStrategy
-from .random_forest_strategy import RandomForestStrategy
-from .svm_strategy import SVMStrategy
+import importlib
+
+# 各策略依赖的框架较重(torch/xgboost/sklearn)，访问时才导入
+_LAZY_STRATEGIES = {
+    'BaseMLStrategy': '.base_ml_strategy',
+    'LSTMStrategy': '.lstm_strategy',
+    'XGBoostStrategy': '.xgboost_strategy',
+    'RandomForestStrategy': '.random_forest_strategy',
+    'SVMStrategy': '.svm_strategy',
+}
+
+def __getattr__(name):
+    if name in _LAZY_STRATEGIES:
+        return getattr(importlib.import_module(_LAZY_STRATEGIES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     'BaseMLStrategy',
@@ -10,4 +20,4 @@ __all__ = [
     'XGBoostStrategy',
     'RandomForestStrategy',
     'SVMStrategy'
-] 
\ No newline at end of file
+]
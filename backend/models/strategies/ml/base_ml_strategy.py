@@ -1,12 +1,19 @@
 from backend.models.strategies.base import BaseStrategy
 import pandas as pd
 import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 from sklearn.preprocessing import StandardScaler
+from backend.models.strategies.ml.features import Feature, FeaturePipeline, lag_features
+from backend.models.strategies.ml.labels import align_labels, make_labels
+from backend.services.model_registry import ModelRegistry, model_registry
 import logging
 
 logger = logging.getLogger(__name__)
 
 class BaseMLStrategy(BaseStrategy):
+    # 拟合后预测所需的属性，走步训练按这些属性缓存和恢复模型
+    FITTED_ATTRIBUTES = ('model', 'scaler')
+    
     def __init__(self, name: str, 
                  lookback_period: int = 20,
                  test_size: float = 0.2,
@@ -17,67 +24,58 @@ class BaseMLStrategy(BaseStrategy):
         self.random_state = random_state
         self.model = None
         self.scaler = StandardScaler()
+        # 标签: 预测周期、标签类型(labels.LABEL_FUNCTIONS 中的名称)及其参数
+        self.prediction_period = 1
+        self.label_method = 'horizon'
+        self.label_options: Dict[str, Any] = {}
+        # 训练好的模型保存到模型仓库，相同策略、参数和训练数据再次运行时直接加载；None表示不使用
+        self.model_registry: Optional[ModelRegistry] = model_registry
+        self.model_key: Optional[str] = None
         
-    def prepare_features(self, data: pd.DataFrame) -> pd.DataFrame:
-        """准备特征数据"""
-        try:
-            df = pd.DataFrame(index=data.index)
-            
+    def feature_spec(self) -> List[Feature]:
+        """策略使用的特征声明"""
+        return [
             # 价格特征
-            df['returns'] = data['Close'].pct_change()
-            df['log_returns'] = np.log1p(df['returns'])
-            
+            Feature('returns', 'returns'),
+            Feature('log_returns', 'log_returns'),
             # 技术指标特征
-            df['sma_20'] = data['Close'].rolling(window=20).mean()
-            df['sma_50'] = data['Close'].rolling(window=50).mean()
-            df['rsi'] = self._calculate_rsi(data['Close'])
-            df['volatility'] = df['returns'].rolling(window=20).std()
-            
+            Feature('sma_20', 'sma', window=20),
+            Feature('sma_50', 'sma', window=50),
+            Feature('rsi', 'rsi'),
+            Feature('volatility', 'volatility', window=20),
             # 成交量特征
-            df['volume_ma'] = data['Volume'].rolling(window=20).mean()
-            df['volume_std'] = data['Volume'].rolling(window=20).std()
-            
-            # 生成滞后特征
-            lookback_range = range(1, int(self.lookback_period) + 1)  # 确保是整数
-            for i in lookback_range:
-                df[f'close_lag_{i}'] = data['Close'].shift(i)
-                df[f'volume_lag_{i}'] = data['Volume'].shift(i)
-            
-            # 删除包含NaN的行
-            df = df.dropna()
-            
-            return df
+            Feature('volume_ma', 'volume_ma', window=20),
+            Feature('volume_std', 'volume_std', window=20),
+            # 滞后特征
+            *lag_features(['Close', 'Volume'], self.lookback_period)
+        ]
+        
+    def prepare_features(self, data: pd.DataFrame) -> pd.DataFrame:
+        """准备特征数据(float32，已删除包含NaN的行)"""
+        try:
+            return FeaturePipeline(self.feature_spec()).transform(data)
         except Exception as e:
             logger.error(f"特征准备失败: {str(e)}", exc_info=True)
             return pd.DataFrame()
             
+    def label_series(self, data: pd.DataFrame) -> pd.Series:
+        """与行情按日期对齐的标签(1/-1/0)，未来K线不足等标签未知的位置为NaN"""
+        return make_labels(data['Close'], self.label_method, self.prediction_period, **self.label_options)
+        
     def prepare_labels(self, data: pd.DataFrame) -> np.ndarray:
-        """准备标签数据"""
+        """准备标签数据(去掉标签未知的K线)"""
         try:
-            # 计算未来收益率
-            future_returns = data['Close'].pct_change().shift(-1)
-            
-            # 生成分类标签
-            labels = pd.Series(0, index=data.index)
-            labels[future_returns > 0] = 1  # 上涨标记为1
-            labels[future_returns < 0] = -1  # 下跌标记为-1
-            
-            return labels.values[:-1]  # 去掉最后一个标签，因为没有未来数据
+            labels = self.label_series(data)
+            return labels.dropna().values.astype(np.int64)
         except Exception as e:
             logger.error(f"标签准备失败: {str(e)}")
             return np.array([])
             
-    def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
-        """计算RSI指标"""
-        try:
-            delta = prices.diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-            rs = gain / loss
-            return 100 - (100 / (1 + rs))
-        except Exception as e:
-            logger.error(f"RSI计算失败: {str(e)}")
-            return pd.Series()
+    def training_data(self, data: pd.DataFrame, features_df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """按日期对齐特征和标签，只保留标签已知的样本"""
+        labels = align_labels(self.label_series(data), features_df.index)
+        valid = ~np.isnan(labels)
+        return features_df.values[valid], labels[valid].astype(np.int64)
             
     def train_model(self, X: np.ndarray, y: np.ndarray):
         """训练模型"""
@@ -95,13 +93,91 @@ class BaseMLStrategy(BaseStrategy):
         """具体的模型训练实现（由子类重写）"""
         raise NotImplementedError
         
+    def fit(self, X: np.ndarray, y: np.ndarray):
+        """在一个训练窗口上拟合模型(走步训练的钩子)，失败时抛出异常
+        
+        默认对特征标准化后调用 _train_model_impl；每次拟合都创建新的标准化器，
+        避免修改已缓存的模型状态。
+        """
+        self.scaler = StandardScaler()
+        X_scaled = self.scaler.fit_transform(X)
+        self._train_model_impl(X_scaled, y)
+        if self.model is None:
+            raise ValueError("模型训练失败")
+            
+    def get_fitted_state(self) -> Dict[str, Any]:
+        """拟合得到的模型状态"""
+        return {name: getattr(self, name, None) for name in self.FITTED_ATTRIBUTES}
+        
+    def set_fitted_state(self, state: Dict[str, Any]):
+        """恢复 get_fitted_state 保存的模型状态"""
+        for name, value in state.items():
+            setattr(self, name, value)
+        
+    def registry_key(
+        self,
+        registry: ModelRegistry,
+        X: np.ndarray,
+        y: np.ndarray,
+        columns: Sequence[str]
+    ) -> Tuple[str, List[List[str]]]:
+        """模型在仓库中的键 (策略, 参数, 特征schema, 训练数据) 和特征schema"""
+        X = np.asarray(X)
+        y = np.asarray(y)
+        schema = [[str(column), X.dtype.str] for column in columns]
+        key = registry.make_key(
+            type(self).__name__, self.get_params(), schema, registry.data_fingerprint(X, y)
+        )
+        return key, schema
+        
+    def load_or_train(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        columns: Sequence[str],
+        train: Optional[Callable[[np.ndarray, np.ndarray], None]] = None
+    ):
+        """训练模型，模型仓库中已有相同 (策略, 参数, 特征schema, 训练数据) 的模型时直接加载
+        
+        :param columns: 特征列名，与特征矩阵的dtype一起构成特征schema
+        :param train: 实际的训练函数，默认为 fit
+        """
+        train = train or self.fit
+        registry = self.model_registry
+        if registry is None:
+            train(X, y)
+            return
+            
+        X = np.asarray(X)
+        y = np.asarray(y)
+        key, schema = self.registry_key(registry, X, y, columns)
+        state = registry.load(key)
+        if state is not None:
+            self.set_fitted_state(state)
+            self.model_key = key
+            logger.info(f"从模型仓库加载模型: {key}")
+            return
+            
+        train(X, y)
+        if self.model is None:
+            return
+        self.model_key = key
+        registry.save(key, self.get_fitted_state(), {
+            'strategy': type(self).__name__,
+            'name': self.name,
+            'params': self.get_params(),
+            'features': schema,
+            'n_samples': int(len(X))
+        })
+        
     def predict(self, X: pd.DataFrame) -> np.ndarray:
         """模型预测"""
         try:
             if self.model is None:
                 raise ValueError("模型未训练")
                 
-            X_scaled = self.scaler.transform(X)
+            # 模型在特征矩阵(不含列名)上训练，预测时同样传入数组
+            X_scaled = self.scaler.transform(np.asarray(X))
             return self.model.predict(X_scaled)
             
         except Exception as e:
@@ -116,18 +192,18 @@ class BaseMLStrategy(BaseStrategy):
             if features_df.empty:
                 return np.zeros(len(data))
                 
-            # 准备标签
-            labels = self.prepare_labels(data)
+            # 准备训练数据(特征和标签按日期对齐)
+            X, y = self.training_data(data, features_df)
             
             # 训练模型
-            self.train_model(features_df.values[:-1], labels)  # 使用除最后一个样本外的数据训练
+            self.load_or_train(X, y, features_df.columns, self.train_model)
             
             # 生成预测
             predictions = self.predict(features_df)
             
-            # 转换为交易信号
+            # 转换为交易信号(跳过特征计算的预热期)
             signals = np.zeros(len(data))
-            signals[self.lookback_period:-1] = predictions  # 跳过前lookback_period个数据点
+            signals[len(data) - len(features_df):] = predictions
             
             return signals
             
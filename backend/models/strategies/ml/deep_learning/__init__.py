@@ -1,9 +1,21 @@
-from .mlp_strategy import MLPStrategy
-from .lstm_mlp_strategy import LSTMMlPStrategy
-from .cnn_mlp_strategy import CNNMLPStrategy
+import importlib
+
+# 依赖torch，访问时才导入
+_LAZY_STRATEGIES = {
+    'MLPStrategy': '.mlp_strategy',
+    'LSTMMlPStrategy': '.lstm_mlp_strategy',
+    'CNNMLPStrategy': '.cnn_mlp_strategy',
+    'DLEnsembleStrategy': '.ensemble',
+}
+
+def __getattr__(name):
+    if name in _LAZY_STRATEGIES:
+        return getattr(importlib.import_module(_LAZY_STRATEGIES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     'MLPStrategy',
     'LSTMMlPStrategy',
-    'CNNMLPStrategy'
-] 
\ No newline at end of file
+    'CNNMLPStrategy',
+    'DLEnsembleStrategy'
+]
@@ -1,14 +1,22 @@
+import time
 import torch
 import torch.nn as nn
 import numpy as np
 import pandas as pd
-from typing import Tuple, Type
+from typing import Any, Dict, Tuple, Type
 from backend.models.strategies.ml.base_ml_strategy import BaseMLStrategy
+from backend.models.strategies.ml.deep_learning.trainer import Trainer, to_tensors
+from backend.models.strategies.ml.deep_learning.inference import (
+    TORCHSCRIPT_FILE, export_torchscript, load_torchscript, predict_classes, serialize_torchscript
+)
+from backend.services.inference_stats import inference_stats
 import logging
 
 logger = logging.getLogger(__name__)
 
 class BaseDLStrategy(BaseMLStrategy):
+    FITTED_ATTRIBUTES = ('model', 'scaler', 'training_history')
+    
     def __init__(self, name: str, lookback_period: int = 20):
         super().__init__(name, lookback_period)
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
@@ -21,158 +29,150 @@ class BaseDLStrategy(BaseMLStrategy):
             'val_loss': [],
             'val_accuracy': []
         }
+        # 训练设置，子类在构造函数中按参数覆盖
+        self.learning_rate = 0.001
+        self.batch_size = 32
+        self.max_epochs = 100
+        self.patience = 10
+        # 训练时 torch 的线程数(None不修改)，编译模式: None / 'torchscript' / 'compile'
+        self.num_threads = None
+        self.compile_mode = None
+        # 推理设置: 每次前向计算的最大行数，CPU上使用的推理模块('torchscript'或None表示直接用训练的网络)
+        self.inference_batch_size = 8192
+        self.inference_runtime = 'torchscript'
+        # 导出的推理模块及其对应的网络
+        self._runtime = None
+        self._runtime_model = None
+        
+    def __getstate__(self) -> Dict[str, Any]:
+        # TorchScript 模块不能pickle(走步训练会把策略发送到子进程)，需要时重新导出或从模型仓库加载
+        state = self.__dict__.copy()
+        state['_runtime'] = None
+        state['_runtime_model'] = None
+        return state
         
     def prepare_data_for_dl(self, X: np.ndarray, y: np.ndarray) -> Tuple[torch.Tensor, torch.Tensor]:
-        """准备深度学习训练数据"""
+        """准备深度学习训练数据(二维特征，需要序列维度的网络在 forward 中自行处理)"""
         try:
             # 确保数据长度匹配
             min_len = min(len(X), len(y))
-            X = X[:min_len]
-            y = y[:min_len]
-            
-            # 转换为PyTorch张量
-            X_tensor = torch.FloatTensor(X).to(self.device)
-            y_tensor = torch.LongTensor(y + 1).to(self.device)  # 转换为[0,2]范围
-            
-            # 调整数据维度
-            if len(X_tensor.shape) == 2:
-                # 对于LSTM和CNN，需要添加序列维度
-                if self.__class__.__name__ in ['LSTMStrategy', 'CNNMLPStrategy']:
-                    X_tensor = X_tensor.unsqueeze(1)  # [batch, seq_len, features]
-                    
-            return X_tensor, y_tensor
+            X_tensor, y_tensor = to_tensors(X[:min_len], y[:min_len])
+            return X_tensor.to(self.device), y_tensor.to(self.device)
             
         except Exception as e:
             logger.error(f"数据准备失败: {str(e)}")
             raise
             
-    def train_epoch(self, dataloader: torch.utils.data.DataLoader) -> Tuple[float, float]:
-        """训练一个epoch"""
-        try:
-            total_loss = 0
-            total_acc = 0
-            n_batches = 0
-            
-            for batch_X, batch_y in dataloader:
-                batch_X = batch_X.to(self.device)
-                batch_y = batch_y.to(self.device)
-                
-                # 训练一个批次
-                self.model.train()
-                self.optimizer.zero_grad()
-                
-                outputs = self.model(batch_X)
-                loss = self.criterion(outputs, batch_y)
-                
-                loss.backward()
-                torch.nn.utils.clip_grad_norm_(self.model.parameters(), max_norm=1.0)
-                self.optimizer.step()
-                
-                # 计算准确率
-                _, predicted = torch.max(outputs.data, 1)
-                accuracy = (predicted == batch_y).sum().item() / len(batch_y)
-                
-                total_loss += loss.item()
-                total_acc += accuracy
-                n_batches += 1
-                
-            return total_loss / n_batches, total_acc / n_batches
-            
-        except Exception as e:
-            logger.error(f"训练失败: {str(e)}")
-            raise
+    def build_model(self, input_dim: int) -> nn.Module:
+        """创建网络，由子类实现"""
+        raise NotImplementedError("子类必须实现build_model方法")
+        
+    def make_trainer(self, **overrides) -> Trainer:
+        """按策略的训练设置创建训练器"""
+        options = {
+            'max_epochs': self.max_epochs,
+            'batch_size': self.batch_size,
+            'patience': self.patience,
+            'num_threads': self.num_threads,
+            'compile_mode': self.compile_mode,
+            'device': self.device
+        }
+        options.update(overrides)
+        return Trainer(**options)
             
     def _train_model_impl(self, X: np.ndarray, y: np.ndarray):
         """训练模型实现"""
         try:
-            # 创建数据加载器
-            dataset = torch.utils.data.TensorDataset(
-                torch.FloatTensor(X),
-                torch.LongTensor(y + 1)  # 转换为[0,2]范围
-            )
+            # model_key 只描述从 load_or_train 得到的网络，重新训练后由 load_or_train 重新设置
+            self.model_key = None
             
-            # 确保批次大小不大于数据集大小
-            batch_size = min(32, len(dataset))  # 默认批次大小为32
+            # 确保数据长度匹配
+            min_len = min(len(X), len(y))
+            X = X[:min_len]
+            y = y[:min_len]
             
-            dataloader = torch.utils.data.DataLoader(
-                dataset,
-                batch_size=batch_size,
-                shuffle=True,
-                drop_last=False  # 保留不完整的批次
-            )
+            # 创建模型
+            self.model = self.build_model(X.shape[1]).to(self.device)
+            self.optimizer = torch.optim.Adam(self.model.parameters(), lr=self.learning_rate)
             
             # 训练模型
-            n_epochs = 100
-            best_loss = float('inf')
-            patience = 10
-            patience_counter = 0
-            
-            for epoch in range(n_epochs):
-                epoch_loss, epoch_acc = self.train_epoch(dataloader)
-                
-                # 记录训练历史
-                self.training_history['loss'].append(epoch_loss)
-                self.training_history['accuracy'].append(epoch_acc)
-                
-                # 早停
-                if epoch_loss < best_loss:
-                    best_loss = epoch_loss
-                    patience_counter = 0
-                else:
-                    patience_counter += 1
-                    
-                if patience_counter >= patience:
-                    logger.info(f"Early stopping at epoch {epoch}")
-                    break
-                    
-                if (epoch + 1) % 10 == 0:
-                    logger.info(f"Epoch {epoch+1}/{n_epochs}, Loss: {epoch_loss:.4f}, Accuracy: {epoch_acc:.4f}")
+            self.make_trainer().fit(
+                self.model, self.optimizer, self.criterion, X, y,
+                history=self.training_history
+            )
                     
         except Exception as e:
-            logger.error(f"模型训练失败: {str(e)}")
+            logger.error(f"{self.name}模型训练失败: {str(e)}")
             self.model = None
             raise
             
+    def fit(self, X: np.ndarray, y: np.ndarray):
+        """在一个训练窗口上拟合网络(与 generate_signals 一致，不做标准化)"""
+        self._train_model_impl(X, y)
+        if self.model is None:
+            raise ValueError("模型训练失败")
+            
+    def set_fitted_state(self, state):
+        """恢复模型状态，并把网络移到当前设备"""
+        super().set_fitted_state(state)
+        self.model_key = None
+        if self.model is not None:
+            self.model = self.model.to(self.device)
+            
+    def inference_module(self) -> Tuple[nn.Module, str]:
+        """推理使用的模块和运行方式
+        
+        CPU上优先使用冻结参数的 TorchScript 模块: 先看当前网络是否已经导出过，再从模型仓库读取，
+        都没有时导出并保存到模型仓库。导出失败时直接使用训练的网络。
+        """
+        if self.inference_runtime != 'torchscript' or self.device.type != 'cpu':
+            return self.model, 'eager'
+        if self._runtime is not None and self._runtime_model is self.model:
+            return self._runtime, 'torchscript'
+            
+        registry = self.model_registry if self.model_key else None
+        runtime = None
+        try:
+            if registry is not None:
+                data = registry.load_artifact(self.model_key, TORCHSCRIPT_FILE)
+                if data is not None:
+                    runtime = load_torchscript(data)
+            if runtime is None:
+                start = time.perf_counter()
+                runtime = export_torchscript(self.model)
+                logger.info(f"{self.name}导出TorchScript推理模块: {(time.perf_counter() - start) * 1000:.1f}ms")
+                if registry is not None:
+                    registry.save_artifact(self.model_key, TORCHSCRIPT_FILE, serialize_torchscript(runtime))
+        except Exception as e:
+            logger.warning(f"{self.name}导出TorchScript失败，使用原网络推理: {str(e)}")
+            self.inference_runtime = None
+            return self.model, 'eager'
+            
+        self._runtime = runtime
+        self._runtime_model = self.model
+        return runtime, 'torchscript'
+        
+    def predict_tensor(self, X: torch.Tensor) -> np.ndarray:
+        """对整块输入(二维特征或序列窗口)做批量推理，返回 -1/0/1，并记录本次调用的耗时"""
+        module, runtime = self.inference_module()
+        if runtime == 'eager':
+            module.eval()
+        start = time.perf_counter()
+        classes = predict_classes(module, X, self.inference_batch_size, self.device)
+        elapsed = time.perf_counter() - start
+        inference_stats.record(self.name, elapsed, len(X), runtime)
+        logger.info(f"{self.name}推理{len(X)}行({runtime}): {elapsed * 1000:.1f}ms")
+        return classes.numpy() - 1
+        
     def predict(self, X: pd.DataFrame) -> np.ndarray:
         """模型预测"""
         try:
             if self.model is None:
                 raise ValueError("模型未训练")
                 
-            self.model.eval()
-            with torch.no_grad():
-                # 创建数据加载器以处理大数据集
-                dataset = torch.utils.data.TensorDataset(
-                    torch.FloatTensor(X.values)
-                )
-                
-                batch_size = min(32, len(dataset))  # 默认批次大小为32
-                
-                dataloader = torch.utils.data.DataLoader(
-                    dataset,
-                    batch_size=batch_size,
-                    shuffle=False,  # 保持顺序
-                    drop_last=False  # 保留所有数据
-                )
-                
-                # 分批预测
-                predictions = []
-                for batch_X, in dataloader:
-                    batch_X = batch_X.to(self.device)
-                    
-                    # 调整数据维度
-                    if self.__class__.__name__ in ['LSTMStrategy', 'CNNMLPStrategy']:
-                        batch_X = batch_X.unsqueeze(1)
-                        
-                    outputs = self.model(batch_X)
-                    batch_preds = torch.argmax(outputs, dim=1).cpu().numpy() - 1
-                    predictions.append(batch_preds)
-                    
-                # 合并所有预测结果
-                predictions = np.concatenate(predictions)
-                
-            return predictions
+            X_tensor, _ = to_tensors(np.asarray(X))
+            return self.predict_tensor(X_tensor)
             
         except Exception as e:
             logger.error(f"预测失败: {str(e)}")
-            return np.zeros(len(X))
\ No newline at end of file
+            return np.zeros(len(X))
@@ -0,0 +1,189 @@
+"""多个深度学习策略在同一份特征上的集成训练
+
+同一只股票上依次回测 mlp、lstm_mlp、cnn_mlp 时，每个策略都要各自准备特征、标签并转换为张量。
+DLEnsemble 对特征声明相同的成员只计算一次特征矩阵，所有成员训练和推理都使用同一块
+float32 内存(torch.from_numpy 零拷贝)。成员在线程池中并行训练，训练期间限制每个线程的
+torch 计算线程数，使总线程数不超过CPU核数。
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+import torch
+from backend.models.strategies.base import BaseStrategy
+from backend.models.strategies.ml.deep_learning.base_dl_strategy import BaseDLStrategy
+from backend.models.strategies.ml.features import FeaturePipeline
+from backend.models.strategies.ml.labels import align_labels
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMBERS = ('mlp', 'lstm_mlp', 'cnn_mlp')
+
+
+class DLEnsemble:
+    """训练多个深度学习策略并按加权投票组合信号
+
+    Args:
+        members: 成员策略名 -> 策略参数
+        weights: 成员策略名 -> 投票权重，默认都为1
+        max_workers: 并行训练的线程数，默认为成员数(不超过CPU核数)
+        threads_per_model: 每个训练线程的 torch 计算线程数，默认 CPU核数 / 线程数
+    """
+
+    def __init__(
+        self,
+        members: Optional[Dict[str, Dict[str, Any]]] = None,
+        weights: Optional[Dict[str, float]] = None,
+        max_workers: Optional[int] = None,
+        threads_per_model: Optional[int] = None
+    ):
+        # 避免在模块级导入工厂(工厂会导入本模块)
+        from backend.models.strategies.factory import StrategyFactory
+        members = members if members is not None else {name: {} for name in DEFAULT_MEMBERS}
+        if not members:
+            raise ValueError("集成至少需要一个成员策略")
+        self.strategies: Dict[str, BaseDLStrategy] = {}
+        for name, params in members.items():
+            strategy = StrategyFactory.create_strategy(name, **(params or {}))
+            if not isinstance(strategy, BaseDLStrategy):
+                raise ValueError(f"集成只支持深度学习策略: {name}")
+            self.strategies[name] = strategy
+        self.weights = {name: float((weights or {}).get(name, 1.0)) for name in self.strategies}
+        cpu_count = os.cpu_count() or 1
+        self.max_workers = max(1, min(int(max_workers or len(self.strategies)), len(self.strategies), cpu_count))
+        self.threads_per_model = max(1, int(threads_per_model or cpu_count // self.max_workers))
+        self.signals: Dict[str, np.ndarray] = {}
+        self.errors: Dict[str, str] = {}
+
+    def _shared_features(self, data: pd.DataFrame) -> Dict[str, Tuple[pd.DataFrame, np.ndarray]]:
+        """按特征声明分组计算特征，返回 成员 -> (特征DataFrame, 共享的float32特征矩阵)"""
+        groups: Dict[str, Tuple[pd.DataFrame, np.ndarray]] = {}
+        shared = {}
+        for name, strategy in self.strategies.items():
+            spec_hash = FeaturePipeline(strategy.feature_spec()).spec_hash
+            if spec_hash not in groups:
+                features_df = strategy.prepare_features(data)
+                # 连续且可写的数组，torch.from_numpy 不复制
+                X = np.ascontiguousarray(features_df.to_numpy(dtype=np.float32))
+                if not X.flags.writeable:
+                    X = X.copy()
+                groups[spec_hash] = (features_df, X)
+            shared[name] = groups[spec_hash]
+        logger.info(f"集成特征: {len(self.strategies)}个成员共享{len(groups)}份特征矩阵")
+        return shared
+
+    def _train_member(
+        self,
+        name: str,
+        features_df: pd.DataFrame,
+        X: np.ndarray,
+        X_train: np.ndarray,
+        y: np.ndarray,
+        n_rows: int
+    ) -> np.ndarray:
+        """训练一个成员并返回与行情对齐的信号(线程池任务)"""
+        strategy = self.strategies[name]
+        # 每个线程有自己的计算线程数设置，由 run 统一恢复
+        torch.set_num_threads(self.threads_per_model)
+        strategy.num_threads = None
+        strategy.load_or_train(X_train, y, features_df.columns, strategy._train_model_impl)
+        if strategy.model is None:
+            raise ValueError("模型训练失败")
+        predictions = strategy.predict_tensor(torch.from_numpy(X))
+        signals = np.zeros(n_rows)
+        signals[n_rows - len(predictions):] = predictions
+        return signals
+
+    def run(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """训练全部成员，返回各成员信号、集成信号和失败的成员"""
+        n_rows = len(data)
+        self.errors = {}
+        shared = self._shared_features(data)
+        labels = {}
+        tasks = []
+        for name, (features_df, X) in shared.items():
+            if features_df.empty:
+                self.errors[name] = "特征为空"
+                continue
+            # 标签设置相同的成员共用标签
+            strategy = self.strategies[name]
+            label_key = json.dumps(
+                [strategy.label_method, strategy.prediction_period, strategy.label_options],
+                sort_keys=True, default=str
+            )
+            if label_key not in labels:
+                labels[label_key] = strategy.label_series(data)
+            y = align_labels(labels[label_key], features_df.index)
+            # 标签按日期与特征对齐(与成员的 generate_signals 一致)，未知的标签只在末尾时训练集是同一块内存的视图
+            valid = ~np.isnan(y)
+            n_train = int(valid.sum())
+            X_train = X[:n_train] if valid[:n_train].all() else X[valid]
+            tasks.append((name, features_df, X, X_train, y[valid].astype(np.int64)))
+
+        previous_threads = torch.get_num_threads()
+        self.signals = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {
+                    name: executor.submit(self._train_member, name, features_df, X, X_train, y, n_rows)
+                    for name, features_df, X, X_train, y in tasks
+                }
+                for name, future in futures.items():
+                    try:
+                        self.signals[name] = future.result()
+                    except Exception as e:
+                        logger.error(f"集成成员{name}训练失败: {str(e)}")
+                        self.errors[name] = str(e)
+        finally:
+            torch.set_num_threads(previous_threads)
+
+        return {
+            'signals': {name: self.signals.get(name, np.zeros(n_rows)) for name in self.strategies},
+            'ensemble': self.combine(self.signals, n_rows),
+            'errors': dict(self.errors)
+        }
+
+    def combine(self, signals: Dict[str, np.ndarray], n_rows: int) -> np.ndarray:
+        """加权投票: 权重和为正时买入(1)，为负时卖出(-1)，否则为0"""
+        votes = np.zeros(n_rows)
+        for name, member_signals in signals.items():
+            votes += self.weights[name] * member_signals
+        return np.sign(votes)
+
+
+class DLEnsembleStrategy(BaseStrategy):
+    """MLP、LSTM+MLP、CNN+MLP 投票集成策略，成员共享回看期和学习率"""
+
+    def __init__(
+        self,
+        lookback_period: int = 20,
+        learning_rate: float = 0.001,
+        max_workers: Optional[int] = None,
+        members: Sequence[str] = DEFAULT_MEMBERS
+    ):
+        super().__init__("深度学习集成")
+        self.lookback_period = int(lookback_period)
+        self.learning_rate = float(learning_rate)
+        self.max_workers = max_workers
+        self.members = list(members)
+        # 最近一次运行的各成员信号
+        self.member_signals: Dict[str, np.ndarray] = {}
+        self.ensemble: Optional[DLEnsemble] = None
+
+    def generate_signals(self, data: pd.DataFrame) -> np.ndarray:
+        """生成交易信号"""
+        try:
+            params = {'lookback_period': self.lookback_period, 'learning_rate': self.learning_rate}
+            self.ensemble = DLEnsemble(
+                {name: dict(params) for name in self.members},
+                max_workers=self.max_workers
+            )
+            result = self.ensemble.run(data)
+            self.member_signals = result['signals']
+            return result['ensemble']
+        except Exception as e:
+            logger.error(f"信号生成失败: {str(e)}")
+            return np.zeros(len(data))
@@ -0,0 +1,59 @@
+"""深度学习策略的推理路径
+
+- 整块特征张量按大批次(默认8192行)做少量几次前向计算，在 torch.inference_mode 下运行，
+  预测类别留在设备上，最后一次性拷贝到主机
+- 训练好的网络可以导出为冻结参数的 TorchScript 模块(CPU)，序列化后存入模型仓库，
+  再次加载同一模型时不需要重新导出
+"""
+import copy
+import io
+import warnings
+import torch
+import torch.nn as nn
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 模型仓库中导出模型的文件名
+TORCHSCRIPT_FILE = 'model.ts'
+
+
+def export_torchscript(model: nn.Module) -> torch.jit.ScriptModule:
+    """把网络导出为评估模式、参数冻结的 CPU TorchScript 模块(不修改原网络)"""
+    model = copy.deepcopy(model).cpu().eval()
+    with warnings.catch_warnings():
+        # 新版本 torch 对 torch.jit 给出弃用警告
+        warnings.simplefilter('ignore', FutureWarning)
+        return torch.jit.freeze(torch.jit.script(model))
+
+
+def serialize_torchscript(module: torch.jit.ScriptModule) -> bytes:
+    buffer = io.BytesIO()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', FutureWarning)
+        torch.jit.save(module, buffer)
+    return buffer.getvalue()
+
+
+def load_torchscript(data: bytes) -> torch.jit.ScriptModule:
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', FutureWarning)
+        return torch.jit.load(io.BytesIO(data), map_location='cpu')
+
+
+def predict_classes(
+    module: nn.Module,
+    X: torch.Tensor,
+    batch_size: int = 8192,
+    device: torch.device = torch.device('cpu')
+) -> torch.Tensor:
+    """返回每行(或每个窗口)概率最大的类别下标(CPU张量)"""
+    if len(X) == 0:
+        return torch.empty(0, dtype=torch.long)
+    batch_size = max(1, int(batch_size))
+    predictions = []
+    with torch.inference_mode():
+        for start in range(0, len(X), batch_size):
+            outputs = module(X[start:start + batch_size].to(device))
+            predictions.append(outputs.argmax(dim=1))
+        return torch.cat(predictions).cpu()
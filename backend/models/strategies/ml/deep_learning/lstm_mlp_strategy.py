@@ -65,21 +65,15 @@ class LSTMMlPStrategy(BaseDLStrategy):
             if features_df.empty:
                 return np.zeros(len(data))
                 
-            # 准备训练数据
-            X = features_df.values
-            y = self.prepare_labels(data)
+            # 准备训练数据(特征和标签按日期对齐)
+            X, y = self.training_data(data, features_df)
             
             if len(y) == 0:
                 return np.zeros(len(data))
             
-            # 确保数据长度匹配
-            min_len = min(len(X), len(y))
-            X = X[:min_len]
-            y = y[:min_len]
-            
             # 训练模型
             logger.info(f"开始训练模型，特征维度: {X.shape}, 标签维度: {y.shape}")
-            self._train_model_impl(X, y)
+            self.load_or_train(X, y, features_df.columns, self._train_model_impl)
             
             if self.model is None:
                 raise ValueError("模型训练失败")
@@ -108,145 +102,9 @@ class LSTMMlPStrategy(BaseDLStrategy):
             logger.error(f"信号生成失败: {str(e)}")
             return np.zeros(len(data))
             
-    def predict(self, X: pd.DataFrame) -> np.ndarray:
-        """模型预测"""
-        try:
-            if self.model is None:
-                raise ValueError("模型未训练")
-                
-            self.model.eval()
-            with torch.no_grad():
-                # 创建数据加载器以处理大数据集
-                dataset = torch.utils.data.TensorDataset(
-                    torch.FloatTensor(X.values)
-                )
-                dataloader = torch.utils.data.DataLoader(
-                    dataset,
-                    batch_size=self.batch_size,
-                    shuffle=False,  # 保持顺序
-                    drop_last=False  # 保留所有数据
-                )
-                
-                # 分批预测
-                predictions = []
-                for batch_X, in dataloader:
-                    batch_X = batch_X.to(self.device)
-                    outputs = self.model(batch_X)
-                    batch_preds = torch.argmax(outputs, dim=1).cpu().numpy() - 1
-                    predictions.append(batch_preds)
-                    
-                # 合并所有预测结果
-                predictions = np.concatenate(predictions)
-                
-                # 确保预测结果长度匹配
-                if len(predictions) < len(X):
-                    # 填充剩余部分
-                    padded = np.zeros(len(X))
-                    padded[-len(predictions):] = predictions
-                    predictions = padded
-                elif len(predictions) > len(X):
-                    # 截取需要的部分
-                    predictions = predictions[-len(X):]
-                    
-            return predictions
-            
-        except Exception as e:
-            logger.error(f"预测失败: {str(e)}")
-            return np.zeros(len(X))
-            
-    def _train_model_impl(self, X: np.ndarray, y: np.ndarray):
-        try:
-            input_dim = X.shape[1]
-            
-            # 确保数据长度匹配
-            min_len = min(len(X), len(y))
-            X = X[:min_len]
-            y = y[:min_len]
-            
-            # 创建模型
-            self.model = LSTMMlPModel(
-                input_dim=input_dim,
-                hidden_dim=self.hidden_dim,
-                num_layers=self.num_layers
-            ).to(self.device)
-            
-            self.optimizer = torch.optim.Adam(
-                self.model.parameters(),
-                lr=self.learning_rate
-            )
-            
-            # 创建数据加载器
-            dataset = torch.utils.data.TensorDataset(
-                torch.FloatTensor(X),
-                torch.LongTensor(y + 1)  # 转换为[0,2]范围
-            )
-            
-            # 确保批次大小不大于数据集大小
-            batch_size = min(self.batch_size, len(dataset))
-            
-            dataloader = torch.utils.data.DataLoader(
-                dataset,
-                batch_size=batch_size,
-                shuffle=True,
-                drop_last=False  # 保留不完整的批次
-            )
-            
-            # 训练模型
-            n_epochs = 100
-            best_loss = float('inf')
-            patience = 10
-            patience_counter = 0
-            
-            for epoch in range(n_epochs):
-                total_loss = 0
-                total_acc = 0
-                n_batches = 0
-                
-                for batch_X, batch_y in dataloader:
-                    batch_X = batch_X.to(self.device)
-                    batch_y = batch_y.to(self.device)
-                    
-                    # 训练一个批次
-                    self.model.train()
-                    self.optimizer.zero_grad()
-                    
-                    outputs = self.model(batch_X)
-                    loss = self.criterion(outputs, batch_y)
-                    
-                    loss.backward()
-                    torch.nn.utils.clip_grad_norm_(self.model.parameters(), max_norm=1.0)
-                    self.optimizer.step()
-                    
-                    # 计算准确率
-                    _, predicted = torch.max(outputs.data, 1)
-                    accuracy = (predicted == batch_y).sum().item() / len(batch_y)
-                    
-                    total_loss += loss.item()
-                    total_acc += accuracy
-                    n_batches += 1
-                
-                # 计算epoch平均损失和准确率
-                epoch_loss = total_loss / n_batches
-                epoch_acc = total_acc / n_batches
-                
-                # 记录训练历史
-                self.training_history['loss'].append(epoch_loss)
-                self.training_history['accuracy'].append(epoch_acc)
-                
-                # 早停
-                if epoch_loss < best_loss:
-                    best_loss = epoch_loss
-                    patience_counter = 0
-                else:
-                    patience_counter += 1
-                    
-                if patience_counter >= patience:
-                    logger.info(f"Early stopping at epoch {epoch}")
-                    break
-                    
-                if (epoch + 1) % 10 == 0:
-                    logger.info(f"Epoch {epoch+1}/{n_epochs}, Loss: {epoch_loss:.4f}, Accuracy: {epoch_acc:.4f}")
-            
-        except Exception as e:
-            logger.error(f"LSTM+MLP模型训练失败: {str(e)}")
-            raise
\ No newline at end of file
+    def build_model(self, input_dim: int) -> nn.Module:
+        return LSTMMlPModel(
+            input_dim=input_dim,
+            hidden_dim=self.hidden_dim,
+            num_layers=self.num_layers
+        )
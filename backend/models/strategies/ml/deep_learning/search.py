@@ -0,0 +1,325 @@
+"""深度学习策略的超参数搜索(successive halving)
+
+- 在参数取值范围内随机采样 n_trials 组配置(学习率按对数均匀采样)，批次大小从候选值中选择
+- 所有配置先训练 min_epochs 个epoch，按验证损失保留前 1/eta，存活的配置从检查点继续训练到
+  eta 倍的epoch数，直到只剩一个配置或达到 max_epochs
+- 所有配置共享总epoch预算，预算不足时在当前轮只继续训练验证损失最低的配置
+- 每一轮的配置在进程池中并行训练，检查点(网络和优化器状态)保存在临时目录，
+  最好的 top_k 个模型保存到模型仓库，键与用同样参数(含批次大小)在同一行情上调用
+  generate_signals 时的键一致，之后的回测直接加载而不重新训练
+"""
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+import torch
+from backend.models.strategies.factory import StrategyFactory
+from backend.models.strategies.validators import get_param_ranges, get_param_types, validate_strategy_params
+from backend.models.strategies.ml.deep_learning.base_dl_strategy import BaseDLStrategy
+from backend.services.model_registry import ModelRegistry, model_registry
+import logging
+
+logger = logging.getLogger(__name__)
+
+SEARCHABLE_STRATEGIES = ('mlp', 'lstm_mlp', 'cnn_mlp')
+
+
+def _create_strategy(strategy_name: str, params: Dict[str, Any], batch_size: int) -> BaseDLStrategy:
+    strategy = StrategyFactory.create_strategy(strategy_name, **params)
+    strategy.model_registry = None
+    strategy.batch_size = int(batch_size)
+    return strategy
+
+
+def _train_trial(task: Dict[str, Any]) -> Dict[str, Any]:
+    """从检查点继续训练一个配置到指定epoch数(进程池任务入口)"""
+    if task.get('num_threads'):
+        torch.set_num_threads(task['num_threads'])
+    torch.manual_seed(task['seed'])
+    strategy = _create_strategy(task['strategy_name'], task['params'], task['batch_size'])
+    X_train, y_train, X_val, y_val = task['data']
+
+    model = strategy.build_model(X_train.shape[1]).to(strategy.device)
+    optimizer = torch.optim.Adam(model.parameters(), lr=strategy.learning_rate)
+    history = {'loss': [], 'accuracy': [], 'val_loss': [], 'val_accuracy': []}
+    checkpoint = task['checkpoint']
+    if os.path.exists(checkpoint):
+        state = torch.load(checkpoint, map_location=strategy.device)
+        model.load_state_dict(state['model'])
+        optimizer.load_state_dict(state['optimizer'])
+        history = state['history']
+    # 继续训练时换一个随机种子，每轮的打乱顺序不同
+    torch.manual_seed(task['seed'] + len(history['loss']))
+
+    epochs = task['epochs'] - len(history['loss'])
+    if epochs > 0:
+        trainer = strategy.make_trainer(max_epochs=epochs, patience=None, num_threads=None)
+        trainer.fit(model, optimizer, strategy.criterion, X_train, y_train,
+                    validation=(X_val, y_val), history=history)
+        torch.save({'model': model.state_dict(), 'optimizer': optimizer.state_dict(), 'history': history},
+                   checkpoint)
+    return {
+        'trial_id': task['trial_id'],
+        'epochs': len(history['loss']),
+        'val_loss': history['val_loss'][-1],
+        'val_accuracy': history['val_accuracy'][-1]
+    }
+
+
+class Trial:
+    """一组超参数配置及其训练结果"""
+
+    def __init__(self, trial_id: int, params: Dict[str, Any], batch_size: int):
+        self.trial_id = trial_id
+        self.params = params
+        self.batch_size = int(batch_size)
+        self.epochs = 0
+        self.val_loss = float('inf')
+        self.val_accuracy = 0.0
+        # 被淘汰时已训练的epoch数，None表示存活到最后
+        self.pruned_at: Optional[int] = None
+        self.model_key: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'trial_id': self.trial_id,
+            'params': self.params,
+            'batch_size': self.batch_size,
+            'epochs': self.epochs,
+            'val_loss': self.val_loss,
+            'val_accuracy': self.val_accuracy,
+            'pruned_at': self.pruned_at,
+            'model_key': self.model_key
+        }
+
+
+class SuccessiveHalvingSearch:
+    """深度学习策略的 successive halving 超参数搜索
+
+    Args:
+        strategy_name: mlp / lstm_mlp / cnn_mlp
+        n_trials: 随机采样的配置数
+        min_epochs: 第一轮每个配置训练的epoch数
+        max_epochs: 单个配置最多训练的epoch数
+        eta: 每一轮保留 1/eta 的配置，存活配置的epoch数乘以 eta
+        budget: 所有配置的总epoch预算，None表示不限制
+        validation_split: 末尾用于验证的样本比例(按时间顺序)
+        batch_sizes: 批次大小候选值
+        space: 参数 -> 候选值列表，覆盖该参数的随机采样
+        max_workers: 并行训练的进程数，1表示在当前进程中训练
+        top_k: 保存到模型仓库的最好配置数
+    """
+
+    def __init__(
+        self,
+        strategy_name: str,
+        n_trials: int = 27,
+        min_epochs: int = 3,
+        max_epochs: int = 81,
+        eta: int = 3,
+        budget: Optional[int] = None,
+        validation_split: float = 0.2,
+        batch_sizes: Sequence[int] = (32, 64, 128),
+        space: Optional[Dict[str, Sequence[Any]]] = None,
+        max_workers: Optional[int] = None,
+        top_k: int = 1,
+        seed: Optional[int] = None,
+        registry: Optional[ModelRegistry] = model_registry
+    ):
+        if strategy_name not in SEARCHABLE_STRATEGIES:
+            raise ValueError(f"超参数搜索只支持深度学习策略: {strategy_name}")
+        if n_trials <= 0 or min_epochs <= 0 or max_epochs < min_epochs or eta < 2:
+            raise ValueError("n_trials、min_epochs必须大于0，max_epochs不小于min_epochs，eta不小于2")
+        self.strategy_name = strategy_name
+        self.n_trials = int(n_trials)
+        self.min_epochs = int(min_epochs)
+        self.max_epochs = int(max_epochs)
+        self.eta = int(eta)
+        self.budget = None if budget is None else int(budget)
+        self.validation_split = float(validation_split)
+        self.batch_sizes = [int(b) for b in batch_sizes]
+        self.space = dict(space or {})
+        self.max_workers = max(1, int(max_workers or os.cpu_count() or 1))
+        self.top_k = int(top_k)
+        self.seed = seed
+        self.registry = registry
+        self.trials: List[Trial] = []
+        self.epochs_used = 0
+        self.rungs: List[Dict[str, Any]] = []
+
+    def sample_trials(self) -> List[Trial]:
+        """在参数取值范围内随机采样配置"""
+        rng = np.random.default_rng(self.seed)
+        ranges = get_param_ranges(self.strategy_name)
+        types = get_param_types(self.strategy_name)
+        trials = []
+        for trial_id in range(self.n_trials):
+            params = {}
+            for param, (low, high) in ranges.items():
+                if param == 'batch_size':
+                    continue
+                if param in self.space:
+                    choices = list(self.space[param])
+                    params[param] = choices[rng.integers(len(choices))]
+                elif types[param] is int:
+                    params[param] = int(rng.integers(low, high + 1))
+                elif param == 'learning_rate':
+                    params[param] = float(np.exp(rng.uniform(np.log(low), np.log(high))).round(6))
+                else:
+                    params[param] = float(round(rng.uniform(low, high), 6))
+            batch_size = self.batch_sizes[rng.integers(len(self.batch_sizes))]
+            params['batch_size'] = int(batch_size)
+            trials.append(Trial(trial_id, validate_strategy_params(self.strategy_name, params), batch_size))
+        return trials
+
+    def prepare_data(self, data: pd.DataFrame, params: Dict[str, Any]) -> Tuple[np.ndarray, ...]:
+        """特征和策略的标签按日期对齐，末尾 validation_split 的样本作为验证集
+
+        训练集和验证集之间空出一个样本，训练集最后一个标签用到的收盘价不在验证区间内。
+        """
+        strategy = _create_strategy(self.strategy_name, params, self.batch_sizes[0])
+        features = strategy.prepare_features(data)
+        X, y = strategy.training_data(data, features)
+        X = np.ascontiguousarray(X, dtype=np.float32)
+
+        n_val = int(len(X) * self.validation_split)
+        n_train = len(X) - n_val - 1
+        if n_val == 0 or n_train < 2:
+            raise ValueError(f"样本数({len(X)})不足以划分训练集和验证集")
+        return X[:n_train], y[:n_train], X[n_train + 1:], y[n_train + 1:]
+
+    def _rung_schedule(self) -> List[int]:
+        """每一轮训练到的epoch数: min_epochs, min_epochs*eta, ... , max_epochs"""
+        schedule = []
+        epochs = self.min_epochs
+        while epochs < self.max_epochs:
+            schedule.append(epochs)
+            epochs *= self.eta
+        schedule.append(self.max_epochs)
+        return schedule
+
+    def _run_rung(self, tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        workers = max(1, min(self.max_workers, len(tasks)))
+        if workers == 1:
+            return [_train_trial(task) for task in tasks]
+        # 每个进程的 torch 线程数，使总线程数不超过CPU核数
+        num_threads = max(1, (os.cpu_count() or 1) // workers)
+        for task in tasks:
+            task['num_threads'] = num_threads
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_train_trial, tasks))
+
+    def run(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """执行搜索，返回所有配置的结果(按验证损失排序)和最好的配置"""
+        self.trials = self.sample_trials()
+        self.epochs_used = 0
+        self.rungs = []
+        # 回看期相同的配置共用特征
+        datasets: Dict[int, Tuple[np.ndarray, ...]] = {}
+        for trial in self.trials:
+            lookback = trial.params['lookback_period']
+            if lookback not in datasets:
+                datasets[lookback] = self.prepare_data(data, trial.params)
+
+        checkpoint_dir = tempfile.mkdtemp(prefix='hpo-')
+        try:
+            survivors = list(self.trials)
+            for epochs in self._rung_schedule():
+                # 按剩余预算限制本轮继续训练的配置数
+                if self.budget is not None:
+                    remaining = self.budget - self.epochs_used
+                    cost = max(1, epochs - min(t.epochs for t in survivors))
+                    affordable = remaining // cost
+                    if affordable < 1:
+                        break
+                    if affordable < len(survivors):
+                        self._prune(survivors[affordable:])
+                        survivors = survivors[:affordable]
+
+                tasks = [{
+                    'trial_id': trial.trial_id,
+                    'strategy_name': self.strategy_name,
+                    'params': trial.params,
+                    'batch_size': trial.batch_size,
+                    'epochs': epochs,
+                    'data': datasets[trial.params['lookback_period']],
+                    'checkpoint': os.path.join(checkpoint_dir, f"trial-{trial.trial_id}.pt"),
+                    'seed': (self.seed or 0) + trial.trial_id
+                } for trial in survivors]
+                by_id = {trial.trial_id: trial for trial in survivors}
+                for result in self._run_rung(tasks):
+                    trial = by_id[result['trial_id']]
+                    self.epochs_used += result['epochs'] - trial.epochs
+                    trial.epochs = result['epochs']
+                    trial.val_loss = result['val_loss']
+                    trial.val_accuracy = result['val_accuracy']
+
+                survivors.sort(key=lambda t: t.val_loss)
+                self.rungs.append({'epochs': epochs, 'trials': len(survivors), 'best_val_loss': survivors[0].val_loss})
+                logger.info(f"超参数搜索: {len(survivors)}个配置训练到{epochs}个epoch, 最低验证损失 {survivors[0].val_loss:.4f}")
+                if epochs >= self.max_epochs:
+                    break
+                keep = max(1, len(survivors) // self.eta)
+                self._prune(survivors[keep:])
+                survivors = survivors[:keep]
+
+            ranked = sorted((t for t in self.trials if t.epochs > 0),
+                            key=lambda t: (t.pruned_at is not None, -t.epochs, t.val_loss))
+            for trial in ranked[:self.top_k]:
+                self._save_best(trial, data, datasets[trial.params['lookback_period']], checkpoint_dir)
+        finally:
+            shutil.rmtree(checkpoint_dir, ignore_errors=True)
+
+        return self.summary()
+
+    @staticmethod
+    def _prune(trials: List[Trial]):
+        for trial in trials:
+            trial.pruned_at = trial.epochs
+
+    def _save_best(self, trial: Trial, data: pd.DataFrame, dataset: Tuple[np.ndarray, ...], checkpoint_dir: str):
+        """把配置的检查点保存到模型仓库
+
+        网络只在训练集上训练，但按 generate_signals 使用的全部对齐样本计算键，
+        之后用相同参数在同一行情上生成信号时直接加载该模型。
+        """
+        if self.registry is None:
+            return
+        checkpoint = os.path.join(checkpoint_dir, f"trial-{trial.trial_id}.pt")
+        strategy = _create_strategy(self.strategy_name, trial.params, trial.batch_size)
+        X_train = dataset[0]
+        state = torch.load(checkpoint, map_location=strategy.device)
+        strategy.model = strategy.build_model(X_train.shape[1]).to(strategy.device)
+        strategy.model.load_state_dict(state['model'])
+        strategy.model.eval()
+        strategy.training_history = state['history']
+
+        features = strategy.prepare_features(data)
+        X, y = strategy.training_data(data, features)
+        key, schema = strategy.registry_key(self.registry, X, y, features.columns)
+        if self.registry.save(key, strategy.get_fitted_state(), {
+            'strategy': type(strategy).__name__,
+            'name': strategy.name,
+            'params': strategy.get_params(),
+            'features': schema,
+            'n_samples': int(len(X_train)),
+            'hpo': {'batch_size': trial.batch_size, 'epochs': trial.epochs,
+                    'val_loss': trial.val_loss, 'val_accuracy': trial.val_accuracy}
+        }):
+            trial.model_key = key
+
+    def summary(self) -> Dict[str, Any]:
+        ranked = sorted(self.trials, key=lambda t: (t.pruned_at is not None, -t.epochs, t.val_loss))
+        return {
+            'strategy': self.strategy_name,
+            'n_trials': self.n_trials,
+            'epochs_used': self.epochs_used,
+            'budget': self.budget,
+            'full_training_epochs': self.n_trials * self.max_epochs,
+            'rungs': self.rungs,
+            'best': ranked[0].to_dict() if ranked and ranked[0].epochs > 0 else None,
+            'trials': [trial.to_dict() for trial in ranked]
+        }
@@ -0,0 +1,41 @@
+"""序列模型(LSTM等)共用的滑动窗口数据
+
+窗口通过 sliding_window_view 在同一块特征内存上构造，不复制 (样本数 × 窗口长度 × 特征数) 的数组，
+只有组成batch时才复制该batch的窗口，内存约为逐个切片拼接的 1/窗口长度。
+"""
+from typing import Optional
+import numpy as np
+import torch
+from numpy.lib.stride_tricks import as_strided, sliding_window_view
+
+
+def sequence_windows(X: np.ndarray, lookback: int) -> np.ndarray:
+    """(N, 特征数) -> (N-lookback+1, lookback, 特征数) 的只读视图，第i个窗口为 X[i:i+lookback]"""
+    X = np.asarray(X)
+    if len(X) < lookback:
+        return np.empty((0, lookback) + X.shape[1:], dtype=X.dtype)
+    return np.moveaxis(sliding_window_view(X, lookback, axis=0), -1, 1)
+
+
+class SequenceDataset(torch.utils.data.Dataset):
+    """以第 i+lookback-1 行结尾的窗口为第i个样本，标签取该行的标签(-1/0/1，转换为0~2)"""
+
+    def __init__(self, X: np.ndarray, y: Optional[np.ndarray] = None, lookback: int = 20):
+        self.lookback = int(lookback)
+        # 保留一份连续的float32特征，所有窗口都是它的视图
+        self._features = np.array(X, dtype=np.float32)
+        windows = sequence_windows(self._features, self.lookback)
+        # sliding_window_view 返回只读视图，按相同的形状和步长在自有的特征数组上建立视图，零拷贝转换为张量
+        self.windows = torch.from_numpy(as_strided(self._features, windows.shape, windows.strides))
+        self.labels = None
+        if y is not None:
+            labels = np.asarray(y)[self.lookback - 1:len(self._features)] + 1
+            self.labels = torch.as_tensor(labels, dtype=torch.long)
+
+    def __len__(self) -> int:
+        return len(self.windows)
+
+    def __getitem__(self, index):
+        if self.labels is None:
+            return (self.windows[index],)
+        return self.windows[index], self.labels[index]
@@ -0,0 +1,230 @@
+"""深度学习策略共用的训练循环
+
+- 数据不大时整块放在设备上，每个epoch用 randperm 切片组成batch，不经过 DataLoader 的逐样本取数和拼接
+- 损失和正确数在设备上累加，每个epoch只同步一次到主机(原先每个batch调用两次 .item())
+- 可以限制 torch 的计算线程数，训练结束后恢复
+- 可选 TorchScript 或 torch.compile 编译模型，编译或运行失败时退回普通模式
+"""
+import time
+import warnings
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+import torch
+import torch.nn as nn
+import logging
+
+logger = logging.getLogger(__name__)
+
+COMPILE_MODES = (None, 'torchscript', 'compile')
+
+ArrayLike = Union[np.ndarray, torch.Tensor]
+
+
+def to_tensors(X: ArrayLike, y: Optional[ArrayLike] = None) -> Tuple[torch.Tensor, Optional[torch.Tensor]]:
+    """特征转换为 float32 张量，标签(-1/0/1)转换为类别下标(0~2)"""
+    if isinstance(X, torch.Tensor):
+        X_tensor = X.float()
+    else:
+        X = np.asarray(X, dtype=np.float32)
+        # 缓存中的特征矩阵是只读的，torch 不能共享只读内存
+        X_tensor = torch.from_numpy(X if X.flags.writeable else X.copy())
+    if y is None:
+        return X_tensor, None
+    if isinstance(y, torch.Tensor):
+        return X_tensor, y.long()
+    return X_tensor, torch.as_tensor(np.asarray(y) + 1, dtype=torch.long)
+
+
+class Trainer:
+    """分类网络的训练循环(交叉熵、Adam等由调用方传入)
+
+    Args:
+        max_epochs: 最大训练轮数
+        batch_size: 批次大小(不大于样本数)
+        patience: 监控的损失连续多少个epoch没有下降时提前停止，None表示不早停
+        max_grad_norm: 梯度裁剪阈值，None表示不裁剪
+        num_threads: 训练期间 torch 使用的线程数，None表示不修改
+        compile_mode: None / 'torchscript' / 'compile'
+        in_memory_max_bytes: 训练数据不超过该大小时整块放在设备上按下标切片，否则使用 DataLoader
+        log_every: 每隔多少个epoch输出一次日志
+    """
+
+    def __init__(
+        self,
+        max_epochs: int = 100,
+        batch_size: int = 32,
+        patience: Optional[int] = 10,
+        max_grad_norm: Optional[float] = 1.0,
+        num_threads: Optional[int] = None,
+        compile_mode: Optional[str] = None,
+        in_memory_max_bytes: int = 256 * 1024 * 1024,
+        device: Optional[torch.device] = None,
+        log_every: int = 10
+    ):
+        if compile_mode not in COMPILE_MODES:
+            raise ValueError(f"不支持的编译模式: {compile_mode}")
+        self.max_epochs = int(max_epochs)
+        self.batch_size = int(batch_size)
+        self.patience = None if patience is None else int(patience)
+        self.max_grad_norm = max_grad_norm
+        self.num_threads = None if num_threads is None else int(num_threads)
+        self.compile_mode = compile_mode
+        self.in_memory_max_bytes = int(in_memory_max_bytes)
+        self.device = device or torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        self.log_every = int(log_every)
+        # 最近一次 fit 的统计
+        self.epochs_run = 0
+        self.seconds = 0.0
+
+    def _compile(self, model: nn.Module) -> nn.Module:
+        """返回用于前向计算的模块(与 model 共享参数)，失败时返回 model"""
+        try:
+            if self.compile_mode == 'torchscript':
+                with warnings.catch_warnings():
+                    # 新版本 torch 对 torch.jit.script 给出弃用警告
+                    warnings.simplefilter('ignore', FutureWarning)
+                    return torch.jit.script(model)
+            if self.compile_mode == 'compile':
+                return torch.compile(model)
+        except Exception as e:
+            logger.warning(f"模型编译失败({self.compile_mode})，使用普通模式: {str(e)}")
+        return model
+
+    def _batches(self, X: torch.Tensor, y: torch.Tensor, shuffle: bool):
+        """按批次产出 (特征, 标签)"""
+        n = len(X)
+        batch_size = max(1, min(self.batch_size, n))
+        if X.element_size() * X.nelement() <= self.in_memory_max_bytes:
+            X = X.to(self.device)
+            y = y.to(self.device)
+            order = torch.randperm(n, device=self.device) if shuffle else None
+            starts = list(range(0, n, batch_size))
+            # 只剩1个样本的末尾批次并入前一个批次(BatchNorm在训练模式下不接受单个样本)
+            if len(starts) > 1 and n - starts[-1] == 1:
+                starts.pop()
+            for i, start in enumerate(starts):
+                end = starts[i + 1] if i + 1 < len(starts) else n
+                if order is None:
+                    yield X[start:end], y[start:end]
+                else:
+                    index = order[start:end]
+                    yield X[index], y[index]
+            return
+
+        loader = torch.utils.data.DataLoader(
+            torch.utils.data.TensorDataset(X, y),
+            batch_size=batch_size,
+            shuffle=shuffle,
+            drop_last=False,
+            pin_memory=self.device.type == 'cuda'
+        )
+        for batch_X, batch_y in loader:
+            yield batch_X.to(self.device, non_blocking=True), batch_y.to(self.device, non_blocking=True)
+
+    def _run_epoch(
+        self,
+        model: nn.Module,
+        forward: nn.Module,
+        criterion: nn.Module,
+        X: torch.Tensor,
+        y: torch.Tensor,
+        optimizer: Optional[torch.optim.Optimizer] = None
+    ) -> Tuple[float, float]:
+        """训练(传入optimizer时)或评估一个epoch，返回按样本加权的平均损失和准确率"""
+        training = optimizer is not None
+        model.train(training)
+        # TorchScript 模块的训练/评估状态独立于原模块(参数和缓冲区共享)
+        forward.train(training)
+        total_loss = torch.zeros((), device=self.device)
+        correct = torch.zeros((), dtype=torch.long, device=self.device)
+        with torch.set_grad_enabled(training):
+            for batch_X, batch_y in self._batches(X, y, shuffle=training):
+                if training:
+                    optimizer.zero_grad(set_to_none=True)
+                outputs = forward(batch_X)
+                loss = criterion(outputs, batch_y)
+                if training:
+                    loss.backward()
+                    if self.max_grad_norm is not None:
+                        torch.nn.utils.clip_grad_norm_(model.parameters(), max_norm=self.max_grad_norm)
+                    optimizer.step()
+                total_loss += loss.detach() * len(batch_y)
+                correct += (outputs.detach().argmax(dim=1) == batch_y).sum()
+        # 每个epoch只同步一次
+        loss_sum, n_correct = torch.stack([total_loss, correct.to(total_loss.dtype)]).tolist()
+        return loss_sum / len(y), n_correct / len(y)
+
+    def fit(
+        self,
+        model: nn.Module,
+        optimizer: torch.optim.Optimizer,
+        criterion: nn.Module,
+        X: ArrayLike,
+        y: ArrayLike,
+        validation: Optional[Tuple[ArrayLike, ArrayLike]] = None,
+        history: Optional[Dict[str, List[float]]] = None
+    ) -> Dict[str, List[float]]:
+        """训练模型(原地更新参数)，返回训练历史
+
+        numpy 标签为 -1/0/1，张量标签视为已经是类别下标；有验证集时按验证损失早停。
+        """
+        X, y = to_tensors(X, y)
+        if len(X) == 0:
+            raise ValueError("训练数据为空")
+        val = to_tensors(*validation) if validation is not None and len(validation[0]) > 0 else None
+        if history is None:
+            history = {'loss': [], 'accuracy': [], 'val_loss': [], 'val_accuracy': []}
+
+        previous_threads = torch.get_num_threads()
+        if self.num_threads is not None:
+            torch.set_num_threads(self.num_threads)
+        start = time.perf_counter()
+        try:
+            forward = self._compile(model)
+            best_loss = float('inf')
+            patience_counter = 0
+            self.epochs_run = 0
+            for epoch in range(self.max_epochs):
+                try:
+                    epoch_loss, epoch_acc = self._run_epoch(model, forward, criterion, X, y, optimizer)
+                except Exception as e:
+                    # 编译后的模型一般在第一次前向计算时才报错(此时参数还没有更新)，退回普通模式
+                    if forward is model or epoch > 0:
+                        raise
+                    logger.warning(f"编译后的模型运行失败，使用普通模式: {str(e)}")
+                    forward = model
+                    epoch_loss, epoch_acc = self._run_epoch(model, forward, criterion, X, y, optimizer)
+                history['loss'].append(epoch_loss)
+                history['accuracy'].append(epoch_acc)
+                monitored = epoch_loss
+                if val is not None:
+                    val_loss, val_acc = self._run_epoch(model, forward, criterion, *val)
+                    history['val_loss'].append(val_loss)
+                    history['val_accuracy'].append(val_acc)
+                    monitored = val_loss
+                self.epochs_run = epoch + 1
+
+                if (epoch + 1) % self.log_every == 0:
+                    logger.info(f"Epoch {epoch+1}/{self.max_epochs}, Loss: {epoch_loss:.4f}, Accuracy: {epoch_acc:.4f}")
+
+                # 早停
+                if self.patience is None:
+                    continue
+                if monitored < best_loss:
+                    best_loss = monitored
+                    patience_counter = 0
+                else:
+                    patience_counter += 1
+                if patience_counter >= self.patience:
+                    logger.info(f"Early stopping at epoch {epoch}")
+                    break
+        finally:
+            self.seconds = time.perf_counter() - start
+            if self.num_threads is not None:
+                torch.set_num_threads(previous_threads)
+        model.eval()
+        return history
+
+    @property
+    def epochs_per_second(self) -> float:
+        return self.epochs_run / self.seconds if self.seconds > 0 else 0.0
@@ -0,0 +1,207 @@
+"""机器学习策略共用的声明式特征流水线
+
+策略用 Feature(列名, 特征类型, 参数) 的列表声明需要的特征，FeaturePipeline 把所有特征写入
+一个预分配的 float32 矩阵(行为日期、列为特征):
+- 类型和参数相同的特征只计算一次(不同列名指向同一特征时直接复制该列)
+- 收益率、成交量均线等中间结果在一次计算内共享，均线/标准差/RSI 通过 indicator_engine 跨策略复用
+- 整个矩阵按 (股票, 行情指纹, 特征声明) 缓存，同一份行情上重复训练或回测时直接返回
+"""
+import hashlib
+import json
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from backend.models.indicators.engine import indicator_engine, fingerprint
+from backend.services.memory_cache import MemoryCache
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 特征矩阵缓存: (股票, 行情指纹, 特征声明哈希) -> (特征矩阵, 有效行掩码)
+feature_cache = MemoryCache(max_bytes=512 * 1024 * 1024, default_ttl=None)
+
+
+class Feature:
+    """一个特征列: 列名 + 特征类型(FEATURE_FUNCTIONS 中的名称) + 参数"""
+
+    __slots__ = ('name', 'kind', 'params')
+
+    def __init__(self, name: str, kind: str, **params):
+        if kind not in FEATURE_FUNCTIONS:
+            raise ValueError(f"不支持的特征类型: {kind}")
+        self.name = name
+        self.kind = kind
+        self.params = params
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        """特征的计算标识，类型和参数相同的特征共享计算结果"""
+        return self.kind, json.dumps(self.params, sort_keys=True)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'name': self.name, 'kind': self.kind, 'params': self.params}
+
+
+class _FeatureContext:
+    """一次特征计算的输入和共享的中间结果"""
+
+    def __init__(self, data: pd.DataFrame):
+        self.data = data
+        self.close = data['Close']
+        self._close_key = fingerprint(self.close)
+        self._memo: Dict[Any, pd.Series] = {}
+
+    def _cached(self, key: Any, compute: Callable[[], pd.Series]) -> pd.Series:
+        result = self._memo.get(key)
+        if result is None:
+            result = compute()
+            self._memo[key] = result
+        return result
+
+    def returns(self) -> pd.Series:
+        return self._cached('returns', lambda: self.close.pct_change())
+
+    def sma(self, window: int, min_periods: Optional[int] = None) -> pd.Series:
+        return indicator_engine.sma(self.close, window, min_periods, key=self._close_key)
+
+    def close_std(self, window: int, min_periods: Optional[int] = None) -> pd.Series:
+        return indicator_engine.rolling_std(self.close, window, min_periods, key=self._close_key)
+
+    def rsi(self, period: int = 14) -> pd.Series:
+        return indicator_engine.rsi(self.close, period, key=self._close_key)
+
+    def volume_ma(self, window: int, min_periods: Optional[int] = None) -> pd.Series:
+        return self._cached(
+            ('volume_ma', window, min_periods),
+            lambda: self.data['Volume'].rolling(window=window, min_periods=min_periods).mean()
+        )
+
+
+def _true_range(ctx: _FeatureContext) -> pd.Series:
+    data = ctx.data
+    prev_close = data['Close'].shift()
+    return pd.DataFrame({
+        'hl': data['High'] - data['Low'],
+        'hc': abs(data['High'] - prev_close),
+        'lc': abs(data['Low'] - prev_close)
+    }).max(axis=1)
+
+
+def _ma_cross(ctx: _FeatureContext, short_window: int, long_window: int) -> pd.Series:
+    ma_long = ctx.sma(long_window)
+    return (ctx.sma(short_window) - ma_long) / ma_long
+
+
+def _bb_position(ctx: _FeatureContext, window: int = 20, num_std: float = 2.0) -> pd.Series:
+    return (ctx.close - ctx.sma(window)) / (num_std * ctx.close_std(window))
+
+
+# 特征类型 -> 计算函数(参数为 Feature.params)，返回与行情对齐的序列
+FEATURE_FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    # 价格
+    'returns': lambda ctx: ctx.returns(),
+    'log_returns': lambda ctx: np.log1p(ctx.returns()),
+    'momentum': lambda ctx, window: ctx.close.pct_change(periods=window),
+    'high_low_ratio': lambda ctx: ctx.data['High'] / ctx.data['Low'],
+    'close_open_ratio': lambda ctx: ctx.close / ctx.data['Open'],
+    'true_range': _true_range,
+    # 趋势和波动
+    'sma': lambda ctx, window, min_periods=None: ctx.sma(window, min_periods),
+    'ma_ratio': lambda ctx, window, min_periods=None: ctx.close / ctx.sma(window, min_periods),
+    'ma_cross': _ma_cross,
+    'close_std': lambda ctx, window, min_periods=None: ctx.close_std(window, min_periods),
+    'volatility': lambda ctx, window, min_periods=None: ctx.returns().rolling(
+        window=window, min_periods=min_periods).std(),
+    'rsi': lambda ctx, period=14: ctx.rsi(period),
+    'bb_position': _bb_position,
+    # 成交量
+    'volume_ma': lambda ctx, window, min_periods=None: ctx.volume_ma(window, min_periods),
+    'volume_std': lambda ctx, window, min_periods=None: ctx.data['Volume'].rolling(
+        window=window, min_periods=min_periods).std(),
+    'volume_ratio': lambda ctx, window, min_periods=None: ctx.data['Volume'] / ctx.volume_ma(window, min_periods),
+    'volume_change': lambda ctx: ctx.data['Volume'].pct_change(),
+    # 滞后值，在 FeaturePipeline 中直接按切片写入矩阵
+    'lag': None,
+}
+
+
+def lag_features(columns: Sequence[str], lookback_period: int) -> List[Feature]:
+    """各列的 1..lookback_period 期滞后值，按滞后期交替排列(close_lag_1, volume_lag_1, ...)"""
+    return [
+        Feature(f"{column.lower()}_lag_{i}", 'lag', column=column, periods=i)
+        for i in range(1, int(lookback_period) + 1)
+        for column in columns
+    ]
+
+
+class FeaturePipeline:
+    """按特征声明生成 float32 特征矩阵"""
+
+    def __init__(self, features: Sequence[Feature], cache: Optional[MemoryCache] = None):
+        names = [feature.name for feature in features]
+        if len(set(names)) != len(names):
+            raise ValueError("特征列名重复")
+        self.features = list(features)
+        self.columns = names
+        self.cache = cache if cache is not None else feature_cache
+        spec = json.dumps([feature.to_dict() for feature in self.features], sort_keys=True)
+        self.spec_hash = hashlib.blake2b(spec.encode(), digest_size=16).hexdigest()
+
+    @staticmethod
+    def data_fingerprint(data: pd.DataFrame) -> str:
+        """行情内容(列名、数值、索引)的指纹"""
+        h = hashlib.blake2b(digest_size=16)
+        for column in data.columns:
+            h.update(str(column).encode())
+            h.update(fingerprint(data[column]).encode())
+        return h.hexdigest()
+
+    def _compute(self, data: pd.DataFrame) -> np.ndarray:
+        n = len(data)
+        matrix = np.empty((n, len(self.features)), dtype=np.float32)
+        ctx = _FeatureContext(data)
+        computed: Dict[Tuple[str, str], int] = {}
+        lag_sources: Dict[str, np.ndarray] = {}
+
+        for j, feature in enumerate(self.features):
+            if feature.key in computed:
+                matrix[:, j] = matrix[:, computed[feature.key]]
+                continue
+            computed[feature.key] = j
+
+            if feature.kind == 'lag':
+                column, periods = feature.params['column'], int(feature.params['periods'])
+                source = lag_sources.get(column)
+                if source is None:
+                    source = lag_sources[column] = data[column].to_numpy(dtype=np.float32)
+                periods = min(periods, n)
+                matrix[:periods, j] = np.nan
+                matrix[periods:, j] = source[:n - periods]
+                continue
+
+            values = FEATURE_FUNCTIONS[feature.kind](ctx, **feature.params)
+            matrix[:, j] = np.asarray(values, dtype=np.float64)
+
+        # 与原先 DataFrame 列计算一致，inf 保留，由调用方处理
+        return matrix
+
+    def compute(self, data: pd.DataFrame) -> np.ndarray:
+        """计算(或从缓存读取)完整的特征矩阵，行与 data 对齐，缓存中的矩阵为共享对象，不应原地修改"""
+        symbol = data.attrs.get('symbol', '')
+        cache_key = f"features:{symbol}:{self.data_fingerprint(data)}:{self.spec_hash}"
+        matrix = self.cache.get(cache_key)
+        if matrix is None:
+            matrix = self._compute(data)
+            matrix.flags.writeable = False
+            self.cache.set(cache_key, matrix)
+        return matrix
+
+    def transform(self, data: pd.DataFrame, dropna: bool = True) -> pd.DataFrame:
+        """返回特征DataFrame，dropna=True 时去掉任一特征为NaN的行"""
+        matrix = self.compute(data)
+        index = data.index
+        if dropna:
+            valid = ~np.isnan(matrix).any(axis=1)
+            matrix = matrix[valid]
+            index = index[valid]
+        return pd.DataFrame(matrix, index=index, columns=self.columns, copy=not dropna)
@@ -0,0 +1,122 @@
+"""机器学习策略共用的前瞻标签
+
+所有标签都与行情按日期对齐: 第t行的标签只由第t行之后的K线决定，未来K线不足(末尾)或
+波动率尚未确定的位置为NaN，训练时按特征的日期取标签并去掉NaN即可保证特征和标签对齐。
+
+- horizon: 未来 horizon 根K线收益率的均值(滚动均值左移)或累计收益的方向
+- triple_barrier: 三重障碍法，未来 horizon 根K线内先触及止盈线为1、先触及止损线为-1，都未触及为0
+  (或取到期收益的方向)；障碍宽度可以是固定比例，也可以是滚动波动率的倍数
+
+每种标签都在整段行情上一次向量化计算，不逐行切片。
+"""
+from typing import Any, Callable, Dict, Optional
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _direction(values: np.ndarray, threshold: float) -> np.ndarray:
+    """超过阈值为1、低于负阈值为-1，其余为0，NaN保持NaN"""
+    labels = np.where(values > threshold, 1.0, np.where(values < -threshold, -1.0, 0.0))
+    labels[np.isnan(values)] = np.nan
+    return labels
+
+
+def horizon_labels(
+    close: pd.Series,
+    horizon: int = 1,
+    threshold: float = 0.0,
+    method: str = 'mean'
+) -> pd.Series:
+    """未来 horizon 根K线收益的方向(1/-1/0)
+
+    :param method: 'mean' 为第 t+1 ~ t+horizon 根K线收益率的均值；'return' 为 t 到 t+horizon 的累计收益
+    :param threshold: 收益的绝对值不超过该阈值时标签为0
+    """
+    horizon = int(horizon)
+    if horizon < 1:
+        raise ValueError(f"预测周期必须大于0: {horizon}")
+    close = close.astype(float)
+    if method == 'mean':
+        # 第j行的滚动均值覆盖 j-horizon+1 ~ j 的收益率，左移 horizon 行后第t行即为 t+1 ~ t+horizon
+        future_returns = close.pct_change().rolling(horizon).mean().shift(-horizon)
+    elif method == 'return':
+        future_returns = close.shift(-horizon) / close - 1
+    else:
+        raise ValueError(f"不支持的收益计算方式: {method}")
+    return pd.Series(_direction(future_returns.to_numpy(), threshold), index=close.index)
+
+
+def triple_barrier_labels(
+    close: pd.Series,
+    horizon: int = 10,
+    upper: float = 0.02,
+    lower: float = 0.02,
+    volatility_window: Optional[int] = None,
+    timeout: str = 'zero'
+) -> pd.Series:
+    """三重障碍标签: 未来 horizon 根K线内先触及止盈线为1，先触及止损线为-1
+
+    :param upper: 止盈线，相对当前收盘价的收益率；设置了 volatility_window 时为波动率的倍数
+    :param lower: 止损线(正数)，含义同 upper
+    :param volatility_window: 按截至当前K线的收益率滚动标准差缩放障碍宽度，None 表示固定比例
+    :param timeout: 两条线都未触及时的标签，'zero' 为0，'sign' 为到期收益的方向
+    """
+    horizon = int(horizon)
+    if horizon < 1:
+        raise ValueError(f"预测周期必须大于0: {horizon}")
+    if timeout not in ('zero', 'sign'):
+        raise ValueError(f"不支持的到期标签: {timeout}")
+    prices = close.to_numpy(dtype=float)
+    n_rows = len(prices)
+    labels = np.full(n_rows, np.nan)
+    n_known = n_rows - horizon
+    if n_known <= 0:
+        return pd.Series(labels, index=close.index)
+
+    # (n_known, horizon): 第t行为第 t+1 ~ t+horizon 根K线相对第t根收盘价的收益，窗口是视图
+    paths = sliding_window_view(prices[1:], horizon)[:n_known] / prices[:n_known, None] - 1
+    if volatility_window:
+        volatility = close.astype(float).pct_change().rolling(int(volatility_window)).std().to_numpy()[:n_known]
+        upper_barrier = (upper * volatility)[:, None]
+        lower_barrier = (lower * volatility)[:, None]
+    else:
+        upper_barrier = upper
+        lower_barrier = lower
+
+    # 首次触及的位置，未触及记为 horizon
+    hit_upper = paths >= upper_barrier
+    hit_lower = paths <= -lower_barrier
+    first_upper = np.where(hit_upper.any(axis=1), hit_upper.argmax(axis=1), horizon)
+    first_lower = np.where(hit_lower.any(axis=1), hit_lower.argmax(axis=1), horizon)
+
+    if timeout == 'sign':
+        expired = np.sign(paths[:, -1])
+    else:
+        expired = np.zeros(n_known)
+    known = np.where(first_upper < first_lower, 1.0, np.where(first_lower < first_upper, -1.0, expired))
+    # 首尾价格缺失或波动率未确定时标签未知
+    unknown = np.isnan(paths).any(axis=1)
+    if volatility_window:
+        unknown |= np.isnan(volatility)
+    known[unknown] = np.nan
+    labels[:n_known] = known
+    return pd.Series(labels, index=close.index)
+
+
+LABEL_FUNCTIONS: Dict[str, Callable[..., pd.Series]] = {
+    'horizon': horizon_labels,
+    'triple_barrier': triple_barrier_labels,
+}
+
+
+def make_labels(close: pd.Series, method: str = 'horizon', horizon: int = 1, **options: Any) -> pd.Series:
+    """按标签类型(LABEL_FUNCTIONS 中的名称)生成与行情对齐的标签"""
+    if method not in LABEL_FUNCTIONS:
+        raise ValueError(f"不支持的标签类型: {method}")
+    return LABEL_FUNCTIONS[method](close, horizon, **options)
+
+
+def align_labels(labels: pd.Series, index: pd.Index) -> np.ndarray:
+    """按特征的日期取标签(float，未知为NaN)"""
+    return labels.reindex(index).to_numpy(dtype=float)
@@ -1,15 +1,35 @@
 import numpy as np
 import pandas as pd
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout
-from tensorflow.keras.optimizers import Adam
-from sklearn.preprocessing import MinMaxScaler
-from backend.models.strategies.ml.base_ml_strategy import BaseMLStrategy
+import torch
+import torch.nn as nn
+from backend.models.strategies.ml.deep_learning.base_dl_strategy import BaseDLStrategy
+from backend.models.strategies.ml.deep_learning.sequences import SequenceDataset
 import logging
 
 logger = logging.getLogger(__name__)
 
-class LSTMStrategy(BaseMLStrategy):
+class LSTMModel(nn.Module):
+    """两层LSTM + 全连接分类(3分类: 卖出、持有、买入)"""
+    
+    def __init__(self, input_dim: int, units: int = 50, dropout: float = 0.2):
+        super().__init__()
+        self.lstm1 = nn.LSTM(input_dim, int(units), batch_first=True)
+        self.lstm2 = nn.LSTM(int(units), int(units // 2), batch_first=True)
+        self.dropout = nn.Dropout(dropout)
+        self.head = nn.Sequential(
+            nn.Linear(int(units // 2), 32),
+            nn.ReLU(),
+            nn.Linear(32, 3)
+        )
+    
+    def forward(self, x):
+        # x: (batch_size, seq_len, features)
+        out, _ = self.lstm1(x)
+        out, _ = self.lstm2(self.dropout(out))
+        # 只使用最后一个时间步的输出
+        return self.head(self.dropout(out[:, -1, :]))
+
+class LSTMStrategy(BaseDLStrategy):
     def __init__(self,
                  lookback_period: int = 20,
                  units: int = 50,
@@ -21,100 +41,72 @@ class LSTMStrategy(BaseMLStrategy):
         self.dropout = float(dropout)
         self.epochs = int(epochs)
         self.batch_size = int(batch_size)
-        self.price_scaler = MinMaxScaler()
-        self.model = None
-        
-    def _create_sequences(self, X: np.ndarray) -> np.ndarray:
-        """创建LSTM序列数据"""
-        sequences = []
+        # 用于验证的末尾样本比例
+        self.validation_split = 0.2
+    
+    def _sequence_dataset(self, X: np.ndarray, y: np.ndarray = None) -> SequenceDataset:
+        """以第t行结尾的窗口预测第t+1行的标签(窗口不包含被预测的K线)"""
         lookback = int(self.lookback_period)
-        for i in range(len(X) - lookback):
-            sequences.append(X[i:(i + lookback)])
-        return np.array(sequences)
-        
-    def _build_model(self, input_shape: tuple) -> Sequential:
-        """构建LSTM模型"""
-        model = Sequential([
-            LSTM(int(self.units), input_shape=input_shape, return_sequences=True),
-            Dropout(self.dropout),
-            LSTM(int(self.units // 2)),
-            Dropout(self.dropout),
-            Dense(32, activation='relu'),
-            Dense(3, activation='softmax')  # 3分类: 买入、卖出、持有
-        ])
-        
-        model.compile(
-            optimizer=Adam(learning_rate=0.001),
-            loss='sparse_categorical_crossentropy',
-            metrics=['accuracy']
-        )
-        
-        return model
-        
+        return SequenceDataset(X[:-1], None if y is None else y[1:], lookback)
+    
+    def build_model(self, input_dim: int) -> nn.Module:
+        return LSTMModel(input_dim, self.units, self.dropout)
+    
     def _train_model_impl(self, X: np.ndarray, y: np.ndarray):
         """训练LSTM模型"""
         try:
             if len(X) <= int(self.lookback_period):
                 raise ValueError(f"数据长度({len(X)})必须大于回看期({self.lookback_period})")
-                
-            # 创建序列数据
-            X_seq = self._create_sequences(X)
-            y_seq = y[int(self.lookback_period):]  # 对齐标签
             
-            # 转换标签范围到[0,2]
-            y_seq = y_seq + 1
+            dataset = self._sequence_dataset(X, y)
             
-            # 构建模型
-            input_shape = (int(self.lookback_period), X.shape[1])
-            self.model = self._build_model(input_shape)
+            # 末尾的样本作为验证集(不打乱，与时间顺序一致)
+            n_val = int(len(dataset) * self.validation_split)
+            n_train = len(dataset) - n_val
+            train_X, train_y = dataset.windows[:n_train], dataset.labels[:n_train]
+            validation = (dataset.windows[n_train:], dataset.labels[n_train:]) if n_val > 0 else None
             
-            # 训练模型
-            history = self.model.fit(
-                X_seq, y_seq,
-                epochs=int(self.epochs),
-                batch_size=int(self.batch_size),
-                validation_split=0.2,
-                verbose=0
+            # 构建模型
+            self.model = self.build_model(X.shape[1]).to(self.device)
+            self.optimizer = torch.optim.Adam(self.model.parameters(), lr=self.learning_rate)
+            
+            # 训练固定的epoch数，不早停
+            trainer = self.make_trainer(max_epochs=self.epochs, patience=None)
+            trainer.fit(
+                self.model, self.optimizer, self.criterion, train_X, train_y,
+                validation=validation, history=self.training_history
             )
             
             # 记录训练结果
-            final_loss = history.history['loss'][-1]
-            final_acc = history.history['accuracy'][-1]
-            logger.info(f"LSTM模型训练完成: loss={final_loss:.4f}, accuracy={final_acc:.4f}")
-            
+            logger.info(
+                f"LSTM模型训练完成: loss={self.training_history['loss'][-1]:.4f}, "
+                f"accuracy={self.training_history['accuracy'][-1]:.4f}"
+            )
+        
         except Exception as e:
             logger.error(f"LSTM模型训练失败: {str(e)}")
             self.model = None
             raise
-            
+    
     def predict(self, X: pd.DataFrame) -> np.ndarray:
-        """模型预测"""
+        """模型预测，第t行的信号由截至第t-1行的窗口得到，前 lookback_period 行为0"""
         try:
             if self.model is None:
                 raise ValueError("模型未训练")
-                
-            # 创建序列数据
-            X_seq = self._create_sequences(X.values)
-            
-            if len(X_seq) == 0:
-                return np.zeros(len(X))
-            
-            # 预测概率
-            probs = self.model.predict(X_seq, verbose=0)
             
-            # 转换为交易信号
-            predictions = np.argmax(probs, axis=1) - 1  # 转换回 -1, 0, 1
-            
-            # 填充预测结果
+            dataset = self._sequence_dataset(np.asarray(X))
             signals = np.zeros(len(X))
-            signals[int(self.lookback_period):] = predictions
+            if len(dataset) == 0:
+                return signals
             
+            # 转换回 -1, 0, 1
+            signals[int(self.lookback_period):] = self.predict_tensor(dataset.windows)
             return signals
-            
+        
         except Exception as e:
             logger.error(f"模型预测失败: {str(e)}")
             return np.zeros(len(X))
-            
+    
     def generate_signals(self, data: pd.DataFrame) -> np.ndarray:
         """生成交易信号"""
         try:
@@ -122,22 +114,16 @@ class LSTMStrategy(BaseMLStrategy):
             features_df = self.prepare_features(data)
             if features_df.empty:
                 return np.zeros(len(data))
-                
-            # 准备训练数据
-            X = features_df.values
-            y = self.prepare_labels(data)
+            
+            # 准备训练数据(特征和标签按日期对齐)
+            X, y = self.training_data(data, features_df)
             
             if len(y) == 0:
                 return np.zeros(len(data))
             
-            # 确保训练数据长度匹配
-            min_len = min(len(X), len(y))
-            X = X[:min_len]
-            y = y[:min_len]
-            
             # 训练模型
             logger.info(f"开始训练模型，特征维度: {X.shape}, 标签维度: {y.shape}")
-            self._train_model_impl(X, y)
+            self.load_or_train(X, y, features_df.columns, self._train_model_impl)
             
             if self.model is None:
                 raise ValueError("模型训练失败")
@@ -157,7 +143,7 @@ class LSTMStrategy(BaseMLStrategy):
             logger.info(f"信号统计: {signal_stats}")
             
             return signals
-            
+        
         except Exception as e:
             logger.error(f"信号生成失败: {str(e)}")
-            return np.zeros(len(data)) 
\ No newline at end of file
+            return np.zeros(len(data))
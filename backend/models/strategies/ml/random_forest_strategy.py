@@ -3,6 +3,7 @@ import pandas as pd
 from typing import List, Dict
 from sklearn.ensemble import RandomForestClassifier
 from .base_ml_strategy import BaseMLStrategy
+from .features import Feature, FeaturePipeline
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,47 +13,44 @@ class RandomForestStrategy(BaseMLStrategy):
                  lookback_period: int = 20,
                  n_estimators: int = 100,
                  max_depth: int = None,
-                 min_samples_split: int = 2):
+                 min_samples_split: int = 2,
+                 prediction_period: int = 1):
         super().__init__("Random Forest", lookback_period)
         self.n_estimators = n_estimators
         self.max_depth = max_depth
         self.min_samples_split = min_samples_split
+        self.prediction_period = int(prediction_period)
         
-    def prepare_features(self, data: pd.DataFrame) -> pd.DataFrame:
-        """准备特征数据"""
-        df = pd.DataFrame()
-        
-        # 价格特征
-        df['returns'] = data['Close'].pct_change()
-        df['high_low_ratio'] = data['High'] / data['Low']
-        df['close_open_ratio'] = data['Close'] / data['Open']
-        
+    def feature_spec(self) -> List[Feature]:
+        """随机森林使用的特征声明"""
+        features = [
+            # 价格特征
+            Feature('returns', 'returns'),
+            Feature('high_low_ratio', 'high_low_ratio'),
+            Feature('close_open_ratio', 'close_open_ratio'),
+        ]
         # 技术指标
         for window in [5, 10, 20, 30]:
-            # 移动平均
-            df[f'ma_{window}'] = data['Close'].rolling(window).mean()
-            # 波动率
-            df[f'std_{window}'] = df['returns'].rolling(window).std()
-            # 动量
-            df[f'mom_{window}'] = data['Close'].pct_change(window)
-            # 相对强弱
-            df[f'rsi_{window}'] = self._calculate_rsi(data['Close'], window)
-            
+            features += [
+                # 移动平均
+                Feature(f'ma_{window}', 'sma', window=window),
+                # 波动率
+                Feature(f'std_{window}', 'volatility', window=window),
+                # 动量
+                Feature(f'mom_{window}', 'momentum', window=window),
+                # 相对强弱
+                Feature(f'rsi_{window}', 'rsi', period=window),
+            ]
         # 成交量特征
-        df['volume_ma5'] = data['Volume'].rolling(5).mean()
-        df['volume_std5'] = data['Volume'].rolling(5).std()
-        df['volume_ratio'] = data['Volume'] / df['volume_ma5']
+        return features + [
+            Feature('volume_ma5', 'volume_ma', window=5),
+            Feature('volume_std5', 'volume_std', window=5),
+            Feature('volume_ratio', 'volume_ratio', window=5),
+        ]
         
-        return df.dropna()
-        
-    def prepare_labels(self, data: pd.DataFrame) -> np.ndarray:
-        """准备标签数据"""
-        returns = data['Close'].pct_change()
-        y = []
-        for i in range(len(returns) - self.prediction_period):
-            future_return = returns.iloc[i:i + self.prediction_period].mean()
-            y.append(1 if future_return > 0 else -1 if future_return < 0 else 0)
-        return np.array(y[:-self.prediction_period])
+    def prepare_features(self, data: pd.DataFrame) -> pd.DataFrame:
+        """准备特征数据"""
+        return FeaturePipeline(self.feature_spec()).transform(data)
         
     def create_model(self) -> RandomForestClassifier:
         """创建随机森林模型"""
@@ -64,14 +62,6 @@ class RandomForestStrategy(BaseMLStrategy):
             n_jobs=-1
         )
         
-    def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
-        """计算RSI指标"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs)) 
-        
     def _train_model_impl(self, X: np.ndarray, y: np.ndarray):
         """训练随机森林模型"""
         try:
@@ -106,19 +96,18 @@ class RandomForestStrategy(BaseMLStrategy):
                 
             self.feature_names = features_df.columns
             
-            # 准备训练数据
-            X = features_df.values
-            y = self.prepare_labels(data)
+            # 准备训练数据(特征和标签按日期对齐)
+            X, y = self.training_data(data, features_df)
             
             # 训练模型
-            self.train_model(X, y)
+            self.load_or_train(X, y, features_df.columns, self.train_model)
             
             # 生成预测
             predictions = self.predict(features_df)
             
-            # 转换为交易信号
+            # 转换为交易信号(跳过特征计算的预热期)
             signals = np.zeros(len(data))
-            signals[self.lookback_period:] = predictions
+            signals[len(data) - len(features_df):] = predictions
             
             return signals
             
@@ -3,6 +3,7 @@ import pandas as pd
 from typing import List, Dict
 from sklearn.svm import SVC
 from .base_ml_strategy import BaseMLStrategy
+from .features import Feature, FeaturePipeline
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,50 +13,35 @@ class SVMStrategy(BaseMLStrategy):
                  lookback_period: int = 20,
                  kernel: str = 'rbf',
                  C: float = 1.0,
-                 gamma: str = 'scale'):
+                 gamma: str = 'scale',
+                 prediction_period: int = 1):
         super().__init__("SVM", lookback_period)
         self.kernel = kernel
         self.C = C
         self.gamma = gamma
+        self.prediction_period = int(prediction_period)
+        
+    def feature_spec(self) -> List[Feature]:
+        """SVM使用的特征声明"""
+        return [
+            # 基础特征
+            Feature('returns', 'returns'),
+            Feature('volatility', 'volatility', window=20),
+            # 价格动量
+            *[Feature(f'momentum_{period}', 'momentum', window=period) for period in [5, 10, 20]],
+            # 移动平均交叉
+            Feature('ma_cross', 'ma_cross', short_window=10, long_window=30),
+            # RSI指标
+            Feature('rsi', 'rsi'),
+            # 成交量特征
+            Feature('volume_ratio', 'volume_ratio', window=20),
+            # 布林带
+            Feature('bb_position', 'bb_position', window=20),
+        ]
         
     def prepare_features(self, data: pd.DataFrame) -> pd.DataFrame:
         """准备特征数据"""
-        df = pd.DataFrame()
-        
-        # 基础特征
-        df['returns'] = data['Close'].pct_change()
-        df['volatility'] = df['returns'].rolling(20).std()
-        
-        # 价格动量
-        for period in [5, 10, 20]:
-            df[f'momentum_{period}'] = data['Close'].pct_change(period)
-            
-        # 移动平均交叉
-        ma_short = data['Close'].rolling(10).mean()
-        ma_long = data['Close'].rolling(30).mean()
-        df['ma_cross'] = (ma_short - ma_long) / ma_long
-        
-        # RSI指标
-        df['rsi'] = self._calculate_rsi(data['Close'])
-        
-        # 成交量特征
-        df['volume_ratio'] = data['Volume'] / data['Volume'].rolling(20).mean()
-        
-        # 布林带
-        ma20 = data['Close'].rolling(20).mean()
-        std20 = data['Close'].rolling(20).std()
-        df['bb_position'] = (data['Close'] - ma20) / (2 * std20)
-        
-        return df.dropna()
-        
-    def prepare_labels(self, data: pd.DataFrame) -> np.ndarray:
-        """准备标签数据"""
-        returns = data['Close'].pct_change()
-        y = []
-        for i in range(len(returns) - self.prediction_period):
-            future_return = returns.iloc[i:i + self.prediction_period].mean()
-            y.append(1 if future_return > 0 else -1 if future_return < 0 else 0)
-        return np.array(y[:-self.prediction_period])
+        return FeaturePipeline(self.feature_spec()).transform(data)
         
     def create_model(self) -> SVC:
         """创建SVM模型"""
@@ -67,14 +53,6 @@ class SVMStrategy(BaseMLStrategy):
             random_state=42
         )
         
-    def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
-        """计算RSI指标"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs)) 
-        
     def _train_model_impl(self, X: np.ndarray, y: np.ndarray):
         """训练SVM模型"""
         try:
@@ -98,19 +76,18 @@ class SVMStrategy(BaseMLStrategy):
             if features_df.empty:
                 return np.zeros(len(data))
                 
-            # 准备训练数据
-            X = features_df.values
-            y = self.prepare_labels(data)
+            # 准备训练数据(特征和标签按日期对齐)
+            X, y = self.training_data(data, features_df)
             
             # 训练模型
-            self.train_model(X, y)
+            self.load_or_train(X, y, features_df.columns, self.train_model)
             
             # 生成预测
             predictions = self.predict(features_df)
             
-            # 转换为交易信号
+            # 转换为交易信号(跳过特征计算的预热期)
             signals = np.zeros(len(data))
-            signals[self.lookback_period:] = predictions
+            signals[len(data) - len(features_df):] = predictions
             
             return signals
             
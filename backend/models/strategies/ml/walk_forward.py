@@ -0,0 +1,214 @@
+from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from backend.models.strategies.ml.base_ml_strategy import BaseMLStrategy
+from backend.services.memory_cache import MemoryCache
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 进程内共享的已拟合模型缓存: (策略, 参数, 训练窗口哈希) -> 模型状态
+model_cache = MemoryCache(max_bytes=1024 * 1024 * 1024, default_ttl=None)
+
+
+def _window_hash(X: np.ndarray, y: np.ndarray, columns: List[str]) -> str:
+    """训练窗口内容(特征、标签、特征名)的哈希"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps(list(columns)).encode())
+    for arr in (X, y):
+        arr = np.ascontiguousarray(arr)
+        h.update(f"{arr.dtype.str}{arr.shape}".encode())
+        h.update(arr.tobytes())
+    return h.hexdigest()
+
+
+def _fit_fold(
+    strategy: BaseMLStrategy,
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    X_test: np.ndarray
+) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """拟合一个窗口并预测其测试区间(进程池任务入口)"""
+    strategy.fit(X_train, y_train)
+    return np.asarray(strategy.predict(X_test), dtype=float), strategy.get_fitted_state()
+
+
+class WalkForwardFold:
+    """一次走步: 在 [train_start, train_end) 上拟合，预测 [test_start, test_end)(特征行号)"""
+
+    def __init__(self, train_start: int, train_end: int, test_start: int, test_end: int):
+        self.train_start = train_start
+        self.train_end = train_end
+        self.test_start = test_start
+        self.test_end = test_end
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            'train_start': self.train_start,
+            'train_end': self.train_end,
+            'test_start': self.test_start,
+            'test_end': self.test_end
+        }
+
+
+class WalkForwardEngine:
+    """机器学习策略的走步训练
+
+    - 每隔 refit_every 根K线重新拟合一次，每个模型最多用于之后 test_window 根K线的预测
+    - 训练窗口为之前的 train_window 根K线(expanding=True 时使用全部历史)，
+      并剔除标签在预测时刻尚未实现的样本，避免使用未来数据
+    - 已拟合的模型按 (策略, 参数, 训练窗口哈希) 缓存，窗口重叠的回测直接复用
+    - n_jobs > 1 时未命中缓存的窗口在进程池中并行拟合
+    """
+
+    def __init__(
+        self,
+        train_window: int = 252,
+        test_window: int = 21,
+        refit_every: Optional[int] = None,
+        expanding: bool = False,
+        min_train_size: Optional[int] = None,
+        n_jobs: int = 1,
+        cache: Optional[MemoryCache] = None
+    ):
+        if train_window <= 0 or test_window <= 0:
+            raise ValueError("train_window和test_window必须大于0")
+        self.train_window = int(train_window)
+        self.test_window = int(test_window)
+        self.refit_every = int(refit_every or test_window)
+        if self.refit_every <= 0:
+            raise ValueError("refit_every必须大于0")
+        self.expanding = expanding
+        self.min_train_size = int(min_train_size or min(self.train_window, 50))
+        self.n_jobs = n_jobs
+        self.cache = cache if cache is not None else model_cache
+        self.folds: List[WalkForwardFold] = []
+        self.cache_hits = 0
+        self.fits = 0
+
+    def make_labels(self, strategy: BaseMLStrategy, data: pd.DataFrame) -> pd.Series:
+        """策略的前瞻标签(1/-1/0)，标签未知的位置为NaN"""
+        return strategy.label_series(data)
+
+    def split(self, n_rows: int, horizon: int = 1) -> List[WalkForwardFold]:
+        """按特征行号划分走步窗口"""
+        folds = []
+        start = self.train_window if not self.expanding else self.min_train_size
+        start = max(start, self.min_train_size)
+        for test_start in range(start, n_rows, self.refit_every):
+            # 第r行的标签在第 r+horizon 根K线才确定，预测第 test_start 行时只能使用 r <= test_start-horizon 的样本
+            train_end = test_start - horizon + 1
+            train_start = 0 if self.expanding else max(0, train_end - self.train_window)
+            # 测试区间到下一次重新拟合为止，且不超过 test_window
+            test_end = min(test_start + self.test_window, test_start + self.refit_every, n_rows)
+            if train_end - train_start < self.min_train_size:
+                continue
+            folds.append(WalkForwardFold(train_start, train_end, test_start, test_end))
+        return folds
+
+    def _cache_key(self, strategy: BaseMLStrategy, window_hash: str) -> str:
+        params = json.dumps(strategy.get_params(), sort_keys=True, default=str)
+        params_hash = hashlib.blake2b(params.encode(), digest_size=8).hexdigest()
+        return f"model:{type(strategy).__name__}:{params_hash}:{window_hash}"
+
+    def generate_signals(self, strategy: BaseMLStrategy, data: pd.DataFrame) -> np.ndarray:
+        """生成样本外信号，没有可用模型的K线信号为0"""
+        signals = np.zeros(len(data))
+        features = strategy.prepare_features(data)
+        if features.empty:
+            logger.warning("特征为空，无法进行走步训练")
+            return signals
+        strategy.feature_names = features.columns
+
+        labels = self.make_labels(strategy, data).reindex(features.index).values
+        X = features.values
+        horizon = getattr(strategy, 'prediction_period', 1)
+        self.folds = self.split(len(features), horizon)
+        self.cache_hits = 0
+        self.fits = 0
+
+        # 先查缓存，未命中的窗口再拟合
+        tasks = []
+        keys: Dict[int, str] = {}
+        fold_predictions: Dict[int, np.ndarray] = {}
+        for i, fold in enumerate(self.folds):
+            train_rows = slice(fold.train_start, fold.train_end)
+            valid = ~np.isnan(labels[train_rows])
+            X_train = X[train_rows][valid]
+            y_train = labels[train_rows][valid].astype(np.int64)
+            keys[i] = self._cache_key(strategy, _window_hash(X_train, y_train, features.columns))
+            X_test = X[fold.test_start:fold.test_end]
+
+            state = self.cache.get(keys[i])
+            if state is not None:
+                self.cache_hits += 1
+                strategy.set_fitted_state(state)
+                fold_predictions[i] = np.asarray(strategy.predict(X_test), dtype=float)
+            else:
+                tasks.append((i, X_train, y_train, X_test))
+
+        for i, predictions, state in self._run_fits(strategy, tasks):
+            self.fits += 1
+            self.cache.set(keys[i], state)
+            fold_predictions[i] = predictions
+
+        # 预测写回原始数据的对应位置
+        positions = data.index.get_indexer(features.index)
+        for i, fold in enumerate(self.folds):
+            predictions = fold_predictions.get(i)
+            if predictions is None or len(predictions) != fold.test_end - fold.test_start:
+                continue
+            signals[positions[fold.test_start:fold.test_end]] = predictions
+
+        # 最后一个窗口的模型留在策略上，供之后的K线继续预测
+        if self.folds:
+            state = self.cache.get(keys[len(self.folds) - 1])
+            if state is not None:
+                strategy.set_fitted_state(state)
+        logger.info(f"走步训练完成: {len(self.folds)}个窗口, 拟合{self.fits}次, 缓存命中{self.cache_hits}次")
+        return signals
+
+    def _run_fits(
+        self,
+        strategy: BaseMLStrategy,
+        tasks: List[Tuple[int, np.ndarray, np.ndarray, np.ndarray]]
+    ) -> List[Tuple[int, np.ndarray, Dict[str, Any]]]:
+        """拟合未命中缓存的窗口，失败的窗口跳过"""
+        results = []
+        workers = max(1, min(self.n_jobs or os.cpu_count() or 1, len(tasks)))
+        if workers == 1:
+            for i, X_train, y_train, X_test in tasks:
+                try:
+                    predictions, state = _fit_fold(strategy, X_train, y_train, X_test)
+                    results.append((i, predictions, state))
+                except Exception as e:
+                    logger.error(f"走步窗口{i}训练失败: {str(e)}")
+            return results
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                (i, executor.submit(_fit_fold, strategy, X_train, y_train, X_test))
+                for i, X_train, y_train, X_test in tasks
+            ]
+            for i, future in futures:
+                try:
+                    predictions, state = future.result()
+                    results.append((i, predictions, state))
+                except Exception as e:
+                    logger.error(f"走步窗口{i}训练失败: {str(e)}")
+        return results
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'folds': len(self.folds),
+            'fits': self.fits,
+            'cache_hits': self.cache_hits,
+            'train_window': self.train_window,
+            'test_window': self.test_window,
+            'refit_every': self.refit_every,
+            'expanding': self.expanding
+        }
@@ -1,67 +1,130 @@
 import xgboost as xgb
 import numpy as np
 import pandas as pd
+import hashlib
+import threading
+from collections import OrderedDict
 from backend.models.strategies.ml.base_ml_strategy import BaseMLStrategy
 import logging
-from typing import Tuple
-from sklearn.preprocessing import StandardScaler
+from typing import Any, List, Optional, Tuple
+from backend.models.strategies.ml.features import Feature, FeaturePipeline
 
 logger = logging.getLogger(__name__)
 
+
+def _matrix_fingerprint(*arrays: np.ndarray) -> str:
+    """数组内容(dtype、形状、数值)的哈希"""
+    h = hashlib.blake2b(digest_size=16)
+    for arr in arrays:
+        arr = np.ascontiguousarray(arr)
+        h.update(f"{arr.dtype.str}{arr.shape}".encode())
+        h.update(arr.tobytes())
+    return h.hexdigest()
+
+
+class _LRU:
+    """按条目数限制的小型LRU(DMatrix、Booster 无法按字节估算大小)"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def items(self) -> List[Tuple[Any, Any]]:
+        with self._lock:
+            return list(self._entries.items())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
 class XGBoostStrategy(BaseMLStrategy):
+    # 训练矩阵(量化后的DMatrix)缓存: (特征+标签指纹, max_bin) -> QuantileDMatrix
+    _dmatrix_cache = _LRU(8)
+    # 完整训练的模型: 参数指纹 -> [(训练样本数, 训练数据指纹, Booster)]，用于只追加了新K线时的增量训练
+    _base_boosters = _LRU(16)
+    # 已做过质量检查的特征矩阵指纹
+    _checked_features = _LRU(64)
+    
     def __init__(self,
                  lookback_period: int = 20,
                  n_estimators: int = 100,
                  max_depth: int = 3,
-                 learning_rate: float = 0.1):
+                 learning_rate: float = 0.1,
+                 n_jobs: int = 0,
+                 max_bin: int = 256,
+                 warm_start_rounds: int = 0,
+                 warm_start_block: int = 20):
+        """
+        :param n_jobs: 训练线程数，0表示使用全部CPU
+        :param max_bin: 直方图算法的特征分箱数
+        :param warm_start_rounds: 只追加了新K线时，在之前完整训练的模型上继续训练的轮数；0(默认)表示总是完整训练
+        :param warm_start_block: 增量训练最多追加的K线数，超过时重新完整训练
+        """
         super().__init__("XGBoost", lookback_period)
         self.n_estimators = int(n_estimators)
         self.max_depth = int(max_depth)
         self.learning_rate = learning_rate
+        self.n_jobs = int(n_jobs)
+        self.max_bin = int(max_bin)
+        self.warm_start_rounds = int(warm_start_rounds)
+        self.warm_start_block = int(warm_start_block)
         self.feature_names = None
         self.model = None
         self.scaler = None
         
-    def prepare_features(self, data: pd.DataFrame) -> pd.DataFrame:
-        """准备特征数据"""
-        try:
-            df = pd.DataFrame(index=data.index)
-            
+    def feature_spec(self) -> List[Feature]:
+        """XGBoost使用的特征声明"""
+        features = [
             # 1. 价格动量特征
-            df['returns'] = data['Close'].pct_change()
-            df['log_returns'] = np.log1p(df['returns'])
-            
-            # 2. 价格趋势特征 - 使用多个时间窗口
-            for window in [5, 10, 20]:
+            Feature('returns', 'returns'),
+            Feature('log_returns', 'log_returns'),
+        ]
+        # 2. 价格趋势特征 - 使用多个时间窗口
+        for window in [5, 10, 20]:
+            features += [
                 # 移动平均
-                df[f'ma_{window}'] = data['Close'].rolling(window=window, min_periods=1).mean()
+                Feature(f'ma_{window}', 'sma', window=window, min_periods=1),
                 # 相对于移动平均的位置
-                df[f'ma_ratio_{window}'] = data['Close'] / df[f'ma_{window}']
+                Feature(f'ma_ratio_{window}', 'ma_ratio', window=window, min_periods=1),
                 # 移动标准差
-                df[f'std_{window}'] = data['Close'].rolling(window=window, min_periods=1).std()
+                Feature(f'std_{window}', 'close_std', window=window, min_periods=1),
                 # 价格动量
-                df[f'mom_{window}'] = data['Close'].pct_change(periods=window)
-                
+                Feature(f'mom_{window}', 'momentum', window=window),
+            ]
+        return features + [
             # 3. 波动率特征
-            df['volatility'] = df['returns'].rolling(window=20, min_periods=1).std()
-            df['high_low_ratio'] = data['High'] / data['Low']
-            df['true_range'] = pd.DataFrame({
-                'hl': data['High'] - data['Low'],
-                'hc': abs(data['High'] - data['Close'].shift()),
-                'lc': abs(data['Low'] - data['Close'].shift())
-            }).max(axis=1)
-            
+            Feature('volatility', 'volatility', window=20, min_periods=1),
+            Feature('high_low_ratio', 'high_low_ratio'),
+            Feature('true_range', 'true_range'),
             # 4. 成交量特征
-            df['volume_ma'] = data['Volume'].rolling(window=20, min_periods=1).mean()
-            df['volume_std'] = data['Volume'].rolling(window=20, min_periods=1).std()
-            df['volume_ratio'] = data['Volume'] / df['volume_ma']
-            df['volume_trend'] = data['Volume'].pct_change()
-            
+            Feature('volume_ma', 'volume_ma', window=20, min_periods=1),
+            Feature('volume_std', 'volume_std', window=20, min_periods=1),
+            Feature('volume_ratio', 'volume_ratio', window=20, min_periods=1),
+            Feature('volume_trend', 'volume_change'),
             # 5. 技术指标
-            df['rsi'] = self._calculate_rsi(data['Close'])
-            
-            # 删除包含NaN的行
-            df = df.dropna()
+            Feature('rsi', 'rsi'),
+        ]
+        
+    def prepare_features(self, data: pd.DataFrame) -> pd.DataFrame:
+        """准备特征数据"""
+        try:
+            df = FeaturePipeline(self.feature_spec()).transform(data)
             
             # 数据质量检查
             self._check_data_quality(df)
@@ -73,66 +136,117 @@ class XGBoostStrategy(BaseMLStrategy):
             return pd.DataFrame()
             
     def _check_data_quality(self, df: pd.DataFrame) -> None:
-        """检查数据质量"""
+        """检查数据质量(同一特征矩阵只检查一次)"""
+        values = df.to_numpy(dtype=np.float64)
+        key = _matrix_fingerprint(values)
+        if self._checked_features.get(key) is not None:
+            return
+        self._checked_features.set(key, True)
+        columns = np.asarray(df.columns)
+        
         # 检查缺失值
-        missing = df.isnull().sum()
+        missing = np.isnan(values).sum(axis=0)
         if missing.any():
-            logger.warning(f"发现缺失值:\n{missing[missing > 0]}")
+            logger.warning(f"发现缺失值:\n{pd.Series(missing, index=columns)[missing > 0]}")
             
         # 检查无穷值
-        inf_count = np.isinf(df).sum()
+        inf_count = np.isinf(values).sum(axis=0)
         if inf_count.any():
-            logger.warning(f"发现无穷值:\n{inf_count[inf_count > 0]}")
-            
-        # 检查异常值
-        for col in df.columns:
-            z_scores = np.abs((df[col] - df[col].mean()) / df[col].std())
-            outliers = (z_scores > 3).sum()
-            if outliers > 0:
-                logger.warning(f"列 {col} 发现 {outliers} 个异常值")
+            logger.warning(f"发现无穷值:\n{pd.Series(inf_count, index=columns)[inf_count > 0]}")
+            
+        # 检查异常值(|z| > 3)，整个矩阵一次计算
+        with np.errstate(invalid='ignore', divide='ignore'):
+            z_scores = np.abs((values - np.nanmean(values, axis=0)) / np.nanstd(values, axis=0, ddof=1))
+        outliers = (z_scores > 3).sum(axis=0)
+        for col, count in zip(columns, outliers):
+            if count > 0:
+                logger.warning(f"列 {col} 发现 {count} 个异常值")
+                
+    def _booster_params(self) -> dict:
+        params = {
+            'objective': 'multi:softprob',
+            'num_class': 3,
+            'tree_method': 'hist',
+            'max_bin': self.max_bin,
+            'max_depth': self.max_depth,
+            'eta': self.learning_rate,
+            'seed': 42,
+            'verbosity': 0
+        }
+        if self.n_jobs > 0:
+            params['nthread'] = self.n_jobs
+        return params
+        
+    def _train_matrix(self, X: np.ndarray, y: np.ndarray, key: str) -> xgb.QuantileDMatrix:
+        """量化后的训练矩阵，相同的特征和标签只构建一次"""
+        cache_key = (key, self.max_bin)
+        dtrain = self._dmatrix_cache.get(cache_key)
+        if dtrain is None:
+            dtrain = xgb.QuantileDMatrix(
+                X, label=y, max_bin=self.max_bin, nthread=self.n_jobs if self.n_jobs > 0 else -1
+            )
+            self._dmatrix_cache.set(cache_key, dtrain)
+        return dtrain
+        
+    def _find_warm_start(self, params_key: str, X: np.ndarray, y: np.ndarray) -> Optional[Tuple[int, xgb.Booster]]:
+        """查找在当前训练数据的前缀上完整训练的模型(之后只追加了不超过 warm_start_block 根K线)"""
+        best = None
+        for n_rows, fingerprint, booster in self._base_boosters.get(params_key) or []:
+            if n_rows >= len(X) or len(X) - n_rows > self.warm_start_block:
+                continue
+            if best is not None and n_rows <= best[0]:
+                continue
+            if _matrix_fingerprint(X[:n_rows], y[:n_rows]) == fingerprint:
+                best = (n_rows, booster)
+        return best
+        
+    def _remember_booster(self, params_key: str, n_rows: int, fingerprint: str, booster: xgb.Booster):
+        entries = [e for e in (self._base_boosters.get(params_key) or []) if e[0] != n_rows]
+        self._base_boosters.set(params_key, (entries + [(n_rows, fingerprint, booster)])[-4:])
                 
     def _train_model_impl(self, X: np.ndarray, y: np.ndarray):
-        """训练XGBoost模型"""
+        """训练XGBoost模型(hist算法，量化训练矩阵缓存，不在训练集上做评估)"""
         try:
             if len(X) == 0 or len(y) == 0:
                 raise ValueError("训练数据为空")
                 
+            X = np.asarray(X, dtype=np.float32)
+            y = np.asarray(y).astype(np.int64)
+            
             # 数据分布分析
-            class_distribution = np.bincount(y + 1)
+            class_distribution = np.bincount(y + 1, minlength=3)
             logger.info(f"标签分布: 卖出={class_distribution[0]}, "
                        f"持有={class_distribution[1]}, "
                        f"买入={class_distribution[2]}")
             
-            # 构建和训练模型
-            self.model = xgb.XGBClassifier(
-                n_estimators=self.n_estimators,
-                max_depth=self.max_depth,
-                learning_rate=self.learning_rate,
-                random_state=42,
-                objective='multi:softmax',
-                num_class=3,
-                eval_metric=['mlogloss', 'merror'],
-                use_label_encoder=False,
-                verbosity=0
-            )
-            
-            # 转换标签范围到[0,2]
+            # 转换标签范围到[0,2]；num_class固定为3，窗口内缺少某一类时也可以训练
             y_transformed = y + 1
-            
-            # 训练模型
-            self.model.fit(
-                X, 
-                y_transformed,
-                eval_set=[(X, y_transformed)],
-                verbose=False
-            )
+            fingerprint = _matrix_fingerprint(X, y_transformed)
+            params = self._booster_params()
+            params_key = hashlib.blake2b(repr(sorted(params.items())).encode(), digest_size=16).hexdigest()
+            dtrain = self._train_matrix(X, y_transformed, fingerprint)
+            
+            warm = self._find_warm_start(params_key, X, y_transformed) if self.warm_start_rounds > 0 else None
+            if warm is not None:
+                # 只追加了新K线: 在之前完整训练的模型上继续训练少量轮数。增量训练的模型不再作为
+                # 后续增量训练的起点，总轮数不超过 n_estimators + warm_start_rounds
+                n_rows, previous = warm
+                logger.info(f"在{n_rows}个样本的模型上增量训练{self.warm_start_rounds}轮")
+                self.model = xgb.train(
+                    params, dtrain, num_boost_round=self.warm_start_rounds, xgb_model=previous
+                )
+            else:
+                self.model = xgb.train(params, dtrain, num_boost_round=self.n_estimators)
+                if self.warm_start_rounds > 0:
+                    self._remember_booster(params_key, len(X), fingerprint, self.model)
             
             # 特征重要性分析
             if self.feature_names is not None:
+                # 训练矩阵不带列名(不同来源的矩阵可共用缓存和增量训练)，特征按 f0, f1, ... 编号
+                names = {f'f{i}': name for i, name in enumerate(self.feature_names)}
                 importance = pd.Series(
-                    self.model.feature_importances_,
-                    index=self.feature_names
-                ).sort_values(ascending=False)
+                    self.model.get_score(importance_type='gain')
+                ).rename(index=names).sort_values(ascending=False)
                 
                 logger.info("XGBoost模型训练完成")
                 logger.info(f"特征重要性排序:\n{importance.head()}")
@@ -142,6 +256,10 @@ class XGBoostStrategy(BaseMLStrategy):
             self.model = None
             raise ValueError("模型训练失败")
             
+    def fit(self, X: np.ndarray, y: np.ndarray):
+        """在一个训练窗口上拟合模型(树模型不需要标准化)"""
+        self._train_model_impl(X, y)
+            
     def predict(self, X: pd.DataFrame) -> np.ndarray:
         """模型预测"""
         try:
@@ -149,7 +267,7 @@ class XGBoostStrategy(BaseMLStrategy):
                 raise ValueError("模型未训练")
                 
             # 预测概率
-            probs = self.model.predict_proba(X)
+            probs = self.model.inplace_predict(np.asarray(X, dtype=np.float32))
             
             # 使用概率阈值生成信号
             threshold = 0.6  # 设置较高的阈值以减少误判
@@ -158,7 +276,7 @@ class XGBoostStrategy(BaseMLStrategy):
             predictions[probs[:, 0] > threshold] = -1  # 卖出信号
             
             # 记录预测统计
-            signal_counts = np.bincount(predictions.astype(int) + 1)
+            signal_counts = np.bincount(predictions.astype(int) + 1, minlength=3)
             logger.info(f"预测信号分布: 卖出={signal_counts[0]}, "
                        f"持有={signal_counts[1]}, "
                        f"买入={signal_counts[2]}")
@@ -179,21 +297,15 @@ class XGBoostStrategy(BaseMLStrategy):
                 
             self.feature_names = features_df.columns
             
-            # 准备训练数据
-            X = features_df.values
-            y = self.prepare_labels(data)
+            # 准备训练数据(特征和标签按日期对齐)
+            X, y = self.training_data(data, features_df)
             
             if len(y) == 0:
                 return np.zeros(len(data))
             
-            # 确保训练数据长度匹配
-            min_len = min(len(X), len(y))
-            X = X[:min_len]
-            y = y[:min_len]
-            
             # 训练模型
             logger.info(f"开始训练模型，特征维度: {X.shape}, 标签维度: {y.shape}")
-            self._train_model_impl(X, y)
+            self.load_or_train(X, y, features_df.columns, self._train_model_impl)
             
             if self.model is None:
                 raise ValueError("模型训练失败")
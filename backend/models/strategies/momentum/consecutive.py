@@ -1,6 +1,7 @@
 from ..base import BaseStrategy
 import pandas as pd
 import numpy as np
+from typing import Dict
 
 class ConsecutiveStrategy(BaseStrategy):
     def __init__(self, n_days: int = 3):
@@ -25,4 +26,28 @@ class ConsecutiveStrategy(BaseStrategy):
         signals[down_streak >= self.n_days] = 1  # 连续下跌后买入
         signals[up_streak >= self.n_days] = -1   # 连续上涨后卖出
         
-        return signals 
\ No newline at end of file
+        return signals
+        
+    def generate_panel_signals(self, panel: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """面板模式: 一次计算 (时间 × 股票) 收盘价矩阵上所有股票的连续涨跌信号"""
+        close = panel['Close']
+        price_changes = np.diff(close.values.astype(np.float64), axis=0, prepend=np.nan)
+        
+        # 最近n_days天(含当天)上涨/下跌的天数，用累计和之差求窗口内计数
+        up_streak = self._window_count(price_changes > 0, self.n_days)
+        down_streak = self._window_count(price_changes < 0, self.n_days)
+        
+        signals = np.zeros(close.shape, dtype=np.int64)
+        signals[down_streak >= self.n_days] = 1
+        signals[up_streak >= self.n_days] = -1
+        return pd.DataFrame(signals, index=close.index, columns=close.columns)
+    
+    @staticmethod
+    def _window_count(mask: np.ndarray, window: int) -> np.ndarray:
+        """沿第0维统计以每个位置结尾的 window 个元素中为True的个数(不足时只统计已有部分)"""
+        counts = np.cumsum(mask, axis=0)
+        if window <= 0:
+            return np.zeros_like(counts)
+        result = counts.copy()
+        result[window:] -= counts[:-window]
+        return result
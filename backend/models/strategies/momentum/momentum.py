@@ -1,6 +1,7 @@
 from ..base import BaseStrategy
 import pandas as pd
 import numpy as np
+from typing import Dict
 
 class MomentumStrategy(BaseStrategy):
     def __init__(self, lookback_period: int = 12):
@@ -17,4 +18,16 @@ class MomentumStrategy(BaseStrategy):
         signals[momentum > 0] = 1  # 动量为正时买入
         signals[momentum < 0] = -1  # 动量为负时卖出
         
-        return signals 
\ No newline at end of file
+        return signals
+        
+    def generate_panel_signals(self, panel: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """面板模式: 一次计算 (时间 × 股票) 收盘价矩阵上所有股票的动量信号"""
+        close = panel['Close'].values.astype(np.float64)
+        momentum = np.full(close.shape, np.nan)
+        if self.lookback_period < len(close):
+            momentum[self.lookback_period:] = close[self.lookback_period:] / close[:-self.lookback_period] - 1
+        
+        signals = np.zeros(close.shape, dtype=np.int64)
+        signals[momentum > 0] = 1
+        signals[momentum < 0] = -1
+        return pd.DataFrame(signals, index=panel['Close'].index, columns=panel['Close'].columns)
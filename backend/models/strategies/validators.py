@@ -1,154 +1,238 @@
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 
-def validate_strategy_params(strategy_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
-    """验证策略参数"""
-    
-    # 定义每个策略的参数配置
-    STRATEGY_PARAMS = {
-        'moving_average': {
-            'required': ['short_window', 'long_window'],
-            'optional': [],
-            'defaults': {
-                'short_window': 5,
-                'long_window': 20
-            },
-            'validators': {
-                'short_window': lambda x: 2 <= x <= 50,
-                'long_window': lambda x: 5 <= x <= 200
-            }
+# 每个策略的参数配置: 必需/可选参数、默认值及取值范围(闭区间)
+STRATEGY_PARAMS = {
+    'moving_average': {
+        'required': ['short_window', 'long_window'],
+        'optional': [],
+        'defaults': {
+            'short_window': 5,
+            'long_window': 20
         },
-        'bollinger_bands': {
-            'required': ['window', 'num_std'],
-            'optional': [],
-            'defaults': {
-                'window': 20,
-                'num_std': 2.0
-            },
-            'validators': {
-                'window': lambda x: 5 <= x <= 100,
-                'num_std': lambda x: 0.1 <= x <= 5.0
-            }
+        'ranges': {
+            'short_window': (2, 50),
+            'long_window': (5, 200)
+        }
+    },
+    'bollinger_bands': {
+        'required': ['window', 'num_std'],
+        'optional': [],
+        'defaults': {
+            'window': 20,
+            'num_std': 2.0
         },
-        'macd': {
-            'required': ['fast_period', 'slow_period', 'signal_period'],
-            'optional': [],
-            'defaults': {
-                'fast_period': 12,
-                'slow_period': 26,
-                'signal_period': 9
-            },
-            'validators': {
-                'fast_period': lambda x: 3 <= x <= 50,
-                'slow_period': lambda x: 5 <= x <= 100,
-                'signal_period': lambda x: 3 <= x <= 50
-            }
+        'ranges': {
+            'window': (5, 100),
+            'num_std': (0.1, 5.0)
+        }
+    },
+    'macd': {
+        'required': ['fast_period', 'slow_period', 'signal_period'],
+        'optional': [],
+        'defaults': {
+            'fast_period': 12,
+            'slow_period': 26,
+            'signal_period': 9
         },
-        'svm': {
-            'required': ['lookback_period', 'C', 'gamma'],
-            'optional': [],
-            'defaults': {
-                'lookback_period': 20,
-                'C': 1.0,
-                'gamma': 0.1
-            },
-            'validators': {
-                'lookback_period': lambda x: 5 <= x <= 100,
-                'C': lambda x: 0.1 <= x <= 10.0,
-                'gamma': lambda x: 0.001 <= x <= 1.0
-            }
+        'ranges': {
+            'fast_period': (3, 50),
+            'slow_period': (5, 100),
+            'signal_period': (3, 50)
+        }
+    },
+    'channel_breakout': {
+        'required': ['window'],
+        'optional': [],
+        'defaults': {
+            'window': 20
         },
-        'random_forest': {
-            'required': ['lookback_period', 'n_estimators', 'max_depth'],
-            'optional': [],
-            'defaults': {
-                'lookback_period': 20,
-                'n_estimators': 100,
-                'max_depth': 10
-            },
-            'validators': {
-                'lookback_period': lambda x: 5 <= x <= 100,
-                'n_estimators': lambda x: 10 <= x <= 500,
-                'max_depth': lambda x: 3 <= x <= 20
-            }
+        'ranges': {
+            'window': (5, 200)
+        }
+    },
+    'momentum': {
+        'required': ['lookback_period'],
+        'optional': [],
+        'defaults': {
+            'lookback_period': 12
         },
-        'xgboost': {
-            'required': ['lookback_period', 'n_estimators', 'learning_rate', 'max_depth'],
-            'optional': [],
-            'defaults': {
-                'lookback_period': 20,
-                'n_estimators': 100,
-                'learning_rate': 0.1,
-                'max_depth': 6
-            },
-            'validators': {
-                'lookback_period': lambda x: 5 <= x <= 100,
-                'n_estimators': lambda x: 10 <= x <= 500,
-                'learning_rate': lambda x: 0.001 <= x <= 1.0,
-                'max_depth': lambda x: 3 <= x <= 10
-            }
+        'ranges': {
+            'lookback_period': (1, 252)
+        }
+    },
+    'consecutive': {
+        'required': ['n_days'],
+        'optional': [],
+        'defaults': {
+            'n_days': 3
         },
-        'lstm': {
-            'required': ['lookback_period', 'units', 'dropout', 'epochs', 'batch_size'],
-            'optional': [],
-            'defaults': {
-                'lookback_period': 20,
-                'units': 50,
-                'dropout': 0.2,
-                'epochs': 100,
-                'batch_size': 32
-            },
-            'validators': {
-                'lookback_period': lambda x: 5 <= x <= 100,
-                'units': lambda x: 10 <= x <= 200,
-                'dropout': lambda x: 0.1 <= x <= 0.5,
-                'epochs': lambda x: 10 <= x <= 500,
-                'batch_size': lambda x: 8 <= x <= 128
-            }
+        'ranges': {
+            'n_days': (1, 20)
+        }
+    },
+    'svm': {
+        'required': ['lookback_period', 'C', 'gamma'],
+        'optional': ['prediction_period'],
+        'defaults': {
+            'lookback_period': 20,
+            'C': 1.0,
+            'gamma': 0.1,
+            'prediction_period': 1
         },
-        'mlp': {
-            'required': ['lookback_period', 'hidden_dims', 'learning_rate'],
-            'optional': [],
-            'defaults': {
-                'lookback_period': 20,
-                'hidden_dims': 64,
-                'learning_rate': 0.001
-            },
-            'validators': {
-                'lookback_period': lambda x: 5 <= x <= 100,
-                'hidden_dims': lambda x: 32 <= x <= 256,
-                'learning_rate': lambda x: 0.0001 <= x <= 0.01
-            }
+        'ranges': {
+            'lookback_period': (5, 100),
+            'C': (0.1, 10.0),
+            'gamma': (0.001, 1.0),
+            'prediction_period': (1, 20)
+        }
+    },
+    'random_forest': {
+        'required': ['lookback_period', 'n_estimators', 'max_depth'],
+        'optional': ['prediction_period'],
+        'defaults': {
+            'lookback_period': 20,
+            'n_estimators': 100,
+            'max_depth': 10,
+            'prediction_period': 1
         },
-        'lstm_mlp': {
-            'required': ['lookback_period', 'hidden_dim', 'num_layers', 'learning_rate'],
-            'optional': [],
-            'defaults': {
-                'lookback_period': 20,
-                'hidden_dim': 64,
-                'num_layers': 2,
-                'learning_rate': 0.001
-            },
-            'validators': {
-                'lookback_period': lambda x: 5 <= x <= 100,
-                'hidden_dim': lambda x: 32 <= x <= 256,
-                'num_layers': lambda x: 1 <= x <= 4,
-                'learning_rate': lambda x: 0.0001 <= x <= 0.01
-            }
+        'ranges': {
+            'lookback_period': (5, 100),
+            'n_estimators': (10, 500),
+            'max_depth': (3, 20),
+            'prediction_period': (1, 20)
+        }
+    },
+    'xgboost': {
+        'required': ['lookback_period', 'n_estimators', 'learning_rate', 'max_depth'],
+        'optional': ['n_jobs', 'max_bin', 'warm_start_rounds', 'warm_start_block'],
+        'defaults': {
+            'lookback_period': 20,
+            'n_estimators': 100,
+            'learning_rate': 0.1,
+            'max_depth': 6,
+            'n_jobs': 0,
+            'max_bin': 256,
+            'warm_start_rounds': 0,
+            'warm_start_block': 20
+        },
+        'ranges': {
+            'lookback_period': (5, 100),
+            'n_estimators': (10, 500),
+            'learning_rate': (0.001, 1.0),
+            'max_depth': (3, 10),
+            'n_jobs': (0, 64),
+            'max_bin': (16, 1024),
+            'warm_start_rounds': (0, 500),
+            'warm_start_block': (1, 1000)
+        }
+    },
+    'lstm': {
+        'required': ['lookback_period', 'units', 'dropout', 'epochs', 'batch_size'],
+        'optional': [],
+        'defaults': {
+            'lookback_period': 20,
+            'units': 50,
+            'dropout': 0.2,
+            'epochs': 100,
+            'batch_size': 32
+        },
+        'ranges': {
+            'lookback_period': (5, 100),
+            'units': (10, 200),
+            'dropout': (0.1, 0.5),
+            'epochs': (10, 500),
+            'batch_size': (8, 128)
+        }
+    },
+    'mlp': {
+        'required': ['lookback_period', 'hidden_dims', 'learning_rate'],
+        'optional': ['batch_size'],
+        'defaults': {
+            'lookback_period': 20,
+            'hidden_dims': 64,
+            'learning_rate': 0.001,
+            'batch_size': 32
+        },
+        'ranges': {
+            'lookback_period': (5, 100),
+            'hidden_dims': (32, 256),
+            'learning_rate': (0.0001, 0.01),
+            'batch_size': (8, 1024)
+        }
+    },
+    'lstm_mlp': {
+        'required': ['lookback_period', 'hidden_dim', 'num_layers', 'learning_rate'],
+        'optional': ['batch_size'],
+        'defaults': {
+            'lookback_period': 20,
+            'hidden_dim': 64,
+            'num_layers': 2,
+            'learning_rate': 0.001,
+            'batch_size': 32
+        },
+        'ranges': {
+            'lookback_period': (5, 100),
+            'hidden_dim': (32, 256),
+            'num_layers': (1, 4),
+            'learning_rate': (0.0001, 0.01),
+            'batch_size': (8, 1024)
+        }
+    },
+    'cnn_mlp': {
+        'required': ['lookback_period', 'learning_rate'],
+        'optional': ['batch_size'],
+        'defaults': {
+            'lookback_period': 20,
+            'learning_rate': 0.001,
+            'batch_size': 32
         },
-        'cnn_mlp': {
-            'required': ['lookback_period', 'learning_rate'],
-            'optional': [],
-            'defaults': {
-                'lookback_period': 20,
-                'learning_rate': 0.001
-            },
-            'validators': {
-                'lookback_period': lambda x: 5 <= x <= 100,
-                'learning_rate': lambda x: 0.0001 <= x <= 0.01
-            }
+        'ranges': {
+            'lookback_period': (5, 100),
+            'learning_rate': (0.0001, 0.01),
+            'batch_size': (8, 1024)
+        }
+    },
+    'dl_ensemble': {
+        'required': ['lookback_period', 'learning_rate'],
+        'optional': ['max_workers'],
+        'defaults': {
+            'lookback_period': 20,
+            'learning_rate': 0.001
+        },
+        'ranges': {
+            'lookback_period': (5, 100),
+            'learning_rate': (0.0001, 0.01),
+            'max_workers': (1, 16)
         }
     }
-    
+}
+
+
+def _in_range(bounds: Tuple[float, float], value: Any) -> bool:
+    """检查参数值是否在取值范围内"""
+    low, high = bounds
+    return low <= value <= high
+
+
+def get_param_ranges(strategy_name: str) -> Dict[str, Tuple[float, float]]:
+    """获取策略参数的取值范围"""
+    if strategy_name not in STRATEGY_PARAMS:
+        raise ValueError(f"不支持的策略类型: {strategy_name}")
+    return dict(STRATEGY_PARAMS[strategy_name]['ranges'])
+
+
+def get_param_types(strategy_name: str) -> Dict[str, type]:
+    """根据默认值推断策略参数类型(int或float)"""
+    if strategy_name not in STRATEGY_PARAMS:
+        raise ValueError(f"不支持的策略类型: {strategy_name}")
+    return {
+        param: type(default)
+        for param, default in STRATEGY_PARAMS[strategy_name]['defaults'].items()
+    }
+
+
+def validate_strategy_params(strategy_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """验证策略参数"""
     if strategy_name not in STRATEGY_PARAMS:
         raise ValueError(f"不支持的策略类型: {strategy_name}")
         
@@ -163,7 +247,7 @@ def validate_strategy_params(strategy_name: str, params: Dict[str, Any]) -> Dict
         else:
             value = params[param]
             # 验证参数值
-            if not config['validators'][param](value):
+            if not _in_range(config['ranges'][param], value):
                 raise ValueError(f"参数 {param} 的值 {value} 超出有效范围")
             validated_params[param] = value
             
@@ -171,7 +255,7 @@ def validate_strategy_params(strategy_name: str, params: Dict[str, Any]) -> Dict
     for param in config['optional']:
         if param in params:
             value = params[param]
-            if not config['validators'][param](value):
+            if not _in_range(config['ranges'][param], value):
                 raise ValueError(f"参数 {param} 的值 {value} 超出有效范围")
             validated_params[param] = value
         elif param in config['defaults']:
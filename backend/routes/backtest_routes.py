@@ -1,11 +1,17 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from typing import Dict, Any
 from backend.services.backtest_service import BacktestService
+from backend.services.sweep_service import SweepService
+from backend.services.hpo_service import HPOService
 import logging
+import json
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 backtest_service = BacktestService()
+sweep_service = SweepService()
+hpo_service = HPOService()
 
 @router.post("/backtest/run")
 async def run_backtest(params: Dict[str, Any]):
@@ -17,13 +23,149 @@ async def run_backtest(params: Dict[str, Any]):
             start_date=params['startDate'],
             end_date=params['endDate'],
             strategy_name=params['strategy']['name'],
-            strategy_params=params['strategy']['params']
+            strategy_params=params['strategy']['params'],
+            walk_forward=params.get('walkForward')
         )
         return result
     except Exception as e:
         logger.error(f"回测失败: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/backtest/batch")
+async def run_batch_backtest(params: Dict[str, Any]):
+    """批量回测，以NDJSON流式返回每个任务的结果和最终汇总表"""
+    try:
+        logger.info(f"开始批量回测，参数: {params}")
+        # 开始流式返回之前校验输入，不合法时返回400
+        max_workers = params.get('maxWorkers')
+        symbols, strategies = backtest_service.prepare_batch(
+            params.get('symbols'), params.get('strategies'), max_workers
+        )
+        start_date = params['startDate']
+        end_date = params['endDate']
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"缺少参数: {e.args[0]}")
+    except ValueError as e:
+        logger.error(f"批量回测参数错误: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+        
+    try:
+        events = backtest_service.run_batch(
+            symbols=symbols,
+            strategies=strategies,
+            start_date=start_date,
+            end_date=end_date,
+            max_workers=max_workers
+        )
+    except Exception as e:
+        logger.error(f"批量回测失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+        
+    async def stream():
+        try:
+            async for event in events:
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+        except Exception as e:
+            logger.error(f"批量回测失败: {str(e)}")
+            yield json.dumps({'type': 'error', 'detail': str(e)}, ensure_ascii=False) + "\n"
+            
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@router.post("/backtest/panel")
+async def run_panel_backtest(params: Dict[str, Any]):
+    """面板回测: 同一策略在多只股票上向量化运行"""
+    try:
+        logger.info(f"开始面板回测，参数: {params}")
+        return await backtest_service.run_panel_backtest(
+            symbols=params['symbols'],
+            start_date=params['startDate'],
+            end_date=params['endDate'],
+            strategy_name=params['strategy']['name'],
+            strategy_params=params['strategy'].get('params', {})
+        )
+    except Exception as e:
+        logger.error(f"面板回测失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/backtest/sweep")
+async def run_parameter_sweep(params: Dict[str, Any]):
+    """参数网格/随机搜索扫描"""
+    try:
+        logger.info(f"开始参数扫描，参数: {params}")
+        # 开始扫描之前检查组合数，超过上限时返回400
+        symbol = params['symbol']
+        start_date = params['startDate']
+        end_date = params['endDate']
+        strategy_name = params['strategy']
+        mode = params.get('mode', 'grid')
+        grid = params.get('grid')
+        points = params.get('points', 10)
+        n_samples = params.get('nSamples', 100)
+        sweep_service.check_limits(strategy_name, mode, grid, points, n_samples)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"缺少参数: {e.args[0]}")
+    except (TypeError, ValueError) as e:
+        logger.error(f"参数扫描参数错误: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+        
+    try:
+        return await sweep_service.run_sweep(
+            symbol=symbol,
+            start_date=start_date,
+            end_date=end_date,
+            strategy_name=strategy_name,
+            mode=mode,
+            grid=grid,
+            points=points,
+            n_samples=n_samples,
+            seed=params.get('seed'),
+            metric=params.get('metric', 'sharpe_ratio'),
+            top_n=params.get('topN')
+        )
+    except Exception as e:
+        logger.error(f"参数扫描失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/backtest/hpo")
+async def run_hyperparameter_search(params: Dict[str, Any]):
+    """深度学习策略的超参数搜索(successive halving，验证损失差的配置提前淘汰)"""
+    try:
+        logger.info(f"开始超参数搜索，参数: {params}")
+        # 开始训练之前检查搜索规模，超过上限时返回400
+        symbol = params['symbol']
+        start_date = params['startDate']
+        end_date = params['endDate']
+        strategy_name = params['strategy']
+        n_trials = params.get('nTrials', 27)
+        max_epochs = params.get('maxEpochs', 81)
+        budget = hpo_service.check_limits(n_trials, max_epochs, params.get('budget'))
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"缺少参数: {e.args[0]}")
+    except (TypeError, ValueError) as e:
+        logger.error(f"超参数搜索参数错误: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+        
+    try:
+        return await hpo_service.run_search(
+            symbol=symbol,
+            start_date=start_date,
+            end_date=end_date,
+            strategy_name=strategy_name,
+            n_trials=n_trials,
+            min_epochs=params.get('minEpochs', 3),
+            max_epochs=max_epochs,
+            eta=params.get('eta', 3),
+            budget=budget,
+            batch_sizes=params.get('batchSizes'),
+            space=params.get('space'),
+            max_workers=params.get('maxWorkers'),
+            top_k=params.get('topK', 1),
+            seed=params.get('seed')
+        )
+    except Exception as e:
+        logger.error(f"超参数搜索失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/backtest/strategies")
 async def get_strategies():
     """获取可用策略列表"""
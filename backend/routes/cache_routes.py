@@ -0,0 +1,36 @@
+from fastapi import APIRouter, HTTPException
+from backend.services.memory_cache import memory_cache
+from backend.models.indicators.engine import indicator_engine
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """获取进程内缓存的命中率、内存占用和淘汰统计"""
+    try:
+        return memory_cache.stats()
+    except Exception as e:
+        logger.error(f"获取缓存统计失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/cache/indicators/stats")
+async def get_indicator_stats():
+    """获取指标引擎的复用率和缓存统计"""
+    try:
+        return indicator_engine.stats()
+    except Exception as e:
+        logger.error(f"获取指标缓存统计失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/cache/clear")
+async def clear_cache():
+    """清空进程内缓存"""
+    try:
+        memory_cache.clear()
+        indicator_engine.clear()
+        return {"message": "缓存已清空"}
+    except Exception as e:
+        logger.error(f"清空缓存失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,67 @@
+from fastapi import APIRouter, HTTPException
+from typing import Dict, Any
+from backend.services.model_registry import model_registry
+from backend.services.inference_stats import inference_stats
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.get("/models")
+async def list_models():
+    """列出模型仓库中的模型(最近访问的在前)"""
+    try:
+        return {
+            'models': model_registry.list_models(),
+            'stats': model_registry.stats()
+        }
+    except Exception as e:
+        logger.error(f"获取模型列表失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/models/inference-stats")
+async def get_inference_stats():
+    """各策略的模型推理耗时统计(调用次数、平均/P50/P95/最大耗时)"""
+    try:
+        return {'stats': inference_stats.summary()}
+    except Exception as e:
+        logger.error(f"获取推理耗时统计失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/models/{key}")
+async def delete_model(key: str):
+    """删除指定模型"""
+    try:
+        deleted = model_registry.delete(key)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"删除模型失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f"模型不存在: {key}")
+    return {"message": "模型已删除"}
+
+@router.post("/models/evict")
+async def evict_models(params: Dict[str, Any] = None):
+    """按容量(maxBytes)和未访问天数(maxAgeDays)淘汰模型，未指定时使用仓库默认配置"""
+    try:
+        params = params or {}
+        removed = model_registry.evict(
+            max_bytes=params.get('maxBytes'),
+            max_age_days=params.get('maxAgeDays')
+        )
+        return {'evicted': removed, 'stats': model_registry.stats()}
+    except Exception as e:
+        logger.error(f"淘汰模型失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/models/clear")
+async def clear_models():
+    """清空模型仓库"""
+    try:
+        removed = model_registry.clear()
+        return {"message": "模型仓库已清空", "removed": removed}
+    except Exception as e:
+        logger.error(f"清空模型仓库失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -18,10 +18,10 @@ async def list_strategies():
 @router.get("/{strategy_name}/params")
 async def get_strategy_params(strategy_name: str):
     """获取策略参数"""
-    if strategy_name not in StrategyFactory._strategies:
+    if not StrategyFactory.has_strategy(strategy_name):
         return {"error": "Strategy not found"}
         
-    strategy_class = StrategyFactory._strategies[strategy_name]
+    strategy_class = StrategyFactory.get_strategy_class(strategy_name)
     return {
         "name": strategy_name,
         "description": strategy_class.__doc__,
@@ -0,0 +1,53 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any
+from functools import partial
+from backend.models.strategies.factory import StrategyFactory
+from backend.services.streaming_service import STOCK_DATA_DIR, CSVReplaySource, StreamingRuntime
+import logging
+import json
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.post("/stream/replay")
+async def replay_stream(params: Dict[str, Any]):
+    """回放本地CSV行情驱动实时策略运行时，以NDJSON流式返回信号事件和延迟统计"""
+    try:
+        logger.info(f"开始行情回放，参数: {params}")
+        strategies = {}
+        for spec in params['strategies']:
+            # 提前创建一次以校验参数；只允许实现了增量 on_bar 的策略，
+            # 默认实现每根K线重新计算全部历史(机器学习策略还会重新训练)，会阻塞事件循环
+            strategy = StrategyFactory.create_strategy(spec['name'], **spec.get('params', {}))
+            if not strategy.supports_streaming():
+                raise ValueError(f"策略不支持实时运行: {spec['name']}")
+            label = spec.get('label', spec['name'])
+            strategies[label] = partial(
+                StrategyFactory.create_strategy, spec['name'], **spec.get('params', {})
+            )
+        runtime = StreamingRuntime(strategies, emit_all=params.get('emitAll', False))
+        # 只回放配置的数据目录，股票代码不合法或路径越出数据目录时返回400
+        source = CSVReplaySource(
+            data_dir=STOCK_DATA_DIR,
+            symbols=params.get('symbols'),
+            start_date=params.get('startDate'),
+            end_date=params.get('endDate'),
+            delay=params.get('delay', 0.0)
+        )
+    except ValueError as e:
+        logger.error(f"行情回放参数错误: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"行情回放失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+        
+    async def stream():
+        try:
+            async for event in runtime.run(source):
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+        except Exception as e:
+            logger.error(f"行情回放失败: {str(e)}")
+            yield json.dumps({'type': 'error', 'detail': str(e)}, ensure_ascii=False) + "\n"
+            
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
@@ -1,17 +1,28 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import os
 import pandas as pd
 import numpy as np
 from datetime import datetime
-import yfinance as yf
 from backend.models.strategies.factory import StrategyFactory
+from backend.models.backtest_engine import run_vectorized_backtest, panel_metrics
+from backend.services.data_fetcher import IncrementalDataFetcher
 import logging
 import math
 
 logger = logging.getLogger(__name__)
 
 class BacktestService:
-    def __init__(self):
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        fetcher: Optional[IncrementalDataFetcher] = None
+    ):
         self.strategy_factory = StrategyFactory()
+        self.fetcher = fetcher or IncrementalDataFetcher()
+        # 批量回测进程池大小，默认使用全部CPU
+        self.max_workers = max_workers
         
     def _safe_float(self, value: float) -> float:
         """安全转换浮点数，处理无穷大、NaN和超出范围的值"""
@@ -26,7 +37,9 @@ class BacktestService:
         
     def _safe_list(self, arr: np.ndarray) -> list:
         """安全转换数组为列表"""
-        return [self._safe_float(x) for x in arr]
+        values = np.asarray(arr, dtype=float)
+        values = np.where(np.isfinite(values), np.clip(values, -1e308, 1e308), 0.0)
+        return values.tolist()
         
     async def run_backtest(
         self,
@@ -34,125 +47,374 @@ class BacktestService:
         start_date: str,
         end_date: str,
         strategy_name: str,
-        strategy_params: Dict[str, Any]
+        strategy_params: Dict[str, Any],
+        walk_forward: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """运行回测"""
+        """运行回测
+        
+        :param walk_forward: 机器学习策略的走步训练配置(WalkForwardEngine的参数)，
+                             为None时沿用策略自身的 generate_signals
+        """
         try:
             # 获取历史数据
-            stock = yf.Ticker(symbol)
-            df = stock.history(
-                start=start_date,
-                end=end_date,
-                interval='1d'
-            )
-            
-            if df.empty:
-                raise ValueError(f"无法获取股票数据: {symbol}")
-                
-            # 创建策略实例
-            strategy = self.strategy_factory.create_strategy(
-                strategy_name,
-                **strategy_params
-            )
-            
-            # 生成交易信号
-            signals = strategy.generate_signals(df)
-            
-            # 确保signals是pandas Series
-            if isinstance(signals, np.ndarray):
-                signals = pd.Series(signals, index=df.index)
-            
-            # 计算收益率
-            returns = df['Close'].pct_change()
-            strategy_returns = signals.shift(1) * returns
+            df = self._load_price_data(symbol, start_date, end_date)
+            return self._run_strategy(df, strategy_name, strategy_params, walk_forward)
             
-            # 计算累计收益
-            equity_curve = (1 + strategy_returns).cumprod()
+        except Exception as e:
+            logger.error(f"回测执行失败: {str(e)}")
+            raise
             
-            # 计算回撤
-            rolling_max = equity_curve.expanding().max()
-            drawdown = (equity_curve - rolling_max) / rolling_max
+    def _load_price_data(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """获取历史行情数据(增量下载，已缓存的日期区间从本地存储读取)"""
+        df = self.fetcher.get(symbol, start_date, end_date)
+        
+        if df.empty:
+            raise ValueError(f"无法获取股票数据: {symbol}")
             
-            # 生成交易记录
-            trades = self._generate_trades(df, signals)
+        # 特征矩阵等按股票缓存的计算使用
+        df.attrs['symbol'] = symbol
+        return df
+        
+    def _run_strategy(
+        self,
+        df: pd.DataFrame,
+        strategy_name: str,
+        strategy_params: Dict[str, Any],
+        walk_forward: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """在已加载的行情数据上运行单个策略回测"""
+        # 创建策略实例
+        strategy = self.strategy_factory.create_strategy(
+            strategy_name,
+            **strategy_params
+        )
+        
+        # 生成交易信号
+        walk_forward_summary = None
+        if walk_forward is not None:
+            # 走步训练依赖sklearn，只在使用时导入
+            from backend.models.strategies.ml.base_ml_strategy import BaseMLStrategy
+            from backend.models.strategies.ml.walk_forward import WalkForwardEngine
+            if not isinstance(strategy, BaseMLStrategy):
+                raise ValueError(f"走步训练只支持机器学习策略: {strategy_name}")
+            engine = WalkForwardEngine(**walk_forward)
+            signals = engine.generate_signals(strategy, df)
+            walk_forward_summary = engine.summary()
+        else:
+            signals = strategy.generate_signals(df)
+        
+        # 计算收益、回撤、交易记录和策略指标
+        signals, equity_curve, drawdown, trades, metrics = self._evaluate_signals(df, signals)
+        
+        # 获取训练历史（如果是深度学习策略）
+        training_history = None
+        if hasattr(strategy, 'training_history'):
+            training_history = {
+                'loss': self._safe_list(strategy.training_history['loss']),
+                'accuracy': self._safe_list(strategy.training_history['accuracy']),
+                'val_loss': self._safe_list(strategy.training_history.get('val_loss', [])) if 'val_loss' in strategy.training_history else None,
+                'val_accuracy': self._safe_list(strategy.training_history.get('val_accuracy', [])) if 'val_accuracy' in strategy.training_history else None
+            }
+        
+        # 构建股票数据
+        ohlcv = df[['Open', 'High', 'Low', 'Close', 'Volume']].to_numpy(dtype=float)
+        stock_data = [
+            {
+                'date': date,
+                'open': row[0],
+                'high': row[1],
+                'low': row[2],
+                'close': row[3],
+                'volume': row[4]
+            }
+            for date, row in zip(df.index.strftime('%Y-%m-%d'), ohlcv)
+        ]
+        
+        # 构建结果
+        result = {
+            'trades': trades,
+            'metrics': {k: self._safe_float(v) for k, v in metrics.items()},
+            'equity_curve': self._safe_list(equity_curve.values),
+            'drawdown_curve': self._safe_list(drawdown.values),
+            'positions': self._safe_list(signals.values),
+            'dates': df.index.strftime('%Y-%m-%d').tolist(),
+            'stockData': stock_data  # 添加股票数据
+        }
+        
+        if training_history:
+            result['training_history'] = training_history
+        if walk_forward_summary:
+            result['walk_forward'] = walk_forward_summary
+        # 集成策略同时返回各成员的信号
+        if getattr(strategy, 'member_signals', None):
+            result['member_positions'] = {
+                name: self._safe_list(member_signals)
+                for name, member_signals in strategy.member_signals.items()
+            }
             
-            # 计算策略指标
-            metrics = self._calculate_metrics(
-                returns=strategy_returns,
-                equity_curve=equity_curve,
-                drawdown=drawdown,
-                trades=trades
-            )
+        return result
+        
+    def prepare_batch(
+        self,
+        symbols: List[str],
+        strategies: List[Dict[str, Any]],
+        max_workers: Optional[int] = None
+    ) -> tuple:
+        """校验并规范化批量回测的输入，返回 (去重后的股票列表, 回测任务列表)
+        
+        在开始流式返回之前调用，输入不合法时直接抛出 ValueError。
+        """
+        if not isinstance(symbols, list) or not isinstance(strategies, list):
+            raise ValueError("股票列表和策略列表必须是数组")
+        if max_workers is not None and (
+            isinstance(max_workers, bool) or not isinstance(max_workers, int) or max_workers < 1
+        ):
+            raise ValueError(f"maxWorkers 必须是正整数: {max_workers}")
+        symbols = list(dict.fromkeys(str(s).strip() for s in symbols if str(s).strip()))
+        jobs = []
+        for s in strategies:
+            if not isinstance(s, dict) or not s.get('name'):
+                raise ValueError(f"策略配置缺少名称: {s}")
+            if not self.strategy_factory.has_strategy(s['name']):
+                raise ValueError(f"不支持的策略类型: {s['name']}")
+            jobs.append({'name': s['name'], 'params': s.get('params') or {}})
+        if not symbols or not jobs:
+            raise ValueError("股票列表和策略列表不能为空")
+        return symbols, jobs
+        
+    async def run_batch(
+        self,
+        symbols: List[str],
+        strategies: List[Dict[str, Any]],
+        start_date: str,
+        end_date: str,
+        max_workers: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """批量回测: 股票列表 × 策略/参数列表
+
+        任务按股票分片提交到进程池，每只股票的行情只在所在进程中加载一次，
+        供该股票的全部策略共享。每个分片完成后立即逐条产出回测结果，
+        最后产出按夏普比率排序的汇总表。输入应先经过 prepare_batch 校验。
+        """
+        symbols, jobs = self.prepare_batch(symbols, strategies, max_workers)
             
-            # 获取训练历史（如果是深度学习策略）
-            training_history = None
-            if hasattr(strategy, 'training_history'):
-                training_history = {
-                    'loss': self._safe_list(strategy.training_history['loss']),
-                    'accuracy': self._safe_list(strategy.training_history['accuracy']),
-                    'val_loss': self._safe_list(strategy.training_history.get('val_loss', [])) if 'val_loss' in strategy.training_history else None,
-                    'val_accuracy': self._safe_list(strategy.training_history.get('val_accuracy', [])) if 'val_accuracy' in strategy.training_history else None
-                }
-            
-            # 构建股票数据
-            stock_data = [
-                {
-                    'date': date.strftime('%Y-%m-%d'),
-                    'open': row['Open'],
-                    'high': row['High'],
-                    'low': row['Low'],
-                    'close': row['Close'],
-                    'volume': row['Volume']
-                }
-                for date, row in df.iterrows()
+        # 并行进程数不超过CPU核数和股票数
+        cpu_count = os.cpu_count() or 1
+        workers = min(max_workers or self.max_workers or cpu_count, cpu_count)
+        workers = max(1, min(workers, len(symbols)))
+        logger.info(f"开始批量回测: {len(symbols)}只股票 × {len(jobs)}个策略, 进程数={workers}")
+        
+        loop = asyncio.get_running_loop()
+        rows = []
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = [
+                loop.run_in_executor(
+                    executor, _run_symbol_jobs, symbol, start_date, end_date, jobs
+                )
+                for symbol in symbols
             ]
+            for future in asyncio.as_completed(futures):
+                for row in await future:
+                    rows.append(row)
+                    yield {'type': 'result', **row}
+        finally:
+            # 客户端断开时生成器被关闭，不等待剩余分片，避免阻塞事件循环
+            executor.shutdown(wait=False, cancel_futures=True)
+                    
+        yield {'type': 'summary', **self._summarize_batch(rows)}
+        
+    async def run_panel_backtest(
+        self,
+        symbols: List[str],
+        start_date: str,
+        end_date: str,
+        strategy_name: str,
+        strategy_params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """面板回测: 同一策略在多只股票上一次计算全部信号和指标
+        
+        各股票的行情按共同的交易日对齐为 (时间 × 股票) 矩阵，
+        信号由策略的 generate_panel_signals 生成，指标按列向量化计算。
+        """
+        symbols = list(dict.fromkeys(s.strip() for s in symbols if s.strip()))
+        if not symbols:
+            raise ValueError("股票列表不能为空")
             
-            # 构建结果
-            result = {
-                'trades': trades,
-                'metrics': {k: self._safe_float(v) for k, v in metrics.items()},
-                'equity_curve': self._safe_list(equity_curve.values),
-                'drawdown_curve': self._safe_list(drawdown.values),
-                'positions': self._safe_list(signals.values),
-                'dates': df.index.strftime('%Y-%m-%d').tolist(),
-                'stockData': stock_data  # 添加股票数据
-            }
+        frames = {}
+        errors = []
+        for symbol in symbols:
+            try:
+                frames[symbol] = self._load_price_data(symbol, start_date, end_date)
+            except Exception as e:
+                logger.error(f"获取股票数据失败 {symbol}: {str(e)}")
+                errors.append({'symbol': symbol, 'error': str(e)})
+        if not frames:
+            raise ValueError("没有可用的行情数据")
             
-            if training_history:
-                result['training_history'] = training_history
-                
-            return result
+        panel = self._build_panel(frames)
+        close = panel['Close']
+        if close.empty:
+            raise ValueError("股票之间没有共同的交易日")
             
+        strategy = self.strategy_factory.create_strategy(strategy_name, **strategy_params)
+        signals = strategy.generate_panel_signals(panel)
+        
+        days = (close.index[-1] - close.index[0]).days
+        metrics = panel_metrics(close.values, signals.values, days)
+        rows = [
+            {
+                'symbol': symbol,
+                **{name: self._safe_float(values[j]) for name, values in metrics.items()}
+            }
+            for j, symbol in enumerate(close.columns)
+        ]
+        rows.sort(key=lambda r: r['sharpe_ratio'], reverse=True)
+        
+        return {
+            'strategy': strategy_name,
+            'params': strategy_params,
+            'start': close.index[0].strftime('%Y-%m-%d'),
+            'end': close.index[-1].strftime('%Y-%m-%d'),
+            'bars': len(close),
+            'rows': rows,
+            'errors': errors
+        }
+        
+    def _build_panel(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """把多只股票的行情对齐为 字段 -> (时间 × 股票) 矩阵，只保留所有股票都有收盘价的日期"""
+        fields = [
+            field for field in ('Open', 'High', 'Low', 'Close', 'Volume')
+            if all(field in df.columns for df in frames.values())
+        ]
+        panel = {
+            field: pd.concat({symbol: df[field] for symbol, df in frames.items()}, axis=1)
+            for field in fields
+        }
+        dates = panel['Close'].dropna(how='any').index
+        return {field: frame.loc[dates] for field, frame in panel.items()}
+        
+    def _run_symbol_jobs(
+        self,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        jobs: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """加载一次行情数据，依次运行该股票的全部回测任务"""
+        try:
+            df = self._load_price_data(symbol, start_date, end_date)
         except Exception as e:
-            logger.error(f"回测执行失败: {str(e)}")
-            raise
+            logger.error(f"获取股票数据失败 {symbol}: {str(e)}")
+            return [self._batch_row(symbol, job, error=str(e)) for job in jobs]
             
+        rows = []
+        for job in jobs:
+            try:
+                signals = self.strategy_factory.create_strategy(
+                    job['name'],
+                    **job['params']
+                ).generate_signals(df)
+                metrics = self._evaluate_signals(df, signals)[-1]
+                rows.append(self._batch_row(symbol, job, metrics=metrics))
+            except Exception as e:
+                logger.error(f"批量回测任务失败 {symbol}/{job['name']}: {str(e)}")
+                rows.append(self._batch_row(symbol, job, error=str(e)))
+        return rows
+        
+    def _batch_row(
+        self,
+        symbol: str,
+        job: Dict[str, Any],
+        metrics: Optional[Dict[str, float]] = None,
+        error: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """构建批量回测结果行"""
+        row = {
+            'symbol': symbol,
+            'strategy': job['name'],
+            'params': job['params'],
+            'error': error
+        }
+        row.update({k: self._safe_float(v) for k, v in (metrics or {}).items()})
+        return row
+        
+    def _summarize_batch(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """生成批量回测汇总表"""
+        succeeded = [r for r in rows if r['error'] is None]
+        failed = [r for r in rows if r['error'] is not None]
+        succeeded.sort(key=lambda r: r.get('sharpe_ratio', 0.0), reverse=True)
+        
+        columns = ['symbol', 'strategy', 'params', 'total_return', 'annual_return',
+                   'sharpe_ratio', 'max_drawdown', 'win_rate', 'trades_count']
+        return {
+            'total_jobs': len(rows),
+            'succeeded': len(succeeded),
+            'failed': len(failed),
+            'columns': columns,
+            'rows': [[r.get(c) for c in columns] for r in succeeded],
+            'errors': [
+                {'symbol': r['symbol'], 'strategy': r['strategy'], 'error': r['error']}
+                for r in failed
+            ]
+        }
+        
+    def _evaluate_signals(self, df: pd.DataFrame, signals) -> tuple:
+        """根据交易信号计算收益曲线、回撤、交易记录和策略指标"""
+        # 确保signals是pandas Series
+        if isinstance(signals, np.ndarray):
+            signals = pd.Series(signals, index=df.index)
+        
+        # 计算收益率
+        returns = df['Close'].pct_change()
+        strategy_returns = signals.shift(1) * returns
+        
+        # 计算累计收益
+        equity_curve = (1 + strategy_returns).cumprod()
+        
+        # 计算回撤
+        rolling_max = equity_curve.expanding().max()
+        drawdown = (equity_curve - rolling_max) / rolling_max
+        
+        # 生成交易记录
+        trades = self._generate_trades(df, signals)
+        
+        # 计算策略指标
+        metrics = self._calculate_metrics(
+            returns=strategy_returns,
+            equity_curve=equity_curve,
+            drawdown=drawdown,
+            trades=trades
+        )
+        
+        return signals, equity_curve, drawdown, trades, metrics
+        
     def _generate_trades(self, df: pd.DataFrame, signals: pd.Series) -> List[Dict[str, Any]]:
         """生成交易记录"""
-        trades = []
-        position = 0
+        kernel = run_vectorized_backtest(df['Close'], signals)
+        entries, exits = kernel['entries'], kernel['exits']
         
-        for date, signal in signals.items():
-            if signal == 1 and position == 0:  # 买入信号
-                trades.append({
-                    'date': date.strftime('%Y-%m-%d'),
-                    'type': 'buy',
-                    'price': df.loc[date, 'Close'],
-                    'shares': 1,  # 简化处理，每次交易1股
-                    'profit': 0
-                })
-                position = 1
-            elif signal == -1 and position == 1:  # 卖出信号
-                buy_trade = next(t for t in reversed(trades) if t['type'] == 'buy')
-                profit = df.loc[date, 'Close'] - buy_trade['price']
+        # 只对发生交易的K线格式化日期
+        entry_dates = df.index[entries].strftime('%Y-%m-%d')
+        exit_dates = df.index[exits].strftime('%Y-%m-%d')
+        
+        trades = []
+        for k in range(len(entries)):
+            trades.append({
+                'date': entry_dates[k],
+                'type': 'buy',
+                'price': kernel['entry_prices'][k],
+                'shares': 1,  # 简化处理，每次交易1股
+                'profit': 0
+            })
+            if k < len(exits):
                 trades.append({
-                    'date': date.strftime('%Y-%m-%d'),
+                    'date': exit_dates[k],
                     'type': 'sell',
-                    'price': df.loc[date, 'Close'],
+                    'price': kernel['exit_prices'][k],
                     'shares': 1,
-                    'profit': profit
+                    'profit': kernel['profits'][k]
                 })
-                position = 0
                 
         return trades
         
@@ -239,4 +501,14 @@ class BacktestService:
     async def get_backtest_history(self) -> list:
         """获取回测历史"""
         # TODO: 实现回测历史存储和查询
-        return []
\ No newline at end of file
+        return []
+
+
+def _run_symbol_jobs(
+    symbol: str,
+    start_date: str,
+    end_date: str,
+    jobs: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """进程池任务入口(需要是模块级函数才能被pickle)"""
+    return BacktestService()._run_symbol_jobs(symbol, start_date, end_date, jobs)
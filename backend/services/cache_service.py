@@ -1,21 +1,124 @@
-from typing import Any, Optional
+from typing import Any, Callable, Dict, List, Optional
+from concurrent.futures import Future
 import redis
+import io
 import json
 import pickle
+import struct
+import threading
+import numpy as np
+import pandas as pd
+import pyarrow as pa
 from datetime import datetime, timedelta
+from backend.services.memory_cache import MemoryCache
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 序列化格式: MAGIC + 1字节类型标记 + 数据
+# 不带 MAGIC 的旧缓存条目按 pickle/JSON 解析
+MAGIC = b'TSC1'
+TAG_ARROW = b'A'
+TAG_NUMPY = b'N'
+TAG_JSON = b'J'
+TAG_PICKLE = b'P'
+
+
+def _encode_dataframe(df: pd.DataFrame) -> bytes:
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def _decode_dataframe(data: memoryview) -> pd.DataFrame:
+    with pa.ipc.open_stream(pa.py_buffer(data)) as reader:
+        return reader.read_all().to_pandas()
+
+
+def _encode_ndarray(arr: np.ndarray) -> bytes:
+    """头部为JSON描述的dtype和shape，之后是C连续的原始数据"""
+    header = json.dumps({'dtype': arr.dtype.str, 'shape': arr.shape}).encode()
+    return struct.pack('<I', len(header)) + header + np.ascontiguousarray(arr).tobytes()
+
+
+def _decode_ndarray(data: memoryview) -> np.ndarray:
+    (header_len,) = struct.unpack_from('<I', data)
+    header = json.loads(bytes(data[4:4 + header_len]))
+    arr = np.frombuffer(data[4 + header_len:], dtype=np.dtype(header['dtype']))
+    return arr.reshape(header['shape']).copy()
+
+
+def serialize(value: Any) -> bytes:
+    """按类型选择紧凑的二进制格式，无法处理的类型回退到pickle"""
+    try:
+        if isinstance(value, pd.DataFrame):
+            return MAGIC + TAG_ARROW + _encode_dataframe(value)
+        if isinstance(value, np.ndarray) and value.dtype != object:
+            return MAGIC + TAG_NUMPY + _encode_ndarray(value)
+        if isinstance(value, (dict, list)):
+            return MAGIC + TAG_JSON + json.dumps(value).encode()
+    except (TypeError, ValueError, pa.ArrowException):
+        pass
+    return MAGIC + TAG_PICKLE + pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def deserialize(data: bytes) -> Any:
+    if not data.startswith(MAGIC):
+        # 兼容旧格式的缓存条目
+        try:
+            return pickle.loads(data)
+        except Exception:
+            return json.loads(data)
+
+    tag = data[len(MAGIC):len(MAGIC) + 1]
+    payload = memoryview(data)[len(MAGIC) + 1:]
+    if tag == TAG_ARROW:
+        return _decode_dataframe(payload)
+    if tag == TAG_NUMPY:
+        return _decode_ndarray(payload)
+    if tag == TAG_JSON:
+        return json.loads(bytes(payload))
+    return pickle.loads(payload)
+
 
 class CacheService:
-    def __init__(self, host: str = 'localhost', port: int = 6379, db: int = 0):
-        self.redis = redis.Redis(host=host, port=port, db=db)
+    """两级缓存: 进程内LRU(近端) + Redis
+
+    - 读取时先查近端缓存，未命中再访问Redis并回填近端缓存
+    - get_or_load 对同一个key的并发未命中只执行一次加载
+    """
+        
+    def __init__(
+        self,
+        host: str = 'localhost',
+        port: int = 6379,
+        db: int = 0,
+        client: Optional[Any] = None,
+        near_cache: Optional[MemoryCache] = None,
+        near_ttl: int = 60
+    ):
+        self.redis = client if client is not None else redis.Redis(host=host, port=port, db=db)
+        self.near_cache = near_cache if near_cache is not None else MemoryCache(max_bytes=128 * 1024 * 1024)
+        self.near_ttl = near_ttl
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        
+    def _near_ttl(self, expire: int) -> int:
+        return min(expire, self.near_ttl)
         
     def get(self, key: str) -> Optional[Any]:
         """获取缓存数据"""
+        value = self.near_cache.get(key)
+        if value is not None:
+            return value
+        
         data = self.redis.get(key)
         if data:
-            try:
-                return pickle.loads(data)
-            except:
-                return json.loads(data)
+            value = deserialize(data)
+            self.near_cache.set(key, value, ttl=self.near_ttl)
+            return value
         return None
         
     def set(
@@ -26,33 +129,106 @@ class CacheService:
     ) -> bool:
         """设置缓存数据"""
         try:
-            if isinstance(value, (dict, list)):
-                data = json.dumps(value)
+            data = serialize(value)
+            result = self.redis.setex(key, expire, data)
+            self.near_cache.set(key, value, ttl=self._near_ttl(expire))
+            return result
+        except Exception as e:
+            logger.error(f"缓存设置失败: {str(e)}")
+            return False
+        
+    def mget(self, keys: List[str]) -> Dict[str, Any]:
+        """批量获取缓存数据，近端未命中的key通过一次MGET从Redis读取"""
+        results = {}
+        missing = []
+        for key in keys:
+            value = self.near_cache.get(key)
+            if value is not None:
+                results[key] = value
             else:
-                data = pickle.dumps(value)
-            return self.redis.setex(key, expire, data)
+                missing.append(key)
+        
+        if missing:
+            for key, data in zip(missing, self.redis.mget(missing)):
+                if data:
+                    value = deserialize(data)
+                    self.near_cache.set(key, value, ttl=self.near_ttl)
+                    results[key] = value
+        return results
+        
+    def mset(self, mapping: Dict[str, Any], expire: int = 3600) -> bool:
+        """批量设置缓存数据，使用pipeline一次往返写入"""
+        try:
+            pipe = self.redis.pipeline()
+            for key, value in mapping.items():
+                pipe.setex(key, expire, serialize(value))
+            pipe.execute()
+            for key, value in mapping.items():
+                self.near_cache.set(key, value, ttl=self._near_ttl(expire))
+            return True
         except Exception as e:
-            print(f"缓存设置失败: {str(e)}")
+            logger.error(f"批量缓存设置失败: {str(e)}")
             return False
-            
+        
+    def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        expire: int = 3600
+    ) -> Any:
+        """获取缓存数据，未命中时调用loader加载并写入缓存
+
+        同一个key的并发请求只有第一个会执行loader，其余请求等待其结果。
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+        
+        if not owner:
+            return future.result()
+        
+        try:
+            # 上一个owner可能在本线程首次读缓存之后才写入缓存并退出，成为owner后再读一次
+            value = self.get(key)
+            if value is None:
+                value = loader()
+                if value is not None:
+                    self.set(key, value, expire)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+        
     def delete(self, key: str) -> bool:
         """删除缓存数据"""
+        self.near_cache.delete(key)
         return bool(self.redis.delete(key))
         
     def exists(self, key: str) -> bool:
         """检查缓存是否存在"""
-        return bool(self.redis.exists(key))
+        return self.near_cache.get(key) is not None or bool(self.redis.exists(key))
         
     def get_stock_data_key(self, symbol: str, start_date: str, end_date: str) -> str:
         """生成股票数据缓存key"""
         return f"stock:{symbol}:{start_date}:{end_date}"
         
+    @staticmethod
     def get_indicator_key(
-        self,
         symbol: str,
         indicator: str,
         params: dict
     ) -> str:
         """生成技术指标缓存key"""
         param_str = ":".join(f"{k}={v}" for k, v in sorted(params.items()))
-        return f"indicator:{symbol}:{indicator}:{param_str}" 
\ No newline at end of file
+        return f"indicator:{symbol}:{indicator}:{param_str}"
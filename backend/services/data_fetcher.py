@@ -0,0 +1,162 @@
+import os
+import json
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+import yfinance as yf
+from backend.services.price_store import PriceStore
+import logging
+
+logger = logging.getLogger(__name__)
+
+Interval = Tuple[pd.Timestamp, pd.Timestamp]
+
+
+class DataProvider(ABC):
+    """行情数据源接口"""
+
+    @abstractmethod
+    def fetch(self, symbol: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        """获取 [start, end) 区间的日线OHLCV数据"""
+        pass
+
+
+class YFinanceProvider(DataProvider):
+    """通过yfinance获取行情数据"""
+
+    def __init__(self, interval: str = '1d'):
+        self.interval = interval
+
+    def fetch(self, symbol: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        stock = yf.Ticker(symbol)
+        return stock.history(
+            start=start.strftime('%Y-%m-%d'),
+            end=end.strftime('%Y-%m-%d'),
+            interval=self.interval
+        )
+
+
+def merge_intervals(intervals: List[Interval]) -> List[Interval]:
+    """合并重叠或相邻的半开区间"""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def missing_intervals(covered: List[Interval], start: pd.Timestamp, end: pd.Timestamp) -> List[Interval]:
+    """计算 [start, end) 中未被已覆盖区间包含的部分"""
+    gaps = []
+    cursor = start
+    for cov_start, cov_end in merge_intervals(covered):
+        if cov_end <= cursor:
+            continue
+        if cov_start >= end:
+            break
+        if cov_start > cursor:
+            gaps.append((cursor, cov_start))
+        cursor = max(cursor, cov_end)
+        if cursor >= end:
+            break
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+class IncrementalDataFetcher:
+    """增量行情数据获取
+
+    每只股票记录已从数据源获取过的日期区间(半开区间，按日)，请求时只向数据源获取
+    未覆盖的部分，合并写入本地列式存储后再从存储中读取整个区间。
+    今天及以后的日期不会被标记为已覆盖，以便下次请求时重新获取当天未收盘的数据。
+    数据源返回空数据(可能是限流或临时错误)的区间也不标记为已覆盖，除非区间内没有工作日。
+    """
+    COVERAGE_FILE = 'coverage.json'
+
+    def __init__(
+        self,
+        store: Optional[PriceStore] = None,
+        provider: Optional[DataProvider] = None
+    ):
+        self.store = store or PriceStore()
+        self.provider = provider or YFinanceProvider()
+        self._coverage: Dict[str, Tuple[float, List[Interval]]] = {}
+        self._lock = threading.Lock()
+
+    def _coverage_path(self, symbol: str) -> str:
+        """覆盖区间文件路径(股票代码不合法或不在存储目录内时抛出ValueError)"""
+        return os.path.join(self.store._symbol_dir(symbol), self.COVERAGE_FILE)
+
+    def get_coverage(self, symbol: str) -> List[Interval]:
+        """读取已覆盖区间，文件未变化时直接使用内存中的副本"""
+        path = self._coverage_path(symbol)
+        if not os.path.exists(path):
+            return []
+
+        mtime = os.path.getmtime(path)
+        cached = self._coverage.get(symbol)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        with open(path, 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+        intervals = [(pd.Timestamp(start), pd.Timestamp(end)) for start, end in raw]
+        self._coverage[symbol] = (mtime, intervals)
+        return intervals
+
+    def _save_coverage(self, symbol: str, intervals: List[Interval]):
+        path = self._coverage_path(symbol)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(
+                [[start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')] for start, end in intervals],
+                f
+            )
+        os.replace(tmp_path, path)
+        self._coverage[symbol] = (os.path.getmtime(path), intervals)
+
+    def _today(self) -> pd.Timestamp:
+        return pd.Timestamp.now().normalize()
+
+    def get(
+        self,
+        symbol: str,
+        start_date: str,
+        end_date: Optional[str] = None,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """获取 [start_date, end_date) 的行情数据，只下载缺失的日期区间"""
+        start = pd.Timestamp(start_date).normalize()
+        end = pd.Timestamp(end_date).normalize() if end_date else self._today() + pd.Timedelta(days=1)
+
+        with self._lock:
+            covered = self.get_coverage(symbol)
+            gaps = missing_intervals(covered, start, end)
+
+            fetched = []
+            try:
+                for gap_start, gap_end in gaps:
+                    logger.info(f"增量获取行情数据: {symbol} {gap_start.date()} ~ {gap_end.date()}")
+                    data = self.provider.fetch(symbol, gap_start, gap_end)
+                    if data is not None and not data.empty:
+                        self.store.write(symbol, data)
+                    elif len(pd.bdate_range(gap_start, gap_end - pd.Timedelta(days=1))) > 0:
+                        logger.warning(f"数据源未返回数据，下次请求时重新获取: {symbol} {gap_start.date()} ~ {gap_end.date()}")
+                        continue
+                    fetched.append((gap_start, min(gap_end, self._today())))
+            finally:
+                # 即使中途失败，也记录已成功获取的区间
+                if fetched:
+                    self._save_coverage(symbol, merge_intervals(covered + fetched))
+
+        df = self.store.read(symbol, start, end, columns)
+        if df is None:
+            return pd.DataFrame()
+        return df
@@ -1,13 +1,23 @@
-import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
+from typing import Optional
+from backend.services.data_fetcher import IncrementalDataFetcher
+from backend.services.memory_cache import MemoryCache, memory_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
 class DataService:
-    def __init__(self):
-        self.cache = {}
+    # 包含当天的区间可能还有未收盘的数据，使用较短的缓存时间
+    INTRADAY_TTL = 300
+    
+    def __init__(
+        self,
+        fetcher: Optional[IncrementalDataFetcher] = None,
+        cache: Optional[MemoryCache] = None
+    ):
+        self.fetcher = fetcher or IncrementalDataFetcher()
+        self.cache = cache or memory_cache
         
     async def get_stock_data(
         self,
@@ -15,30 +25,26 @@ class DataService:
         start_date: str,
         end_date: str
     ) -> pd.DataFrame:
-        """获取股票数据"""
+        """获取股票数据(本地已有的日期区间直接读取，只下载缺失部分)"""
         try:
             # 处理股票代码格式
             formatted_symbol = self._format_symbol(symbol)
             logger.info(f"获取股票数据: {formatted_symbol}")
             
-            # 检查缓存
-            cache_key = f"{formatted_symbol}:{start_date}:{end_date}"
-            if cache_key in self.cache:
-                return self.cache[cache_key]
+            # 检查缓存(已缓存的更大区间可直接切片)
+            data = self.cache.get_frame(formatted_symbol, start_date, end_date)
+            if data is not None:
+                return data
             
-            # 获取数据
-            stock = yf.Ticker(formatted_symbol)
-            data = stock.history(
-                start=start_date,
-                end=end_date,
-                interval='1d'
-            )
+            data = self.fetcher.get(formatted_symbol, start_date, end_date)
             
             if data.empty:
                 raise ValueError(f"未找到股票数据: {formatted_symbol}")
             
             # 缓存数据
-            self.cache[cache_key] = data
+            today = pd.Timestamp.now().normalize()
+            ttl = self.INTRADAY_TTL if pd.Timestamp(end_date) > today else None
+            self.cache.set_frame(formatted_symbol, start_date, end_date, data, ttl=ttl)
             return data
             
         except Exception as e:
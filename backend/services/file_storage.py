@@ -3,6 +3,7 @@ import json
 import pandas as pd
 from typing import Dict, List, Optional, Any
 from datetime import datetime
+from backend.services.price_store import PriceStore
 
 class FileStorageService:
     def __init__(self, base_dir: str = "data"):
@@ -10,27 +11,47 @@ class FileStorageService:
         self.stocks_dir = os.path.join(base_dir, "stocks")
         self.results_dir = os.path.join(base_dir, "results")
         self.cache_dir = os.path.join(base_dir, "cache")
+        self.price_store = PriceStore(os.path.join(base_dir, "store"))
         
         # 创建必要的目录
         for directory in [self.stocks_dir, self.results_dir, self.cache_dir]:
             os.makedirs(directory, exist_ok=True)
             
     def save_stock_data(self, symbol: str, data: pd.DataFrame) -> bool:
-        """保存股票数据到CSV文件"""
+        """保存股票数据到列式存储"""
         try:
-            file_path = os.path.join(self.stocks_dir, f"{symbol}.csv")
-            data.to_csv(file_path)
+            self.price_store.write(symbol, data)
             return True
         except Exception as e:
             print(f"保存股票数据失败: {str(e)}")
             return False
             
-    def load_stock_data(self, symbol: str) -> Optional[pd.DataFrame]:
-        """从CSV文件加载股票数据"""
+    def load_stock_data(
+        self,
+        symbol: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        columns: Optional[List[str]] = None
+    ) -> Optional[pd.DataFrame]:
+        """加载股票数据，优先读取列式存储，未迁移的股票回退到CSV文件"""
+        try:
+            data = self.price_store.read(symbol, start_date, end_date, columns)
+            if data is not None:
+                return data
+        except Exception as e:
+            print(f"加载股票数据失败: {str(e)}")
+
         file_path = os.path.join(self.stocks_dir, f"{symbol}.csv")
         if os.path.exists(file_path):
             try:
-                return pd.read_csv(file_path, index_col=0, parse_dates=True)
+                data = pd.read_csv(file_path, index_col=0, parse_dates=True)
+                if start_date is not None:
+                    data = data[data.index >= pd.Timestamp(start_date, tz=data.index.tz)]
+                if end_date is not None:
+                    data = data[data.index < pd.Timestamp(end_date, tz=data.index.tz)]
+                if columns is not None:
+                    data = data[[c for c in columns if c in data.columns]]
+                return data
             except Exception as e:
                 print(f"加载股票数据失败: {str(e)}")
         return None
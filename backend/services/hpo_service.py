@@ -0,0 +1,85 @@
+from typing import Any, Dict, List, Optional
+import asyncio
+import os
+from backend.services.backtest_service import BacktestService
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 单次搜索的上限，防止一个请求长时间占满CPU；未指定预算时按总epoch上限限制
+HPO_LIMITS = {
+    'n_trials': 100,
+    'max_epochs': 200,
+    'budget': 2000
+}
+
+
+class HPOService:
+    """深度学习策略的超参数搜索服务"""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.backtest_service = BacktestService()
+        self.max_workers = max_workers
+
+    @staticmethod
+    def check_limits(n_trials: int, max_epochs: int, budget: Optional[int] = None) -> Optional[int]:
+        """检查搜索规模不超过上限，返回实际使用的总epoch预算"""
+        for name, value in (('n_trials', n_trials), ('max_epochs', max_epochs), ('budget', budget)):
+            if value is not None and int(value) > HPO_LIMITS[name]:
+                raise ValueError(f"参数 {name} 的值 {value} 超过上限 {HPO_LIMITS[name]}")
+        return HPO_LIMITS['budget'] if budget is None else int(budget)
+
+    async def run_search(
+        self,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        strategy_name: str,
+        n_trials: int = 27,
+        min_epochs: int = 3,
+        max_epochs: int = 81,
+        eta: int = 3,
+        budget: Optional[int] = None,
+        batch_sizes: Optional[List[int]] = None,
+        space: Optional[Dict[str, List[Any]]] = None,
+        max_workers: Optional[int] = None,
+        top_k: int = 1,
+        seed: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """加载行情并执行 successive halving 搜索，返回各配置的验证结果和保存的最好模型
+
+        加载行情和搜索都是同步计算，在线程池中运行，不阻塞事件循环。
+        """
+        try:
+            budget = self.check_limits(n_trials, max_epochs, budget)
+            # 并行进程数不超过CPU核数
+            cpu_count = os.cpu_count() or 1
+            workers = min(max_workers or self.max_workers or cpu_count, cpu_count)
+
+            loop = asyncio.get_running_loop()
+            df = await loop.run_in_executor(
+                None, self.backtest_service._load_price_data, symbol, start_date, end_date
+            )
+
+            # 搜索依赖torch，只在使用时导入
+            from backend.models.strategies.ml.deep_learning.search import SuccessiveHalvingSearch
+            search = SuccessiveHalvingSearch(
+                strategy_name,
+                n_trials=n_trials,
+                min_epochs=min_epochs,
+                max_epochs=max_epochs,
+                eta=eta,
+                budget=budget,
+                batch_sizes=batch_sizes or (32, 64, 128),
+                space=space,
+                max_workers=workers,
+                top_k=top_k,
+                seed=seed
+            )
+            result = await loop.run_in_executor(None, search.run, df)
+            result['symbol'] = symbol
+            return result
+
+        except Exception as e:
+            logger.error(f"超参数搜索失败: {str(e)}")
+            raise
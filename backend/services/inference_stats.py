@@ -0,0 +1,67 @@
+import threading
+from collections import deque
+from typing import Any, Dict, Optional
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceStats:
+    """模型推理耗时统计，按策略名分别记录每次 predict 调用的耗时
+
+    保留每个策略最近 window 次调用的耗时用于计算分位数，调用次数、行数和总耗时为累计值。
+    """
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._records: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, name: str, seconds: float, rows: int, runtime: str = 'eager'):
+        with self._lock:
+            record = self._records.get(name)
+            if record is None:
+                record = self._records[name] = {
+                    'calls': 0,
+                    'rows': 0,
+                    'total_seconds': 0.0,
+                    'latencies': deque(maxlen=self.window),
+                    'runtime': runtime
+                }
+            record['calls'] += 1
+            record['rows'] += int(rows)
+            record['total_seconds'] += seconds
+            record['latencies'].append(seconds)
+            record['runtime'] = runtime
+
+    def summary(self, name: Optional[str] = None) -> Dict[str, Any]:
+        """各策略(或指定策略)的推理耗时统计，单位毫秒"""
+        with self._lock:
+            names = [name] if name is not None else list(self._records)
+            result = {}
+            for key in names:
+                record = self._records.get(key)
+                if record is None:
+                    continue
+                latencies = np.fromiter(record['latencies'], dtype=float) * 1000
+                result[key] = {
+                    'calls': record['calls'],
+                    'rows': record['rows'],
+                    'runtime': record['runtime'],
+                    'mean_ms': record['total_seconds'] * 1000 / record['calls'],
+                    'last_ms': float(latencies[-1]),
+                    'p50_ms': float(np.percentile(latencies, 50)),
+                    'p95_ms': float(np.percentile(latencies, 95)),
+                    'max_ms': float(latencies.max()),
+                    'rows_per_second': record['rows'] / record['total_seconds'] if record['total_seconds'] > 0 else 0.0
+                }
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._records.clear()
+
+
+# 全局推理耗时统计
+inference_stats = InferenceStats()
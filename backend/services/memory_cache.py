@@ -0,0 +1,206 @@
+import pickle
+import sys
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_size(value: Any) -> int:
+    """估算缓存对象占用的内存字节数"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+        return sys.getsizeof(value)
+    # 其他对象(拟合好的模型等)的 getsizeof 不包含其引用的数据，按序列化后的大小估算
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class MemoryCache:
+    """进程内按内存大小限制的LRU缓存
+
+    - 以估算的字节数计入容量，超出 max_bytes 时淘汰最久未使用的条目
+    - 每个条目有过期时间(TTL)，过期后视为未命中；容量不足时先清除过期条目再按LRU淘汰
+    - 行情数据按 (股票, 起始日期, 结束日期) 缓存，请求的区间被已缓存区间包含时直接切片返回
+    """
+    FRAME_PREFIX = 'frame:'
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024, default_ttl: Optional[float] = 24 * 3600):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        # key -> (value, size, expires_at)
+        self._entries: "OrderedDict[str, Tuple[Any, int, Optional[float]]]" = OrderedDict()
+        # symbol -> {key: (start, end)}
+        self._ranges: Dict[str, Dict[str, Tuple[pd.Timestamp, pd.Timestamp]]] = {}
+        self._lock = threading.RLock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.range_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+        if key.startswith(self.FRAME_PREFIX):
+            symbol = key[len(self.FRAME_PREFIX):].rsplit(':', 2)[0]
+            ranges = self._ranges.get(symbol)
+            if ranges is not None:
+                ranges.pop(key, None)
+                if not ranges:
+                    del self._ranges[symbol]
+
+    def _lookup(self, key: str) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        value, _, expires_at = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            self._remove(key)
+            self.expirations += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            self.misses += 1
+            return default
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """写入缓存，单个条目超过容量上限时不缓存"""
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            logger.warning(f"缓存条目过大，跳过缓存: {key} ({size} bytes)")
+            return False
+
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at)
+            self.current_bytes += size
+            self._evict()
+        return True
+
+    def _evict(self):
+        """超出容量时先清除已过期的条目，仍超出时再淘汰最久未使用的条目"""
+        if self.current_bytes <= self.max_bytes:
+            return
+        now = time.monotonic()
+        expired = [
+            key for key, (_, _, expires_at) in self._entries.items()
+            if expires_at is not None and now >= expires_at
+        ]
+        for key in expired:
+            self._remove(key)
+            self.expirations += 1
+        while self.current_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._ranges.clear()
+            self.current_bytes = 0
+
+    def _frame_key(self, symbol: str, start: pd.Timestamp, end: pd.Timestamp) -> str:
+        return f"{self.FRAME_PREFIX}{symbol}:{start.date()}:{end.date()}"
+
+    def set_frame(
+        self,
+        symbol: str,
+        start: str,
+        end: str,
+        data: pd.DataFrame,
+        ttl: Optional[float] = None
+    ) -> bool:
+        """缓存 [start, end) 区间的行情数据"""
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        key = self._frame_key(symbol, start, end)
+        with self._lock:
+            if not self.set(key, data, ttl):
+                return False
+            self._ranges.setdefault(symbol, {})[key] = (start, end)
+        return True
+
+    def get_frame(self, symbol: str, start: str, end: str) -> Optional[pd.DataFrame]:
+        """获取 [start, end) 区间的行情数据，可从包含该区间的已缓存数据中切片"""
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        key = self._frame_key(symbol, start, end)
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+
+            for other_key, (cached_start, cached_end) in list(self._ranges.get(symbol, {}).items()):
+                if cached_start <= start and end <= cached_end:
+                    found, value = self._lookup(other_key)
+                    if not found:
+                        continue
+                    self.hits += 1
+                    self.range_hits += 1
+                    index = value.index
+                    if index.tz is not None:
+                        lower, upper = start.tz_localize(index.tz), end.tz_localize(index.tz)
+                    else:
+                        lower, upper = start, end
+                    return value[(index >= lower) & (index < upper)]
+
+            self.misses += 1
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'current_bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'range_hits': self.range_hits,
+                'hit_rate': self.hits / total if total else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'default_ttl': self.default_ttl,
+            }
+
+
+# 进程内共享的缓存实例
+memory_cache = MemoryCache()
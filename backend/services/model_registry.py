@@ -0,0 +1,254 @@
+import os
+import json
+import time
+import shutil
+import pickle
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILE = 'model.pkl'
+META_FILE = 'meta.json'
+
+
+class ModelRegistry:
+    """训练好的策略模型的磁盘仓库
+
+    目录结构: {base_dir}/{key}/model.pkl(模型、标准化器、训练历史) + meta.json(描述信息)
+    + 可选的附加文件(例如导出的 TorchScript 推理模型)
+    - key 由 (策略类名, 策略参数, 特征schema, 训练数据指纹) 生成，任一项变化都会重新训练
+    - 模型文件的修改时间记录最近一次访问，超过 max_age_days 未访问的模型被淘汰
+    - 总大小超过 max_bytes 时按最近访问时间从旧到新淘汰
+    """
+
+    def __init__(
+        self,
+        base_dir: str = "data/models",
+        max_bytes: int = 2 * 1024 * 1024 * 1024,
+        max_age_days: Optional[float] = 30
+    ):
+        self.base_dir = base_dir
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.saves = 0
+        self.evictions = 0
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # 策略实例会被发送到子进程(走步训练的进程池)，锁不能序列化
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def data_fingerprint(X: np.ndarray, y: np.ndarray) -> str:
+        """训练数据(特征矩阵和标签)内容的哈希"""
+        h = hashlib.blake2b(digest_size=16)
+        for arr in (X, y):
+            arr = np.ascontiguousarray(arr)
+            h.update(f"{arr.dtype.str}{arr.shape}".encode())
+            h.update(arr.tobytes())
+        return h.hexdigest()
+
+    @staticmethod
+    def make_key(
+        strategy_name: str,
+        params: Dict[str, Any],
+        feature_schema: Sequence[Any],
+        data_fingerprint: str
+    ) -> str:
+        """生成模型key"""
+        payload = json.dumps(
+            [strategy_name, params, list(feature_schema), data_fingerprint],
+            sort_keys=True,
+            default=str
+        )
+        return f"{strategy_name}-{hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()}"
+
+    def _model_dir(self, key: str) -> str:
+        if not key or os.sep in key or key.startswith('.'):
+            raise ValueError(f"无效的模型key: {key}")
+        return os.path.join(self.base_dir, key)
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取模型状态，不存在或读取失败时返回None"""
+        path = os.path.join(self._model_dir(key), MODEL_FILE)
+        with self._lock:
+            if not os.path.exists(path):
+                self.misses += 1
+                return None
+            try:
+                with open(path, 'rb') as f:
+                    state = pickle.load(f)
+                # 修改时间作为最近访问时间
+                os.utime(path)
+                self.hits += 1
+                return state
+            except Exception as e:
+                logger.error(f"读取模型失败 {key}: {str(e)}")
+                self.misses += 1
+                return None
+
+    def save(self, key: str, state: Dict[str, Any], meta: Optional[Dict[str, Any]] = None) -> bool:
+        """保存模型状态和描述信息，先写临时目录再原子替换"""
+        model_dir = self._model_dir(key)
+        tmp_dir = f"{model_dir}.tmp-{os.getpid()}-{threading.get_ident()}"
+        try:
+            os.makedirs(tmp_dir, exist_ok=True)
+            with open(os.path.join(tmp_dir, MODEL_FILE), 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            meta = dict(meta or {})
+            meta['key'] = key
+            meta['created_at'] = time.time()
+            meta['size_bytes'] = os.path.getsize(os.path.join(tmp_dir, MODEL_FILE))
+            with open(os.path.join(tmp_dir, META_FILE), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False, default=str)
+
+            with self._lock:
+                if os.path.exists(model_dir):
+                    shutil.rmtree(model_dir)
+                os.replace(tmp_dir, model_dir)
+                self.saves += 1
+                self.evict()
+            return True
+        except Exception as e:
+            logger.error(f"保存模型失败 {key}: {str(e)}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return False
+
+    def _artifact_path(self, key: str, filename: str) -> str:
+        if not filename or os.sep in filename or filename.startswith('.') or filename in (MODEL_FILE, META_FILE):
+            raise ValueError(f"无效的文件名: {filename}")
+        return os.path.join(self._model_dir(key), filename)
+
+    def save_artifact(self, key: str, filename: str, data: bytes) -> bool:
+        """在已保存的模型目录中写入附加文件(例如导出的推理模型)，模型不存在时返回False"""
+        path = self._artifact_path(key, filename)
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with self._lock:
+            if not os.path.isdir(self._model_dir(key)):
+                return False
+            try:
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except Exception as e:
+                logger.error(f"保存模型文件失败 {key}/{filename}: {str(e)}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                return False
+            self.evict()
+        return True
+
+    def load_artifact(self, key: str, filename: str) -> Optional[bytes]:
+        """读取模型目录中的附加文件，不存在时返回None"""
+        path = self._artifact_path(key, filename)
+        with self._lock:
+            if not os.path.exists(path):
+                return None
+            try:
+                with open(path, 'rb') as f:
+                    return f.read()
+            except OSError as e:
+                logger.error(f"读取模型文件失败 {key}/{filename}: {str(e)}")
+                return None
+
+    def delete(self, key: str) -> bool:
+        """删除模型"""
+        model_dir = self._model_dir(key)
+        with self._lock:
+            if not os.path.isdir(model_dir):
+                return False
+            shutil.rmtree(model_dir)
+            return True
+
+    def _read_meta(self, key: str) -> Optional[Dict[str, Any]]:
+        model_dir = os.path.join(self.base_dir, key)
+        model_path = os.path.join(model_dir, MODEL_FILE)
+        try:
+            with open(os.path.join(model_dir, META_FILE), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            # 模型文件和附加文件的总大小(不含描述信息)
+            meta['size_bytes'] = sum(
+                entry.stat().st_size for entry in os.scandir(model_dir)
+                if entry.is_file() and entry.name != META_FILE
+            )
+            meta['last_access'] = os.path.getmtime(model_path)
+            return meta
+        except (OSError, ValueError):
+            return None
+
+    def list_models(self) -> List[Dict[str, Any]]:
+        """列出所有模型的描述信息，最近访问的在前"""
+        with self._lock:
+            if not os.path.isdir(self.base_dir):
+                return []
+            models = []
+            for key in os.listdir(self.base_dir):
+                if '.tmp-' in key:
+                    continue
+                meta = self._read_meta(key)
+                if meta is not None:
+                    models.append(meta)
+        models.sort(key=lambda m: m['last_access'], reverse=True)
+        return models
+
+    def evict(self, max_bytes: Optional[int] = None, max_age_days: Optional[float] = None) -> int:
+        """淘汰过期和超出容量的模型，返回淘汰的数量"""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        max_age_days = self.max_age_days if max_age_days is None else max_age_days
+        removed = 0
+        with self._lock:
+            models = self.list_models()
+            now = time.time()
+            total = sum(m['size_bytes'] for m in models)
+            # 从最久未访问的开始淘汰
+            for meta in reversed(models):
+                expired = max_age_days is not None and now - meta['last_access'] > max_age_days * 86400
+                if not expired and total <= max_bytes:
+                    continue
+                if self.delete(meta['key']):
+                    total -= meta['size_bytes']
+                    removed += 1
+            self.evictions += removed
+        if removed:
+            logger.info(f"模型仓库淘汰{removed}个模型")
+        return removed
+
+    def clear(self) -> int:
+        """删除所有模型"""
+        with self._lock:
+            models = self.list_models()
+            for meta in models:
+                self.delete(meta['key'])
+            return len(models)
+
+    def stats(self) -> Dict[str, Any]:
+        models = self.list_models()
+        lookups = self.hits + self.misses
+        return {
+            'models': len(models),
+            'total_bytes': sum(m['size_bytes'] for m in models),
+            'max_bytes': self.max_bytes,
+            'max_age_days': self.max_age_days,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'saves': self.saves,
+            'evictions': self.evictions
+        }
+
+
+# 全局模型仓库
+model_registry = ModelRegistry()
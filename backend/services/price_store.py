@@ -0,0 +1,264 @@
+import os
+import re
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows 上只使用进程内的锁
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DateLike = Union[str, pd.Timestamp, None]
+
+# 股票代码: 字母、数字(含中文名称)及 . - ^ = ，不能包含路径分隔符
+SYMBOL_PATTERN = re.compile(r'^[\w^][\w.\-^=]{0,31}$')
+
+# 分区文件格式: Arrow IPC 可内存映射零拷贝读取，Parquet 压缩率更高
+FILE_FORMATS = {
+    'arrow': '.arrow',
+    'parquet': '.parquet',
+}
+
+
+class PriceStore:
+    """按 股票/年份 分区的列式OHLCV行情存储
+
+    目录结构: {base_dir}/{symbol}/{year}.arrow (或 .parquet)
+    - 价格列(Open/High/Low/Close)使用 price_dtype(默认float64，可选float32)
+    - 成交量及其他数值列使用float64
+    - 日期索引统一存为交易所本地时间(去掉时区)，按年份分区以便日期范围裁剪
+    """
+    PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+    INDEX_COLUMN = 'Date'
+    # 分区 -> 写入锁，同一分区的读取-合并-写入串行执行
+    _partition_locks: Dict[str, threading.Lock] = {}
+    _partition_locks_guard = threading.Lock()
+
+    def __init__(
+        self,
+        base_dir: str = "data/store",
+        price_dtype: str = 'float64',
+        file_format: str = 'arrow'
+    ):
+        if file_format not in FILE_FORMATS:
+            raise ValueError(f"不支持的存储格式: {file_format}")
+        self.base_dir = base_dir
+        self.price_dtype = np.dtype(price_dtype)
+        self.file_format = file_format
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    def _symbol_dir(self, symbol: str) -> str:
+        """股票的分区目录，只允许存储根目录下的一级目录"""
+        if not isinstance(symbol, str) or not SYMBOL_PATTERN.match(symbol):
+            raise ValueError(f"不合法的股票代码: {symbol}")
+        base_dir = os.path.realpath(self.base_dir)
+        path = os.path.realpath(os.path.join(base_dir, symbol))
+        if os.path.dirname(path) != base_dir:
+            raise ValueError(f"不合法的股票代码: {symbol}")
+        return path
+
+    def _partition_path(self, symbol: str, year: int, file_format: Optional[str] = None) -> str:
+        ext = FILE_FORMATS[file_format or self.file_format]
+        return os.path.join(self._symbol_dir(symbol), f"{year}{ext}")
+
+    @contextmanager
+    def _partition_lock(self, symbol: str, year: int):
+        """同一年份分区的写入互斥
+
+        进程内按分区使用线程锁；跨进程对股票目录加文件锁(不在目录中生成额外的锁文件)。
+        """
+        symbol_dir = self._symbol_dir(symbol)
+        key = os.path.join(symbol_dir, str(year))
+        with self._partition_locks_guard:
+            lock = self._partition_locks.setdefault(key, threading.Lock())
+        with lock:
+            if fcntl is None:
+                yield
+                return
+            fd = os.open(symbol_dir, os.O_RDONLY)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                os.close(fd)
+
+    def _normalize(self, data: pd.DataFrame) -> pd.DataFrame:
+        """统一索引和列类型"""
+        df = data.copy()
+        index = pd.DatetimeIndex(pd.to_datetime(df.index))
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        df.index = index.astype('datetime64[ns]')
+        df.index.name = self.INDEX_COLUMN
+
+        df = df.select_dtypes(include='number')
+        for col in df.columns:
+            dtype = self.price_dtype if col in self.PRICE_COLUMNS else np.float64
+            df[col] = df[col].astype(dtype)
+
+        df = df[~df.index.duplicated(keep='last')]
+        return df.sort_index()
+
+    def _read_partition(self, path: str) -> pa.Table:
+        if path.endswith(FILE_FORMATS['parquet']):
+            return pq.ParquetFile(path).read()
+        return feather.read_table(path, memory_map=True)
+
+    def _write_partition(self, table: pa.Table, path: str):
+        """先写临时文件再原子替换，避免读到写了一半的分区"""
+        # 临时文件名包含进程和线程号，并发写同一分区时互不覆盖
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        try:
+            if path.endswith(FILE_FORMATS['parquet']):
+                pq.write_table(table, tmp_path)
+            else:
+                feather.write_feather(table, tmp_path, compression='uncompressed')
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def write(self, symbol: str, data: pd.DataFrame) -> int:
+        """写入行情数据，按日期与已有数据合并(相同日期以新数据为准)"""
+        if data is None or data.empty:
+            return 0
+
+        df = self._normalize(data)
+        os.makedirs(self._symbol_dir(symbol), exist_ok=True)
+
+        for year, part in df.groupby(df.index.year):
+            with self._partition_lock(symbol, int(year)):
+                self._merge_partition(symbol, int(year), part)
+
+        return len(df)
+
+    def _merge_partition(self, symbol: str, year: int, part: pd.DataFrame):
+        """与同年份已有的分区(任意格式)合并后重写"""
+        path = self._partition_path(symbol, year)
+        existing_paths = [
+            self._partition_path(symbol, year, file_format)
+            for file_format in FILE_FORMATS
+        ]
+        existing_paths = [p for p in existing_paths if os.path.exists(p)]
+        if existing_paths:
+            existing = pd.concat([
+                self._read_partition(p).to_pandas().set_index(self.INDEX_COLUMN)
+                for p in existing_paths
+            ])
+            part = self._normalize(pd.concat([existing, part]))
+
+        table = pa.Table.from_pandas(part.reset_index(), preserve_index=False)
+        self._write_partition(table, path)
+        # 格式变更后删除旧格式的同年分区
+        for old_path in existing_paths:
+            if old_path != path:
+                os.remove(old_path)
+
+    def _partition_files(self, symbol: str, start: DateLike = None, end: DateLike = None) -> List[str]:
+        """列出与日期范围相交的年份分区"""
+        start_year = pd.Timestamp(start).year if start is not None else None
+        end_year = pd.Timestamp(end).year if end is not None else None
+
+        symbol_dir = self._symbol_dir(symbol)
+        if not os.path.isdir(symbol_dir):
+            return []
+
+        files = []
+        for name in os.listdir(symbol_dir):
+            stem, ext = os.path.splitext(name)
+            if ext not in FILE_FORMATS.values() or not stem.isdigit():
+                continue
+            year = int(stem)
+            if start_year is not None and year < start_year:
+                continue
+            if end_year is not None and year > end_year:
+                continue
+            files.append(os.path.join(symbol_dir, name))
+        return sorted(files)
+
+    def read(
+        self,
+        symbol: str,
+        start: DateLike = None,
+        end: DateLike = None,
+        columns: Optional[List[str]] = None
+    ) -> Optional[pd.DataFrame]:
+        """读取行情数据
+
+        :param start: 起始日期(包含)
+        :param end: 结束日期(不包含，与yfinance的end语义一致)
+        :param columns: 只读取指定列
+        """
+        files = self._partition_files(symbol, start, end)
+        if not files:
+            return None
+
+        tables = []
+        for path in files:
+            table = self._read_partition(path)
+            if columns is not None:
+                table = table.select(
+                    [self.INDEX_COLUMN] + [c for c in columns if c in table.column_names]
+                )
+            tables.append(table)
+        # 不同年份的分区可能包含不同的列(例如早期只有收盘价)或精度，缺失列补空值
+        table = pa.concat_tables(tables, promote_options='permissive')
+
+        # 年份裁剪之后，只需在首尾分区内按日期过滤
+        date = table.column(self.INDEX_COLUMN)
+        mask = None
+        if start is not None:
+            mask = pc.greater_equal(date, pa.scalar(pd.Timestamp(start), type=date.type))
+        if end is not None:
+            upper = pc.less(date, pa.scalar(pd.Timestamp(end), type=date.type))
+            mask = upper if mask is None else pc.and_(mask, upper)
+        if mask is not None:
+            table = table.filter(mask)
+
+        return table.to_pandas().set_index(self.INDEX_COLUMN).sort_index()
+
+    def read_many(
+        self,
+        symbols: List[str],
+        start: DateLike = None,
+        end: DateLike = None,
+        columns: Optional[List[str]] = None,
+        max_workers: int = 8
+    ) -> Dict[str, pd.DataFrame]:
+        """并行读取多只股票的行情数据"""
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            frames = executor.map(lambda s: self.read(s, start, end, columns), symbols)
+            return {
+                symbol: df
+                for symbol, df in zip(symbols, frames)
+                if df is not None
+            }
+
+    def symbols(self) -> List[str]:
+        """列出存储中的全部股票"""
+        return sorted(
+            name for name in os.listdir(self.base_dir)
+            if os.path.isdir(os.path.join(self.base_dir, name))
+        )
+
+    def exists(self, symbol: str) -> bool:
+        return bool(self._partition_files(symbol))
+
+    def delete(self, symbol: str) -> bool:
+        """删除某只股票的全部分区"""
+        existed = os.path.isdir(self._symbol_dir(symbol))
+        if existed:
+            shutil.rmtree(self._symbol_dir(symbol))
+        return existed
@@ -0,0 +1,247 @@
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional
+from collections import deque
+import asyncio
+import os
+import time
+import numpy as np
+import pandas as pd
+from backend.models.strategies.base import BaseStrategy, Bar
+from backend.services.price_store import SYMBOL_PATTERN
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 队列结束标记
+_END = None
+
+# 默认的回放数据目录
+STOCK_DATA_DIR = "data/stocks"
+
+
+class LatencyStats:
+    """逐K线处理延迟统计(微秒)，分位数基于最近 max_samples 个样本"""
+
+    def __init__(self, max_samples: int = 100000):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self._samples: Deque[int] = deque(maxlen=max_samples)
+
+    def record(self, elapsed_ns: int):
+        self.count += 1
+        self.total_ns += elapsed_ns
+        self.max_ns = max(self.max_ns, elapsed_ns)
+        self._samples.append(elapsed_ns)
+
+    def summary(self) -> Dict[str, float]:
+        if not self.count:
+            return {'count': 0, 'mean_us': 0.0, 'p50_us': 0.0, 'p99_us': 0.0, 'max_us': 0.0}
+        p50, p99 = np.percentile(np.fromiter(self._samples, dtype=np.int64), [50, 99])
+        return {
+            'count': self.count,
+            'mean_us': self.total_ns / self.count / 1000,
+            'p50_us': float(p50) / 1000,
+            'p99_us': float(p99) / 1000,
+            'max_us': self.max_ns / 1000,
+        }
+
+
+class CSVReplaySource:
+    """按时间顺序回放本地CSV行情(默认 data/stocks/*.csv)，用于驱动和测试实时运行时
+
+    文件只有收盘价时，开盘/最高/最低价用收盘价代替。多只股票按时间合并后依次输出。
+    股票代码在创建时校验，不合法或解析后的路径不在数据目录内时抛出 ValueError。
+    """
+
+    def __init__(
+        self,
+        data_dir: str = STOCK_DATA_DIR,
+        symbols: Optional[List[str]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        delay: float = 0.0
+    ):
+        self.data_dir = data_dir
+        if symbols is not None:
+            if not isinstance(symbols, list):
+                raise ValueError("股票列表必须是数组")
+            for symbol in symbols:
+                self._symbol_path(symbol)
+        self.symbols = symbols
+        self.start_date = start_date
+        self.end_date = end_date
+        # 每根K线之间的等待秒数，0表示尽快回放
+        self.delay = delay
+
+    def _list_symbols(self) -> List[str]:
+        if self.symbols:
+            return list(self.symbols)
+        return sorted(
+            name[:-len('.csv')] for name in os.listdir(self.data_dir) if name.endswith('.csv')
+        )
+
+    def _symbol_path(self, symbol: str) -> str:
+        """股票对应的CSV路径，只允许数据目录内的文件"""
+        if not isinstance(symbol, str) or not SYMBOL_PATTERN.match(symbol):
+            raise ValueError(f"不合法的股票代码: {symbol}")
+        base_dir = os.path.realpath(self.data_dir)
+        path = os.path.realpath(os.path.join(base_dir, f"{symbol}.csv"))
+        if os.path.dirname(path) != base_dir:
+            raise ValueError(f"不合法的股票代码: {symbol}")
+        return path
+
+    def _load(self, symbol: str) -> pd.DataFrame:
+        path = self._symbol_path(symbol)
+        df = pd.read_csv(path, index_col=0)
+        if df.empty or 'Close' not in df.columns:
+            return pd.DataFrame()
+        df.index = pd.to_datetime(df.index, utc=True).tz_localize(None)
+        for column in ('Open', 'High', 'Low'):
+            if column not in df.columns:
+                df[column] = df['Close']
+        if 'Volume' not in df.columns:
+            df['Volume'] = 0.0
+        if self.start_date:
+            df = df[df.index >= pd.Timestamp(self.start_date)]
+        if self.end_date:
+            df = df[df.index < pd.Timestamp(self.end_date)]
+        return df.dropna(subset=['Close'])
+
+    def load_bars(self) -> List[Bar]:
+        """读取全部K线并按 (时间, 股票) 排序"""
+        frames = []
+        for symbol in self._list_symbols():
+            try:
+                df = self._load(symbol)
+            except Exception as e:
+                logger.error(f"读取回放数据失败 {symbol}: {str(e)}")
+                continue
+            if df.empty:
+                logger.warning(f"回放数据为空，跳过: {symbol}")
+                continue
+            frames.append(df[['Open', 'High', 'Low', 'Close', 'Volume']].assign(Symbol=symbol))
+
+        if not frames:
+            return []
+        data = pd.concat(frames).rename_axis('Date').reset_index()
+        data = data.sort_values(['Date', 'Symbol'], kind='stable')
+        return [
+            Bar(row[0], row[1], row[2], row[3], row[4], row[5], row[6])
+            for row in data[['Date', 'Open', 'High', 'Low', 'Close', 'Volume', 'Symbol']].itertuples(
+                index=False, name=None
+            )
+        ]
+
+    async def __aiter__(self) -> AsyncIterator[Bar]:
+        for bar in self.load_bars():
+            yield bar
+            await asyncio.sleep(self.delay)
+
+
+class StreamingRuntime:
+    """事件驱动的实时策略运行时
+
+    K线通过异步队列送入，每只股票拥有独立的策略实例，逐根调用 on_bar 并记录处理延迟。
+    支持增量计算的策略(均线、布林带、MACD、通道突破)每根K线为O(1)。
+    """
+
+    def __init__(
+        self,
+        strategies: Dict[str, Callable[[], BaseStrategy]],
+        queue_size: int = 1024,
+        emit_all: bool = False
+    ):
+        """
+        :param strategies: 策略标识 -> 创建策略实例的函数
+        :param emit_all: 是否为没有信号(信号为0)的K线也输出事件
+        """
+        self.strategy_builders = strategies
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.emit_all = emit_all
+        self._instances: Dict[str, Dict[str, BaseStrategy]] = {}
+        self.latency: Dict[str, LatencyStats] = {name: LatencyStats() for name in strategies}
+        self.bar_latency = LatencyStats()
+        self.bars_processed = 0
+
+    def _strategies_for(self, symbol: str) -> Dict[str, BaseStrategy]:
+        instances = self._instances.get(symbol)
+        if instances is None:
+            instances = {name: build() for name, build in self.strategy_builders.items()}
+            self._instances[symbol] = instances
+        return instances
+
+    async def publish(self, bar: Bar):
+        """送入一根K线(队列满时等待)"""
+        await self.queue.put(bar)
+
+    async def close(self):
+        """通知运行时输入结束"""
+        await self.queue.put(_END)
+
+    def process_bar(self, bar: Bar) -> List[Dict[str, Any]]:
+        """把一根K线交给该股票的所有策略，返回信号事件"""
+        events = []
+        bar_start = time.perf_counter_ns()
+        for name, strategy in self._strategies_for(bar.symbol).items():
+            start = time.perf_counter_ns()
+            signal = strategy.on_bar(bar)
+            elapsed = time.perf_counter_ns() - start
+            self.latency[name].record(elapsed)
+            if signal != 0 or self.emit_all:
+                events.append({
+                    'type': 'signal',
+                    'symbol': bar.symbol,
+                    'time': pd.Timestamp(bar.time).isoformat(),
+                    'strategy': name,
+                    'signal': int(signal),
+                    'close': float(bar.close),
+                    'latency_us': elapsed / 1000
+                })
+        self.bar_latency.record(time.perf_counter_ns() - bar_start)
+        self.bars_processed += 1
+        return events
+
+    async def events(self) -> AsyncIterator[Dict[str, Any]]:
+        """消费队列中的K线直到收到结束标记，依次输出信号事件"""
+        while True:
+            bar = await self.queue.get()
+            if bar is _END:
+                break
+            for event in self.process_bar(bar):
+                yield event
+
+    async def run(self, source: AsyncIterator[Bar]) -> AsyncIterator[Dict[str, Any]]:
+        """从数据源读取K线送入队列并处理，结束时输出延迟统计"""
+
+        async def produce():
+            try:
+                async for bar in source:
+                    await self.publish(bar)
+            except Exception as e:
+                logger.error(f"行情输入失败: {str(e)}")
+            finally:
+                await self.close()
+
+        producer = asyncio.create_task(produce())
+        try:
+            async for event in self.events():
+                yield event
+        finally:
+            if not producer.done():
+                producer.cancel()
+        yield {'type': 'summary', **self.stats()}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'bars': self.bars_processed,
+            'symbols': len(self._instances),
+            'bar_latency': self.bar_latency.summary(),
+            'strategy_latency': {name: stats.summary() for name, stats in self.latency.items()},
+        }
+
+    def reset(self):
+        """清空所有策略的逐K线状态和统计"""
+        self._instances.clear()
+        self.latency = {name: LatencyStats() for name in self.strategy_builders}
+        self.bar_latency = LatencyStats()
+        self.bars_processed = 0
@@ -0,0 +1,292 @@
+from typing import Dict, Any, List, Optional, Callable
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import itertools
+import os
+import numpy as np
+import pandas as pd
+from backend.models.strategies.validators import (
+    get_param_ranges,
+    get_param_types,
+    validate_strategy_params
+)
+from backend.models.strategies.indicators.moving_average import MovingAverageStrategy
+from backend.models.strategies.indicators.bollinger_bands import BollingerBandsStrategy
+from backend.models.strategies.indicators.macd import MACDStrategy
+from backend.models.indicators.engine import indicator_engine, fingerprint
+from backend.services.backtest_service import BacktestService
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 单次扫描的组合数上限(过滤约束前)，防止一个请求生成和评估无限多的组合
+MAX_COMBOS = 10000
+
+# 参数之间的约束条件，不满足的组合在扫描前被剔除
+PARAM_CONSTRAINTS: Dict[str, Callable[[Dict[str, Any]], bool]] = {
+    'moving_average': lambda p: p['short_window'] < p['long_window'],
+    'macd': lambda p: p['fast_period'] < p['slow_period'],
+}
+
+
+def _moving_average_signals(df: pd.DataFrame, key: str, params: Dict[str, Any]) -> np.ndarray:
+    if len(df) < params['long_window']:
+        return np.zeros(len(df), dtype=np.int64)
+    return MovingAverageStrategy.crossover_signals(
+        indicator_engine.sma(df['Close'], int(params['short_window']), min_periods=1, key=key).values,
+        indicator_engine.sma(df['Close'], int(params['long_window']), min_periods=1, key=key).values
+    )
+
+
+def _bollinger_signals(df: pd.DataFrame, key: str, params: Dict[str, Any]) -> np.ndarray:
+    window = int(params['window'])
+    if len(df) < window:
+        return np.zeros(len(df), dtype=np.int64)
+    upper, _, lower = indicator_engine.bollinger_bands(
+        df['Close'], window, float(params['num_std']), min_periods=1, key=key
+    )
+    return BollingerBandsStrategy.band_signals(df['Close'].values, upper.values, lower.values)
+
+
+def _macd_signals(df: pd.DataFrame, key: str, params: Dict[str, Any]) -> np.ndarray:
+    _, _, histogram = indicator_engine.macd(
+        df['Close'],
+        params['fast_period'],
+        params['slow_period'],
+        params['signal_period'],
+        key=key
+    )
+    return MACDStrategy.histogram_signals(histogram.values)
+
+
+# 支持共享中间结果的策略信号构造函数，其他策略回退到 StrategyFactory 逐个生成
+SHARED_SIGNAL_BUILDERS = {
+    'moving_average': _moving_average_signals,
+    'bollinger_bands': _bollinger_signals,
+    'macd': _macd_signals,
+}
+
+
+def _evaluate_chunk(
+    df: pd.DataFrame,
+    strategy_name: str,
+    combos: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """评估一批参数组合(进程池任务入口)"""
+    service = BacktestService()
+    # 收盘价指纹只计算一次，同一窗口/周期的指标由指标引擎在组合之间共享
+    key = fingerprint(df['Close'])
+    builder = SHARED_SIGNAL_BUILDERS.get(strategy_name)
+
+    rows = []
+    for params in combos:
+        try:
+            if builder is not None:
+                signals = builder(df, key, params)
+            else:
+                strategy = service.strategy_factory.create_strategy(strategy_name, **params)
+                signals = strategy.generate_signals(df)
+            metrics = service._evaluate_signals(df, signals)[-1]
+            rows.append({**params, **metrics})
+        except Exception as e:
+            logger.error(f"参数组合评估失败 {params}: {str(e)}")
+    return rows
+
+
+class SweepService:
+    def __init__(self, max_workers: Optional[int] = None):
+        self.backtest_service = BacktestService()
+        self.max_workers = max_workers
+
+    @staticmethod
+    def check_limits(
+        strategy_name: str,
+        mode: str = 'grid',
+        grid: Optional[Dict[str, List[Any]]] = None,
+        points: int = 10,
+        n_samples: int = 100
+    ) -> int:
+        """在生成组合之前检查组合数不超过 MAX_COMBOS，返回组合数的上界"""
+        if mode == 'grid':
+            grid = grid or {}
+            if not isinstance(grid, dict) or not all(isinstance(v, list) for v in grid.values()):
+                raise ValueError("网格必须是 参数 -> 取值列表")
+            if int(points) < 1:
+                raise ValueError(f"points 必须大于0: {points}")
+            total = 1
+            for param in get_param_ranges(strategy_name):
+                total *= len(grid[param]) if param in grid else int(points)
+                if total > MAX_COMBOS:
+                    break
+        elif mode == 'random':
+            total = int(n_samples)
+            if total < 1:
+                raise ValueError(f"nSamples 必须大于0: {n_samples}")
+        else:
+            raise ValueError(f"不支持的扫描模式: {mode}")
+        if total > MAX_COMBOS:
+            raise ValueError(f"参数组合数超过上限 {MAX_COMBOS}")
+        return total
+
+    def expand_grid(
+        self,
+        strategy_name: str,
+        grid: Optional[Dict[str, List[Any]]] = None,
+        points: int = 10
+    ) -> List[Dict[str, Any]]:
+        """展开参数网格
+
+        grid 中指定的参数使用给定的取值，其余参数在取值范围内均匀取 points 个点
+        (整数参数去重)。
+        """
+        self.check_limits(strategy_name, 'grid', grid, points)
+        grid = grid or {}
+        ranges = get_param_ranges(strategy_name)
+        types = get_param_types(strategy_name)
+
+        axes = {}
+        for param, (low, high) in ranges.items():
+            if param in grid:
+                axes[param] = list(grid[param])
+            elif types[param] is int:
+                axes[param] = sorted(set(np.linspace(low, high, points).round().astype(int).tolist()))
+            else:
+                axes[param] = np.linspace(low, high, points).round(6).tolist()
+
+        names = list(axes)
+        combos = [dict(zip(names, values)) for values in itertools.product(*axes.values())]
+        return self._filter_combos(strategy_name, combos)
+
+    def random_samples(
+        self,
+        strategy_name: str,
+        n_samples: int,
+        seed: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """在参数取值范围内随机采样"""
+        self.check_limits(strategy_name, 'random', n_samples=n_samples)
+        rng = np.random.default_rng(seed)
+        ranges = get_param_ranges(strategy_name)
+        types = get_param_types(strategy_name)
+
+        samples = {}
+        for param, (low, high) in ranges.items():
+            if types[param] is int:
+                samples[param] = rng.integers(low, high + 1, size=n_samples).tolist()
+            else:
+                samples[param] = rng.uniform(low, high, size=n_samples).round(6).tolist()
+
+        combos = [
+            {param: samples[param][i] for param in ranges}
+            for i in range(n_samples)
+        ]
+        # 去重后再过滤约束
+        unique = list({tuple(sorted(c.items())): c for c in combos}.values())
+        return self._filter_combos(strategy_name, unique)
+
+    def _filter_combos(self, strategy_name: str, combos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """剔除超出范围或不满足约束的组合"""
+        constraint = PARAM_CONSTRAINTS.get(strategy_name)
+        valid = []
+        for combo in combos:
+            try:
+                params = validate_strategy_params(strategy_name, combo)
+            except ValueError:
+                continue
+            if constraint is None or constraint(params):
+                valid.append(params)
+        return valid
+
+    def sweep(
+        self,
+        df: pd.DataFrame,
+        strategy_name: str,
+        combos: List[Dict[str, Any]],
+        metric: str = 'sharpe_ratio',
+        max_workers: Optional[int] = None
+    ) -> pd.DataFrame:
+        """在同一份行情数据上并行评估所有参数组合，返回按指标排序的结果表"""
+        if not combos:
+            raise ValueError("没有有效的参数组合")
+
+        # 并行进程数不超过CPU核数和组合数
+        cpu_count = os.cpu_count() or 1
+        workers = min(max_workers or self.max_workers or cpu_count, cpu_count)
+        workers = max(1, min(workers, len(combos)))
+
+        # 组合排序后按连续区间分片，使同一分片内的窗口尽量重叠以复用中间结果
+        combos = sorted(combos, key=lambda c: tuple(c.values()))
+        chunk_size = int(np.ceil(len(combos) / workers))
+        chunks = [combos[i:i + chunk_size] for i in range(0, len(combos), chunk_size)]
+        logger.info(f"开始参数扫描: {strategy_name}, {len(combos)}个组合, 进程数={workers}")
+
+        if workers == 1:
+            rows = _evaluate_chunk(df, strategy_name, combos)
+        else:
+            rows = []
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for chunk_rows in executor.map(
+                    _evaluate_chunk,
+                    itertools.repeat(df),
+                    itertools.repeat(strategy_name),
+                    chunks
+                ):
+                    rows.extend(chunk_rows)
+
+        table = pd.DataFrame(rows)
+        if table.empty:
+            return table
+        return table.sort_values(metric, ascending=False, kind='stable').reset_index(drop=True)
+
+    async def run_sweep(
+        self,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        strategy_name: str,
+        mode: str = 'grid',
+        grid: Optional[Dict[str, List[Any]]] = None,
+        points: int = 10,
+        n_samples: int = 100,
+        seed: Optional[int] = None,
+        metric: str = 'sharpe_ratio',
+        top_n: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """加载行情并执行参数扫描，返回列式排名表
+
+        加载行情和扫描都是同步计算，在线程池中运行，不阻塞事件循环。
+        """
+        try:
+            self.check_limits(strategy_name, mode, grid, points, n_samples)
+            loop = asyncio.get_running_loop()
+            df = await loop.run_in_executor(
+                None, self.backtest_service._load_price_data, symbol, start_date, end_date
+            )
+
+            if mode == 'grid':
+                combos = self.expand_grid(strategy_name, grid, points)
+            elif mode == 'random':
+                combos = self.random_samples(strategy_name, n_samples, seed)
+            else:
+                raise ValueError(f"不支持的扫描模式: {mode}")
+
+            table = await loop.run_in_executor(None, self.sweep, df, strategy_name, combos, metric)
+            if top_n:
+                table = table.head(top_n)
+
+            return {
+                'symbol': symbol,
+                'strategy': strategy_name,
+                'metric': metric,
+                'total_combos': len(combos),
+                'columns': list(table.columns),
+                'data': {
+                    col: [self.backtest_service._safe_float(v) if isinstance(v, float) else v
+                          for v in table[col].tolist()]
+                    for col in table.columns
+                }
+            }
+
+        except Exception as e:
+            logger.error(f"参数扫描失败: {str(e)}")
+            raise
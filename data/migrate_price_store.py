@@ -0,0 +1,62 @@
+"""将 data/stocks/*.csv 与 data/raw/*.csv 迁移到列式行情存储
+
+在项目根目录运行:
+
+    python -m data.migrate_price_store --store data/store
+"""
+import argparse
+import glob
+import os
+import pandas as pd
+from backend.services.price_store import PriceStore, FILE_FORMATS
+
+
+def migrate_stock_files(store: PriceStore, stocks_dir: str = 'data/stocks') -> dict:
+    """迁移按股票保存的CSV文件(每个文件一只股票，列为OHLCV)"""
+    migrated = {}
+    for path in sorted(glob.glob(os.path.join(stocks_dir, '*.csv'))):
+        symbol = os.path.splitext(os.path.basename(path))[0]
+        try:
+            df = pd.read_csv(path, index_col=0, parse_dates=True)
+            if df.empty:
+                continue
+            migrated[symbol] = store.write(symbol, df)
+        except Exception as e:
+            print(f"迁移{path}失败: {str(e)}")
+    return migrated
+
+
+def migrate_wide_files(store: PriceStore, raw_dir: str = 'data/raw') -> dict:
+    """迁移宽表CSV文件(日期为索引，每列为一只股票的收盘价)"""
+    migrated = {}
+    for path in sorted(glob.glob(os.path.join(raw_dir, '*.csv'))):
+        try:
+            df = pd.read_csv(path, index_col=0, parse_dates=True)
+            for symbol in df.columns:
+                close = df[[symbol]].dropna()
+                close.columns = ['Close']
+                rows = store.write(str(symbol), close)
+                migrated[str(symbol)] = migrated.get(str(symbol), 0) + rows
+        except Exception as e:
+            print(f"迁移{path}失败: {str(e)}")
+    return migrated
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='将CSV行情数据迁移到列式存储')
+    parser.add_argument('--store', default='data/store')
+    parser.add_argument('--stocks-dir', default='data/stocks')
+    parser.add_argument('--raw-dir', default='data/raw')
+    parser.add_argument('--price-dtype', default='float64', choices=['float32', 'float64'])
+    parser.add_argument('--format', default='arrow', choices=list(FILE_FORMATS))
+    args = parser.parse_args()
+
+    store = PriceStore(args.store, price_dtype=args.price_dtype, file_format=args.format)
+    # 先迁移宽表，再用按股票保存的文件覆盖同名股票的重叠日期
+    results = migrate_wide_files(store, args.raw_dir)
+    for symbol, rows in migrate_stock_files(store, args.stocks_dir).items():
+        results[symbol] = results.get(symbol, 0) + rows
+
+    print(f"迁移完成: {len(results)}只股票")
+    for symbol, rows in sorted(results.items()):
+        print(f"  {symbol}: {rows}行")
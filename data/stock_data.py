@@ -5,6 +5,8 @@ from typing import List, Tuple, Dict
 from datetime import datetime, timedelta
 import os
 import json
+from backend.services.price_store import PriceStore
+from backend.services.data_fetcher import IncrementalDataFetcher
 
 class StockDataManager:
     def __init__(self, symbols: List[str]):
@@ -14,6 +16,8 @@ class StockDataManager:
         self.stats = {}
         self.data_dir = 'data/stocks'
         self.cache_dir = 'data/cache'
+        self.price_store = PriceStore('data/store')
+        self.fetcher = IncrementalDataFetcher(self.price_store)
         
         # 创建必要的目录
         os.makedirs(self.data_dir, exist_ok=True)
@@ -29,18 +33,21 @@ class StockDataManager:
         
     def _load_cached_data(self, symbol: str) -> Tuple[pd.Series, datetime]:
         """加载缓存的股票数据"""
-        cache_path = self._get_cache_path(symbol)
-        if os.path.exists(cache_path):
-            try:
-                df = pd.read_csv(cache_path, index_col=0, parse_dates=True)
-                if not df.empty:
-                    return df['Close'], pd.to_datetime(df.index[-1])
-            except Exception as e:
-                print(f"加载缓存数据失败 {symbol}: {str(e)}")
+        try:
+            df = self.price_store.read(symbol, columns=['Close'])
+            if df is None:
+                # 尚未迁移到列式存储的旧CSV缓存
+                cache_path = self._get_cache_path(symbol)
+                if os.path.exists(cache_path):
+                    df = pd.read_csv(cache_path, index_col=0, parse_dates=True)
+            if df is not None and not df.empty:
+                return df['Close'], pd.to_datetime(df.index[-1])
+        except Exception as e:
+            print(f"加载缓存数据失败 {symbol}: {str(e)}")
         return None, None
         
     def fetch_data(self, start_date: str, end_date: str = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
-        """获取股票历史数据，支持增量更新"""
+        """获取股票历史数据，支持增量更新(只下载本地存储中缺失的日期区间)"""
         if end_date is None:
             end_date = datetime.now().strftime('%Y-%m-%d')
             
@@ -50,53 +57,38 @@ class StockDataManager:
         dfs = []
         failed_symbols = []
         
-        # 使用yfinance的批量下载功能
-        try:
-            data = yf.download(
-                self.symbols,
-                start=start_date.strftime('%Y-%m-%d'),
-                end=end_date.strftime('%Y-%m-%d'),
-                group_by='ticker',
-                auto_adjust=True  # 自动调整价格
-            )
-            
-            # 处理单个股票和多个股票的情况
-            if len(self.symbols) == 1:
-                if 'Close' in data.columns:
-                    prices = pd.DataFrame(data['Close'])
-                    prices.columns = self.symbols
-                    dfs.append(prices)
-            else:
-                for symbol in self.symbols:
-                    if (symbol, 'Close') in data.columns:
-                        prices = data[symbol]['Close']
-                        prices.name = symbol
-                        dfs.append(prices)
-                    else:
-                        failed_symbols.append(symbol)
-                        
-            # 获取基本面数据
-            for symbol in self.symbols:
-                if symbol not in failed_symbols:
-                    try:
-                        stock = yf.Ticker(symbol)
-                        info = stock.info
-                        self.stats[symbol] = {
-                            'name': info.get('longName', symbol),
-                            'sector': info.get('sector', 'Unknown'),
-                            'industry': info.get('industry', 'Unknown'),
-                            'market_cap': info.get('marketCap', 0),
-                            'pe_ratio': info.get('forwardPE', 0),
-                            'dividend_yield': info.get('dividendYield', 0),
-                            'last_updated': datetime.now().strftime('%Y-%m-%d')
-                        }
-                        self._save_metadata(symbol, self.stats[symbol])
-                    except Exception as e:
-                        print(f"获取{symbol}元数据失败: {str(e)}")
-                        
-        except Exception as e:
-            print(f"批量下载数据失败: {str(e)}")
-            return self._fallback_download(start_date, end_date)
+        for symbol in self.symbols:
+            try:
+                data = self.fetcher.get(symbol, start_date, end_date, columns=['Close'])
+                if data.empty:
+                    failed_symbols.append(symbol)
+                    continue
+                    
+                prices = data['Close']
+                prices.name = symbol
+                dfs.append(prices)
+            except Exception as e:
+                print(f"获取{symbol}数据失败: {str(e)}")
+                failed_symbols.append(symbol)
+                
+        # 获取基本面数据
+        for symbol in self.symbols:
+            if symbol not in failed_symbols:
+                try:
+                    stock = yf.Ticker(symbol)
+                    info = stock.info
+                    self.stats[symbol] = {
+                        'name': info.get('longName', symbol),
+                        'sector': info.get('sector', 'Unknown'),
+                        'industry': info.get('industry', 'Unknown'),
+                        'market_cap': info.get('marketCap', 0),
+                        'pe_ratio': info.get('forwardPE', 0),
+                        'dividend_yield': info.get('dividendYield', 0),
+                        'last_updated': datetime.now().strftime('%Y-%m-%d')
+                    }
+                    self._save_metadata(symbol, self.stats[symbol])
+                except Exception as e:
+                    print(f"获取{symbol}元数据失败: {str(e)}")
         
         if not dfs:
             raise ValueError(f"没有成功获取任何股票数据。失败的股票代码: {', '.join(failed_symbols)}")
@@ -113,53 +105,14 @@ class StockDataManager:
             
         self.returns = self.prices.pct_change().dropna()
         
-        # 保存数据到缓存
-        for symbol in self.symbols:
-            if symbol not in failed_symbols:
-                symbol_data = self.prices[symbol].to_frame()
-                symbol_data.columns = ['Close']
-                self._save_data_to_cache(symbol, symbol_data)
-        
         return self.prices, self.returns
     
-    def _fallback_download(self, start_date: datetime, end_date: datetime) -> Tuple[pd.DataFrame, pd.DataFrame]:
-        """备用的单个下载方法"""
-        dfs = []
-        failed_symbols = []
-        
-        for symbol in self.symbols:
-            try:
-                stock = yf.Ticker(symbol)
-                hist = stock.history(
-                    start=start_date.strftime('%Y-%m-%d'),
-                    end=end_date.strftime('%Y-%m-%d'),
-                    auto_adjust=True
-                )
-                
-                if hist.empty:
-                    failed_symbols.append(symbol)
-                    continue
-                    
-                prices = hist['Close']
-                prices.name = symbol
-                dfs.append(prices)
-                
-                # 保存数据到缓存
-                self._save_data_to_cache(symbol, hist[['Close']])
-                
-            except Exception as e:
-                print(f"获取{symbol}数据失败: {str(e)}")
-                failed_symbols.append(symbol)
-                
-        if not dfs:
-            raise ValueError(f"没有成功获取任何股票数据。失败的股票代码: {', '.join(failed_symbols)}")
-            
-        return pd.concat(dfs, axis=1), pd.concat(dfs, axis=1).pct_change().dropna()
-    
     def _save_data_to_cache(self, symbol: str, data: pd.DataFrame):
-        """保存股票数据到缓存"""
-        cache_path = self._get_cache_path(symbol)
-        data.to_csv(cache_path)
+        """保存股票数据到列式存储缓存"""
+        try:
+            self.price_store.write(symbol, data)
+        except Exception as e:
+            print(f"保存缓存数据失败 {symbol}: {str(e)}")
         
     def _save_metadata(self, symbol: str, metadata: dict):
         """保存股票元数据"""
@@ -0,0 +1,60 @@
+import pytest
+import numpy as np
+import pandas as pd
+from backend.models.backtest_engine import run_vectorized_backtest, positions_from_signals
+
+
+def loop_trades(close, signals, edge_triggered=False):
+    """逐行循环的参考实现(BacktestService / BaseStrategy 原有逻辑)"""
+    trades = []
+    position = 0
+    start = 1 if edge_triggered else 0
+    for i in range(start, len(signals)):
+        if edge_triggered and signals[i] == signals[i - 1]:
+            continue
+        if signals[i] == 1 and position == 0:
+            trades.append(('buy', i, close[i], 0.0))
+            position = 1
+        elif signals[i] == -1 and position == 1:
+            trades.append(('sell', i, close[i], close[i] - trades[-1][2]))
+            position = 0
+    return trades
+
+
+def kernel_trades(close, signals, edge_triggered=False):
+    result = run_vectorized_backtest(close, signals, edge_triggered)
+    trades = []
+    for k, entry in enumerate(result['entries']):
+        trades.append(('buy', entry, result['entry_prices'][k], 0.0))
+        if k < len(result['exits']):
+            trades.append(('sell', result['exits'][k], result['exit_prices'][k], result['profits'][k]))
+    return trades
+
+
+@pytest.mark.parametrize('edge_triggered', [False, True])
+@pytest.mark.parametrize('seed', range(5))
+def test_kernel_matches_loop(seed, edge_triggered):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, 2000))
+    signals = rng.choice([-1, 0, 1], size=2000, p=[0.1, 0.8, 0.1]).astype(float)
+    signals[rng.random(2000) < 0.01] = np.nan
+
+    assert kernel_trades(close, signals, edge_triggered) == loop_trades(close, signals, edge_triggered)
+
+
+def test_edge_triggered_ignores_first_bar_and_repeats():
+    signals = np.array([1, 1, -1, -1, 1, 0, 1, -1])
+    close = np.arange(len(signals), dtype=float)
+
+    assert list(positions_from_signals(signals)) == [1, 1, 0, 0, 1, 1, 1, 0]
+    assert list(positions_from_signals(signals, edge_triggered=True)) == [0, 0, 0, 0, 1, 1, 1, 0]
+    assert kernel_trades(close, signals, True) == loop_trades(close, signals, True)
+
+
+def test_open_position_at_end():
+    signals = pd.Series([0, 1, 0, 0])
+    result = run_vectorized_backtest(np.arange(4.0), signals)
+
+    assert list(result['entries']) == [1]
+    assert len(result['exits']) == 0
+    assert len(result['profits']) == 0
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import backend.services.backtest_service as backtest_module
+from backend.routes.backtest_routes import router
+from backend.services.backtest_service import BacktestService
+
+
+def make_data(symbol, n=300):
+    seed = sum(map(ord, symbol))
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+        'Volume': rng.uniform(1e5, 2e5, n)
+    }, index=pd.bdate_range('2020-01-01', periods=n))
+
+
+@pytest.fixture(autouse=True)
+def fake_prices(monkeypatch):
+    """进程池以fork方式创建，子进程继承替换后的行情加载"""
+    def load(self, symbol, start_date, end_date):
+        if symbol == 'MISSING':
+            raise ValueError(f"无法获取股票数据: {symbol}")
+        if symbol == 'SLOW':
+            time.sleep(5)
+        return make_data(symbol)
+    monkeypatch.setattr(BacktestService, '_load_price_data', load)
+
+
+STRATEGIES = [
+    {'name': 'moving_average', 'params': {'short_window': 5, 'long_window': 20}},
+    {'name': 'moving_average', 'params': {'short_window': 10, 'long_window': 50}},
+]
+
+
+def collect(service, symbols, strategies, max_workers=2):
+    async def run():
+        return [event async for event in service.run_batch(
+            symbols, strategies, '2020-01-01', '2021-03-01', max_workers
+        )]
+    return asyncio.run(run())
+
+
+def test_batch_yields_rows_and_summary():
+    events = collect(BacktestService(), ['AAA', 'BBB', 'AAA', 'MISSING'], STRATEGIES)
+    results = [e for e in events if e['type'] == 'result']
+    summary = events[-1]
+    assert summary['type'] == 'summary'
+    assert len(results) == 6 and summary['total_jobs'] == 6
+
+    # 每个结果行与单独评估该股票、该策略的指标一致
+    service = BacktestService()
+    df = make_data('AAA')
+    signals = service.strategy_factory.create_strategy('moving_average', **STRATEGIES[0]['params']).generate_signals(df)
+    expected = service._evaluate_signals(df, signals)[-1]
+    row = next(r for r in results if r['symbol'] == 'AAA' and r['params'] == STRATEGIES[0]['params'])
+    assert row['error'] is None
+    assert row['sharpe_ratio'] == pytest.approx(service._safe_float(expected['sharpe_ratio']))
+
+    # 汇总表按夏普比率降序，失败的任务单独列出
+    assert summary['succeeded'] == 4 and summary['failed'] == 2
+    sharpe = [r[summary['columns'].index('sharpe_ratio')] for r in summary['rows']]
+    assert sharpe == sorted(sharpe, reverse=True)
+    assert {e['symbol'] for e in summary['errors']} == {'MISSING'}
+
+
+def test_prepare_batch_validates_eagerly():
+    service = BacktestService()
+    assert service.prepare_batch([' AAA', 'AAA', ''], [{'name': 'moving_average'}]) == (
+        ['AAA'], [{'name': 'moving_average', 'params': {}}]
+    )
+    for symbols, strategies in [([], STRATEGIES), (['AAA'], []), (['AAA'], [{'name': 'unknown'}]), ('AAA', STRATEGIES)]:
+        with pytest.raises(ValueError):
+            service.prepare_batch(symbols, strategies)
+    for max_workers in [0, -1, 1.5, '4', True]:
+        with pytest.raises(ValueError):
+            service.prepare_batch(['AAA'], STRATEGIES, max_workers)
+    assert service.prepare_batch(['AAA'], STRATEGIES, 4)[0] == ['AAA']
+
+
+def test_workers_are_capped_by_cpu_count(monkeypatch):
+    created = []
+
+    class RecordingExecutor(backtest_module.ProcessPoolExecutor):
+        def __init__(self, max_workers=None):
+            created.append(max_workers)
+            super().__init__(max_workers=max_workers)
+    monkeypatch.setattr(backtest_module, 'ProcessPoolExecutor', RecordingExecutor)
+    monkeypatch.setattr(backtest_module.os, 'cpu_count', lambda: 2)
+    events = collect(BacktestService(), ['AAA', 'BBB', 'CCC', 'DDD'], STRATEGIES[:1], 500)
+    assert created == [2]
+    assert events[-1]['succeeded'] == 4
+
+
+def test_closing_stream_does_not_wait_for_pending_shards():
+    async def run():
+        events = BacktestService().run_batch(['AAA', 'SLOW'], STRATEGIES[:1], '2020-01-01', '2021-03-01', 2)
+        first = await events.__anext__()
+        start = time.perf_counter()
+        # 客户端断开: 关闭生成器时不等待仍在运行的分片
+        await events.aclose()
+        return first, time.perf_counter() - start
+    first, seconds = asyncio.run(run())
+    assert first['symbol'] == 'AAA'
+    assert seconds < 2
+
+
+def make_client():
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    return TestClient(app)
+
+
+def test_batch_endpoint_streams_ndjson_and_rejects_bad_input():
+    client = make_client()
+    response = client.post('/api/backtest/batch', json={
+        'symbols': ['AAA', 'BBB'], 'strategies': STRATEGIES[:1],
+        'startDate': '2020-01-01', 'endDate': '2021-03-01', 'maxWorkers': 1
+    })
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [e['type'] for e in events] == ['result', 'result', 'summary']
+
+    for body in [
+        {'symbols': [], 'strategies': STRATEGIES, 'startDate': '2020-01-01', 'endDate': '2021-03-01'},
+        {'symbols': ['AAA'], 'strategies': [], 'startDate': '2020-01-01', 'endDate': '2021-03-01'},
+        {'symbols': ['AAA'], 'strategies': STRATEGIES},
+        {'symbols': ['AAA'], 'strategies': STRATEGIES, 'startDate': '2020-01-01', 'endDate': '2021-03-01', 'maxWorkers': 0},
+        {'symbols': ['AAA'], 'strategies': STRATEGIES, 'startDate': '2020-01-01', 'endDate': '2021-03-01', 'maxWorkers': 'many'},
+    ]:
+        assert client.post('/api/backtest/batch', json=body).status_code == 400
@@ -0,0 +1,148 @@
+import time
+import threading
+import numpy as np
+import pandas as pd
+import pickle
+import json
+from backend.services.cache_service import CacheService, serialize, deserialize
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def setex(self, key, expire, data):
+        self.commands.append((key, expire, data))
+        return self
+
+    def execute(self):
+        self.client.round_trips += 1
+        for key, expire, data in self.commands:
+            self.client.store[key] = data
+        return [True] * len(self.commands)
+
+
+class FakeRedis:
+    """本地模拟Redis客户端，记录网络往返次数"""
+
+    def __init__(self):
+        self.store = {}
+        self.round_trips = 0
+
+    def get(self, key):
+        self.round_trips += 1
+        return self.store.get(key)
+
+    def mget(self, keys):
+        self.round_trips += 1
+        return [self.store.get(key) for key in keys]
+
+    def setex(self, key, expire, data):
+        self.round_trips += 1
+        self.store[key] = data
+        return True
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def delete(self, key):
+        self.round_trips += 1
+        return 1 if self.store.pop(key, None) is not None else 0
+
+    def exists(self, key):
+        self.round_trips += 1
+        return int(key in self.store)
+
+
+def test_serialization_roundtrip():
+    df = pd.DataFrame(
+        {'Close': [1.0, 2.0, 3.0], 'Volume': [10, 20, 30]},
+        index=pd.date_range('2020-01-01', periods=3, name='Date')
+    )
+    pd.testing.assert_frame_equal(deserialize(serialize(df)), df, check_freq=False)
+
+    arr = np.arange(12, dtype=np.float32).reshape(3, 4)
+    restored = deserialize(serialize(arr))
+    assert restored.dtype == arr.dtype and np.array_equal(restored, arr)
+
+    assert deserialize(serialize({'a': [1, 2]})) == {'a': [1, 2]}
+    assert deserialize(serialize(('tuple', 1))) == ('tuple', 1)
+
+
+def test_legacy_entries_still_readable():
+    cache = CacheService(client=FakeRedis())
+    cache.redis.store['old_pickle'] = pickle.dumps({'x': 1})
+    cache.redis.store['old_json'] = json.dumps([1, 2]).encode()
+
+    assert cache.get('old_pickle') == {'x': 1}
+    assert cache.get('old_json') == [1, 2]
+
+
+def test_near_cache_and_pipelined_batch():
+    client = FakeRedis()
+    cache = CacheService(client=client)
+    cache.mset({f"k{i}": np.arange(i + 1) for i in range(5)})
+    assert client.round_trips == 1
+
+    # 近端缓存命中不访问Redis
+    assert np.array_equal(cache.get('k3'), np.arange(4))
+    assert client.round_trips == 1
+
+    other = CacheService(client=client)
+    values = other.mget([f"k{i}" for i in range(5)] + ['missing'])
+    assert client.round_trips == 2
+    assert sorted(values) == [f"k{i}" for i in range(5)]
+
+
+def test_concurrent_misses_load_once():
+    cache = CacheService(client=FakeRedis())
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.1)
+        return {'value': 42}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_load('key', loader)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [{'value': 42}] * 8
+
+
+def test_late_owner_rereads_cache_before_loading():
+    cache = CacheService(client=FakeRedis())
+    calls = []
+    first_owner_done = threading.Event()
+    original_get = cache.get
+
+    def get(key):
+        value = original_get(key)
+        # 慢线程在首次未命中之后、注册为owner之前，上一个owner完成加载并退出
+        if threading.current_thread().name == 'late' and not first_owner_done.is_set():
+            first_owner_done.wait(5)
+        return value
+    cache.get = get
+
+    def loader():
+        calls.append(1)
+        return {'value': len(calls)}
+
+    results = []
+    late = threading.Thread(target=lambda: results.append(cache.get_or_load('key', loader)), name='late')
+    late.start()
+    time.sleep(0.05)
+    assert cache.get_or_load('key', loader) == {'value': 1}
+    first_owner_done.set()
+    late.join()
+
+    assert len(calls) == 1
+    assert results == [{'value': 1}]
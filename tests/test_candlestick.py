@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backend.models.indicators import candlestick
+from backend.models.strategies.basic.inside_bar import InsideBarStrategy
+from backend.models.strategies.basic.outside_bar import OutsideBarStrategy
+from backend.models.strategies.basic.bar_up_down import BarUpDnStrategy
+
+
+def make_data(n, seed):
+    rng = np.random.default_rng(seed)
+    close = (100 + np.cumsum(rng.normal(0, 1, n))).round(0)
+    open_ = (close + rng.normal(0, 1, n)).round(0)
+    high = np.maximum(open_, close) + rng.integers(0, 3, n)
+    low = np.minimum(open_, close) - rng.integers(0, 3, n)
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close},
+                        index=pd.bdate_range('2020-01-01', periods=n))
+
+
+def legacy_inside_bar(data):
+    signals = pd.Series(0, index=data.index)
+    for i in range(1, len(data)):
+        if data['High'].iloc[i] <= data['High'].iloc[i - 1] and data['Low'].iloc[i] >= data['Low'].iloc[i - 1]:
+            if data['Close'].iloc[i] > data['Close'].iloc[i - 1]:
+                signals.iloc[i] = 1
+            elif data['Close'].iloc[i] < data['Close'].iloc[i - 1]:
+                signals.iloc[i] = -1
+    return signals
+
+
+def legacy_outside_bar(data):
+    signals = pd.Series(0, index=data.index)
+    for i in range(1, len(data)):
+        if data['High'].iloc[i] > data['High'].iloc[i - 1] and data['Low'].iloc[i] < data['Low'].iloc[i - 1]:
+            if data['Close'].iloc[i] > data['Open'].iloc[i]:
+                signals.iloc[i] = 1
+            elif data['Close'].iloc[i] < data['Open'].iloc[i]:
+                signals.iloc[i] = -1
+    return signals
+
+
+def legacy_bar_up_down(data, n_bars):
+    direction = np.where(data['Close'] > data['Open'], 1, np.where(data['Close'] < data['Open'], -1, 0))
+    signals = pd.Series(0, index=data.index)
+    for i in range(n_bars, len(data)):
+        if all(direction[i - n_bars:i] == -1):
+            signals.iloc[i] = 1
+    for i in range(n_bars, len(data)):
+        if all(direction[i - n_bars:i] == 1):
+            signals.iloc[i] = -1
+    return signals
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_strategies_match_legacy_loops(seed):
+    data = make_data(400, seed)
+    pd.testing.assert_series_equal(InsideBarStrategy().generate_signals(data), legacy_inside_bar(data), check_dtype=False)
+    pd.testing.assert_series_equal(OutsideBarStrategy().generate_signals(data), legacy_outside_bar(data), check_dtype=False)
+    for n_bars in (1, 2, 3, 5):
+        expected = legacy_bar_up_down(data, n_bars)
+        assert expected.abs().sum() > 0
+        pd.testing.assert_series_equal(BarUpDnStrategy(n_bars).generate_signals(data), expected, check_dtype=False)
+
+
+def test_consecutive_count():
+    mask = np.array([[1, 1, 0, 1, 1, 1], [0, 0, 1, 1, 0, 1]], dtype=bool)
+    np.testing.assert_array_equal(
+        candlestick.consecutive_count(mask),
+        [[1, 2, 0, 1, 2, 3], [0, 0, 1, 2, 0, 1]]
+    )
+
+
+def test_panel_matches_single_symbol():
+    frames = [make_data(200, seed) for seed in range(3)]
+    panel = {col: np.stack([df[col].values for df in frames]) for col in ('Open', 'High', 'Low', 'Close')}
+
+    inside = InsideBarStrategy.inside_bar_signals(panel['High'], panel['Low'], panel['Close'])
+    streaks = BarUpDnStrategy.streak_signals(panel['Open'], panel['Close'], 2)
+    for row, df in enumerate(frames):
+        np.testing.assert_array_equal(inside[row], legacy_inside_bar(df).values)
+        np.testing.assert_array_equal(streaks[row], legacy_bar_up_down(df, 2).values)
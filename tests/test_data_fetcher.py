@@ -0,0 +1,104 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from backend.services.price_store import PriceStore
+from backend.services.data_fetcher import (
+    DataProvider,
+    IncrementalDataFetcher,
+    missing_intervals
+)
+
+
+class FakeProvider(DataProvider):
+    """本地模拟数据源，记录每次请求的区间"""
+
+    def __init__(self):
+        index = pd.bdate_range('2020-01-01', '2020-12-31')
+        close = 100 + np.arange(len(index), dtype=float)
+        self.data = pd.DataFrame({
+            'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+            'Volume': 1000.0
+        }, index=index)
+        self.calls = []
+
+    def fetch(self, symbol, start, end):
+        self.calls.append((start, end))
+        return self.data[(self.data.index >= start) & (self.data.index < end)]
+
+
+def ts(value):
+    return pd.Timestamp(value)
+
+
+def test_missing_intervals():
+    covered = [(ts('2020-02-01'), ts('2020-03-01')), (ts('2020-04-01'), ts('2020-05-01'))]
+
+    assert missing_intervals(covered, ts('2020-02-10'), ts('2020-02-20')) == []
+    assert missing_intervals(covered, ts('2020-01-01'), ts('2020-06-01')) == [
+        (ts('2020-01-01'), ts('2020-02-01')),
+        (ts('2020-03-01'), ts('2020-04-01')),
+        (ts('2020-05-01'), ts('2020-06-01')),
+    ]
+
+
+def test_only_missing_ranges_are_fetched(tmp_path):
+    provider = FakeProvider()
+    fetcher = IncrementalDataFetcher(PriceStore(str(tmp_path)), provider)
+
+    first = fetcher.get('TEST', '2020-03-01', '2020-06-01')
+    assert provider.calls == [(ts('2020-03-01'), ts('2020-06-01'))]
+
+    # 滑动窗口只下载新增的尾部区间
+    second = fetcher.get('TEST', '2020-04-01', '2020-07-01')
+    assert provider.calls[1:] == [(ts('2020-06-01'), ts('2020-07-01'))]
+
+    # 完全覆盖的区间不再访问数据源
+    fetcher.get('TEST', '2020-03-15', '2020-06-15')
+    assert len(provider.calls) == 2
+
+    expected = provider.data.loc['2020-04-01':'2020-06-30']
+    pd.testing.assert_frame_equal(second, expected, check_names=False, check_freq=False)
+    assert first.index.min() == ts('2020-03-02')
+
+
+def test_coverage_persists_across_instances(tmp_path):
+    provider = FakeProvider()
+    IncrementalDataFetcher(PriceStore(str(tmp_path)), provider).get('TEST', '2020-01-01', '2020-02-01')
+
+    fetcher = IncrementalDataFetcher(PriceStore(str(tmp_path)), provider)
+    df = fetcher.get('TEST', '2020-01-01', '2020-02-01')
+
+    assert len(provider.calls) == 1
+    assert len(df) == len(provider.data.loc['2020-01-01':'2020-01-31'])
+
+
+def test_empty_responses_are_not_marked_covered(tmp_path):
+    provider = FakeProvider()
+    fetcher = IncrementalDataFetcher(PriceStore(str(tmp_path)), provider)
+    fetch = provider.fetch
+
+    # 限流或临时错误时数据源返回空数据，下次请求重新获取
+    provider.fetch = lambda symbol, start, end: provider.calls.append((start, end)) or pd.DataFrame()
+    assert fetcher.get('TEST', '2020-03-01', '2020-04-01').empty
+    assert fetcher.get_coverage('TEST') == []
+
+    provider.fetch = fetch
+    df = fetcher.get('TEST', '2020-03-01', '2020-04-01')
+    assert len(provider.calls) == 2 and len(df) == len(provider.data.loc['2020-03'])
+
+    # 只包含周末的区间没有交易日，返回空数据时也标记为已覆盖
+    provider.fetch = lambda symbol, start, end: provider.calls.append((start, end)) or pd.DataFrame()
+    fetcher.get('TEST', '2020-04-04', '2020-04-06')
+    fetcher.get('TEST', '2020-04-04', '2020-04-06')
+    assert len(provider.calls) == 3
+
+
+def test_symbols_outside_the_store_are_rejected(tmp_path):
+    provider = FakeProvider()
+    fetcher = IncrementalDataFetcher(PriceStore(str(tmp_path / 'store')), provider)
+    for symbol in ['../../x', '../x', '/tmp/x', 'a/b']:
+        with pytest.raises(ValueError):
+            fetcher.get(symbol, '2020-01-01', '2020-02-01')
+    assert provider.calls == []
+    assert os.listdir(tmp_path) == ['store'] and os.listdir(tmp_path / 'store') == []
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+from backend.models.strategies.factory import StrategyFactory
+from backend.models.strategies.ml.deep_learning.ensemble import DLEnsemble, DLEnsembleStrategy
+
+
+def make_data(n=260, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    index = pd.date_range('2020-01-01', periods=n, freq='D')
+    return pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.002, n)),
+        'High': close * 1.01,
+        'Low': close * 0.99,
+        'Close': close,
+        'Volume': rng.integers(1000, 5000, n).astype(float)
+    }, index=index)
+
+
+def make_ensemble(**kwargs):
+    ensemble = DLEnsemble({name: {'lookback_period': 5} for name in ('mlp', 'lstm_mlp', 'cnn_mlp')}, **kwargs)
+    for strategy in ensemble.strategies.values():
+        strategy.model_registry = None
+        strategy.max_epochs = 2
+    return ensemble
+
+
+def test_members_share_one_feature_matrix():
+    ensemble = make_ensemble()
+    shared = ensemble._shared_features(make_data())
+    matrices = [X for _, X in shared.values()]
+    assert all(X is matrices[0] for X in matrices)
+    assert matrices[0].dtype == np.float32 and matrices[0].flags.c_contiguous
+    assert torch.from_numpy(matrices[0]).data_ptr() == matrices[0].ctypes.data
+
+
+def test_ensemble_matches_members_and_votes():
+    data = make_data()
+    before = torch.get_num_threads()
+    torch.manual_seed(0)
+    ensemble = make_ensemble(max_workers=3, threads_per_model=1)
+    result = ensemble.run(data)
+    assert torch.get_num_threads() == before
+    assert result['errors'] == {}
+    assert set(result['signals']) == {'mlp', 'lstm_mlp', 'cnn_mlp'}
+
+    # 各成员的信号与用训练好的网络单独运行 generate_signals 的预测一致
+    for name, strategy in ensemble.strategies.items():
+        features = strategy.prepare_features(data)
+        expected = np.zeros(len(data))
+        expected[len(data) - len(features):] = strategy.predict(features)
+        np.testing.assert_array_equal(result['signals'][name], expected)
+
+    votes = sum(result['signals'].values())
+    np.testing.assert_array_equal(result['ensemble'], np.sign(votes))
+
+
+def test_weighted_vote_and_failed_member():
+    ensemble = make_ensemble(weights={'mlp': 2.0})
+    signals = {'mlp': np.array([1.0, -1.0, 0.0]), 'lstm_mlp': np.array([-1.0, -1.0, 1.0])}
+    np.testing.assert_array_equal(ensemble.combine(signals, 3), [1.0, -1.0, 1.0])
+
+    ensemble.strategies['cnn_mlp'].build_model = lambda input_dim: (_ for _ in ()).throw(RuntimeError("boom"))
+    result = ensemble.run(make_data())
+    assert 'cnn_mlp' in result['errors']
+    assert not result['signals']['cnn_mlp'].any()
+    np.testing.assert_array_equal(
+        result['ensemble'], np.sign(2 * result['signals']['mlp'] + result['signals']['lstm_mlp'])
+    )
+
+
+def test_ensemble_strategy_is_registered():
+    assert StrategyFactory.has_strategy('dl_ensemble')
+    strategy = StrategyFactory.create_strategy('dl_ensemble', lookback_period=10, max_workers=2)
+    assert isinstance(strategy, DLEnsembleStrategy)
+    assert strategy.lookback_period == 10 and strategy.max_workers == 2
+    with pytest.raises(ValueError):
+        DLEnsemble({'moving_average': {}})
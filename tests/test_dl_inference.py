@@ -0,0 +1,131 @@
+import pickle
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+from backend.models.strategies.ml.deep_learning import base_dl_strategy
+from backend.models.strategies.ml.deep_learning.inference import TORCHSCRIPT_FILE
+from backend.models.strategies.ml.deep_learning.mlp_strategy import MLPStrategy
+from backend.models.strategies.ml.deep_learning.cnn_mlp_strategy import CNNMLPStrategy
+from backend.models.strategies.ml.deep_learning.lstm_mlp_strategy import LSTMMlPStrategy
+from backend.services.inference_stats import InferenceStats, inference_stats
+from backend.services.model_registry import ModelRegistry
+
+
+def make_data(n=300, n_features=6, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, n_features)).astype(np.float32)
+    y = np.digitize(X[:, 0], [-0.5, 0.5]) - 1
+    return X, y
+
+
+def legacy_predict(model, X: pd.DataFrame, batch_size=32):
+    """原 BaseDLStrategy.predict 的 DataLoader 实现"""
+    model.eval()
+    with torch.no_grad():
+        dataset = torch.utils.data.TensorDataset(torch.FloatTensor(X.values))
+        dataloader = torch.utils.data.DataLoader(dataset, batch_size=min(batch_size, len(dataset)), shuffle=False)
+        return np.concatenate([torch.argmax(model(batch_X), dim=1).numpy() - 1 for batch_X, in dataloader])
+
+
+def make_strategy(strategy_class=MLPStrategy, registry=None):
+    torch.manual_seed(0)
+    strategy = strategy_class()
+    strategy.model_registry = registry
+    strategy.max_epochs = 2
+    return strategy
+
+
+def fail_export(model):
+    raise AssertionError("模型仓库中已有导出的模块时不应重新导出")
+
+
+@pytest.mark.parametrize('strategy_class', [MLPStrategy, CNNMLPStrategy, LSTMMlPStrategy])
+@pytest.mark.parametrize('runtime', [None, 'torchscript'])
+def test_batched_predict_matches_legacy_dataloader(strategy_class, runtime):
+    X, y = make_data()
+    strategy = make_strategy(strategy_class)
+    strategy.fit(X, y)
+    strategy.inference_runtime = runtime
+    # 推理批次小于行数时分多次前向计算
+    strategy.inference_batch_size = 128
+    frame = pd.DataFrame(X)
+    np.testing.assert_array_equal(strategy.predict(frame), legacy_predict(strategy.model, frame))
+
+
+def test_torchscript_module_is_cached_in_model_registry(tmp_path, monkeypatch):
+    registry = ModelRegistry(str(tmp_path))
+    X, y = make_data()
+    columns = [f"f{i}" for i in range(X.shape[1])]
+    frame = pd.DataFrame(X, columns=columns)
+
+    first = make_strategy(registry=registry)
+    first.load_or_train(X, y, columns, first._train_model_impl)
+    expected = first.predict(frame)
+    assert registry.load_artifact(first.model_key, TORCHSCRIPT_FILE) is not None
+    # 附加文件计入模型大小
+    assert registry.list_models()[0]['size_bytes'] > len(registry.load_artifact(first.model_key, TORCHSCRIPT_FILE))
+
+    monkeypatch.setattr(base_dl_strategy, 'export_torchscript', fail_export)
+    second = make_strategy(registry=registry)
+    second.load_or_train(X, y, columns, second._train_model_impl)
+    assert second.model_key == first.model_key
+    np.testing.assert_array_equal(second.predict(frame), expected)
+    assert second.inference_module()[1] == 'torchscript'
+
+
+def test_retrained_model_does_not_use_stale_export(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    X, y = make_data()
+    strategy = make_strategy(registry=registry)
+    strategy.load_or_train(X, y, ['a', 'b', 'c', 'd', 'e', 'f'], strategy._train_model_impl)
+    strategy.predict(pd.DataFrame(X))
+
+    # 走步训练直接调用 fit，新网络不对应原来的 model_key
+    strategy.fit(X[:200], y[:200])
+    assert strategy.model_key is None
+    module, runtime = strategy.inference_module()
+    assert runtime == 'torchscript'
+    frame = pd.DataFrame(X)
+    np.testing.assert_array_equal(strategy.predict(frame), legacy_predict(strategy.model, frame))
+
+    # 导出的模块不参与pickle
+    restored = pickle.loads(pickle.dumps(strategy))
+    assert restored._runtime is None
+    np.testing.assert_array_equal(restored.predict(frame), strategy.predict(frame))
+
+
+def test_predict_records_latency():
+    X, y = make_data()
+    strategy = make_strategy()
+    strategy.fit(X, y)
+    inference_stats.reset()
+    strategy.predict(pd.DataFrame(X))
+    strategy.predict(pd.DataFrame(X[:100]))
+    summary = inference_stats.summary()['MLP']
+    assert summary['calls'] == 2
+    assert summary['rows'] == 400
+    assert summary['runtime'] == 'torchscript'
+    assert 0 < summary['p50_ms'] <= summary['max_ms']
+
+
+def test_inference_stats_keeps_recent_window():
+    stats = InferenceStats(window=3)
+    for seconds in [1.0, 0.001, 0.002, 0.003]:
+        stats.record('s', seconds, 10)
+    summary = stats.summary('s')['s']
+    assert summary['calls'] == 4
+    assert summary['max_ms'] == pytest.approx(3.0)
+    assert summary['mean_ms'] == pytest.approx(1006.0 / 4)
+    assert stats.summary('missing') == {}
+
+
+def test_registry_artifacts_require_saved_model(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    assert not registry.save_artifact('missing', TORCHSCRIPT_FILE, b'data')
+    with pytest.raises(ValueError):
+        registry.save_artifact('missing', 'model.pkl', b'data')
+    registry.save('k', {'model': 1})
+    assert registry.save_artifact('k', TORCHSCRIPT_FILE, b'data')
+    assert registry.load_artifact('k', TORCHSCRIPT_FILE) == b'data'
+    assert registry.load_artifact('k', 'other.bin') is None
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backend.models.strategies.factory import StrategyFactory
+from backend.models.strategies.ml.deep_learning.search import SuccessiveHalvingSearch
+from backend.services.model_registry import ModelRegistry
+
+
+def make_data(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.002, n)),
+        'High': close * 1.01,
+        'Low': close * 0.99,
+        'Close': close,
+        'Volume': rng.uniform(1e3, 2e3, n)
+    }, index=pd.bdate_range('2018-01-01', periods=n))
+
+
+def make_search(tmp_path, **kwargs):
+    options = dict(n_trials=9, min_epochs=1, max_epochs=9, eta=3, max_workers=1, seed=1,
+                   space={'lookback_period': [5]}, batch_sizes=[64],
+                   registry=ModelRegistry(str(tmp_path)))
+    options.update(kwargs)
+    return SuccessiveHalvingSearch('mlp', **options)
+
+
+def test_rung_schedule_and_sampling(tmp_path):
+    assert make_search(tmp_path)._rung_schedule() == [1, 3, 9]
+    assert make_search(tmp_path, min_epochs=2, max_epochs=10)._rung_schedule() == [2, 6, 10]
+
+    trials = make_search(tmp_path, n_trials=50).sample_trials()
+    assert all(t.params['lookback_period'] == 5 for t in trials)
+    learning_rates = np.array([t.params['learning_rate'] for t in trials])
+    assert ((learning_rates >= 0.0001) & (learning_rates <= 0.01)).all()
+    # 对数均匀采样，大约一半的学习率小于几何中点 0.001
+    assert 10 < (learning_rates < 0.001).sum() < 40
+
+    with pytest.raises(ValueError):
+        SuccessiveHalvingSearch('random_forest')
+
+
+def test_validation_split_labels_are_aligned(tmp_path):
+    data = make_data()
+    search = make_search(tmp_path)
+    X_train, y_train, X_val, y_val = search.prepare_data(data, search.sample_trials()[0].params)
+    # 返回的第一个特征是收益率，对应日期的下一根K线涨跌即为标签
+    close = data['Close'].values
+    returns = close[1:] / close[:-1] - 1
+    first_row = np.flatnonzero(np.isclose(returns, X_train[0, 0], rtol=1e-5))[0] + 1
+    assert y_train[0] == np.sign(close[first_row + 1] / close[first_row] - 1)
+    assert len(X_val) == int((len(X_train) + len(X_val) + 1) * 0.2)
+
+
+def test_successive_halving_prunes_and_saves_best(tmp_path):
+    search = make_search(tmp_path, top_k=2)
+    result = search.run(make_data())
+
+    assert [rung['trials'] for rung in result['rungs']] == [9, 3, 1]
+    # 9×1 + 3×2 + 1×6，远少于全部配置训练满9个epoch
+    assert result['epochs_used'] == 21
+    assert result['full_training_epochs'] == 81
+    assert sum(t['pruned_at'] is not None for t in result['trials']) == 8
+    best = result['best']
+    assert best['epochs'] == 9 and best['pruned_at'] is None
+
+    registry = search.registry
+    assert len(registry.list_models()) == 2
+    state = registry.load(best['model_key'])
+    assert len(state['training_history']['val_loss']) == 9
+    assert state['training_history']['val_loss'][-1] == pytest.approx(best['val_loss'])
+
+
+def test_generate_signals_reuses_saved_best_model(tmp_path, monkeypatch):
+    data = make_data()
+    search = make_search(tmp_path, n_trials=3, max_epochs=3, batch_sizes=[16, 64])
+    best = search.run(data)['best']
+    assert best['params']['batch_size'] == best['batch_size']
+
+    # 用最好的参数在同一行情上生成信号时直接从模型仓库加载，不重新训练
+    strategy = StrategyFactory.create_strategy('mlp', **best['params'])
+    strategy.model_registry = search.registry
+    monkeypatch.setattr(strategy, '_train_model_impl', lambda X, y: pytest.fail("不应重新训练"))
+    signals = strategy.generate_signals(data)
+    assert strategy.model_key == best['model_key']
+    assert len(signals) == len(data)
+    assert len(strategy.training_history['val_loss']) == 3
+
+
+def test_budget_limits_training(tmp_path):
+    search = make_search(tmp_path, budget=12, registry=None)
+    result = search.run(make_data())
+    # 第一轮用掉9个epoch，剩余预算只够一个配置从1训练到3
+    assert result['epochs_used'] == 11
+    assert [rung['trials'] for rung in result['rungs']] == [9, 1]
+    assert result['best']['epochs'] == 3
+
+
+def test_parallel_workers_match_serial(tmp_path):
+    serial = make_search(tmp_path / 'a', n_trials=4, max_epochs=3, eta=2, registry=None).run(make_data())
+    parallel = make_search(tmp_path / 'b', n_trials=4, max_epochs=3, eta=2, registry=None,
+                           max_workers=2).run(make_data())
+    assert serial['best']['trial_id'] == parallel['best']['trial_id']
+    assert serial['best']['val_loss'] == pytest.approx(parallel['best']['val_loss'], rel=1e-4)
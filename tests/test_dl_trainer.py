@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+import torch.nn as nn
+from backend.models.strategies.ml.deep_learning.trainer import Trainer, to_tensors
+from backend.models.strategies.ml.deep_learning.mlp_strategy import MLPModel, MLPStrategy
+from backend.models.strategies.ml.deep_learning.cnn_mlp_strategy import CNNMLPStrategy
+from backend.models.strategies.ml.deep_learning.lstm_mlp_strategy import LSTMMlPStrategy
+
+
+def make_data(n: int = 301, n_features: int = 6, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, n_features)).astype(np.float32)
+    y = np.digitize(X[:, 0], [-0.5, 0.5]) - 1
+    return X, y
+
+
+def fit(trainer: Trainer, X, y, **kwargs):
+    torch.manual_seed(0)
+    model = MLPModel(X.shape[1])
+    history = trainer.fit(model, torch.optim.Adam(model.parameters(), lr=0.01), nn.CrossEntropyLoss(),
+                          X, y, **kwargs)
+    return model, history
+
+
+def test_to_tensors_converts_labels_and_read_only_features():
+    X, y = make_data(10)
+    X.flags.writeable = False
+    X_tensor, y_tensor = to_tensors(X, y)
+    assert X_tensor.dtype == torch.float32
+    assert y_tensor.tolist() == list(y + 1)
+
+
+@pytest.mark.parametrize('in_memory_max_bytes', [256 * 1024 * 1024, 0])
+def test_trainer_learns_with_in_memory_and_dataloader_batches(in_memory_max_bytes):
+    # 301个样本、batch 30: 末尾只剩1个样本的批次并入前一批，BatchNorm不会报错
+    X, y = make_data()
+    trainer = Trainer(max_epochs=15, batch_size=30, patience=None, in_memory_max_bytes=in_memory_max_bytes)
+    if in_memory_max_bytes == 0:
+        X, y = X[:300], y[:300]
+    model, history = fit(trainer, X, y)
+    assert trainer.epochs_run == 15
+    assert len(history['loss']) == 15
+    assert history['loss'][-1] < history['loss'][0]
+    assert history['accuracy'][-1] > 0.8
+    assert not model.training
+
+
+def test_trainer_early_stops_on_validation_loss():
+    X, y = make_data()
+    # 验证集标签随机，验证损失很快不再下降
+    val_y = np.random.default_rng(1).integers(-1, 2, size=100)
+    trainer = Trainer(max_epochs=200, batch_size=64, patience=3)
+    _, history = fit(trainer, X[:200], y[:200], validation=(X[200:300], val_y))
+    assert trainer.epochs_run < 200
+    assert len(history['val_loss']) == trainer.epochs_run
+    best = int(np.argmin(history['val_loss']))
+    assert trainer.epochs_run == best + 4
+
+
+def test_trainer_restores_thread_count():
+    X, y = make_data(64)
+    before = torch.get_num_threads()
+    fit(Trainer(max_epochs=1, num_threads=1), X, y)
+    assert torch.get_num_threads() == before
+
+
+def test_torchscript_trains_original_module():
+    X, y = make_data()
+    eager, eager_history = fit(Trainer(max_epochs=3, patience=None), X, y)
+    scripted, scripted_history = fit(Trainer(max_epochs=3, patience=None, compile_mode='torchscript'), X, y)
+    # 编译后的模块与原模块共享参数和BatchNorm统计量，训练结果一致
+    assert isinstance(scripted, MLPModel)
+    np.testing.assert_allclose(scripted_history['loss'], eager_history['loss'], rtol=1e-4)
+    for a, b in zip(eager.state_dict().values(), scripted.state_dict().values()):
+        torch.testing.assert_close(a, b, rtol=1e-3, atol=1e-4)
+    with pytest.raises(ValueError):
+        Trainer(compile_mode='jit')
+
+
+@pytest.mark.parametrize('strategy_class', [MLPStrategy, CNNMLPStrategy, LSTMMlPStrategy])
+def test_dl_strategies_train_through_shared_trainer(strategy_class):
+    X, y = make_data(120)
+    strategy = strategy_class(batch_size=16)
+    strategy.max_epochs = 3
+    strategy.fit(X, y)
+    assert isinstance(strategy.model, nn.Module)
+    assert len(strategy.training_history['loss']) == 3
+    predictions = strategy.predict(pd.DataFrame(X))
+    assert predictions.shape == (120,)
+    assert set(np.unique(predictions)) <= {-1, 0, 1}
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backend.models.indicators.engine import indicator_engine
+from backend.models.strategies.ml.base_ml_strategy import BaseMLStrategy
+from backend.models.strategies.ml.features import Feature, FeaturePipeline
+from backend.models.strategies.ml.random_forest_strategy import RandomForestStrategy
+from backend.models.strategies.ml.svm_strategy import SVMStrategy
+from backend.models.strategies.ml.xgboost_strategy import XGBoostStrategy
+from backend.services.memory_cache import MemoryCache
+
+
+def make_data(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.005, n)),
+        'High': close * (1 + rng.uniform(0, 0.02, n)),
+        'Low': close * (1 - rng.uniform(0, 0.02, n)),
+        'Close': close,
+        'Volume': rng.uniform(1e5, 1e6, n)
+    }, index=pd.bdate_range('2020-01-01', periods=n))
+
+
+def legacy_base_features(data, lookback_period):
+    df = pd.DataFrame(index=data.index)
+    df['returns'] = data['Close'].pct_change()
+    df['log_returns'] = np.log1p(df['returns'])
+    df['sma_20'] = indicator_engine.sma(data['Close'], 20)
+    df['sma_50'] = indicator_engine.sma(data['Close'], 50)
+    df['rsi'] = indicator_engine.rsi(data['Close'])
+    df['volatility'] = df['returns'].rolling(window=20).std()
+    df['volume_ma'] = data['Volume'].rolling(window=20).mean()
+    df['volume_std'] = data['Volume'].rolling(window=20).std()
+    for i in range(1, lookback_period + 1):
+        df[f'close_lag_{i}'] = data['Close'].shift(i)
+        df[f'volume_lag_{i}'] = data['Volume'].shift(i)
+    return df.dropna()
+
+
+def legacy_xgboost_features(data):
+    df = pd.DataFrame(index=data.index)
+    df['returns'] = data['Close'].pct_change()
+    df['log_returns'] = np.log1p(df['returns'])
+    for window in [5, 10, 20]:
+        df[f'ma_{window}'] = indicator_engine.sma(data['Close'], window, min_periods=1)
+        df[f'ma_ratio_{window}'] = data['Close'] / df[f'ma_{window}']
+        df[f'std_{window}'] = indicator_engine.rolling_std(data['Close'], window, min_periods=1)
+        df[f'mom_{window}'] = data['Close'].pct_change(periods=window)
+    df['volatility'] = df['returns'].rolling(window=20, min_periods=1).std()
+    df['high_low_ratio'] = data['High'] / data['Low']
+    df['true_range'] = pd.DataFrame({
+        'hl': data['High'] - data['Low'],
+        'hc': abs(data['High'] - data['Close'].shift()),
+        'lc': abs(data['Low'] - data['Close'].shift())
+    }).max(axis=1)
+    df['volume_ma'] = data['Volume'].rolling(window=20, min_periods=1).mean()
+    df['volume_std'] = data['Volume'].rolling(window=20, min_periods=1).std()
+    df['volume_ratio'] = data['Volume'] / df['volume_ma']
+    df['volume_trend'] = data['Volume'].pct_change()
+    df['rsi'] = indicator_engine.rsi(data['Close'])
+    return df.dropna()
+
+
+def legacy_random_forest_features(data):
+    df = pd.DataFrame()
+    df['returns'] = data['Close'].pct_change()
+    df['high_low_ratio'] = data['High'] / data['Low']
+    df['close_open_ratio'] = data['Close'] / data['Open']
+    for window in [5, 10, 20, 30]:
+        df[f'ma_{window}'] = indicator_engine.sma(data['Close'], window)
+        df[f'std_{window}'] = df['returns'].rolling(window).std()
+        df[f'mom_{window}'] = data['Close'].pct_change(window)
+        df[f'rsi_{window}'] = indicator_engine.rsi(data['Close'], window)
+    df['volume_ma5'] = data['Volume'].rolling(5).mean()
+    df['volume_std5'] = data['Volume'].rolling(5).std()
+    df['volume_ratio'] = data['Volume'] / df['volume_ma5']
+    return df.dropna()
+
+
+def legacy_svm_features(data):
+    df = pd.DataFrame()
+    df['returns'] = data['Close'].pct_change()
+    df['volatility'] = df['returns'].rolling(20).std()
+    for period in [5, 10, 20]:
+        df[f'momentum_{period}'] = data['Close'].pct_change(period)
+    ma_short = indicator_engine.sma(data['Close'], 10)
+    ma_long = indicator_engine.sma(data['Close'], 30)
+    df['ma_cross'] = (ma_short - ma_long) / ma_long
+    df['rsi'] = indicator_engine.rsi(data['Close'])
+    df['volume_ratio'] = data['Volume'] / data['Volume'].rolling(20).mean()
+    ma20 = indicator_engine.sma(data['Close'], 20)
+    std20 = indicator_engine.rolling_std(data['Close'], 20)
+    df['bb_position'] = (data['Close'] - ma20) / (2 * std20)
+    return df.dropna()
+
+
+class _Base(BaseMLStrategy):
+    def __init__(self, lookback_period=5):
+        super().__init__("base", lookback_period)
+
+
+@pytest.mark.parametrize('strategy, legacy', [
+    (_Base(5), lambda data: legacy_base_features(data, 5)),
+    (XGBoostStrategy(), legacy_xgboost_features),
+    (RandomForestStrategy(), legacy_random_forest_features),
+    (SVMStrategy(), legacy_svm_features),
+])
+def test_matches_legacy_features(strategy, legacy):
+    data = make_data()
+    features = strategy.prepare_features(data)
+    expected = legacy(data)
+
+    assert list(features.columns) == list(expected.columns)
+    pd.testing.assert_index_equal(features.index, expected.index)
+    assert (features.dtypes == np.float32).all()
+    np.testing.assert_allclose(features.values, expected.values.astype(np.float32), rtol=1e-6)
+
+
+def test_matrix_is_cached_and_shared_features_computed_once():
+    cache = MemoryCache()
+    data = make_data()
+    pipeline = FeaturePipeline([
+        Feature('r', 'returns'),
+        Feature('r_copy', 'returns'),
+        Feature('vol', 'volatility', window=10),
+    ], cache=cache)
+
+    matrix = pipeline.compute(data)
+    assert matrix.dtype == np.float32 and matrix.shape == (len(data), 3)
+    np.testing.assert_array_equal(matrix[:, 0], matrix[:, 1])
+    assert pipeline.compute(data) is matrix
+    assert cache.hits == 1
+
+    # 行情变化或特征声明变化时重新计算
+    changed = data.copy()
+    changed.iloc[-1, changed.columns.get_loc('Close')] *= 1.01
+    assert pipeline.compute(changed) is not matrix
+    other = FeaturePipeline([Feature('r', 'returns')], cache=cache)
+    assert other.compute(data).shape == (len(data), 1)
+
+
+def test_rejects_unknown_and_duplicate_features():
+    with pytest.raises(ValueError):
+        Feature('x', 'unknown')
+    with pytest.raises(ValueError):
+        FeaturePipeline([Feature('x', 'returns'), Feature('x', 'log_returns')])
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backend.models.strategies.composite.greedy import GreedyStrategy
+from backend.models.indicators.engine import indicator_engine
+
+
+def legacy_signals(strategy, data):
+    """向量化之前的逐K线投票实现"""
+    signals = pd.Series(0, index=data.index)
+    rsi = indicator_engine.rsi(data['Close'], strategy.rsi_period)
+    ma_short = indicator_engine.sma(data['Close'], strategy.ma_short)
+    ma_long = indicator_engine.sma(data['Close'], strategy.ma_long)
+    bb_mid = indicator_engine.sma(data['Close'], strategy.bb_period)
+    bb_std = indicator_engine.rolling_std(data['Close'], strategy.bb_period)
+    bb_upper = bb_mid + strategy.bb_std * bb_std
+    bb_lower = bb_mid - strategy.bb_std * bb_std
+
+    for i in range(max(strategy.rsi_period, strategy.ma_long, strategy.bb_period), len(data)):
+        buy_signals = 0
+        sell_signals = 0
+        if rsi.iloc[i] < 30:
+            buy_signals += 1
+        elif rsi.iloc[i] > 70:
+            sell_signals += 1
+        if ma_short.iloc[i] > ma_long.iloc[i]:
+            buy_signals += 1
+        elif ma_short.iloc[i] < ma_long.iloc[i]:
+            sell_signals += 1
+        if data['Close'].iloc[i] < bb_lower.iloc[i]:
+            buy_signals += 1
+        elif data['Close'].iloc[i] > bb_upper.iloc[i]:
+            sell_signals += 1
+        if buy_signals >= 2:
+            signals.iloc[i] = 1
+        elif sell_signals >= 2:
+            signals.iloc[i] = -1
+    return signals
+
+
+def make_data(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    # 包含一段横盘(RSI为NaN、标准差为0)
+    close[n // 2:n // 2 + 30] = close[n // 2]
+    return pd.DataFrame({'Close': close}, index=pd.bdate_range('2018-01-01', periods=n))
+
+
+PARAM_SETS = [
+    {},
+    {'rsi_period': 7, 'ma_short': 3, 'ma_long': 10, 'bb_period': 10, 'bb_std': 1.0},
+    {'rsi_period': 21, 'ma_short': 10, 'ma_long': 50, 'bb_period': 30, 'bb_std': 1.5},
+    {'rsi_period': 30, 'ma_long': 60, 'bb_period': 40},
+]
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_matches_legacy_loop(seed):
+    data = make_data(400, seed)
+    for params in PARAM_SETS:
+        strategy = GreedyStrategy(**params)
+        expected = legacy_signals(strategy, data)
+        pd.testing.assert_series_equal(strategy.generate_signals(data), expected, check_dtype=False)
+
+
+def test_batch_rows_match_single_runs():
+    data = make_data(300, 3)
+    batch = GreedyStrategy.generate_signals_batch(data, PARAM_SETS)
+
+    assert batch.shape == (len(PARAM_SETS), len(data))
+    for row, params in zip(batch, PARAM_SETS):
+        np.testing.assert_array_equal(row, legacy_signals(GreedyStrategy(**params), data).values)
+
+
+def test_short_history_has_no_signals():
+    data = make_data(15, 4)
+    assert (GreedyStrategy().generate_signals(data) == 0).all()
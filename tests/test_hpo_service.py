@@ -0,0 +1,89 @@
+import asyncio
+import os
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from backend.models.strategies.ml.deep_learning.search import SuccessiveHalvingSearch
+from backend.routes.backtest_routes import hpo_service, router
+from backend.services.hpo_service import HPO_LIMITS, HPOService
+
+
+def make_data(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+        'Volume': rng.uniform(1e3, 2e3, n)
+    }, index=pd.bdate_range('2020-01-01', periods=n))
+
+
+@pytest.fixture
+def fake_search(monkeypatch):
+    """替换行情加载和搜索本身，只检查服务层的调度和参数"""
+    calls = []
+
+    def run(self, data):
+        time.sleep(0.5)
+        calls.append({'n_trials': self.n_trials, 'budget': self.budget, 'max_workers': self.max_workers})
+        return {'strategy': self.strategy_name, 'best': None}
+    monkeypatch.setattr(SuccessiveHalvingSearch, 'run', run)
+    monkeypatch.setattr(hpo_service.backtest_service, '_load_price_data', lambda *args: make_data())
+    return calls
+
+
+def test_check_limits():
+    assert HPOService.check_limits(27, 81) == HPO_LIMITS['budget']
+    assert HPOService.check_limits(27, 81, 100) == 100
+    for n_trials, max_epochs, budget in [(HPO_LIMITS['n_trials'] + 1, 81, None),
+                                         (27, HPO_LIMITS['max_epochs'] + 1, None),
+                                         (27, 81, HPO_LIMITS['budget'] + 1)]:
+        with pytest.raises(ValueError):
+            HPOService.check_limits(n_trials, max_epochs, budget)
+
+
+def test_run_search_does_not_block_event_loop(fake_search):
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.02)
+                ticks += 1
+        task = asyncio.create_task(ticker())
+        result = await hpo_service.run_search('AAA', '2020-01-01', '2021-03-01', 'mlp', max_workers=10_000)
+        task.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(run())
+    # 搜索期间事件循环仍在处理其他任务
+    assert ticks >= 10
+    assert result['symbol'] == 'AAA'
+    # 未指定预算时使用上限，并行进程数不超过CPU核数
+    assert fake_search[0]['budget'] == HPO_LIMITS['budget']
+    assert fake_search[0]['max_workers'] <= (os.cpu_count() or 1)
+
+
+def test_hpo_endpoint_rejects_oversized_searches(fake_search):
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    client = TestClient(app)
+    body = {'symbol': 'AAA', 'startDate': '2020-01-01', 'endDate': '2021-03-01', 'strategy': 'mlp'}
+
+    assert client.post('/api/backtest/hpo', json=dict(body, nTrials=9, maxEpochs=9)).status_code == 200
+    for extra in [{'nTrials': 10_000}, {'maxEpochs': 10_000}, {'budget': 10 ** 9}, {'nTrials': 'many'}]:
+        assert client.post('/api/backtest/hpo', json=dict(body, **extra)).status_code == 400
+    assert client.post('/api/backtest/hpo', json={'symbol': 'AAA'}).status_code == 400
+    assert len(fake_search) == 1
+
+
+def test_router_keeps_strategy_and_history_endpoints():
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    client = TestClient(app)
+    strategies = client.get('/api/backtest/strategies')
+    assert strategies.status_code == 200 and 'mlp' in strategies.json()
+    assert client.get('/api/backtest/history').status_code == 200
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backend.models.indicators.engine import IndicatorEngine, fingerprint
+
+
+def make_close(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.Series(close, index=pd.bdate_range('2020-01-01', periods=n), name='Close')
+
+
+def test_memo_hits_and_misses_are_counted():
+    engine = IndicatorEngine()
+    close = make_close()
+    first = engine.sma(close, 20)
+    second = engine.sma(close, 20)
+    pd.testing.assert_series_equal(first, close.rolling(20).mean())
+    pd.testing.assert_series_equal(first, second)
+    engine.sma(close, 10)
+    engine.rolling_std(close, 20, key=fingerprint(close))
+
+    stats = engine.stats()
+    assert stats['indicators']['sma'] == {'hits': 1, 'misses': 2}
+    assert stats['indicators']['std'] == {'hits': 0, 'misses': 1}
+    assert stats['hits'] == 1 and stats['misses'] == 3
+    assert stats['reuse_rate'] == pytest.approx(0.25)
+    assert stats['entries'] == 3
+
+    # 布林带复用已缓存的均线和标准差
+    upper, middle, lower = engine.bollinger_bands(close, 20)
+    assert engine.stats()['indicators']['sma']['hits'] == 2
+    pd.testing.assert_series_equal(upper, middle + 2 * close.rolling(20).std())
+    engine.clear()
+    assert engine.stats()['misses'] == 0 and engine.stats()['entries'] == 0
+
+
+def test_changed_data_gets_a_new_key():
+    engine = IndicatorEngine()
+    close = make_close()
+    before = engine.rsi(close, 14)
+
+    changed = close.copy()
+    changed.iloc[-1] *= 1.1
+    after = engine.rsi(changed, 14)
+    assert engine.stats()['indicators']['rsi'] == {'hits': 0, 'misses': 2}
+    assert after.iloc[-1] != before.iloc[-1]
+    pd.testing.assert_series_equal(after.iloc[:-1], before.iloc[:-1])
+
+    # 数值相同但日期不同的序列也不共享结果
+    shifted = pd.Series(close.values, index=close.index + pd.Timedelta(days=1))
+    assert fingerprint(shifted) != fingerprint(close)
+    engine.rsi(shifted, 14)
+    assert engine.stats()['indicators']['rsi']['misses'] == 3
+
+
+def test_cached_results_are_not_shared_with_callers():
+    engine = IndicatorEngine()
+    close = make_close()
+    sma = engine.sma(close, 5)
+    sma.iloc[:] = 0.0
+    pd.testing.assert_series_equal(engine.sma(close, 5), close.rolling(5).mean())
+
+    macd, signal, histogram = engine.macd(close)
+    histogram.iloc[-1] = np.nan
+    macd += 1
+    again = engine.macd(close)
+    assert not np.isnan(again[2].iloc[-1])
+    pd.testing.assert_series_equal(again[0], close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean())
+    assert engine.stats()['indicators']['macd'] == {'hits': 1, 'misses': 1}
+
+
+def test_wilder_rsi_matches_recursive_definition():
+    close = make_close()
+    period = 14
+    rsi = IndicatorEngine().rsi(close, period, method='wilder').values
+
+    delta = np.diff(close.values)
+    gains, losses = np.maximum(delta, 0), np.maximum(-delta, 0)
+    avg_gain, avg_loss = gains[:period].mean(), losses[:period].mean()
+    expected = [100 * avg_gain / (avg_gain + avg_loss)]
+    for gain, loss in zip(gains[period:], losses[period:]):
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+        expected.append(100 * avg_gain / (avg_gain + avg_loss))
+    assert np.isnan(rsi[:period]).all()
+    np.testing.assert_allclose(rsi[period:], expected, rtol=1e-10)
+
+
+def test_technical_indicators_rsi_matches_talib():
+    talib = pytest.importorskip('talib')
+    from backend.models.indicators.technical import TechnicalIndicators
+    close = make_close()
+    np.testing.assert_allclose(
+        TechnicalIndicators.RSI(close, 14).values, talib.RSI(close, timeperiod=14).values, equal_nan=True
+    )
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backend.benchmarks.bench_labels import loop_horizon_labels, loop_triple_barrier_labels
+from backend.models.strategies.ml.labels import horizon_labels, make_labels, triple_barrier_labels
+from backend.models.strategies.ml.random_forest_strategy import RandomForestStrategy
+from backend.models.strategies.ml.walk_forward import WalkForwardEngine
+
+
+def make_close(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    # 停牌(价格不变)的区间，收益均值为0
+    close[100:110] = close[99]
+    return pd.Series(close, index=pd.bdate_range('2020-01-01', periods=n))
+
+
+def make_data(n=400, seed=0):
+    close = make_close(n, seed)
+    return pd.DataFrame({
+        'Open': close * 1.001,
+        'High': close * 1.01,
+        'Low': close * 0.99,
+        'Close': close,
+        'Volume': np.linspace(1e5, 2e5, n)
+    }, index=close.index)
+
+
+@pytest.mark.parametrize('horizon', [1, 3, 10])
+def test_horizon_labels_match_loop(horizon):
+    close = make_close()
+    labels = horizon_labels(close, horizon)
+    assert labels.index.equals(close.index)
+    np.testing.assert_array_equal(labels.values, loop_horizon_labels(close, horizon))
+    # 末尾 horizon 根K线的标签未知，停牌区间的标签为0
+    assert labels.iloc[-horizon:].isna().all() and labels.iloc[:-horizon].notna().all()
+    assert (labels.iloc[100:109 - horizon] == 0).all()
+
+
+def test_horizon_return_method_and_threshold():
+    close = make_close()
+    labels = horizon_labels(close, 5, method='return')
+    future_returns = close.shift(-5) / close - 1
+    expected = np.sign(future_returns).where(future_returns.notna())
+    np.testing.assert_array_equal(labels.values, expected.values)
+
+    small = horizon_labels(close, 1, threshold=0.005)
+    returns = close.pct_change().shift(-1)
+    assert (small[returns.abs() <= 0.005] == 0).all()
+    with pytest.raises(ValueError):
+        horizon_labels(close, 0)
+
+
+@pytest.mark.parametrize('horizon', [1, 5, 20])
+def test_triple_barrier_labels_match_loop(horizon):
+    close = make_close()
+    labels = triple_barrier_labels(close, horizon, upper=0.02, lower=0.01)
+    np.testing.assert_array_equal(labels.values, loop_triple_barrier_labels(close, horizon, 0.02, 0.01))
+    assert set(labels.dropna().unique()) <= {-1.0, 0.0, 1.0}
+
+
+def test_triple_barrier_volatility_and_timeout():
+    close = make_close()
+    labels = triple_barrier_labels(close, 10, upper=2.0, lower=2.0, volatility_window=20)
+    # 波动率窗口内的标签未知
+    assert labels.iloc[:20].isna().all() and labels.iloc[20:-10].notna().all()
+
+    volatility = close.pct_change().rolling(20).std()
+    t = 200
+    barrier = 2.0 * volatility.iloc[t]
+    fixed = triple_barrier_labels(close.iloc[t:t + 11], 10, upper=barrier, lower=barrier)
+    assert labels.iloc[t] == fixed.iloc[0]
+
+    # 两条线都不可能触及时，按到期收益方向
+    expired = triple_barrier_labels(close, 5, upper=10.0, lower=10.0, timeout='sign')
+    np.testing.assert_array_equal(expired.values, horizon_labels(close, 5, method='return').values)
+    assert (triple_barrier_labels(close, 5, upper=10.0, lower=10.0).dropna() == 0).all()
+    with pytest.raises(ValueError):
+        make_labels(close, 'unknown')
+
+
+def test_strategies_share_aligned_labels():
+    data = make_data()
+    strategy = RandomForestStrategy(prediction_period=3)
+    features = strategy.prepare_features(data)
+    X, y = strategy.training_data(data, features)
+    # 特征第一行对应日期的标签
+    expected = horizon_labels(data['Close'], 3).reindex(features.index).dropna()
+    np.testing.assert_array_equal(y, expected.values)
+    np.testing.assert_array_equal(X, features.loc[expected.index].values)
+    np.testing.assert_array_equal(strategy.prepare_labels(data), horizon_labels(data['Close'], 3).dropna().values)
+
+    # 走步训练使用策略的标签设置
+    strategy.label_method = 'triple_barrier'
+    strategy.label_options = {'upper': 0.02, 'lower': 0.02}
+    np.testing.assert_array_equal(
+        WalkForwardEngine().make_labels(strategy, data).values,
+        triple_barrier_labels(data['Close'], 3, 0.02, 0.02).values
+    )
+
+
+def test_random_forest_generates_signals():
+    data = make_data()
+    strategy = RandomForestStrategy(n_estimators=10)
+    strategy.model_registry = None
+    signals = strategy.generate_signals(data)
+    warmup = len(data) - len(strategy.prepare_features(data))
+    assert (signals[:warmup] == 0).all()
+    assert (signals[warmup:] != 0).any()
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+import backend.services.memory_cache as memory_cache_module
+from backend.services.memory_cache import MemoryCache, estimate_size
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(memory_cache_module.time, 'monotonic', clock)
+    return clock
+
+
+def array(kb):
+    return np.zeros(kb * 1024 // 8)
+
+
+def test_lru_eviction_by_bytes():
+    cache = MemoryCache(max_bytes=3 * 1024, default_ttl=None)
+    for key in 'abc':
+        assert cache.set(key, array(1))
+    assert cache.current_bytes == 3 * 1024
+
+    # 读取 a 后 b 成为最久未使用的条目
+    assert cache.get('a') is not None
+    cache.set('d', array(1))
+    assert cache.get('b') is None
+    assert all(cache.get(key) is not None for key in 'acd')
+    assert cache.evictions == 1 and cache.current_bytes == 3 * 1024
+
+    # 一个较大的条目淘汰多个旧条目；超过容量上限的条目不缓存
+    cache.set('e', array(2))
+    assert cache.stats()['entries'] == 2 and cache.evictions == 3
+    assert not cache.set('huge', array(4))
+    assert cache.get('huge') is None
+
+
+def test_ttl_expiry(clock):
+    cache = MemoryCache(max_bytes=1024 * 1024, default_ttl=10)
+    cache.set('short', 1, ttl=1)
+    cache.set('default', 2)
+    cache.set('long', 3, ttl=100)
+
+    clock.now += 5
+    assert cache.get('short') is None
+    assert cache.get('default') == 2
+    clock.now += 10
+    assert cache.get('default') is None
+    assert cache.get('long') == 3
+    assert cache.expirations == 2
+
+
+def test_expired_entries_are_purged_before_lru_eviction(clock):
+    cache = MemoryCache(max_bytes=3 * 1024, default_ttl=None)
+    cache.set('live', array(1))
+    cache.set('expired-1', array(1), ttl=1)
+    cache.set('expired-2', array(1), ttl=1)
+    clock.now += 2
+
+    # 过期条目不应继续占用容量而挤掉仍有效的条目
+    cache.set('new', array(1))
+    assert cache.get('live') is not None and cache.get('new') is not None
+    assert cache.evictions == 0 and cache.expirations == 2
+    assert cache.current_bytes == 2 * 1024
+
+
+def test_get_frame_slices_cached_ranges():
+    cache = MemoryCache(default_ttl=None)
+    index = pd.bdate_range('2020-01-01', '2020-12-31')
+    data = pd.DataFrame({'Close': np.arange(len(index), dtype=float)}, index=index)
+    size = estimate_size(data)
+    cache.set_frame('AAA', '2020-01-01', '2021-01-01', data)
+
+    exact = cache.get_frame('AAA', '2020-01-01', '2021-01-01')
+    assert exact is data
+    part = cache.get_frame('AAA', '2020-03-01', '2020-04-01')
+    pd.testing.assert_frame_equal(part, data.loc['2020-03-01':'2020-03-31'])
+    assert cache.get_frame('AAA', '2019-12-01', '2020-02-01') is None
+    assert cache.get_frame('BBB', '2020-03-01', '2020-04-01') is None
+
+    stats = cache.stats()
+    assert stats['hits'] == 2 and stats['range_hits'] == 1 and stats['misses'] == 2
+    assert stats['hit_rate'] == pytest.approx(0.5)
+    assert stats['entries'] == 1 and stats['current_bytes'] == size
+
+    # 删除条目后不再从区间索引中命中
+    assert cache.delete(cache._frame_key('AAA', pd.Timestamp('2020-01-01'), pd.Timestamp('2021-01-01')))
+    assert cache.get_frame('AAA', '2020-03-01', '2020-04-01') is None
+    cache.clear()
+    assert cache.stats()['entries'] == 0 and cache.current_bytes == 0
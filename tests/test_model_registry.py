@@ -0,0 +1,84 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from backend.models.strategies.ml.random_forest_strategy import RandomForestStrategy
+from backend.services.model_registry import ModelRegistry
+
+
+def make_training_data(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 4))
+    y = np.where(X[:, 0] > 0, 1, -1)
+    return X, y, ['a', 'b', 'c', 'd']
+
+
+def make_strategy(registry, **params):
+    strategy = RandomForestStrategy(n_estimators=10, **params)
+    strategy.model_registry = registry
+    strategy.feature_names = ['a', 'b', 'c', 'd']
+    return strategy
+
+
+def fail_training(X, y):
+    raise AssertionError("命中模型仓库时不应重新训练")
+
+
+def test_trained_model_is_loaded_from_registry(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    X, y, columns = make_training_data()
+
+    first = make_strategy(registry)
+    first.load_or_train(X, y, columns)
+    assert registry.saves == 1
+
+    second = make_strategy(registry)
+    second.load_or_train(X, y, columns, fail_training)
+    assert registry.hits == 1
+    assert second.model_key == first.model_key
+    frame = pd.DataFrame(X, columns=columns)
+    np.testing.assert_array_equal(second.predict(frame), first.predict(frame))
+
+    models = registry.list_models()
+    assert [m['key'] for m in models] == [first.model_key]
+    assert models[0]['strategy'] == 'RandomForestStrategy'
+    assert models[0]['params']['n_estimators'] == 10
+
+
+def test_key_changes_with_params_features_and_data(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    X, y, columns = make_training_data()
+    make_strategy(registry).load_or_train(X, y, columns)
+
+    make_strategy(registry, max_depth=3).load_or_train(X, y, columns)
+    make_strategy(registry).load_or_train(X, y, ['a', 'b', 'c', 'e'])
+    make_strategy(registry).load_or_train(X[1:], y[1:], columns)
+    assert registry.hits == 0
+    assert len(registry.list_models()) == 4
+
+
+def test_eviction_by_age_and_size(tmp_path):
+    registry = ModelRegistry(str(tmp_path), max_age_days=None)
+    for i in range(3):
+        registry.save(f"m{i}", {'model': np.zeros(1000)}, {'strategy': 'test'})
+        # 最近访问时间依次递增
+        path = os.path.join(str(tmp_path), f"m{i}", 'model.pkl')
+        os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+    assert len(registry.list_models()) == 3
+
+    registry.load('m0')
+    size = registry.list_models()[0]['size_bytes']
+    assert registry.evict(max_bytes=2 * size) == 1
+    assert sorted(m['key'] for m in registry.list_models()) == ['m0', 'm2']
+
+    path = os.path.join(str(tmp_path), 'm2', 'model.pkl')
+    os.utime(path, (time.time() - 3 * 86400, time.time() - 3 * 86400))
+    assert registry.evict(max_age_days=1) == 1
+    assert [m['key'] for m in registry.list_models()] == ['m0']
+
+
+def test_invalid_key_is_rejected(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    with pytest.raises(ValueError):
+        registry.delete('../outside')
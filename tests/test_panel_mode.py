@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backend.models.backtest_engine import panel_metrics
+from backend.models.strategies.indicators.moving_average import MovingAverageStrategy
+from backend.models.strategies.indicators.macd import MACDStrategy
+from backend.models.strategies.indicators.bollinger_bands import BollingerBandsStrategy
+from backend.models.strategies.momentum.momentum import MomentumStrategy
+from backend.models.strategies.momentum.consecutive import ConsecutiveStrategy
+from backend.models.strategies.breakout.channel_breakout import ChannelBreakoutStrategy
+from backend.models.strategies.basic.inside_bar import InsideBarStrategy
+from backend.services.backtest_service import BacktestService
+
+SYMBOLS = ['A', 'B', 'C', 'D', 'FLAT']
+
+
+def make_panel(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2020-01-01', periods=n)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n, len(SYMBOLS))), axis=0))
+    close[:, -1] = 50.0  # 价格不变的股票(波动率为0)
+    high = close * (1 + np.abs(rng.normal(0, 0.01, close.shape)))
+    low = close * (1 - np.abs(rng.normal(0, 0.01, close.shape)))
+    # 让收盘价偶尔突破当日最高/最低价，使通道突破产生信号
+    high[::7] = close[::7] * 0.999
+    low[::11] = close[::11] * 1.001
+    frame = lambda values: pd.DataFrame(values, index=index, columns=SYMBOLS)
+    return {'Open': frame(close), 'High': frame(high), 'Low': frame(low), 'Close': frame(close)}
+
+
+def symbol_frame(panel, symbol):
+    return pd.DataFrame({field: frame[symbol] for field, frame in panel.items()})
+
+
+STRATEGIES = [
+    MovingAverageStrategy(5, 20),
+    MACDStrategy(12, 26, 9),
+    BollingerBandsStrategy(20, 1.5),
+    MomentumStrategy(10),
+    ConsecutiveStrategy(3),
+    ChannelBreakoutStrategy(10),
+    InsideBarStrategy(),  # 使用逐只股票的默认实现
+]
+
+
+@pytest.mark.parametrize('strategy', STRATEGIES, ids=lambda s: s.name)
+def test_panel_signals_match_single_symbol(strategy):
+    panel = make_panel()
+    signals = strategy.generate_panel_signals(panel)
+
+    assert signals.shape == panel['Close'].shape
+    assert (signals != 0).any().any()
+    for symbol in SYMBOLS:
+        expected = strategy.generate_signals(symbol_frame(panel, symbol))
+        np.testing.assert_array_equal(signals[symbol].values, np.asarray(expected))
+
+
+@pytest.mark.parametrize('strategy', STRATEGIES[:3], ids=lambda s: s.name)
+def test_panel_metrics_match_single_symbol(strategy):
+    panel = make_panel(seed=1)
+    close = panel['Close']
+    signals = strategy.generate_panel_signals(panel)
+    metrics = panel_metrics(close.values, signals.values, (close.index[-1] - close.index[0]).days)
+
+    service = BacktestService(fetcher=object())
+    for j, symbol in enumerate(SYMBOLS):
+        df = symbol_frame(panel, symbol)
+        expected = service._evaluate_signals(df, signals[symbol])[-1]
+        for name, value in expected.items():
+            assert metrics[name][j] == pytest.approx(value, rel=1e-9, abs=1e-12), (symbol, name)
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backend.models.indicators.rolling import rolling_max, rolling_min
+from backend.models.strategies.breakout.pattern_breakout import PatternBreakoutStrategy
+
+
+def make_data(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    high = close * (1 + np.abs(rng.normal(0, 0.005, n)))
+    low = close * (1 - np.abs(rng.normal(0, 0.005, n)))
+    # 价格取整到0.1，制造相等的高低点
+    return pd.DataFrame({
+        'High': high.round(1), 'Low': low.round(1), 'Close': close.round(1)
+    }, index=pd.bdate_range('2020-01-01', periods=n))
+
+
+def legacy_breakout(data, window):
+    """向量化之前逐K线切片的实现"""
+    signals = pd.Series(0, index=data.index)
+    for i in range(window, len(data)):
+        window_data = data.iloc[i - window:i]
+        support, resistance = window_data['Low'].min(), window_data['High'].max()
+        if data['Close'].iloc[i] > resistance:
+            signals.iloc[i] = 1
+        elif data['Close'].iloc[i] < support:
+            signals.iloc[i] = -1
+    return signals
+
+
+def legacy_patterns(data):
+    """向量化之前逐个4根K线窗口判断的实现"""
+    def hs_top(h):
+        return (h[0] < h[1] and h[1] > h[2] and h[2] < h[3] and h[1] < h[2] and
+                abs(h[0] - h[3]) < 0.01 * h[0])
+
+    def hs_bottom(l):
+        return (l[0] > l[1] and l[1] < l[2] and l[2] > l[3] and l[1] > l[2] and
+                abs(l[0] - l[3]) < 0.01 * l[0])
+
+    def double_top(h):
+        return h[0] < h[1] and h[1] > h[2] and h[2] < h[3] and abs(h[1] - h[3]) < 0.01 * h[1]
+
+    def double_bottom(l):
+        return l[0] > l[1] and l[1] < l[2] and l[2] > l[3] and abs(l[1] - l[3]) < 0.01 * l[1]
+
+    patterns = pd.Series(0, index=data.index)
+    for i in range(3, len(data)):
+        highs = data['High'].values[i - 3:i + 1]
+        lows = data['Low'].values[i - 3:i + 1]
+        if hs_top(highs):
+            patterns.iloc[i] = -1
+        elif hs_bottom(lows):
+            patterns.iloc[i] = 1
+        elif double_top(highs):
+            patterns.iloc[i] = -1
+        elif double_bottom(lows):
+            patterns.iloc[i] = 1
+    return patterns
+
+
+@pytest.mark.parametrize('window', [1, 3, 7, 20, 64])
+def test_rolling_extremes_match_pandas(window):
+    values = np.random.default_rng(window).normal(size=(3, 200))
+    for row, expected in zip(rolling_max(values, window), values):
+        np.testing.assert_array_equal(row, pd.Series(expected).rolling(window).max().values)
+    for row, expected in zip(rolling_min(values, window), values):
+        np.testing.assert_array_equal(row, pd.Series(expected).rolling(window).min().values)
+
+
+@pytest.mark.parametrize('window', [5, 20, 300])
+def test_breakout_matches_legacy_loop(window):
+    data = make_data(250, window)
+    signals = PatternBreakoutStrategy(window).generate_signals(data)
+    pd.testing.assert_series_equal(signals, legacy_breakout(data, window), check_dtype=False)
+
+
+def test_patterns_match_per_window_checks():
+    data = make_data(500, 0)
+    patterns = PatternBreakoutStrategy()._identify_patterns(data)
+    assert patterns.abs().sum() > 0
+    pd.testing.assert_series_equal(patterns, legacy_patterns(data), check_dtype=False)
+
+
+def test_multi_symbol_scan():
+    frames = [make_data(120, seed) for seed in range(4)]
+    high = np.stack([df['High'].values for df in frames])
+    low = np.stack([df['Low'].values for df in frames])
+    close = np.stack([df['Close'].values for df in frames])
+
+    signals = PatternBreakoutStrategy.breakout_signals(high, low, close, 10)
+    for row, df in zip(signals, frames):
+        np.testing.assert_array_equal(row, legacy_breakout(df, 10).values)
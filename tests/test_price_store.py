@@ -0,0 +1,145 @@
+import multiprocessing
+import os
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from backend.services.price_store import PriceStore
+from data.migrate_price_store import migrate_stock_files, migrate_wide_files
+
+
+def make_data(start='2019-06-03', periods=400, offset=0.0):
+    index = pd.bdate_range(start, periods=periods)
+    close = 100 + np.arange(periods, dtype=float) + offset
+    return pd.DataFrame({
+        'Open': close - 0.5, 'High': close + 1, 'Low': close - 1, 'Close': close,
+        'Volume': np.full(periods, 1000.0)
+    }, index=index)
+
+
+def test_write_merges_with_existing_partitions(tmp_path):
+    store = PriceStore(str(tmp_path))
+    data = make_data()
+    assert store.write('AAA', data) == len(data)
+    # 按年份分区
+    assert sorted(os.listdir(tmp_path / 'AAA')) == ['2019.arrow', '2020.arrow']
+    pd.testing.assert_frame_equal(store.read('AAA'), data, check_names=False, check_freq=False)
+
+    # 重叠日期以新数据为准，新日期追加
+    update = make_data('2020-06-01', 200, offset=1000.0)
+    store.write('AAA', update)
+    merged = store.read('AAA')
+    assert merged.index.is_monotonic_increasing and not merged.index.duplicated().any()
+    assert merged.index[0] == data.index[0] and merged.index[-1] == update.index[-1]
+    np.testing.assert_array_equal(merged.loc[update.index, 'Close'].values, update['Close'].values)
+    old_rows = data.index[data.index < update.index[0]]
+    np.testing.assert_array_equal(merged.loc[old_rows, 'Close'].values, data.loc[old_rows, 'Close'].values)
+    assert store.symbols() == ['AAA'] and store.exists('AAA')
+    assert store.delete('AAA') and store.read('AAA') is None
+
+
+def test_reads_prune_years_and_push_down_columns(tmp_path, monkeypatch):
+    store = PriceStore(str(tmp_path), price_dtype='float32')
+    store.write('AAA', make_data())
+
+    read_paths = []
+    original = store._read_partition
+    monkeypatch.setattr(store, '_read_partition', lambda path: read_paths.append(path) or original(path))
+    df = store.read('AAA', '2020-02-03', '2020-03-02', columns=['Close'])
+    # 只读取2020年的分区，且只返回请求的列
+    assert [os.path.basename(p) for p in read_paths] == ['2020.arrow']
+    assert list(df.columns) == ['Close'] and df['Close'].dtype == np.float32
+    assert df.index[0] == pd.Timestamp('2020-02-03') and df.index[-1] < pd.Timestamp('2020-03-02')
+
+    # 早期分区缺失的列补空值
+    store.write('BBB', make_data('2018-01-01', 100)[['Close']])
+    store.write('BBB', make_data('2019-01-01', 100))
+    mixed = store.read('BBB', columns=['Close', 'Volume'])
+    assert mixed.loc['2018', 'Volume'].isna().all() and mixed.loc['2019', 'Volume'].notna().all()
+    assert set(store.read_many(['AAA', 'BBB', 'CCC'], columns=['Close'])) == {'AAA', 'BBB'}
+
+
+def test_concurrent_writers_do_not_clobber_temp_files(tmp_path):
+    store = PriceStore(str(tmp_path))
+    errors = []
+
+    def write(offset):
+        try:
+            for _ in range(5):
+                store.write('AAA', make_data('2020-01-01', 50, offset=offset))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert os.listdir(tmp_path / 'AAA') == ['2020.arrow']
+    assert len(store.read('AAA')) == 50
+
+
+def append_days(base_dir, days):
+    store = PriceStore(base_dir)
+    for day in days:
+        store.write('AAA', make_data(day, 1))
+
+
+@pytest.mark.parametrize('mode', ['thread', 'process'])
+def test_concurrent_writers_to_one_partition_keep_all_rows(tmp_path, mode):
+    # 多个写入者同时向同一年份分区追加不同日期，任何一方的数据都不能丢失
+    days = pd.bdate_range('2020-01-01', periods=48)
+    chunks = [[str(day.date()) for day in days[i::4]] for i in range(4)]
+    if mode == 'thread':
+        workers = [threading.Thread(target=append_days, args=(str(tmp_path), chunk)) for chunk in chunks]
+    else:
+        context = multiprocessing.get_context('fork')
+        workers = [context.Process(target=append_days, args=(str(tmp_path), chunk)) for chunk in chunks]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    stored = PriceStore(str(tmp_path)).read('AAA')
+    assert list(stored.index) == list(days)
+    assert os.listdir(tmp_path / 'AAA') == ['2020.arrow']
+
+
+def test_symbols_outside_the_store_are_rejected(tmp_path):
+    store = PriceStore(str(tmp_path / 'store'))
+    victim = tmp_path / 'victim'
+    victim.mkdir()
+    (victim / 'keep.txt').write_text('x')
+    os.symlink(victim, tmp_path / 'store' / 'LINK')
+
+    for symbol in ['../victim', '..', '/tmp', 'a/b', '', 'LINK', None]:
+        with pytest.raises(ValueError):
+            store.delete(symbol)
+        with pytest.raises(ValueError):
+            store.write(symbol, make_data())
+    assert (victim / 'keep.txt').exists()
+    assert sorted(os.listdir(tmp_path)) == ['store', 'victim']
+    assert store.write('BRK-B', make_data(periods=5)) == 5 and store.exists('BRK-B')
+
+
+@pytest.mark.parametrize('file_format', ['arrow', 'parquet'])
+def test_csv_migration_round_trip(tmp_path, file_format):
+    stocks_dir = tmp_path / 'stocks'
+    raw_dir = tmp_path / 'raw'
+    stocks_dir.mkdir()
+    raw_dir.mkdir()
+    data = make_data()
+    data.index.name = 'Date'
+    data.to_csv(stocks_dir / 'AAA.csv')
+    wide = pd.DataFrame({'BBB': data['Close'], 'CCC': data['Close'] * 2}, index=data.index)
+    wide.iloc[:10, 1] = np.nan
+    wide.to_csv(raw_dir / 'close.csv')
+
+    store = PriceStore(str(tmp_path / 'store'), file_format=file_format)
+    assert migrate_wide_files(store, str(raw_dir)) == {'BBB': len(data), 'CCC': len(data) - 10}
+    assert migrate_stock_files(store, str(stocks_dir)) == {'AAA': len(data)}
+
+    pd.testing.assert_frame_equal(store.read('AAA'), data, check_freq=False)
+    np.testing.assert_array_equal(store.read('CCC')['Close'].values, wide['CCC'].dropna().values)
+    assert list(store.read('BBB').columns) == ['Close']
@@ -0,0 +1,44 @@
+import numpy as np
+import torch
+from backend.models.strategies.ml.deep_learning.sequences import SequenceDataset, sequence_windows
+from backend.models.strategies.ml.lstm_strategy import LSTMStrategy
+
+
+def legacy_create_sequences(X, lookback):
+    """原 LSTMStrategy._create_sequences 的循环实现"""
+    sequences = []
+    for i in range(len(X) - lookback):
+        sequences.append(X[i:(i + lookback)])
+    return np.array(sequences)
+
+
+def test_windows_match_legacy_loop_without_copying():
+    X = np.random.default_rng(0).normal(size=(50, 4)).astype(np.float32)
+    windows = sequence_windows(X, 10)
+    assert windows.shape == (41, 10, 4)
+    assert np.shares_memory(windows, X)
+    np.testing.assert_array_equal(windows[:-1], legacy_create_sequences(X, 10))
+
+    dataset = SequenceDataset(X, np.arange(50) % 3 - 1, 10)
+    assert len(dataset) == 41
+    assert dataset.windows.data_ptr() == torch.from_numpy(dataset._features).data_ptr()
+    window, label = dataset[5]
+    np.testing.assert_array_equal(window.numpy(), X[5:15])
+    # 标签取窗口最后一行的标签，并转换到0~2
+    assert label.item() == (14 % 3 - 1) + 1
+
+
+def test_lstm_strategy_trains_on_torch():
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(120, 3)).astype(np.float32)
+    y = np.sign(rng.normal(size=120)).astype(np.int64)
+    strategy = LSTMStrategy(lookback_period=5, units=8, epochs=2)
+    strategy.fit(X, y)
+    assert isinstance(strategy.model, torch.nn.Module)
+    assert len(strategy.training_history['val_loss']) == 2
+
+    import pandas as pd
+    signals = strategy.predict(pd.DataFrame(X))
+    assert signals.shape == (120,)
+    assert (signals[:5] == 0).all()
+    assert set(np.unique(signals)) <= {-1, 0, 1}
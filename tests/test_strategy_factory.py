@@ -0,0 +1,33 @@
+import subprocess
+import sys
+import pytest
+from backend.models.strategies.factory import StrategyFactory
+from backend.models.strategies.indicators.moving_average import MovingAverageStrategy
+
+
+def test_app_startup_does_not_import_ml_frameworks():
+    code = (
+        "import sys, backend.main\n"
+        "from backend.models.strategies.factory import StrategyFactory\n"
+        "StrategyFactory.list_strategies()\n"
+        "print([m for m in ('tensorflow', 'torch', 'xgboost', 'sklearn') if m in sys.modules])\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip().splitlines()[-1] == '[]'
+
+
+def test_strategy_classes_resolve_on_first_use():
+    assert StrategyFactory.get_strategy_class('moving_average') is MovingAverageStrategy
+    strategy = StrategyFactory.create_strategy('random_forest')
+    from backend.models.strategies import RandomForestStrategy
+    assert isinstance(strategy, RandomForestStrategy)
+    assert set(StrategyFactory.list_strategies()) == set(StrategyFactory._strategies)
+
+
+def test_unknown_strategy():
+    assert not StrategyFactory.has_strategy('unknown')
+    with pytest.raises(ValueError):
+        StrategyFactory.get_strategy_class('unknown')
+    with pytest.raises(AttributeError):
+        import backend.models.strategies as strategies
+        strategies.UnknownStrategy
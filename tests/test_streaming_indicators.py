@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backend.models.indicators.engine import IndicatorEngine
+from backend.models.indicators import streaming
+from backend.models.strategies.indicators.technical_indicators import TechnicalIndicators
+
+# RSI/ATR等在批量版本中经过不同的中间计算，在浮点误差范围内比较
+RTOL = 1e-9
+ATOL = 1e-9
+
+
+@pytest.fixture(params=[0, 1, 2])
+def bars(request):
+    rng = np.random.default_rng(request.param)
+    n = 1500
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    # 插入一段横盘，覆盖涨跌幅为0、最高最低相等等边界情况
+    close[200:230] = close[199]
+    spread = np.abs(rng.normal(0, 0.005, n)) * close
+    spread[200:230] = 0
+    index = pd.bdate_range('2015-01-01', periods=n)
+    return pd.DataFrame({'High': close + spread, 'Low': close - spread, 'Close': close}, index=index)
+
+
+def stream(indicator, *columns):
+    """逐根K线喂入指标，收集每一步的输出"""
+    outputs = [indicator.update(*values) for values in zip(*columns)]
+    return np.array(outputs, dtype=float)
+
+
+def assert_exact(actual, expected):
+    np.testing.assert_array_equal(actual, np.asarray(expected, dtype=float))
+
+
+def assert_close(actual, expected):
+    np.testing.assert_allclose(actual, np.asarray(expected, dtype=float), rtol=RTOL, atol=ATOL, equal_nan=True)
+
+
+@pytest.mark.parametrize('window,min_periods', [(1, None), (20, None), (20, 1)])
+def test_sma_and_std_are_bit_exact(bars, window, min_periods):
+    close = bars['Close']
+    engine = IndicatorEngine()
+    assert_exact(stream(streaming.SMA(window, min_periods), close), engine.sma(close, window, min_periods))
+    assert_exact(stream(streaming.RollingStd(window, min_periods), close), engine.rolling_std(close, window, min_periods))
+
+
+def test_sma_and_std_do_not_drift_on_long_series_with_nans():
+    # 长时间运行的实时会话: 一百万根K线，含零散和连续的缺失值以及正负值
+    rng = np.random.default_rng(7)
+    n = 1_000_000
+    values = np.cumsum(rng.normal(0, 1, n))
+    values[rng.choice(n, 1000, replace=False)] = np.nan
+    values[5000:5050] = np.nan
+    series = pd.Series(values)
+    for window, min_periods in [(20, None), (250, 5)]:
+        rolling = series.rolling(window, min_periods=min_periods)
+        assert_exact(stream(streaming.SMA(window, min_periods), values), rolling.mean())
+        assert_exact(stream(streaming.RollingStd(window, min_periods), values), rolling.std())
+
+
+@pytest.mark.parametrize('span', [3, 12, 26])
+def test_ema_is_bit_exact(bars, span):
+    close = bars['Close']
+    expected = IndicatorEngine().ema(close, span).values
+    assert np.array_equal(stream(streaming.EMA(span), close), expected)
+
+
+def test_macd_is_bit_exact(bars):
+    close = bars['Close']
+    expected = np.column_stack(IndicatorEngine().macd(close, 12, 26, 9))
+    assert np.array_equal(stream(streaming.MACD(12, 26, 9), close), expected)
+
+
+@pytest.mark.parametrize('method', ['sma', 'wilder'])
+@pytest.mark.parametrize('period', [2, 14])
+def test_rsi(bars, method, period):
+    close = bars['Close']
+    expected = IndicatorEngine().rsi(close, period, method=method)
+    assert_close(stream(streaming.RSI(period, method), close), expected)
+
+
+def test_bollinger_bands(bars):
+    close = bars['Close']
+    expected = np.column_stack(IndicatorEngine().bollinger_bands(close, 20, 2.0))
+    assert_close(stream(streaming.BollingerBands(20, 2.0), close), expected)
+
+
+def test_atr(bars):
+    expected = TechnicalIndicators.atr(bars['High'], bars['Low'], bars['Close'], 14)
+    assert_close(stream(streaming.ATR(14), bars['High'], bars['Low'], bars['Close']), expected)
+
+
+@pytest.mark.parametrize('k_period,d_period', [(14, 3), (5, 1)])
+def test_stochastic(bars, k_period, d_period):
+    expected = np.column_stack(
+        TechnicalIndicators.stochastic(bars['High'], bars['Low'], bars['Close'], k_period, d_period)
+    )
+    assert_close(stream(streaming.Stochastic(k_period, d_period), bars['High'], bars['Low'], bars['Close']), expected)
+
+
+def test_rolling_extreme_matches_pandas(bars):
+    high = bars['High']
+    assert_close(stream(streaming.RollingExtreme(10, 'max'), high), high.rolling(10).max())
+    assert_close(stream(streaming.RollingExtreme(10, 'min'), high), high.rolling(10).min())
+
+
+@pytest.mark.parametrize('min_periods', [None, 3])
+def test_rolling_extreme_skips_nans_like_pandas(min_periods):
+    rng = np.random.default_rng(3)
+    values = rng.normal(size=2000)
+    values[rng.choice(2000, 200, replace=False)] = np.nan
+    values[100:120] = np.nan
+    series = pd.Series(values)
+    rolling = series.rolling(10, min_periods=min_periods)
+    assert_exact(stream(streaming.RollingExtreme(10, 'max', min_periods), values), rolling.max())
+    assert_exact(stream(streaming.RollingExtreme(10, 'min', min_periods), values), rolling.min())
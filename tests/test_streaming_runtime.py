@@ -0,0 +1,128 @@
+import asyncio
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from backend.models.strategies.base import Bar
+from backend.models.strategies.indicators.moving_average import MovingAverageStrategy
+from backend.models.strategies.indicators.bollinger_bands import BollingerBandsStrategy
+from backend.models.strategies.indicators.macd import MACDStrategy
+from backend.models.strategies.breakout.channel_breakout import ChannelBreakoutStrategy
+from backend.models.strategies.factory import StrategyFactory
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import backend.routes.stream_routes as stream_routes
+from backend.services.streaming_service import STOCK_DATA_DIR, CSVReplaySource, StreamingRuntime
+
+
+def make_data(n=150, seed=1):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    spread = np.abs(rng.normal(0, 0.01, n)) * close
+    return pd.DataFrame({
+        'Open': close,
+        'High': close + spread * rng.uniform(0, 1, n),
+        'Low': close - spread,
+        'Close': close,
+        'Volume': 1000.0
+    }, index=pd.bdate_range('2021-01-01', periods=n))
+
+
+def to_bars(df):
+    return [
+        Bar(t, r.Open, r.High, r.Low, r.Close, r.Volume, 'TEST')
+        for t, r in zip(df.index, df.itertuples())
+    ]
+
+
+@pytest.mark.parametrize('strategy', [
+    MovingAverageStrategy(5, 20),
+    BollingerBandsStrategy(10, 1.0),
+    MACDStrategy(12, 26, 9),
+    ChannelBreakoutStrategy(10),
+])
+def test_on_bar_matches_batch_signals(strategy):
+    df = make_data()
+    streamed = [strategy.on_bar(bar) for bar in to_bars(df)]
+    # 每根K线的信号等于在截至该K线的历史上批量计算的最后一个信号
+    expected = [int(strategy.generate_signals(df.iloc[:i + 1]).iloc[-1]) for i in range(len(df))]
+    assert streamed == expected
+
+
+def test_replay_runtime(tmp_path):
+    df = make_data(60)
+    df[['Close']].rename_axis('Date').to_csv(tmp_path / 'AAA.csv')
+    df[['Close']].iloc[:30].rename_axis('Date').to_csv(tmp_path / 'BBB.csv')
+    pd.DataFrame(columns=['Close']).rename_axis('Date').to_csv(tmp_path / 'EMPTY.csv')
+
+    runtime = StreamingRuntime({'ma': lambda: MovingAverageStrategy(5, 20)}, emit_all=True)
+
+    async def collect():
+        return [event async for event in runtime.run(CSVReplaySource(str(tmp_path)))]
+
+    events = asyncio.run(collect())
+    summary = events[-1]
+    assert summary['type'] == 'summary'
+    assert summary['bars'] == 90
+    assert summary['symbols'] == 2
+    assert summary['strategy_latency']['ma']['count'] == 90
+    assert len(events) == 91
+
+    # 预热结束后与批量信号一致
+    signals = [e['signal'] for e in events[:-1] if e['symbol'] == 'AAA']
+    expected = MovingAverageStrategy(5, 20).generate_signals(df).tolist()
+    assert signals[19:] == expected[19:]
+    assert any(signals)
+
+
+def test_replay_source_rejects_paths_outside_data_dir(tmp_path):
+    data_dir = tmp_path / 'stocks'
+    data_dir.mkdir()
+    (tmp_path / 'secret.csv').write_text('Date,Close\n2021-01-01,1\n')
+    # 数据目录内指向目录外文件的符号链接
+    os.symlink(tmp_path / 'secret.csv', data_dir / 'LINK.csv')
+
+    for symbols in (['../secret'], ['../../etc/x'], ['/etc/passwd'], ['..'], [''], ['a\\b'], ['LINK'], [1], 'AAA'):
+        with pytest.raises(ValueError):
+            CSVReplaySource(str(data_dir), symbols=symbols)
+    with pytest.raises(ValueError):
+        CSVReplaySource(str(data_dir))._load('../secret')
+
+    source = CSVReplaySource(str(data_dir), symbols=['AAPL', 'BRK.B', '^GSPC', 'EURUSD=X', '股票A'])
+    assert source.symbols[-1] == '股票A'
+
+
+def test_replay_endpoint_uses_configured_data_dir(monkeypatch):
+    app = FastAPI()
+    app.include_router(stream_routes.router, prefix="/api")
+    client = TestClient(app)
+    strategies = [{'name': 'moving_average', 'params': {'short_window': 5, 'long_window': 20}}]
+
+    response = client.post('/api/stream/replay', json={'strategies': strategies, 'symbols': ['../../etc/x']})
+    assert response.status_code == 400
+
+    data_dirs = []
+
+    class RecordingSource(CSVReplaySource):
+        def __init__(self, data_dir, **kwargs):
+            data_dirs.append(data_dir)
+            super().__init__(data_dir, **kwargs)
+
+        def load_bars(self):
+            return []
+    monkeypatch.setattr(stream_routes, 'CSVReplaySource', RecordingSource)
+    # 请求中的 dataDir 被忽略
+    response = client.post('/api/stream/replay', json={'strategies': strategies, 'symbols': ['AAPL'], 'dataDir': '/'})
+    assert response.status_code == 200
+    assert data_dirs == [STOCK_DATA_DIR]
+
+
+def test_replay_endpoint_rejects_strategies_without_incremental_on_bar():
+    app = FastAPI()
+    app.include_router(stream_routes.router, prefix="/api")
+    client = TestClient(app)
+    assert StrategyFactory.get_strategy_class('moving_average').supports_streaming()
+    for name in ['momentum', 'xgboost', 'mlp']:
+        assert not StrategyFactory.get_strategy_class(name).supports_streaming()
+        response = client.post('/api/stream/replay', json={'strategies': [{'name': name}], 'symbols': ['AAPL']})
+        assert response.status_code == 400
@@ -0,0 +1,154 @@
+import asyncio
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from backend.models.indicators.engine import fingerprint
+from backend.models.strategies.factory import StrategyFactory
+from backend.models.strategies.validators import get_param_ranges
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import backend.services.sweep_service as sweep_module
+from backend.routes.backtest_routes import router
+from backend.services.sweep_service import MAX_COMBOS, PARAM_CONSTRAINTS, SHARED_SIGNAL_BUILDERS, SweepService
+
+
+def make_data(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, n)))
+    return pd.DataFrame({
+        'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+        'Volume': rng.uniform(1e5, 2e5, n)
+    }, index=pd.bdate_range('2020-01-01', periods=n))
+
+
+def test_expand_grid_applies_constraints():
+    service = SweepService()
+    combos = service.expand_grid('moving_average', {'short_window': [5, 10, 30], 'long_window': [20, 60]})
+    assert [(c['short_window'], c['long_window']) for c in combos] == [(5, 20), (5, 60), (10, 20), (10, 60), (30, 60)]
+
+    # 未指定的参数在取值范围内均匀取点，整数参数去重
+    combos = service.expand_grid('macd', {'signal_period': [9]}, points=3)
+    assert {c['fast_period'] for c in combos} <= {3, 26, 50}
+    assert all(PARAM_CONSTRAINTS['macd'](c) for c in combos)
+    assert len(combos) == sum(1 for f in (3, 26, 50) for s in (5, 52, 100) if f < s)
+
+    # 超出取值范围的组合被剔除
+    assert service.expand_grid('moving_average', {'short_window': [1, 5], 'long_window': [20]}) == [
+        {'short_window': 5, 'long_window': 20}
+    ]
+
+
+def test_random_samples_are_valid_and_reproducible():
+    service = SweepService()
+    combos = service.random_samples('bollinger_bands', 50, seed=3)
+    assert combos == service.random_samples('bollinger_bands', 50, seed=3)
+    assert 0 < len(combos) <= 50
+    ranges = get_param_ranges('bollinger_bands')
+    for combo in combos:
+        assert isinstance(combo['window'], int)
+        for param, (low, high) in ranges.items():
+            assert low <= combo[param] <= high
+
+    ma = service.random_samples('moving_average', 100, seed=1)
+    assert ma and all(c['short_window'] < c['long_window'] for c in ma)
+
+
+@pytest.mark.parametrize('strategy_name,combos', [
+    ('moving_average', [{'short_window': 5, 'long_window': 20}, {'short_window': 10, 'long_window': 60}]),
+    ('bollinger_bands', [{'window': 20, 'num_std': 2.0}, {'window': 10, 'num_std': 1.5}]),
+    ('macd', [{'fast_period': 12, 'slow_period': 26, 'signal_period': 9}, {'fast_period': 5, 'slow_period': 35, 'signal_period': 5}]),
+])
+def test_shared_builders_match_generate_signals(strategy_name, combos):
+    df = make_data()
+    key = fingerprint(df['Close'])
+    for params in combos:
+        expected = StrategyFactory.create_strategy(strategy_name, **params).generate_signals(df)
+        shared = SHARED_SIGNAL_BUILDERS[strategy_name](df, key, params)
+        np.testing.assert_array_equal(np.asarray(shared, dtype=float), np.asarray(expected, dtype=float))
+
+
+def test_sweep_ranks_by_metric_and_parallel_matches_serial():
+    df = make_data()
+    service = SweepService()
+    combos = service.expand_grid('moving_average', points=4)
+    serial = service.sweep(df, 'moving_average', combos, max_workers=1)
+    assert len(serial) == len(combos)
+    assert serial['sharpe_ratio'].is_monotonic_decreasing
+
+    by_return = service.sweep(df, 'moving_average', combos, metric='total_return', max_workers=1)
+    assert by_return['total_return'].is_monotonic_decreasing
+
+    parallel = service.sweep(df, 'moving_average', combos, max_workers=2)
+    pd.testing.assert_frame_equal(serial, parallel)
+    with pytest.raises(ValueError):
+        service.sweep(df, 'moving_average', [])
+
+
+def test_run_sweep_does_not_block_event_loop(monkeypatch):
+    service = SweepService()
+    monkeypatch.setattr(service.backtest_service, '_load_price_data', lambda *args: make_data())
+    original = service.sweep
+
+    def slow_sweep(*args, **kwargs):
+        time.sleep(0.5)
+        return original(*args, **kwargs)
+    monkeypatch.setattr(service, 'sweep', slow_sweep)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.02)
+                ticks += 1
+        task = asyncio.create_task(ticker())
+        result = await service.run_sweep('AAA', '2020-01-01', '2021-12-31', 'moving_average',
+                                         grid={'short_window': [5, 10], 'long_window': [20, 40]}, top_n=2)
+        task.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(run())
+    # 扫描期间事件循环仍在处理其他任务
+    assert ticks >= 10
+    assert result['total_combos'] == 4
+    assert len(result['data']['sharpe_ratio']) == 2
+
+
+def test_combo_count_is_capped_before_generation():
+    service = SweepService()
+    assert SweepService.check_limits('macd', points=10) == 1000
+    for kwargs in [{'points': 1000}, {'grid': {'fast_period': list(range(3, 51)), 'slow_period': list(range(5, 101))}}]:
+        with pytest.raises(ValueError):
+            service.expand_grid('macd', **kwargs)
+    with pytest.raises(ValueError):
+        service.random_samples('macd', MAX_COMBOS + 1)
+    for kwargs in [{'points': 0}, {'grid': {'fast_period': 12}}, {'mode': 'unknown'}, {'mode': 'random', 'n_samples': 0}]:
+        with pytest.raises(ValueError):
+            SweepService.check_limits('macd', **kwargs)
+
+
+def test_sweep_workers_are_capped_by_cpu_count(monkeypatch):
+    monkeypatch.setattr(sweep_module.os, 'cpu_count', lambda: 1)
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("单核时不应创建进程池")
+    monkeypatch.setattr(sweep_module, 'ProcessPoolExecutor', no_pool)
+    service = SweepService()
+    combos = service.expand_grid('moving_average', points=3)
+    assert len(service.sweep(make_data(), 'moving_average', combos, max_workers=64)) == len(combos)
+
+
+def test_sweep_endpoint_rejects_oversized_requests(monkeypatch):
+    loads = []
+    monkeypatch.setattr(sweep_module.BacktestService, '_load_price_data', lambda *args: loads.append(args) or make_data())
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    client = TestClient(app)
+    body = {'symbol': 'AAA', 'startDate': '2020-01-01', 'endDate': '2021-12-31', 'strategy': 'macd'}
+    for extra in [{'points': 10 ** 6}, {'mode': 'random', 'nSamples': 10 ** 9}, {'grid': {'fast_period': 12}}]:
+        assert client.post('/api/backtest/sweep', json=dict(body, **extra)).status_code == 400
+    assert loads == []
+    response = client.post('/api/backtest/sweep', json=dict(body, points=3, topN=1))
+    assert response.status_code == 200 and len(loads) == 1
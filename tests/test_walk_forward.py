@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+from backend.models.strategies.ml.random_forest_strategy import RandomForestStrategy
+from backend.models.strategies.ml.walk_forward import WalkForwardEngine
+from backend.services.memory_cache import MemoryCache
+
+
+def make_data(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.002, n)),
+        'High': close * 1.01,
+        'Low': close * 0.99,
+        'Close': close,
+        'Volume': rng.uniform(1e5, 2e5, n)
+    }, index=pd.bdate_range('2019-01-01', periods=n))
+
+
+def make_engine(cache):
+    return WalkForwardEngine(train_window=150, test_window=40, cache=cache)
+
+
+def test_split_excludes_unrealized_labels():
+    engine = WalkForwardEngine(train_window=100, test_window=20, refit_every=10)
+    folds = engine.split(300, horizon=3)
+
+    assert folds[0].test_start == 100
+    for fold in folds:
+        # 训练样本的标签在预测时刻之前已经确定
+        assert fold.train_end - 1 + 3 <= fold.test_start
+        assert fold.train_end - fold.train_start <= 100
+        # 下一次重新拟合之后不再使用旧模型
+        assert fold.test_end - fold.test_start <= 10
+
+
+def test_models_are_reused_across_backtests():
+    cache = MemoryCache(default_ttl=None)
+    longer = make_data(560)
+    data = longer.iloc[:500]
+    strategy = RandomForestStrategy(n_estimators=10)
+
+    engine = make_engine(cache)
+    first = engine.generate_signals(strategy, data)
+    assert engine.fits == len(engine.folds) > 0
+    assert (first[:150] == 0).all()
+    assert (first != 0).any()
+
+    # 追加新K线后，之前的窗口直接使用缓存的模型
+    engine = make_engine(cache)
+    second = engine.generate_signals(RandomForestStrategy(n_estimators=10), longer)
+    assert engine.cache_hits >= engine.fits
+    np.testing.assert_array_equal(second[:len(first) - 40], first[:len(first) - 40])
+
+
+def test_process_pool_matches_sequential_fits():
+    data = make_data()
+    signals = []
+    for n_jobs in (1, 2):
+        engine = WalkForwardEngine(train_window=150, test_window=40, n_jobs=n_jobs,
+                                   cache=MemoryCache(default_ttl=None))
+        signals.append(engine.generate_signals(RandomForestStrategy(n_estimators=10), data))
+        assert engine.fits == len(engine.folds) > 1
+    assert (signals[0] != 0).any()
+    np.testing.assert_array_equal(signals[1], signals[0])
+
+
+def test_signals_do_not_depend_on_future_bars():
+    data = make_data()
+    changed = data.copy()
+    changed.iloc[300:, :] *= 1.5
+
+    signals = make_engine(MemoryCache()).generate_signals(RandomForestStrategy(n_estimators=10), data)
+    altered = make_engine(MemoryCache()).generate_signals(RandomForestStrategy(n_estimators=10), changed)
+    np.testing.assert_array_equal(signals[:300], altered[:300])
+
+
+def test_model_cache_evicts_by_fitted_model_size():
+    data = make_data()
+    cache = MemoryCache(default_ttl=None)
+    engine = make_engine(cache)
+    engine.generate_signals(RandomForestStrategy(n_estimators=20), data)
+    entries = len(engine.folds)
+    # 条目大小按序列化后的模型估算，而不是对象头的几百字节
+    entry_bytes = cache.current_bytes / entries
+    assert entry_bytes > 10_000
+
+    small = MemoryCache(max_bytes=int(entry_bytes * 2.5), default_ttl=None)
+    engine = make_engine(small)
+    engine.generate_signals(RandomForestStrategy(n_estimators=20), data)
+    stats = small.stats()
+    assert stats['evictions'] == entries - stats['entries'] > 0
+    assert stats['current_bytes'] <= small.max_bytes
+
+
+def test_deep_learning_walk_forward_reuses_cached_models():
+    from backend.models.strategies.ml.deep_learning.mlp_strategy import MLPStrategy
+
+    def make_strategy():
+        strategy = MLPStrategy(lookback_period=5)
+        strategy.model_registry = None
+        strategy.max_epochs = 2
+        return strategy
+
+    data = make_data(320)
+    cache = MemoryCache(default_ttl=None)
+    engine = WalkForwardEngine(train_window=150, test_window=40, cache=cache)
+    first = engine.generate_signals(make_strategy(), data)
+    assert engine.fits == len(engine.folds) > 0
+    warmup = len(data) - len(make_strategy().prepare_features(data))
+    assert (first[:warmup + 150] == 0).all()
+    assert (first != 0).any()
+
+    engine = WalkForwardEngine(train_window=150, test_window=40, cache=cache)
+    second = engine.generate_signals(make_strategy(), data)
+    assert engine.fits == 0 and engine.cache_hits == len(engine.folds)
+    np.testing.assert_array_equal(second, first)
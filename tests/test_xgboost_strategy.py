@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+from backend.models.strategies.ml.xgboost_strategy import XGBoostStrategy
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    for cache in (XGBoostStrategy._dmatrix_cache, XGBoostStrategy._base_boosters,
+                  XGBoostStrategy._checked_features):
+        cache.clear()
+
+
+def make_training_data(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 5)).astype(np.float32)
+    # 只有涨跌两类(没有持平的样本)
+    y = np.where(X[:, 0] + 0.5 * rng.normal(size=n) > 0, 1, -1)
+    return X, y
+
+
+def make_strategy(**params):
+    strategy = XGBoostStrategy(n_estimators=20, **params)
+    strategy.model_registry = None
+    return strategy
+
+
+def test_trains_when_a_class_is_missing():
+    X, y = make_training_data()
+    strategy = make_strategy()
+    strategy.fit(X, y)
+    predictions = strategy.predict(X)
+    assert set(np.unique(predictions)) <= {-1, 0, 1}
+    assert (predictions == np.where(X[:, 0] > 0, 1, -1))[np.abs(X[:, 0]) > 1].mean() > 0.9
+
+
+def test_training_matrix_is_reused():
+    X, y = make_training_data()
+    make_strategy(warm_start_rounds=0).fit(X, y)
+    matrices = [m for _, m in XGBoostStrategy._dmatrix_cache.items()]
+    make_strategy(warm_start_rounds=0).fit(X, y)
+    assert [m for _, m in XGBoostStrategy._dmatrix_cache.items()] == matrices
+
+
+def test_warm_start_is_off_by_default():
+    X, y = make_training_data()
+    strategy = make_strategy()
+    strategy.fit(X, y)
+    assert strategy.warm_start_rounds == 0
+    assert strategy.model.num_boosted_rounds() == 20
+    assert XGBoostStrategy._base_boosters.items() == []
+
+
+def test_warm_start_when_bars_are_appended():
+    X, y = make_training_data(340)
+    first = make_strategy(warm_start_rounds=5, warm_start_block=20)
+    first.fit(X[:300], y[:300])
+    previous = first.model
+    assert previous.num_boosted_rounds() == 20
+
+    second = make_strategy(warm_start_rounds=5, warm_start_block=20)
+    second.fit(X[:312], y[:312])
+    assert second.model.num_boosted_rounds() == 25
+    assert previous.num_boosted_rounds() == 20
+
+    # 追加的K线超过 warm_start_block 时重新完整训练
+    third = make_strategy(warm_start_rounds=5, warm_start_block=20)
+    third.fit(X[:325], y[:325])
+    assert third.model.num_boosted_rounds() == 20
+
+    # 训练数据不是之前的前缀时重新训练
+    fourth = make_strategy(warm_start_rounds=5, warm_start_block=20)
+    fourth.fit(X[10:], y[10:])
+    assert fourth.model.num_boosted_rounds() == 20
+
+
+def test_warm_started_models_stay_bounded():
+    X, y = make_training_data(500)
+    rounds = []
+    # 每天追加一根K线
+    for n_rows in range(100, 501):
+        strategy = make_strategy(warm_start_rounds=5, warm_start_block=20)
+        strategy.fit(X[:n_rows], y[:n_rows])
+        rounds.append(strategy.model.num_boosted_rounds())
+    # 增量训练的模型不会叠加，模型不会无限增长
+    assert set(rounds) == {20, 25}
+    assert rounds.count(25) > rounds.count(20)
+    assert all(b.num_boosted_rounds() == 20
+               for _, entries in XGBoostStrategy._base_boosters.items() for _, _, b in entries)